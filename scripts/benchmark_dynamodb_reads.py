@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark reading step results from DynamoDB one Query at a time versus BatchGetItem.
+
+Runs against an in-memory moto table, so it needs no AWS account. Simulates a
+repository investigation with 17 analysis steps: every step's result is saved,
+then read back the way the workflow does it (context for the last step plus
+retrieve_all_results). Use --latency-ms to add a per-request delay that
+approximates the round trip to a real table.
+
+Usage:
+    python scripts/benchmark_dynamodb_reads.py [--steps 17] [--latency-ms 10] [--rounds 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add src to path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+TABLE = "benchmark-repo-swarm-results"
+
+
+def create_table():
+    import boto3
+
+    boto3.resource("dynamodb", region_name="us-east-1").create_table(
+        TableName=TABLE,
+        KeySchema=[
+            {"AttributeName": "repository_name", "KeyType": "HASH"},
+            {"AttributeName": "analysis_timestamp", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "repository_name", "AttributeType": "S"},
+            {"AttributeName": "analysis_timestamp", "AttributeType": "N"},
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+def instrument(client, latency_ms):
+    """Count DynamoDB requests and optionally delay each one."""
+    calls = {"count": 0}
+
+    def before_call(**kwargs):
+        calls["count"] += 1
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+
+    client.dynamodb.meta.client.meta.events.register("before-call.dynamodb.*", before_call)
+    return calls
+
+
+def read_sequential(client, keys):
+    return {key: client.get_analysis_result(key) for key in keys}
+
+
+def read_batched(client, keys):
+    return client.get_analysis_results(keys)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--steps", type=int, default=17, help="Number of analysis steps (default 17)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Simulated latency per request in ms")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed rounds per strategy")
+    parser.add_argument("--result-kb", type=int, default=8, help="Size of each step result in KB")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+    from moto import mock_aws
+
+    with mock_aws():
+        from utils.dynamodb_client import DynamoDBClient
+
+        create_table()
+        client = DynamoDBClient(table_name=TABLE)
+        keys = [f"repo_step{i}_{'c' * 40}_v1" for i in range(args.steps)]
+        for key in keys:
+            client.save_analysis_result(key, f"# {key}\n" + "x" * (args.result_kb * 1024))
+
+        calls = instrument(client, args.latency_ms)
+        print(f"📊 {args.steps} step results of {args.result_kb}KB, "
+              f"{args.latency_ms}ms simulated latency, {args.rounds} rounds")
+
+        for name, read in (("sequential Query", read_sequential), ("BatchGetItem", read_batched)):
+            expected = read(client, keys)
+            assert all(expected.values()), f"{name} missed results"
+
+            calls["count"] = 0
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                read(client, keys)
+            elapsed_ms = (time.perf_counter() - start) * 1000 / args.rounds
+
+            print(f"  {name:<17} {elapsed_ms:8.1f} ms/read   {calls['count'] / args.rounds:5.1f} requests/read")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Compare the token cost of the tree and compact repository structure encodings.
+
+The repository structure is sent with every analysis step, so its size is paid
+once per step. For each repository path given, renders both encodings and
+counts their tokens with the Anthropic token counting endpoint when
+ANTHROPIC_API_KEY is set, otherwise with a characters-per-token estimate
+(marked "est.").
+
+Usage:
+    python scripts/benchmark_structure_encoding.py [REPO_PATH ...] [--max-depth 3] [--token-budget 8000]
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+# Add src to path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+FORMATS = ("tree", "compact")
+
+
+def token_counter():
+    """Return (count_tokens, is_estimate)."""
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if api_key:
+        import anthropic
+        from investigator.core.config import Config
+
+        client = anthropic.Anthropic(api_key=api_key)
+
+        def count_tokens(text):
+            return client.messages.count_tokens(
+                model=Config.CLAUDE_MODEL, messages=[{"role": "user", "content": text}]
+            ).input_tokens
+
+        return count_tokens, False
+
+    from investigator.core.repository_analyzer import RepositoryAnalyzer
+    return RepositoryAnalyzer.estimate_tokens, True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("repos", nargs="*", default=[os.path.join(os.path.dirname(__file__), "..")],
+                        help="Repository paths (default: this repository)")
+    parser.add_argument("--max-depth", type=int, default=None, help="Structure depth (default MAX_DEPTH)")
+    parser.add_argument("--token-budget", type=int, default=None, help="Fit a token budget instead of a fixed depth")
+    args = parser.parse_args()
+
+    from investigator.core.repository_analyzer import RepositoryAnalyzer
+
+    analyzer = RepositoryAnalyzer(logging.getLogger(__name__))
+    count_tokens, is_estimate = token_counter()
+    unit = "tokens (est.)" if is_estimate else "tokens"
+    print(f"📊 Repository structure encodings, {unit}")
+
+    for repo in args.repos:
+        repo = os.path.abspath(repo)
+        tokens = {
+            fmt: count_tokens(analyzer.get_structure(
+                repo, args.max_depth, structure_format=fmt, token_budget=args.token_budget
+            ))
+            for fmt in FORMATS
+        }
+        saved = 100 * (1 - tokens["compact"] / tokens["tree"]) if tokens["tree"] else 0
+        print(f"  {os.path.basename(repo):<24} tree {tokens['tree']:7d}   compact {tokens['compact']:7d}   "
+              f"saved {saved:5.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Train a zstd dictionary on existing .arch.md files.
+
+Analysis results share a lot of structure (headings, section names, phrasing),
+so a dictionary trained on earlier results improves the compression of new
+ones. Point DYNAMODB_ZSTD_DICT at the output file on every worker; items
+written with the dictionary record its id and can only be read by workers
+that load the same dictionary.
+
+Usage:
+    python scripts/train_zstd_dictionary.py ARCH_HUB_DIR [--output arch-md.zdict] [--size-kb 112]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    print("❌ The zstandard package is required: uv add zstandard")
+    sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a zstd dictionary on .arch.md files")
+    parser.add_argument("corpus_dir", help="Directory containing .arch.md files (searched recursively)")
+    parser.add_argument("--output", default="arch-md.zdict", help="Dictionary output path")
+    parser.add_argument("--size-kb", type=int, default=112, help="Dictionary size in KB")
+    args = parser.parse_args()
+
+    samples = [path.read_bytes() for path in Path(args.corpus_dir).rglob("*.arch.md")]
+    if len(samples) < 8:
+        print(f"❌ Found {len(samples)} .arch.md files, need at least 8 to train a dictionary")
+        sys.exit(1)
+
+    dictionary = zstandard.train_dictionary(args.size_kb * 1024, samples)
+    Path(args.output).write_bytes(dictionary.as_bytes())
+
+    plain = zstandard.ZstdCompressor(level=9)
+    trained = zstandard.ZstdCompressor(level=9, dict_data=dictionary)
+    total = sum(len(s) for s in samples)
+    without = sum(len(plain.compress(s)) for s in samples)
+    with_dict = sum(len(trained.compress(s)) for s in samples)
+
+    print(f"✅ Trained dictionary {dictionary.dict_id()} on {len(samples)} files -> {args.output}")
+    print(f"   {total} bytes: {without} compressed without dictionary, {with_dict} with it")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+The worker's shared AsyncAnthropic client.
+
+A ClaudeAnalyzer with its own Anthropic client per analysis step meant a new
+connection pool, and a new TCP and TLS handshake, for every Claude call, plus
+an LLM pool thread blocked for the whole call. The worker instead creates one
+AsyncAnthropic client at startup (configure_claude_client) and the analysis
+steps await it on the event loop, reusing its keep-alive connections:
+
+- CLAUDE_MAX_CONNECTIONS bounds the connections open at once
+- CLAUDE_KEEPALIVE_CONNECTIONS idle connections are kept for
+  CLAUDE_KEEPALIVE_EXPIRY_SECONDS, longer than the gap between two steps
+- CLAUDE_CONNECT_TIMEOUT_SECONDS fails fast on an unreachable API while
+  CLAUDE_TIMEOUT_SECONDS leaves room for long generations
+
+Without a configured client (tests, scripts) the steps fall back to a
+synchronous client on the LLM thread pool.
+"""
+
+from typing import Optional
+
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+
+try:
+    import httpx
+except ImportError:  # newer Anthropic SDKs are built on httpx2
+    import httpx2 as httpx
+
+from investigator.core.config import Config
+
+_client: Optional[AsyncAnthropic] = None
+
+
+def create_claude_client(api_key: str, base_url: Optional[str] = None) -> AsyncAnthropic:
+    """
+    Create an AsyncAnthropic client with the connection limits and timeouts from Config.
+
+    Args:
+        api_key: Anthropic API key
+        base_url: API base URL (default: ANTHROPIC_BASE_URL or the Anthropic API)
+    """
+    timeout = httpx.Timeout(Config.CLAUDE_TIMEOUT_SECONDS, connect=Config.CLAUDE_CONNECT_TIMEOUT_SECONDS)
+    http_client = DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=Config.CLAUDE_MAX_CONNECTIONS,
+            max_keepalive_connections=Config.CLAUDE_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=Config.CLAUDE_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=timeout,
+    )
+    return AsyncAnthropic(api_key=api_key, base_url=base_url, http_client=http_client, timeout=timeout)
+
+
+def configure_claude_client(client: Optional[AsyncAnthropic]) -> None:
+    """Set the client shared by this worker's analysis steps (None to go back to per-step clients)."""
+    global _client
+    _client = client
+
+
+def get_claude_client() -> Optional[AsyncAnthropic]:
+    """The worker's shared client, or None when none was configured."""
+    return _client
+
+
+async def close_claude_client() -> None:
+    """Close the shared client's connections (used when the worker stops)."""
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.close()
@@ -12,6 +12,8 @@ from datetime import datetime, timezone
 from temporalio import activity
 import uuid
 
+from .executors import run_io
+
 activity_logger = logging.getLogger(__name__)
 
 
@@ -33,7 +35,7 @@ async def check_dynamodb_health() -> Dict:
     
     # Check if we're running locally and should skip DynamoDB health check
     is_local = any([
-        os.environ.get('PROMPT_CONTEXT_STORAGE') == 'file',
+        os.environ.get('PROMPT_CONTEXT_STORAGE') in ('file', 'sqlite'),
         os.environ.get('SKIP_DYNAMODB_CHECK') == 'true',
         os.environ.get('LOCAL_TESTING') == 'true',
         # Check if we're NOT in AWS/production environment
@@ -51,7 +53,7 @@ async def check_dynamodb_health() -> Dict:
         activity.logger.info(f"  SKIP_DYNAMODB_CHECK: {os.environ.get('SKIP_DYNAMODB_CHECK')}")
         activity.logger.info(f"  LOCAL_TESTING: {os.environ.get('LOCAL_TESTING')}")
         activity.logger.info(f"  TEMPORAL_SERVER_URL: {temporal_server}")
-        activity.logger.info(f"  Running in local mode - DynamoDB operations will use file storage")
+        activity.logger.info(f"  Running in local mode - DynamoDB operations will use file/SQLite storage")
         
         return {
             "status": "healthy",
@@ -66,7 +68,7 @@ async def check_dynamodb_health() -> Dict:
         from utils.dynamodb_client import get_dynamodb_client
         
         # Get the DynamoDB client
-        dynamodb_client = get_dynamodb_client()
+        dynamodb_client = await run_io(get_dynamodb_client)
         
         # Generate a unique test key to avoid conflicts with real repos
         # Use double underscore prefix, timestamp, and UUID to ensure uniqueness
@@ -93,12 +95,12 @@ async def check_dynamodb_health() -> Dict:
         
         # Convert floats to Decimal for DynamoDB
         test_item = dynamodb_client._convert_floats_to_decimal(test_item)
-        dynamodb_client.table.put_item(Item=test_item)
+        await run_io(dynamodb_client.table.put_item, Item=test_item)
         activity.logger.info("✓ Write operation successful")
         
         # Step 2: Read test item back
         activity.logger.info("Testing DynamoDB read operation...")
-        response = dynamodb_client.table.get_item(
+        response = await run_io(dynamodb_client.table.get_item,
             Key={
                 'repository_name': test_repo_name,
                 'analysis_timestamp': test_timestamp
@@ -116,7 +118,7 @@ async def check_dynamodb_health() -> Dict:
         
         # Step 3: Delete test item
         activity.logger.info("Testing DynamoDB delete operation...")
-        dynamodb_client.table.delete_item(
+        await run_io(dynamodb_client.table.delete_item,
             Key={
                 'repository_name': test_repo_name,
                 'analysis_timestamp': test_timestamp
@@ -126,7 +128,7 @@ async def check_dynamodb_health() -> Dict:
         
         # Step 4: Verify deletion
         activity.logger.info("Verifying test item was deleted...")
-        verify_response = dynamodb_client.table.get_item(
+        verify_response = await run_io(dynamodb_client.table.get_item,
             Key={
                 'repository_name': test_repo_name,
                 'analysis_timestamp': test_timestamp
@@ -163,7 +165,7 @@ async def check_dynamodb_health() -> Dict:
         try:
             if 'test_repo_name' in locals() and 'test_timestamp' in locals():
                 activity.logger.info("Attempting to clean up test item after failure...")
-                dynamodb_client.table.delete_item(
+                await run_io(dynamodb_client.table.delete_item,
                     Key={
                         'repository_name': test_repo_name,
                         'analysis_timestamp': test_timestamp
@@ -196,10 +198,10 @@ async def cleanup_old_health_checks() -> Dict:
         from utils.dynamodb_client import get_dynamodb_client
         from boto3.dynamodb.conditions import Attr
         
-        dynamodb_client = get_dynamodb_client()
+        dynamodb_client = await run_io(get_dynamodb_client)
         
         # Scan for health check items (this should be very few items)
-        response = dynamodb_client.table.scan(
+        response = await run_io(dynamodb_client.table.scan,
             FilterExpression=Attr('health_check').eq(True),
             Limit=100  # Limit to prevent runaway scans
         )
@@ -207,7 +209,7 @@ async def cleanup_old_health_checks() -> Dict:
         items_deleted = 0
         for item in response.get('Items', []):
             try:
-                dynamodb_client.table.delete_item(
+                await run_io(dynamodb_client.table.delete_item,
                     Key={
                         'repository_name': item['repository_name'],
                         'analysis_timestamp': item['analysis_timestamp']
@@ -0,0 +1,85 @@
+"""
+Thread pools for the blocking work done inside async activities.
+
+All activities are `async def`, so they share the worker's event loop. Git,
+subprocess, boto3, filesystem and synchronous Anthropic calls are handed to
+one of two separately sized pools instead of running on the loop, so one
+slow clone or Claude call never stalls the other activities or their
+heartbeats:
+
+- io: git, subprocess, filesystem and DynamoDB work
+- llm: Claude API calls made without the worker's shared async client
+  (see claude_client.py)
+
+The pool sizes are set once by the worker (configure_executors); otherwise
+they are created on first use from Config.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_lock = threading.Lock()
+
+
+def configure_executors(io_workers: int, llm_workers: int) -> None:
+    """
+    Create the I/O and LLM thread pools with the given sizes.
+
+    Replaces any existing pools; work already submitted to them finishes
+    normally.
+
+    Args:
+        io_workers: Maximum threads for git/subprocess/filesystem/DynamoDB work
+        llm_workers: Maximum threads for Claude API calls
+    """
+    with _lock:
+        previous = list(_executors.values())
+        _executors["io"] = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="activity-io")
+        _executors["llm"] = ThreadPoolExecutor(max_workers=llm_workers, thread_name_prefix="activity-llm")
+    for executor in previous:
+        executor.shutdown(wait=False)
+
+
+def get_executor(kind: str) -> ThreadPoolExecutor:
+    """Return the "io" or "llm" pool, creating both from Config if needed."""
+    executor = _executors.get(kind)
+    if executor is None:
+        from investigator.core.config import Config
+        with _lock:
+            if not _executors:
+                _executors["io"] = ThreadPoolExecutor(max_workers=Config.ACTIVITY_IO_WORKERS, thread_name_prefix="activity-io")
+                _executors["llm"] = ThreadPoolExecutor(max_workers=Config.ACTIVITY_LLM_WORKERS, thread_name_prefix="activity-llm")
+        executor = _executors[kind]
+    return executor
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    """Shut down both pools (used when the worker stops)."""
+    with _lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
+
+
+async def _run_in(kind: str, fn: Callable[..., T], *args, **kwargs) -> T:
+    # Copy the context so activity.logger and activity.info() keep working in the thread
+    call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(get_executor(kind), call)
+
+
+async def run_io(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run blocking git/subprocess/filesystem/DynamoDB work on the I/O pool."""
+    return await _run_in("io", fn, *args, **kwargs)
+
+
+async def run_llm(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run a blocking Claude API call on the LLM pool."""
+    return await _run_in("llm", fn, *args, **kwargs)
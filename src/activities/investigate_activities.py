@@ -3,16 +3,34 @@ import os
 import sys
 import json
 import asyncio
+import functools
 import subprocess
-from typing import Optional
+import threading
+import time
+from typing import Dict, Optional
 
 # Import Pydantic models for type safety
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from models import AnalyzeWithClaudeInput, AnalyzeWithClaudeOutput, PromptContextDict
+from models import (
+    AnalyzeWithClaudeInput,
+    AnalyzeWithClaudeOutput,
+    ClaudeApiFeedback,
+    RunAnalysisStepInput,
+    AnalysisStepCacheCheckOutput,
+    StoreSharedInputsOutput,
+    PromptContextDict,
+    ClaudeBatchSubmitInput,
+    ClaudeBatchSubmitOutput,
+    ClaudeBatchCollectInput,
+    ClaudeBatchCollectOutput,
+)
 
 # Add parent directory to path to import investigator
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Blocking work runs on the worker's thread pools, never on the event loop
+from activities.executors import run_io, run_llm
+
 @activity.defn
 async def update_repos_list() -> dict:
     """
@@ -37,7 +55,8 @@ async def update_repos_list() -> dict:
         activity.logger.info(f"Running update_repos.py script at: {script_path}")
         
         # Run the script using the same Python interpreter
-        result = subprocess.run(
+        result = await run_io(
+            subprocess.run,
             [sys.executable, script_path],
             capture_output=True,
             text=True,
@@ -107,14 +126,31 @@ async def read_repos_config() -> dict:
     )
     
     try:
-        with open(repos_file_path, 'r') as f:
-            repos_data = json.load(f)
-            activity.logger.info(f"Successfully read repos.json with {len(repos_data.get('repositories', {}))} repositories")
-            return repos_data
+        repos_data = await run_io(_read_json_file, repos_file_path)
+        activity.logger.info(f"Successfully read repos.json with {len(repos_data.get('repositories', {}))} repositories")
+        return repos_data
     except Exception as e:
         activity.logger.error(f"Failed to read repos.json: {str(e)}")
         return {"error": str(e), "repositories": {}}
 
+def _read_json_file(file_path: str):
+    """Load a JSON file."""
+    with open(file_path, 'r') as f:
+        return json.load(f)
+
+
+def _read_text_file(file_path: str) -> str:
+    """Read a UTF-8 text file."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _write_text_file(file_path: str, content: str) -> None:
+    """Write a UTF-8 text file."""
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
 def _read_arch_file_content(arch_file_path: str) -> str:
     """
     Read the content of the arch file.
@@ -159,7 +195,8 @@ async def save_to_arch_hub(arch_files: list) -> dict:
         pass
     
     # Create a temporary directory for cloning
-    with tempfile.TemporaryDirectory() as temp_dir:
+    temp_dir = await run_io(tempfile.mkdtemp)
+    try:
         try:
             # Clone the results repository using GitRepositoryManager for proper auth
             from investigator.core.git_manager import GitRepositoryManager
@@ -171,7 +208,7 @@ async def save_to_arch_hub(arch_files: list) -> dict:
             
             # Use GitRepositoryManager which handles GitHub token authentication
             git_manager = GitRepositoryManager(activity.logger)
-            cloned_repo_path = git_manager.clone_or_update(repo_url, repo_dir)
+            cloned_repo_path = await run_io(git_manager.clone_or_update, repo_url, repo_dir)
             
             activity.logger.info(f"Repository cloned successfully to: {cloned_repo_path}")
             
@@ -185,7 +222,7 @@ async def save_to_arch_hub(arch_files: list) -> dict:
             if Config.ARCH_HUB_FILES_DIR:
                 target_dir = os.path.join(repo_dir, Config.ARCH_HUB_FILES_DIR)
                 # Create the directory if it doesn't exist
-                os.makedirs(target_dir, exist_ok=True)
+                await run_io(os.makedirs, target_dir, exist_ok=True)
             else:
                 target_dir = repo_dir
             
@@ -204,8 +241,7 @@ async def save_to_arch_hub(arch_files: list) -> dict:
                 file_path = os.path.join(target_dir, filename)
                 
                 # Write the architecture content to file
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(arch_content)
+                await run_io(_write_text_file, file_path, arch_content)
                 
                 # Store relative path if using subdirectory
                 if Config.ARCH_HUB_FILES_DIR:
@@ -233,17 +269,17 @@ async def save_to_arch_hub(arch_files: list) -> dict:
                 pass
             
             # Configure git user (required for commits)
-            git_config_success = git_manager.configure_git_user(repo_dir, Config.GIT_USER_NAME, Config.GIT_USER_EMAIL)
+            git_config_success = await run_io(git_manager.configure_git_user, repo_dir, Config.GIT_USER_NAME, Config.GIT_USER_EMAIL)
             if not git_config_success:
                 raise Exception("Failed to configure git user")
             
             # Validate GitHub token and log user info
-            token_validation = git_manager.validate_github_token()
+            token_validation = await run_io(git_manager.validate_github_token)
             if token_validation["status"] == "valid":
                 activity.logger.info(token_validation["message"])
                 
                 # Check repository permissions
-                permission_check = git_manager.check_repository_permissions(repo_url)
+                permission_check = await run_io(git_manager.check_repository_permissions, repo_url)
                 if permission_check["status"] == "allowed":
                     activity.logger.info(permission_check["message"])
                 elif permission_check["status"] == "denied":
@@ -272,7 +308,8 @@ async def save_to_arch_hub(arch_files: list) -> dict:
                 pass
             
             # Add all files
-            subprocess.run(
+            await run_io(
+                subprocess.run,
                 ["git", "add", "."],
                 cwd=repo_dir,
                 check=True
@@ -302,7 +339,8 @@ async def save_to_arch_hub(arch_files: list) -> dict:
                 pass
             
             # Commit changes
-            commit_result = subprocess.run(
+            commit_result = await run_io(
+                subprocess.run,
                 ["git", "commit", "-m", commit_message],
                 cwd=repo_dir,
                 capture_output=True,
@@ -319,7 +357,7 @@ async def save_to_arch_hub(arch_files: list) -> dict:
                 pass
             
             # Push changes using GitRepositoryManager
-            push_result = git_manager.push_with_authentication(repo_dir, "main")
+            push_result = await run_io(git_manager.push_with_authentication, repo_dir, "main")
             
             if push_result["status"] != "success":
                 raise Exception(push_result["message"])
@@ -346,22 +384,153 @@ async def save_to_arch_hub(arch_files: list) -> dict:
             activity.logger.error(f"Failed to save architecture files: {str(e)}")
             # Raise exception to properly signal activity failure to Temporal
             raise Exception(f"Failed to save architecture files: {str(e)}") from e 
+    finally:
+        # Remove the hub clone on the I/O pool, not the event loop
+        await run_io(shutil.rmtree, temp_dir, ignore_errors=True)
 
 
+# Shared inputs must outlive the longest run (batch mode can wait a day for results)
+SHARED_INPUT_TTL_MINUTES = 72 * 60
+
+# Shared-input key -> time this worker last wrote it
+_shared_input_writes: Dict[str, float] = {}
+
+
+def _save_shared_input(repo_name: str, content: str) -> str:
+    """
+    Save a shared input under its content-addressed key.
+    
+    Each key is written once per worker (again after half its TTL has passed),
+    however many steps ask for it.
+    
+    Returns:
+        The shared-input key
+    """
+    from utils.prompt_context import create_prompt_context_manager
+    from utils.storage_keys import KeyNameCreator
+    
+    reference_key = KeyNameCreator.create_shared_input_key(repo_name, content).to_storage_key()
+    last_write = _shared_input_writes.get(reference_key)
+    if last_write is None or time.monotonic() - last_write > SHARED_INPUT_TTL_MINUTES * 30:
+        create_prompt_context_manager(repo_name).save_shared_input(content, ttl_minutes=SHARED_INPUT_TTL_MINUTES)
+        _shared_input_writes[reference_key] = time.monotonic()
+    return reference_key
+
+
+@functools.lru_cache(maxsize=32)
+def _load_shared_input(repo_name: str, reference_key: str) -> str:
+    """
+    Read a shared input, once per worker.
+    
+    Keys are content-addressed, so a cached copy can never be stale.
+    """
+    from utils.prompt_context import create_prompt_context_manager
+    
+    content = create_prompt_context_manager(repo_name).get_shared_input(reference_key)
+    if content is None:
+        raise Exception(f"Shared input not found: {reference_key}")
+    return content
+
+
+@activity.defn
+async def store_shared_inputs_activity(repo_name: str, repo_structure: str,
+                                       deps_formatted_content: Optional[str] = None) -> StoreSharedInputsOutput:
+    """
+    Activity to store the inputs shared by every analysis step once per run.
+    
+    The repository structure and formatted dependencies are saved under
+    content-addressed keys, and the steps receive only those keys.
+    
+    Args:
+        repo_name: Name of the repository
+        repo_structure: Repository structure string
+        deps_formatted_content: Optional formatted dependencies content
+        
+    Returns:
+        StoreSharedInputsOutput with the shared-input keys
+    """
+    activity.logger.info(f"Storing shared analysis inputs for {repo_name}")
+    
+    try:
+        # Import here to avoid workflow sandbox issues
+        sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        
+        repo_structure_ref = await run_io(_save_shared_input, repo_name, repo_structure)
+        deps_ref = None
+        if deps_formatted_content:
+            deps_ref = await run_io(_save_shared_input, repo_name, deps_formatted_content)
+        
+        activity.logger.info(
+            f"💾 Shared inputs stored: structure={repo_structure_ref} ({len(repo_structure)} chars), "
+            f"deps={deps_ref} ({len(deps_formatted_content or '')} chars)"
+        )
+        return StoreSharedInputsOutput(repo_structure_ref=repo_structure_ref, deps_ref=deps_ref)
+        
+    except Exception as e:
+        activity.logger.error(f"Failed to store shared inputs: {str(e)}")
+        raise Exception(f"Failed to store shared inputs: {str(e)}") from e
+
+
+def _prepare_prompt(prompt_content: str, repo_structure: str,
+                    deps_formatted_content: Optional[str]) -> tuple:
+    """
+    Fill the {repo_deps} placeholder of a prompt template.
+    
+    Returns:
+        Tuple of (prompt_content, repo_structure); with prompt caching enabled the
+        dependencies are moved into the shared repository context instead
+    """
+    from investigator.core.claude_analyzer import ClaudeAnalyzer
+    from investigator.core.config import Config
+    
+    if deps_formatted_content and Config.PROMPT_CACHING_ENABLED:
+        # Dependencies belong to the shared repo prefix so every step sends identical cached bytes
+        activity.logger.info(f"Prompt caching enabled - adding dependencies to the shared repository context")
+        repo_structure = f"{repo_structure}\n\n## Dependencies\n\n{deps_formatted_content}"
+        prompt_content = prompt_content.replace('{repo_deps}', ClaudeAnalyzer.REPO_DEPS_REFERENCE)
+    elif deps_formatted_content:
+        # Define dependency keywords to check for
+        DEPENDENCY_KEYWORDS = [
+            'dependencies', 'packages', 'requirements', 'libraries',
+            'npm', 'pip', 'gem', 'cargo', 'maven', 'gradle', 'nuget',
+            'pyproject', 'package.json', 'gemfile', '{repo_deps}'
+        ]
+        
+        # Check if prompt contains dependency keywords
+        needs_deps = any(keyword.lower() in prompt_content.lower() for keyword in DEPENDENCY_KEYWORDS)
+        
+        if needs_deps:
+            activity.logger.info(f"Prompt contains dependency keywords - including dependencies")
+            # Replace the placeholder with formatted dependencies
+            prompt_content = prompt_content.replace('{repo_deps}', deps_formatted_content)
+        else:
+            activity.logger.debug(f"Prompt does not contain dependency keywords - skipping dependencies")
+    else:
+        # Replace with "not found" message if prompt expects dependencies
+        if '{repo_deps}' in prompt_content:
+            activity.logger.info(f"Prompt expects dependencies but none were provided")
+            prompt_content = prompt_content.replace('{repo_deps}', 'No dependency files found!')
+    
+    return prompt_content, repo_structure
+
 
 @activity.defn
 async def save_prompt_context_activity(context_dict: dict, 
                                       prompt_content: str, 
-                                      repo_structure: str,
-                                      deps_formatted_content: str = None) -> dict:
+                                      repo_structure: Optional[str],
+                                      deps_formatted_content: str = None,
+                                      repo_structure_ref: str = None,
+                                      deps_ref: str = None) -> dict:
     """
     Activity to save prompt data using PromptContext.
     
     Args:
         context_dict: Dictionary representation of PromptContext
         prompt_content: The prompt template content
-        repo_structure: Repository structure string
+        repo_structure: Repository structure string (None when passed by reference)
         deps_formatted_content: Optional formatted dependencies content
+        repo_structure_ref: Optional shared-input key of the repository structure
+        deps_ref: Optional shared-input key of the formatted dependencies
         
     Returns:
         Updated context dictionary with data reference key
@@ -376,32 +545,26 @@ async def save_prompt_context_activity(context_dict: dict,
         # Create PromptContext from dictionary using factory
         context = create_prompt_context_from_dict(context_dict)
         
-        # Check if prompt needs dependencies and replace placeholder
-        if deps_formatted_content:
-            # Define dependency keywords to check for
-            DEPENDENCY_KEYWORDS = [
-                'dependencies', 'packages', 'requirements', 'libraries',
-                'npm', 'pip', 'gem', 'cargo', 'maven', 'gradle', 'nuget',
-                'pyproject', 'package.json', 'gemfile', '{repo_deps}'
-            ]
-            
-            # Check if prompt contains dependency keywords
-            needs_deps = any(keyword.lower() in prompt_content.lower() for keyword in DEPENDENCY_KEYWORDS)
-            
-            if needs_deps:
-                activity.logger.info(f"Prompt contains dependency keywords - including dependencies")
-                # Replace the placeholder with formatted dependencies
-                prompt_content = prompt_content.replace('{repo_deps}', deps_formatted_content)
-            else:
-                activity.logger.debug(f"Prompt does not contain dependency keywords - skipping dependencies")
+        repo_name = context_dict.get('repo_name')
+        if deps_ref:
+            deps_formatted_content = await run_io(_load_shared_input, repo_name, deps_ref)
+        
+        if repo_structure_ref:
+            shared_structure = await run_io(_load_shared_input, repo_name, repo_structure_ref)
+            # Fill the dependencies placeholder
+            prompt_content, repo_structure = _prepare_prompt(prompt_content, shared_structure, deps_formatted_content)
+            if repo_structure != shared_structure:
+                # Prompt caching folded the dependencies in - share the combined text instead
+                repo_structure_ref = await run_io(_save_shared_input, repo_name, repo_structure)
+            # The step context points at the shared copy instead of storing it again
+            context.repo_structure_ref = repo_structure_ref
+            repo_structure = None
         else:
-            # Replace with "not found" message if prompt expects dependencies
-            if '{repo_deps}' in prompt_content:
-                activity.logger.info(f"Prompt expects dependencies but none were provided")
-                prompt_content = prompt_content.replace('{repo_deps}', 'No dependency files found!')
+            # Fill the dependencies placeholder
+            prompt_content, repo_structure = _prepare_prompt(prompt_content, repo_structure, deps_formatted_content)
         
         # Save the prompt data
-        data_key = context.save_prompt_data(prompt_content, repo_structure)
+        data_key = await run_io(context.save_prompt_data, prompt_content, repo_structure)
         
         activity.logger.info(f"Successfully saved prompt data with key: {data_key}")
         
@@ -439,7 +602,7 @@ async def retrieve_all_results_activity(manager_dict: dict) -> dict:
         manager.step_results = manager_dict.get('step_results', {})
         
         # Retrieve all results
-        results = manager.retrieve_all_results()
+        results = await run_io(manager.retrieve_all_results)
         
         activity.logger.info(f"Successfully retrieved {len(results)} results")
         return {
@@ -474,7 +637,7 @@ async def cleanup_temporary_analysis_data_activity(reference_key: str) -> dict:
         dynamodb_client = get_dynamodb_client()
         
         # Delete the temporary data
-        success = dynamodb_client.delete_temporary_analysis_data(reference_key)
+        success = await run_io(dynamodb_client.delete_temporary_analysis_data, reference_key)
         
         if success:
             activity.logger.info(f"Successfully cleaned up temporary data with key: {reference_key}")
@@ -488,6 +651,391 @@ async def cleanup_temporary_analysis_data_activity(reference_key: str) -> dict:
         return {"status": "failed", "error": str(e)}
 
 
+def _create_investigation_cache(repo_name: str):
+    """Create an InvestigationCache on the configured prompt context storage."""
+    from activities.investigation_cache import InvestigationCache
+    
+    # Get appropriate storage client and create cache instance
+    if os.environ.get('PROMPT_CONTEXT_STORAGE') in ('file', 'sqlite'):
+        from utils.prompt_context import create_prompt_context_manager
+        storage_client = create_prompt_context_manager(repo_name)
+    else:
+        from utils.dynamodb_client import get_dynamodb_client
+        storage_client = get_dynamodb_client()
+    return InvestigationCache(storage_client)
+
+
+def _should_force_step(config_overrides: dict, step_name: str) -> bool:
+    """Whether the force_section override asks to re-run this step."""
+    force_section = config_overrides.get('force_section') if config_overrides else None
+    return bool(force_section and force_section == step_name)
+
+
+def _check_prompt_cache(context_dict: dict, config_overrides: dict,
+                        latest_commit: Optional[str],
+                        upstream_hashes: Optional[Dict[str, str]] = None) -> Optional[AnalyzeWithClaudeOutput]:
+    """
+    Check the prompt-level cache for an analysis step.
+    
+    When upstream_hashes is given, a cached result only counts if it was built
+    from those upstream results (see InvestigationCache.check_result_lineage).
+    
+    Returns:
+        AnalyzeWithClaudeOutput for a cache hit, or None when the step needs analysis
+    """
+    repo_name = context_dict.get('repo_name')
+    step_name = context_dict.get('step_name')
+    
+    if not (latest_commit and repo_name and step_name):
+        return None
+    
+    # Extract version from context
+    prompt_version = context_dict.get('prompt_version', '1')
+    
+    activity.logger.info(f"Checking prompt cache for {repo_name}/{step_name} at commit {latest_commit[:8]} version={prompt_version}")
+    activity.logger.info(f"DEBUG: Full context_dict = {context_dict}")
+    
+    cache = _create_investigation_cache(repo_name)
+    
+    # Check if this step should be forced (bypass cache)
+    if _should_force_step(config_overrides, step_name):
+        activity.logger.info(f"🚀 Force section enabled for {step_name} - skipping cache check")
+        cache_check = {
+            "needs_analysis": True,
+            "cached_result": None,
+            "reason": f"Force section override for {step_name}"
+        }
+    else:
+        # Check if this prompt needs analysis for this commit AND version
+        cache_check = cache.check_prompt_needs_analysis(repo_name, step_name, latest_commit, prompt_version)
+    
+    if not cache_check["cached_result"]:
+        activity.logger.info(
+            f"No cache hit for {repo_name}/{step_name} - {cache_check['reason']}"
+        )
+        return None
+    
+    # We have a cached result, use it
+    cached_result = cache_check["cached_result"]
+    activity.logger.info(
+        f"Using cached result for {repo_name}/{step_name} - {cache_check['reason']}"
+    )
+    
+    # Use the cache key directly as the result key
+    result_key = cache_check.get("cached_result_key")
+    if not result_key:
+        # Generate the cache key if not provided
+        from utils.storage_keys import KeyNameCreator
+        cache_key_obj = KeyNameCreator.create_prompt_cache_key(
+            repo_name=repo_name,
+            step_name=step_name,
+            commit_sha=latest_commit,
+            prompt_version=prompt_version
+        )
+        result_key = cache_key_obj.to_storage_key()
+    
+    result_hash = cache.compute_result_hash(cached_result)
+    if upstream_hashes is not None:
+        lineage_check = cache.check_result_lineage(result_key, upstream_hashes)
+        if not lineage_check["is_valid"]:
+            activity.logger.info(
+                f"🧬 Cached result for {repo_name}/{step_name} is stale - {lineage_check['reason']}"
+            )
+            return None
+        if not lineage_check["has_lineage"]:
+            # Cached before lineage was recorded: adopt the current upstream results
+            cache.save_result_lineage(result_key, step_name, result_hash, upstream_hashes)
+    
+    activity.logger.info(f"Using cached result with key: {result_key}")
+    
+    # Update context with the result reference key
+    context_dict_with_result = context_dict.copy()
+    context_dict_with_result['result_reference_key'] = result_key
+    
+    # Return success with cached result
+    return AnalyzeWithClaudeOutput(
+        status="success",
+        context=PromptContextDict(**context_dict_with_result),
+        result_length=len(cached_result),
+        cached=True,
+        cache_reason=cache_check["reason"],
+        result_hash=result_hash
+    )
+
+
+def _save_prompt_result(context_dict: dict, latest_commit: Optional[str], result: str) -> str:
+    """
+    Save an analysis result under its prompt cache key.
+    
+    Returns:
+        The cache key, which is also used as the result reference key
+    """
+    repo_name = context_dict.get('repo_name')
+    step_name = context_dict.get('step_name')
+    
+    try:
+        # Get version from context
+        prompt_version = context_dict.get('prompt_version', '1')
+        
+        cache = _create_investigation_cache(repo_name)
+        
+        # Use commit SHA if available, otherwise use a placeholder
+        commit_to_use = latest_commit if latest_commit else "no-commit"
+        
+        # Save with cache key format (includes version and commit)
+        cache_save_result = cache.save_prompt_result(
+            repo_name=repo_name,
+            step_name=step_name,
+            commit_sha=commit_to_use,
+            result_content=result,
+            prompt_version=prompt_version,
+            ttl_days=90
+        )
+        
+        if cache_save_result["status"] == "success":
+            # Use the cache key as the result key
+            result_key = cache_save_result["cache_key"]
+            activity.logger.info(
+                f"Successfully saved and cached prompt result with key: {result_key}"
+            )
+            return result_key
+        
+        # This should not happen, but log it
+        activity.logger.error(
+            f"Failed to save prompt result: {cache_save_result.get('message', 'Unknown error')}"
+        )
+        raise Exception(f"Failed to save result: {cache_save_result.get('message')}")
+    except Exception as e:
+        activity.logger.error(f"Failed to save result: {str(e)}")
+        raise
+
+
+def _input_fingerprint(context_dict: dict, config_overrides: dict, prompt_content: str,
+                       repo_structure: str, context_to_use: Optional[str]) -> str:
+    """Fingerprint of everything a step sends to Claude (see InvestigationCache.compute_input_fingerprint)."""
+    from activities.investigation_cache import InvestigationCache
+    from investigator.core.config import Config
+    
+    model_settings = {
+        "model": config_overrides.get('claude_model') or Config.CLAUDE_MODEL,
+        "max_tokens": config_overrides.get('max_tokens') or Config.MAX_TOKENS,
+        "temperature": config_overrides.get('temperature'),
+    }
+    return InvestigationCache.compute_input_fingerprint(
+        prompt_content, repo_structure, context_to_use,
+        context_dict.get('prompt_version', '1'), model_settings
+    )
+
+
+def _check_input_fingerprint_cache(context_dict: dict, latest_commit: Optional[str],
+                                   fingerprint: str,
+                                   upstream_hashes: Optional[Dict[str, str]] = None) -> Optional[AnalyzeWithClaudeOutput]:
+    """
+    Reuse the result of an earlier run whose inputs were identical, whatever its commit.
+    
+    The result is also saved under this commit's prompt cache key, so reruns at
+    this commit hit the commit-keyed cache directly.
+    
+    Returns:
+        AnalyzeWithClaudeOutput for a cache hit, or None when the step needs analysis
+    """
+    repo_name = context_dict.get('repo_name')
+    step_name = context_dict.get('step_name')
+    
+    cache = _create_investigation_cache(repo_name)
+    cache_check = cache.check_input_fingerprint(repo_name, step_name, fingerprint)
+    cached_result = cache_check["cached_result"]
+    if not cached_result:
+        return None
+    
+    result_key = _save_prompt_result(context_dict, latest_commit, cached_result)
+    # Refresh the fingerprint entry's TTL while it keeps being reused
+    cache.save_input_fingerprint_result(repo_name, step_name, fingerprint, cached_result)
+    result_hash = cache.compute_result_hash(cached_result)
+    if upstream_hashes is not None:
+        cache.save_result_lineage(result_key, step_name, result_hash, upstream_hashes)
+    
+    context_dict_with_result = context_dict.copy()
+    context_dict_with_result['result_reference_key'] = result_key
+    return AnalyzeWithClaudeOutput(
+        status="success",
+        context=PromptContextDict(**context_dict_with_result),
+        result_length=len(cached_result),
+        cached=True,
+        cache_reason=cache_check["reason"],
+        result_hash=result_hash
+    )
+
+
+def _check_reuse_commit_cache(context_dict: dict, latest_commit: Optional[str], reuse_commit: str,
+                              upstream_hashes: Optional[Dict[str, str]] = None) -> Optional[AnalyzeWithClaudeOutput]:
+    """
+    Reuse the result of the last investigated commit for a step the diff since then does not affect.
+    
+    The result is only reused while it was built from the current upstream
+    results, and is saved under this commit's prompt cache key.
+    
+    Returns:
+        AnalyzeWithClaudeOutput for a cache hit, or None when the step needs analysis
+    """
+    repo_name = context_dict.get('repo_name')
+    step_name = context_dict.get('step_name')
+    prompt_version = context_dict.get('prompt_version', '1')
+    
+    cache = _create_investigation_cache(repo_name)
+    cache_check = cache.check_prompt_needs_analysis(repo_name, step_name, reuse_commit, prompt_version)
+    cached_result = cache_check["cached_result"]
+    if not cached_result:
+        return None
+    
+    if upstream_hashes is not None and cache_check.get("cached_result_key"):
+        lineage_check = cache.check_result_lineage(cache_check["cached_result_key"], upstream_hashes)
+        if not lineage_check["is_valid"]:
+            activity.logger.info(
+                f"🧬 Result of {step_name} at {reuse_commit[:8]} is stale - {lineage_check['reason']}"
+            )
+            return None
+    
+    result_key = _save_prompt_result(context_dict, latest_commit, cached_result)
+    result_hash = cache.compute_result_hash(cached_result)
+    if upstream_hashes is not None:
+        cache.save_result_lineage(result_key, step_name, result_hash, upstream_hashes)
+    
+    context_dict_with_result = context_dict.copy()
+    context_dict_with_result['result_reference_key'] = result_key
+    return AnalyzeWithClaudeOutput(
+        status="success",
+        context=PromptContextDict(**context_dict_with_result),
+        result_length=len(cached_result),
+        cached=True,
+        cache_reason=f"No relevant changes since {reuse_commit[:8]}",
+        result_hash=result_hash
+    )
+
+
+def _get_previous_section(context_dict: dict, previous_commit: str) -> Optional[str]:
+    """The result this step (at the same prompt version) produced for an earlier commit."""
+    repo_name = context_dict.get('repo_name')
+    cache = _create_investigation_cache(repo_name)
+    cache_check = cache.check_prompt_needs_analysis(
+        repo_name, context_dict.get('step_name'), previous_commit, context_dict.get('prompt_version', '1')
+    )
+    return cache_check["cached_result"]
+
+
+def _save_input_fingerprint_result(context_dict: dict, fingerprint: str, result: str) -> None:
+    """Save a fresh result under the fingerprint of its inputs."""
+    repo_name = context_dict.get('repo_name')
+    cache = _create_investigation_cache(repo_name)
+    cache.save_input_fingerprint_result(repo_name, context_dict.get('step_name'), fingerprint, result)
+
+
+def _save_result_lineage(context_dict: dict, result_key: str, result_hash: str,
+                         upstream_hashes: Dict[str, str]) -> None:
+    """Record the upstream results a fresh result was built from."""
+    cache = _create_investigation_cache(context_dict.get('repo_name'))
+    cache.save_result_lineage(result_key, context_dict.get('step_name'), result_hash, upstream_hashes)
+
+
+def _log_token_usage(step_name: str, usage: Optional[dict]) -> None:
+    """Log Claude token usage, including prompt cache reads/writes."""
+    if usage:
+        activity.logger.info(
+            f"📊 Token usage for {step_name}: input={usage.get('input_tokens', 0)}, "
+            f"cache_write={usage.get('cache_creation_input_tokens', 0)}, "
+            f"cache_read={usage.get('cache_read_input_tokens', 0)}, "
+            f"output={usage.get('output_tokens', 0)}"
+        )
+
+
+async def _analyze_and_save(context, context_dict: dict, config_overrides: dict, latest_commit: Optional[str],
+                            prompt_content: str, repo_structure: str,
+                            context_to_use: Optional[str],
+                            input_fingerprint: Optional[str] = None,
+                            upstream_hashes: Optional[Dict[str, str]] = None,
+                            update_inputs: Optional[tuple] = None) -> AnalyzeWithClaudeOutput:
+    """
+    Run Claude on a prepared prompt and save the result under its prompt cache key
+    (and under input_fingerprint, when given), with the lineage of its upstream
+    results when upstream_hashes is given.
+    
+    With update_inputs - (prompt_template, previous_section, diff_summary) - Claude
+    revises the previous section from the diff instead of analyzing from scratch.
+    
+    Returns:
+        AnalyzeWithClaudeOutput with the result reference key and token usage
+    """
+    from investigator.core.claude_analyzer import ClaudeAnalyzer
+    from activities.claude_client import get_claude_client
+    from activities.investigation_cache import InvestigationCache
+    import logging
+    
+    step_name = context_dict.get('step_name')
+    
+    # Create a logger for the ClaudeAnalyzer
+    logger = logging.getLogger(__name__)
+    
+    # Initialize Claude analyzer on the worker's shared async client when there is one
+    claude_client = get_claude_client()
+    api_key = os.getenv('ANTHROPIC_API_KEY')
+    if not api_key and claude_client is None:
+        raise Exception("Claude API key not configured. Set ANTHROPIC_API_KEY environment variable.")
+        
+    claude_analyzer = ClaudeAnalyzer(api_key, logger, async_client=claude_client)
+    
+    # Perform the analysis
+    if update_inputs:
+        activity.logger.info("Calling Claude API to update the previous section from the diff")
+        prompt_template, previous_section, diff_summary = update_inputs
+        args = (prompt_template, previous_section, diff_summary, context_to_use)
+        call = claude_analyzer.update_section_async if claude_client else claude_analyzer.update_section
+    else:
+        activity.logger.info("Calling Claude API for analysis")
+        args = (prompt_content, repo_structure, context_to_use)
+        call = claude_analyzer.analyze_with_context_async if claude_client else claude_analyzer.analyze_with_context
+    if claude_client:
+        result = await call(*args, config_overrides=config_overrides)
+    else:
+        # No shared client (tests, scripts): a synchronous client on the LLM pool
+        result = await run_llm(call, *args, config_overrides=config_overrides)
+    
+    activity.logger.info(f"Claude analysis completed successfully ({len(result)} characters)")
+    usage = claude_analyzer.last_usage or None
+    _log_token_usage(step_name, usage)
+    api_feedback = ClaudeApiFeedback(
+        **claude_analyzer.last_api_feedback,
+        # Earlier attempts of this activity failed - most often on 429/529 once the SDK gave up
+        failed_attempts=activity.info().attempt - 1 if activity.in_activity() else 0
+    )
+    
+    # Save the result as a cache entry (this is the ONLY save we need)
+    result_key = await run_io(_save_prompt_result, context_dict, latest_commit, result)
+    if input_fingerprint:
+        await run_io(_save_input_fingerprint_result, context_dict, input_fingerprint, result)
+    result_hash = InvestigationCache.compute_result_hash(result)
+    if upstream_hashes is not None:
+        await run_io(_save_result_lineage, context_dict, result_key, result_hash, upstream_hashes)
+    
+    activity.logger.info(f"Result saved with key: {result_key}")
+    
+    # Debug: Verify the context has the result key
+    context_dict_after_save = context.to_dict()
+    # Update the result reference key in the context
+    context_dict_after_save['result_reference_key'] = result_key
+    activity.logger.info(f"Context after save - result_reference_key: {context_dict_after_save.get('result_reference_key')}")
+    
+    # Return updated context
+    return AnalyzeWithClaudeOutput(
+        status="success",
+        context=PromptContextDict(**context_dict_after_save),
+        result_length=len(result),
+        cached=False,
+        usage=usage,
+        result_hash=result_hash,
+        api_feedback=api_feedback
+    )
+
+
 @activity.defn
 async def analyze_with_claude_context(input_params: AnalyzeWithClaudeInput) -> AnalyzeWithClaudeOutput:
     """
@@ -505,7 +1053,6 @@ async def analyze_with_claude_context(input_params: AnalyzeWithClaudeInput) -> A
     config_overrides = input_params.config_overrides.model_dump() if input_params.config_overrides else {}
     latest_commit = input_params.latest_commit
     
-    repo_name = context_dict.get('repo_name')
     step_name = context_dict.get('step_name')
     
     activity.logger.info(f"Starting Claude analysis for step: {step_name}")
@@ -514,89 +1061,18 @@ async def analyze_with_claude_context(input_params: AnalyzeWithClaudeInput) -> A
         # Import here to avoid workflow sandbox issues
         sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
         from utils.prompt_context import create_prompt_context_from_dict
-        from investigator.core.claude_analyzer import ClaudeAnalyzer
-        from investigator.core.config import Config
-        from utils.dynamodb_client import get_dynamodb_client
-        from activities.investigation_cache import InvestigationCache
-        import logging
         
         # Check prompt-level cache if commit SHA is provided
-        if latest_commit and repo_name and step_name:
-            # Extract version from context
-            prompt_version = context_dict.get('prompt_version', '1')
-            
-            activity.logger.info(f"Checking prompt cache for {repo_name}/{step_name} at commit {latest_commit[:8]} version={prompt_version}")
-            activity.logger.info(f"DEBUG: Full context_dict = {context_dict}")
-            
-            # Check if this step should be forced (bypass cache)
-            force_section = getattr(config_overrides, 'force_section', None) if config_overrides else None
-            should_force_this_step = force_section and force_section == step_name
-            
-            if should_force_this_step:
-                activity.logger.info(f"🚀 Force section enabled for {step_name} - skipping cache check")
-                cache_check = {
-                    "needs_analysis": True,
-                    "cached_result": None,
-                    "reason": f"Force section override for {step_name}"
-                }
-            else:
-                # Get appropriate storage client and create cache instance
-                if os.environ.get('PROMPT_CONTEXT_STORAGE') == 'file':
-                    from utils.prompt_context import create_prompt_context_manager
-                    storage_client = create_prompt_context_manager(repo_name)
-                else:
-                    from utils.dynamodb_client import get_dynamodb_client
-                    storage_client = get_dynamodb_client()
-                cache = InvestigationCache(storage_client)
-                
-                # Check if this prompt needs analysis for this commit AND version
-                cache_check = cache.check_prompt_needs_analysis(repo_name, step_name, latest_commit, prompt_version)
-            
-            if cache_check["cached_result"]:
-                # We have a cached result, use it
-                cached_result = cache_check["cached_result"]
-                activity.logger.info(
-                    f"Using cached result for {repo_name}/{step_name} - {cache_check['reason']}"
-                )
-                
-                # Use the cache key directly as the result key
-                result_key = cache_check.get("cached_result_key")
-                if not result_key:
-                    # Generate the cache key if not provided
-                    from utils.storage_keys import KeyNameCreator
-                    cache_key_obj = KeyNameCreator.create_prompt_cache_key(
-                        repo_name=repo_name,
-                        step_name=step_name,
-                        commit_sha=latest_commit,
-                        prompt_version=context_dict.get('prompt_version', '1')
-                    )
-                    result_key = cache_key_obj.to_storage_key()
-                
-                activity.logger.info(f"Using cached result with key: {result_key}")
-                
-                # Update context with the result reference key
-                context_dict_with_result = context_dict.copy()
-                context_dict_with_result['result_reference_key'] = result_key
-                
-                # Return success with cached result
-                return AnalyzeWithClaudeOutput(
-                    status="success",
-                    context=PromptContextDict(**context_dict_with_result),
-                    result_length=len(cached_result),
-                    cached=True,
-                    cache_reason=cache_check["reason"]
-                )
-            else:
-                activity.logger.info(
-                    f"No cache hit for {repo_name}/{step_name} - {cache_check['reason']}"
-                )
+        cached_output = await run_io(_check_prompt_cache, context_dict, config_overrides, latest_commit)
+        if cached_output:
+            return cached_output
         
         # Create PromptContext from dictionary using factory
         context = create_prompt_context_from_dict(context_dict)
         
         # Get prompt data and context from DynamoDB
         activity.logger.info(f"Retrieving prompt and context data")
-        data = context.get_prompt_and_context()
+        data = await run_io(context.get_prompt_and_context)
         
         prompt_content = data["prompt_content"]
         repo_structure = data["repo_structure"]
@@ -607,90 +1083,521 @@ async def analyze_with_claude_context(input_params: AnalyzeWithClaudeInput) -> A
         
         activity.logger.info(f"Successfully prepared data for Claude analysis")
         
-        # Create a logger for the ClaudeAnalyzer
-        logger = logging.getLogger(__name__)
+        return await _analyze_and_save(
+            context, context_dict, config_overrides, latest_commit,
+            prompt_content, repo_structure, context_to_use
+        )
+        
+    except Exception as e:
+        activity.logger.error(f"Claude analysis failed: {str(e)}")
+        raise Exception(f"Failed to analyze with Claude: {str(e)}") from e
+
+
+async def _load_step_prompt(input_params: RunAnalysisStepInput, context_dict: dict) -> str:
+    """Load a step's prompt template from the worker-local registry and set its version in context_dict."""
+    # Import here to avoid workflow sandbox issues
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from investigator.core.prompt_registry import get_prompt_registry
+    
+    prompt = await run_io(get_prompt_registry().get, input_params.prompts_dir, input_params.prompt_file)
+    if prompt is None:
+        activity.logger.error(f"Required prompt file not found: {input_params.prompt_file}")
+        raise FileNotFoundError(f"Required prompt file not found: {input_params.prompt_file}")
+    prompt_content, prompt_version = prompt
+    context_dict['prompt_version'] = prompt_version
+    return prompt_content
+
+
+async def _check_analysis_step_caches(input_params: RunAnalysisStepInput, context_dict: dict,
+                                      config_overrides: dict, prompt_content: str) -> tuple:
+    """
+    Run the cache checks of an analysis step, cheapest first: the commit-keyed
+    prompt cache (with lineage), the reuse commit, then the input fingerprint.
+    
+    Returns:
+        (cached_output, prepared) - the AnalyzeWithClaudeOutput of a cache hit and None,
+        or None and the (context, prompt_content, repo_structure, context_to_use,
+        input_fingerprint) tuple the Claude call needs
+    """
+    from utils.prompt_context import create_prompt_context_from_dict
+    
+    latest_commit = input_params.latest_commit
+    upstream_hashes = input_params.upstream_hashes
+    step_name = context_dict.get('step_name')
+    force = _should_force_step(config_overrides, step_name)
+    
+    # Check prompt-level cache if commit SHA is provided
+    cached_output = await run_io(_check_prompt_cache, context_dict, config_overrides, latest_commit,
+                                 upstream_hashes)
+    if cached_output:
+        return cached_output, None
+    
+    # The changes since the last investigation don't touch this step's paths
+    if input_params.reuse_commit and not force:
+        cached_output = await run_io(_check_reuse_commit_cache, context_dict, latest_commit,
+                                     input_params.reuse_commit, upstream_hashes)
+        if cached_output:
+            return cached_output, None
+    
+    # Resolve the shared inputs passed by reference
+    repo_name = context_dict.get('repo_name')
+    repo_structure = input_params.repo_structure
+    if input_params.repo_structure_ref:
+        repo_structure = await run_io(_load_shared_input, repo_name, input_params.repo_structure_ref)
+    deps_formatted_content = input_params.deps_formatted_content
+    if input_params.deps_ref:
+        deps_formatted_content = await run_io(_load_shared_input, repo_name, input_params.deps_ref)
+    
+    # Fill the dependencies placeholder
+    prompt_content, repo_structure = _prepare_prompt(prompt_content, repo_structure, deps_formatted_content)
+    if not prompt_content or not repo_structure:
+        raise Exception(f"Invalid data: missing prompt_content or repo_structure")
+    
+    # Build the context from the results of earlier steps
+    context = create_prompt_context_from_dict(context_dict)
+    context_to_use = await run_io(context.get_context)
+    
+    # A new commit that leaves this step's inputs unchanged can reuse the earlier result
+    input_fingerprint = _input_fingerprint(
+        context_dict, config_overrides, prompt_content, repo_structure, context_to_use
+    )
+    if not force:
+        cached_output = await run_io(_check_input_fingerprint_cache, context_dict, latest_commit,
+                                     input_fingerprint, upstream_hashes)
+        if cached_output:
+            return cached_output, None
+    
+    return None, (context, prompt_content, repo_structure, context_to_use, input_fingerprint)
+
+
+@activity.defn
+async def run_analysis_step_activity(input_params: RunAnalysisStepInput) -> AnalyzeWithClaudeOutput:
+    """
+    Activity that runs one whole analysis step: load the prompt, check the prompt
+    cache, build the context from earlier results, call Claude and save the result.
+    
+    Besides the commit-keyed prompt cache, results are cached by a fingerprint of
+    the step's exact inputs, so commits that do not change what this step sees
+    (a README typo for most steps) reuse the earlier result.
+    
+    A commit-keyed result is only reused while the results of the steps it takes
+    context from still hash to input_params.upstream_hashes, so re-running one
+    step (force_section) re-runs exactly the steps that depend on it.
+    
+    When the workflow found that the diff since the last investigated commit
+    does not touch this step's paths, it passes that commit as reuse_commit and
+    the step reuses its result from there. In update mode an affected step gets
+    that commit as update_from_commit plus the stored diff summary (diff_ref),
+    and Claude revises the previous section instead of re-reading the repository.
+    
+    Replaces the read_prompt_file -> save_prompt_context -> analyze_with_claude_context
+    sequence with a single round-trip. Prompts come from the worker-local registry and
+    no per-step prompt data is written to storage.
+    
+    Args:
+        input_params: RunAnalysisStepInput with the step context, prompt location and repository data
+        
+    Returns:
+        AnalyzeWithClaudeOutput with the result reference key, result length and cache info
+    """
+    context_dict = input_params.context_dict.model_dump()
+    config_overrides = input_params.config_overrides.model_dump() if input_params.config_overrides else {}
+    latest_commit = input_params.latest_commit
+    step_name = context_dict.get('step_name')
+    
+    activity.logger.info(f"Running analysis step: {step_name}")
+    
+    # Load the prompt template and its version
+    prompt_content = await _load_step_prompt(input_params, context_dict)
+    prompt_template = prompt_content
+    
+    try:
+        upstream_hashes = input_params.upstream_hashes
+        cached_output, prepared = await _check_analysis_step_caches(
+            input_params, context_dict, config_overrides, prompt_content
+        )
+        if cached_output:
+            return cached_output
+        context, prompt_content, repo_structure, context_to_use, input_fingerprint = prepared
+        repo_name = context_dict.get('repo_name')
+        
+        # Update mode: revise the previous section from the diff since its commit
+        update_inputs = None
+        if input_params.update_from_commit and input_params.diff_ref and not _should_force_step(config_overrides, step_name):
+            previous_section = await run_io(_get_previous_section, context_dict, input_params.update_from_commit)
+            if previous_section:
+                diff_summary = await run_io(_load_shared_input, repo_name, input_params.diff_ref)
+                update_inputs = (prompt_template, previous_section, diff_summary)
+            else:
+                activity.logger.info(f"No previous section of {step_name} to update - running a full analysis")
+        
+        return await _analyze_and_save(
+            context, context_dict, config_overrides, latest_commit,
+            prompt_content, repo_structure, context_to_use, input_fingerprint, upstream_hashes,
+            update_inputs
+        )
+        
+    except Exception as e:
+        activity.logger.error(f"Analysis step {step_name} failed: {str(e)}")
+        raise Exception(f"Failed to run analysis step {step_name}: {str(e)}") from e
+
+
+@activity.defn
+async def check_analysis_step_cache_activity(input_params: RunAnalysisStepInput) -> AnalysisStepCacheCheckOutput:
+    """
+    Activity that runs the cache checks of run_analysis_step_activity without calling Claude.
+    
+    Batch mode uses it before queueing a step into a Message Batch, so unchanged
+    steps are served from the prompt cache (with lineage), the reuse commit or the
+    input fingerprint instead of being resubmitted.
+    
+    Args:
+        input_params: RunAnalysisStepInput with the step context, prompt location and repository data
+        
+    Returns:
+        AnalysisStepCacheCheckOutput with the cached output, or the input fingerprint
+        to save the batched result under
+    """
+    context_dict = input_params.context_dict.model_dump()
+    config_overrides = input_params.config_overrides.model_dump() if input_params.config_overrides else {}
+    step_name = context_dict.get('step_name')
+    
+    activity.logger.info(f"Checking caches for analysis step: {step_name}")
+    
+    prompt_content = await _load_step_prompt(input_params, context_dict)
+    
+    try:
+        cached_output, prepared = await _check_analysis_step_caches(
+            input_params, context_dict, config_overrides, prompt_content
+        )
+    except Exception as e:
+        activity.logger.error(f"Cache check for step {step_name} failed: {str(e)}")
+        raise Exception(f"Failed to check caches for step {step_name}: {str(e)}") from e
+    
+    if cached_output:
+        return AnalysisStepCacheCheckOutput(cached_output=cached_output)
+    return AnalysisStepCacheCheckOutput(input_fingerprint=prepared[-1])
+
+
+@activity.defn
+async def submit_claude_batch_activity(input_params: ClaudeBatchSubmitInput) -> ClaudeBatchSubmitOutput:
+    """
+    Activity to submit ready analysis steps as one Message Batch.
+    
+    Steps with a prompt-level cache hit are answered immediately and left out
+    of the batch. The remaining steps are built exactly like the synchronous
+    analyze_with_claude_context request.
+    
+    Args:
+        input_params: ClaudeBatchSubmitInput with the steps to submit
+        
+    Returns:
+        ClaudeBatchSubmitOutput with the batch ID, submitted items, cache hits and errors
+    """
+    activity.logger.info(f"Preparing message batch for {len(input_params.items)} analysis steps")
+    
+    try:
+        # Import here to avoid workflow sandbox issues
+        sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from utils.prompt_context import create_prompt_context_from_dict
+        from investigator.core.claude_analyzer import ClaudeAnalyzer
+        from investigator.core.claude_batch_client import ClaudeBatchClient
+        import logging
         
-        # Initialize Claude analyzer
         api_key = os.getenv('ANTHROPIC_API_KEY')
         if not api_key:
             raise Exception("Claude API key not configured. Set ANTHROPIC_API_KEY environment variable.")
-            
+        
+        logger = logging.getLogger(__name__)
         claude_analyzer = ClaudeAnalyzer(api_key, logger)
         
-        # Perform the analysis
-        activity.logger.info("Calling Claude API for analysis")
-        result = claude_analyzer.analyze_with_context(
-            prompt_content, 
-            repo_structure, 
-            context_to_use,
-            config_overrides=config_overrides
+        output = ClaudeBatchSubmitOutput()
+        requests = []
+        for item in input_params.items:
+            analyze_input = item.analyze_input
+            context_dict = analyze_input.context_dict.model_dump()
+            config_overrides = analyze_input.config_overrides.model_dump() if analyze_input.config_overrides else {}
+            
+            try:
+                cached_output = await run_io(_check_prompt_cache, context_dict, config_overrides,
+                                             analyze_input.latest_commit, analyze_input.upstream_hashes)
+                if cached_output:
+                    output.completed[item.custom_id] = cached_output
+                    continue
+                
+                data = await run_io(create_prompt_context_from_dict(context_dict).get_prompt_and_context)
+                if not data["prompt_content"] or not data["repo_structure"]:
+                    raise Exception(f"Invalid data: missing prompt_content or repo_structure")
+                
+                params = claude_analyzer.build_message_params(
+                    data["prompt_content"],
+                    data["repo_structure"],
+                    data["context"],
+                    config_overrides=config_overrides
+                )
+            except Exception as e:
+                activity.logger.error(f"Failed to prepare batch request for {context_dict.get('repo_name')}/{item.step_name}: {str(e)}")
+                output.errors[item.custom_id] = str(e)
+                continue
+            
+            requests.append({"custom_id": item.custom_id, "params": params})
+            output.submitted.append(item)
+        
+        if requests:
+            output.batch_id = await run_llm(ClaudeBatchClient(api_key, logger).submit, requests)
+        
+        activity.logger.info(
+            f"📦 Batch {output.batch_id or '(none)'}: {len(output.submitted)} submitted, "
+            f"{len(output.completed)} cached, {len(output.errors)} failed"
         )
+        return output
         
-        activity.logger.info(f"Claude analysis completed successfully ({len(result)} characters)")
+    except Exception as e:
+        activity.logger.error(f"Failed to submit message batch: {str(e)}")
+        raise Exception(f"Failed to submit message batch: {str(e)}") from e
+
+
+@activity.defn
+async def collect_claude_batch_activity(input_params: ClaudeBatchCollectInput) -> ClaudeBatchCollectOutput:
+    """
+    Activity to wait for a Message Batch to end and save its results.
+    
+    Polls the batch with heartbeats until it ends, then writes each result to
+    the same prompt cache key analyze_with_claude_context would use, plus its
+    input fingerprint and lineage when the step's input carries them. Retrying
+    the activity simply resumes polling the same batch.
+    
+    Args:
+        input_params: ClaudeBatchCollectInput with the batch ID and its items
         
-        # Save the result as a cache entry (this is the ONLY save we need)
-        result_key = None
-        try:
-            # Get version from context
-            prompt_version = context_dict.get('prompt_version', '1')
-            
-            # Get appropriate storage client and create cache instance
-            if os.environ.get('PROMPT_CONTEXT_STORAGE') == 'file':
-                from utils.prompt_context import create_prompt_context_manager
-                storage_client = create_prompt_context_manager(repo_name)
-            else:
-                from utils.dynamodb_client import get_dynamodb_client
-                storage_client = get_dynamodb_client()
-            cache = InvestigationCache(storage_client)
-            
-            # Use commit SHA if available, otherwise use a placeholder
-            commit_to_use = latest_commit if latest_commit else "no-commit"
+    Returns:
+        ClaudeBatchCollectOutput with analysis outputs and errors by custom_id
+    """
+    batch_id = input_params.batch_id
+    activity.logger.info(f"Waiting for message batch {batch_id} ({len(input_params.items)} requests)")
+    
+    try:
+        # Import here to avoid workflow sandbox issues
+        sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from activities.investigation_cache import InvestigationCache
+        from investigator.core.claude_batch_client import ClaudeBatchClient
+        from investigator.core.config import Config
+        import logging
+        
+        api_key = os.getenv('ANTHROPIC_API_KEY')
+        if not api_key:
+            raise Exception("Claude API key not configured. Set ANTHROPIC_API_KEY environment variable.")
+        
+        batch_client = ClaudeBatchClient(api_key, logging.getLogger(__name__))
+        
+        while True:
+            status = await run_llm(batch_client.get_status, batch_id)
+            activity.heartbeat({"batch_id": batch_id, **status})
+            if status["processing_status"] == "ended":
+                break
+            activity.logger.info(f"⏳ Batch {batch_id} {status['processing_status']}: {status['request_counts']}")
+            await asyncio.sleep(Config.CLAUDE_BATCH_POLL_SECONDS)
+        
+        results = await run_llm(batch_client.get_results, batch_id)
+        
+        output = ClaudeBatchCollectOutput()
+        for item in input_params.items:
+            context_dict = item.analyze_input.context_dict.model_dump()
+            batch_result = results.get(item.custom_id)
             
-            # Save with cache key format (includes version and commit)
-            cache_save_result = cache.save_prompt_result(
-                repo_name=repo_name,
-                step_name=step_name,
-                commit_sha=commit_to_use,
-                result_content=result,
-                prompt_version=prompt_version,
-                ttl_days=90
-            )
+            if not batch_result:
+                output.errors[item.custom_id] = f"No result returned for {item.custom_id}"
+                continue
+            if batch_result["status"] != "succeeded":
+                output.errors[item.custom_id] = batch_result.get("error") or batch_result["status"]
+                continue
             
-            if cache_save_result["status"] == "success":
-                # Use the cache key as the result key
-                result_key = cache_save_result["cache_key"]
-                activity.logger.info(
-                    f"Successfully saved and cached prompt result with key: {result_key}"
-                )
-            else:
-                # This should not happen, but log it
-                activity.logger.error(
-                    f"Failed to save prompt result: {cache_save_result.get('message', 'Unknown error')}"
+            try:
+                result = batch_result["text"]
+                usage = batch_result.get("usage") or None
+                _log_token_usage(item.step_name, usage)
+                
+                analyze_input = item.analyze_input
+                result_key = await run_io(_save_prompt_result, context_dict, analyze_input.latest_commit, result)
+                if analyze_input.input_fingerprint:
+                    await run_io(_save_input_fingerprint_result, context_dict, analyze_input.input_fingerprint, result)
+                result_hash = InvestigationCache.compute_result_hash(result)
+                if analyze_input.upstream_hashes is not None:
+                    await run_io(_save_result_lineage, context_dict, result_key, result_hash,
+                                 analyze_input.upstream_hashes)
+                context_dict['result_reference_key'] = result_key
+                output.completed[item.custom_id] = AnalyzeWithClaudeOutput(
+                    status="success",
+                    context=PromptContextDict(**context_dict),
+                    result_length=len(result),
+                    cached=False,
+                    usage=usage,
+                    result_hash=result_hash
                 )
-                raise Exception(f"Failed to save result: {cache_save_result.get('message')}")
-        except Exception as e:
-            activity.logger.error(f"Failed to save result: {str(e)}")
-            raise
-        
-        activity.logger.info(f"Result saved with key: {result_key}")
+            except Exception as e:
+                output.errors[item.custom_id] = str(e)
+            
+            activity.heartbeat({"batch_id": batch_id, "saved": len(output.completed)})
         
-        # Debug: Verify the context has the result key
-        context_dict_after_save = context.to_dict()
-        # Update the result reference key in the context
-        context_dict_after_save['result_reference_key'] = result_key
-        activity.logger.info(f"Context after save - result_reference_key: {context_dict_after_save.get('result_reference_key')}")
+        activity.logger.info(f"📦 Batch {batch_id} collected: {len(output.completed)} saved, {len(output.errors)} failed")
+        return output
         
-        # Return updated context
-        return AnalyzeWithClaudeOutput(
-            status="success",
-            context=PromptContextDict(**context_dict_after_save),
-            result_length=len(result),
-            cached=False
+    except Exception as e:
+        activity.logger.error(f"Failed to collect message batch {batch_id}: {str(e)}")
+        raise Exception(f"Failed to collect message batch {batch_id}: {str(e)}") from e
+
+
+@activity.defn
+async def get_remote_head_activity(repo_url: str, repo_name: str) -> dict:
+    """
+    Activity to resolve the remote default-branch commit without cloning.
+
+    Args:
+        repo_url: Repository URL to query
+        repo_name: Name of the repository
+
+    Returns:
+        Dictionary with status, commit_sha and branch_name
+    """
+    activity.logger.info(f"Resolving remote HEAD for repository: {repo_name}")
+
+    try:
+        # Import here to avoid workflow sandbox issues
+        import sys
+        import os
+        sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from investigator.core.git_manager import GitRepositoryManager
+        import logging
+
+        logger = logging.getLogger(__name__)
+        git_manager = GitRepositoryManager(logger)
+
+        remote_head = await run_io(git_manager.get_remote_head, repo_url)
+        activity.logger.info(
+            f"Remote HEAD for {repo_name}: commit={remote_head['commit_sha'][:8]}, "
+            f"branch={remote_head['branch_name']}"
         )
-        
+
+        return {
+            "status": "success",
+            "commit_sha": remote_head["commit_sha"],
+            "branch_name": remote_head["branch_name"]
+        }
+
     except Exception as e:
-        activity.logger.error(f"Claude analysis failed: {str(e)}")
-        raise Exception(f"Failed to analyze with Claude: {str(e)}") from e
+        # Not fatal - the workflow falls back to checking the cache after cloning
+        activity.logger.warning(f"Failed to resolve remote HEAD for {repo_name}: {str(e)}")
+        return {
+            "status": "failed",
+            "commit_sha": None,
+            "branch_name": None,
+            "message": str(e)
+        }
+
+
+@activity.defn
+async def get_diff_affected_steps_activity(repo_path: str, base_commit: str, processing_order: list,
+                                           diff_ignore_paths: Optional[list] = None,
+                                           repo_name: Optional[str] = None) -> dict:
+    """
+    Activity to find the analysis steps affected by the changes since an earlier commit.
+
+    With update mode enabled (CLAUDE_UPDATE_MODE) and a repo_name, a summary of
+    the diff is also stored as a shared input, so affected steps can revise
+    their previous section from it. Diffs over UPDATE_MODE_MAX_DIFF_TOKENS
+    get no summary and those steps run a full analysis.
+
+    Args:
+        repo_path: Path to the cloned repository (at the new commit)
+        base_commit: Commit of the last investigation
+        processing_order: Steps from the prompts configuration, with their path rules
+        diff_ignore_paths: Patterns of paths that never affect any step
+        repo_name: Name of the repository (for storing the diff summary)
+
+    Returns:
+        Dictionary with status, changed_paths count, affected_steps and diff_ref;
+        status "failed" when the diff could not be computed (every step re-runs then)
+    """
+    activity.logger.info(f"Diffing {repo_path} against last investigated commit {base_commit[:8]}")
+
+    try:
+        # Import here to avoid workflow sandbox issues
+        import sys
+        import os
+        sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from investigator.core.git_manager import GitRepositoryManager
+        from investigator.core.diff_relevance import (
+            steps_affected_by_diff, relevant_changed_paths, summarize_diff, estimate_tokens
+        )
+        from investigator.core.config import Config
+        import logging
+
+        logger = logging.getLogger(__name__)
+        git_manager = GitRepositoryManager(logger)
+
+        changed_paths = await run_io(git_manager.get_changed_paths, repo_path, base_commit)
+        relevant_paths = relevant_changed_paths(changed_paths, diff_ignore_paths)
+        affected_steps = steps_affected_by_diff(processing_order, changed_paths, diff_ignore_paths)
+        activity.logger.info(
+            f"🔀 {len(changed_paths)} changed paths ({len(relevant_paths)} relevant) affect "
+            f"{len(affected_steps)}/{len(processing_order)} steps"
+        )
+
+        diff_ref = None
+        if Config.UPDATE_MODE_ENABLED and repo_name and affected_steps:
+            patch = await run_io(git_manager.get_diff, repo_path, base_commit)
+            diff_summary = summarize_diff(patch, diff_ignore_paths, Config.UPDATE_MODE_MAX_FILE_LINES)
+            diff_tokens = estimate_tokens(diff_summary)
+            if diff_tokens <= Config.UPDATE_MODE_MAX_DIFF_TOKENS:
+                diff_ref = await run_io(_save_shared_input, repo_name, diff_summary)
+                activity.logger.info(f"📝 Update mode: diff summary of ~{diff_tokens} tokens stored as {diff_ref}")
+            else:
+                activity.logger.info(
+                    f"Diff summary of ~{diff_tokens} tokens exceeds {Config.UPDATE_MODE_MAX_DIFF_TOKENS} - "
+                    f"affected steps run a full analysis"
+                )
+
+        return {
+            "status": "success",
+            "changed_paths": len(changed_paths),
+            "relevant_paths": len(relevant_paths),
+            "affected_steps": sorted(affected_steps),
+            "diff_ref": diff_ref
+        }
+
+    except Exception as e:
+        # Not fatal - without a diff every step runs as before
+        activity.logger.warning(f"Failed to diff against {base_commit[:8]}: {str(e)}")
+        return {
+            "status": "failed",
+            "affected_steps": None,
+            "message": str(e)
+        }
+
+
+async def _heartbeat_while(awaitable, details: str, interval_seconds: float = 20,
+                           cancel_event: Optional[threading.Event] = None):
+    """
+    Await a long running operation, heartbeating every interval_seconds meanwhile.
+    
+    Lets the clone activity run as long as a first mirror fetch of a large
+    repository needs while a lost worker is still noticed within the
+    heartbeat timeout. Cancelling the task does not stop work already running
+    on a thread pool, so cancel_event is set as well for the operation to
+    stop its subprocesses.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=interval_seconds)
+            if done:
+                return task.result()
+            if activity.in_activity():
+                activity.heartbeat(details)
+    finally:
+        if not task.done() and cancel_event is not None:
+            cancel_event.set()
+        task.cancel()
 
 
 @activity.defn
@@ -732,11 +1639,35 @@ async def clone_repository_activity(repo_url: str, repo_name: str) -> dict:
         repo_path = None
         last_error = None
         
-        # Strategy 1: Try normal clone first
+        # Strategy 0: Check out through the worker-local mirror cache (incremental fetch)
+        from investigator.core.config import Config
+        if Config.GIT_MIRROR_CACHE_ENABLED:
+            mirror_root = Config.GIT_MIRROR_DIR or os.path.join(temp_root, "mirrors")
+            try:
+                activity.logger.info(f"Attempting mirror-cache checkout for {repo_name}")
+                cancel_event = threading.Event()
+                repo_path = await _heartbeat_while(
+                    run_io(git_manager.clone_from_mirror, repo_url, repo_dir, mirror_root,
+                           no_checkout=Config.GIT_TREE_ONLY, cancel_event=cancel_event),
+                    "git:mirror", cancel_event=cancel_event
+                )
+                temp_dir = repo_dir
+            except Exception as e:
+                activity.logger.warning(f"Mirror-cache checkout failed, falling back to a full clone: {str(e)}")
+                if os.path.exists(repo_dir):
+                    await run_io(shutil.rmtree, repo_dir, ignore_errors=True)
+        
+        # Strategy 1: Try normal clone
         try:
-            activity.logger.info(f"Attempting normal clone for {repo_name}")
-            repo_path = git_manager.clone_or_update(repo_url, repo_dir)
-            temp_dir = repo_dir
+            if repo_path is None and Config.GIT_TREE_ONLY:
+                # Tree-only mode reads everything from git objects, so skip blobs and checkout
+                activity.logger.info(f"Attempting partial clone for {repo_name}")
+                repo_path = await _heartbeat_while(run_io(git_manager.partial_clone, repo_url, repo_dir), "git:partial_clone")
+                temp_dir = repo_dir
+            elif repo_path is None:
+                activity.logger.info(f"Attempting normal clone for {repo_name}")
+                repo_path = await _heartbeat_while(run_io(git_manager.clone_or_update, repo_url, repo_dir), "git:clone")
+                temp_dir = repo_dir
         except Exception as e:
             last_error = e
             activity.logger.warning(f"Normal clone failed: {str(e)}")
@@ -747,24 +1678,24 @@ async def clone_repository_activity(repo_url: str, repo_name: str) -> dict:
                 
                 # Clean up failed attempt
                 if os.path.exists(repo_dir):
-                    shutil.rmtree(repo_dir, ignore_errors=True)
+                    await run_io(shutil.rmtree, repo_dir, ignore_errors=True)
                 
                 # Strategy 2: Try shallow clone with depth=1
                 try:
                     activity.logger.info(f"Attempting shallow clone (depth=1) for {repo_name}")
-                    repo_path = _shallow_clone_repository(repo_url, repo_dir, depth=1, logger=logger)
+                    repo_path = await run_io(_shallow_clone_repository, repo_url, repo_dir, depth=1, logger=logger)
                     temp_dir = repo_dir
                 except Exception as shallow_error:
                     activity.logger.warning(f"Shallow clone with depth=1 failed: {str(shallow_error)}")
                     
                     # Clean up failed attempt
                     if os.path.exists(repo_dir):
-                        shutil.rmtree(repo_dir, ignore_errors=True)
+                        await run_io(shutil.rmtree, repo_dir, ignore_errors=True)
                     
                     # Strategy 3: Try minimal clone (single branch, no tags, depth=1)
                     try:
                         activity.logger.info(f"Attempting minimal clone for {repo_name}")
-                        repo_path = _minimal_clone_repository(repo_url, repo_dir, logger=logger)
+                        repo_path = await run_io(_minimal_clone_repository, repo_url, repo_dir, logger=logger)
                         temp_dir = repo_dir
                     except Exception as minimal_error:
                         last_error = minimal_error
@@ -943,7 +1874,8 @@ async def analyze_repository_structure_activity(repo_path: str) -> dict:
         repo_path: Path to the cloned repository
         
     Returns:
-        Dictionary with structure analysis results
+        Dictionary with structure analysis results, including the token budget
+        (None for the fixed depth limit) and the estimated size of the structure
     """
     activity.logger.info(f"Analyzing repository structure: {repo_path}")
     
@@ -959,13 +1891,26 @@ async def analyze_repository_structure_activity(repo_path: str) -> dict:
         repo_analyzer = RepositoryAnalyzer(logger)
         
         # Analyze repository structure
-        repo_structure = repo_analyzer.get_structure(repo_path)
+        from investigator.core.config import Config
+        token_budget = Config.STRUCTURE_TOKEN_BUDGET or None
+        if Config.GIT_TREE_ONLY:
+            repo_structure = await run_io(
+                repo_analyzer.get_structure_from_git, repo_path, token_budget=token_budget
+            )
+        else:
+            repo_structure = await run_io(repo_analyzer.get_structure, repo_path, token_budget=token_budget)
         
-        activity.logger.info(f"Repository structure captured ({len(repo_structure.split(chr(10)))} lines)")
+        structure_tokens = repo_analyzer.estimate_tokens(repo_structure)
+        activity.logger.info(
+            f"Repository structure captured ({len(repo_structure.split(chr(10)))} lines, ~{structure_tokens} tokens"
+            f"{f' of {token_budget} budget' if token_budget else ''})"
+        )
         
         return {
             "status": "success",
-            "repo_structure": repo_structure
+            "repo_structure": repo_structure,
+            "structure_token_budget": token_budget,
+            "structure_tokens": structure_tokens,
         }
         
     except Exception as e:
@@ -1002,10 +1947,10 @@ async def get_prompts_config_activity(repo_path: str, repo_type: str, repo_url:
         file_manager = FileManager(logger)
         
         # Get prompts directory
-        prompts_dir = type_detector.get_prompts_directory(repo_path, repo_type, repo_url)
+        prompts_dir = await run_io(type_detector.get_prompts_directory, repo_path, repo_type, repo_url)
         
         # Read prompts configuration
-        prompts_config = file_manager.read_prompts_config(prompts_dir)
+        prompts_config = await run_io(file_manager.read_prompts_config, prompts_dir)
         processing_order = prompts_config.get("processing_order", [])
         
         # Extract prompt versions for cache comparison
@@ -1031,8 +1976,7 @@ async def get_prompts_config_activity(repo_path: str, repo_type: str, repo_url:
                 
                 try:
                     # Read prompt content and extract version
-                    with open(prompt_path, 'r', encoding='utf-8') as f:
-                        prompt_content = f.read()
+                    prompt_content = await run_io(_read_text_file, prompt_path)
                     
                     version = AnalysisResultsCollector.extract_prompt_version(prompt_content)
                     prompt_versions[step_name] = version
@@ -1051,7 +1995,8 @@ async def get_prompts_config_activity(repo_path: str, repo_type: str, repo_url:
             "status": "success",
             "prompts_dir": prompts_dir,
             "processing_order": processing_order,
-            "prompt_versions": prompt_versions
+            "prompt_versions": prompt_versions,
+            "diff_ignore_paths": prompts_config.get("diff_ignore_paths", [])
         }
         
     except Exception as e:
@@ -1086,7 +2031,7 @@ async def read_prompt_file_activity(prompts_dir: str, file_name: str) -> dict:
         file_manager = FileManager(logger)
         
         # Read the prompt file
-        prompt_content = file_manager.read_prompt_file(prompts_dir, file_name)
+        prompt_content = await run_io(file_manager.read_prompt_file, prompts_dir, file_name)
         
         if prompt_content is None:
             return {
@@ -1134,7 +2079,7 @@ async def cleanup_repository_activity(repo_path: str, temp_dir: str = None) -> d
         # Clean up the repository path
         if repo_path and os.path.exists(repo_path):
             try:
-                shutil.rmtree(repo_path, ignore_errors=True)
+                await run_io(shutil.rmtree, repo_path, ignore_errors=True)
                 cleaned_paths.append(repo_path)
                 activity.logger.info(f"Removed repository directory: {repo_path}")
             except Exception as e:
@@ -1143,7 +2088,7 @@ async def cleanup_repository_activity(repo_path: str, temp_dir: str = None) -> d
         # Clean up temp directory if it's different from repo_path
         if temp_dir and temp_dir != repo_path and os.path.exists(temp_dir):
             try:
-                shutil.rmtree(temp_dir, ignore_errors=True)
+                await run_io(shutil.rmtree, temp_dir, ignore_errors=True)
                 cleaned_paths.append(temp_dir)
                 activity.logger.info(f"Removed temp directory: {temp_dir}")
             except Exception as e:
@@ -1156,7 +2101,7 @@ async def cleanup_repository_activity(repo_path: str, temp_dir: str = None) -> d
             arch_file = os.path.join(parent_dir, f"{repo_name}.arch.md")
             if os.path.exists(arch_file):
                 try:
-                    os.remove(arch_file)
+                    await run_io(os.remove, arch_file)
                     cleaned_paths.append(arch_file)
                     activity.logger.info(f"Removed arch file: {arch_file}")
                 except Exception as e:
@@ -1214,7 +2159,7 @@ async def write_analysis_result_activity(temp_dir: str, repo_path: str, final_an
         file_manager = FileManager(logger)
         
         # Write final analysis to file
-        arch_file_path = file_manager.write_analysis(repo_path, final_analysis)
+        arch_file_path = await run_io(file_manager.write_analysis, repo_path, final_analysis)
         
         activity.logger.info(f"Analysis written to: {arch_file_path}")
         
@@ -1228,6 +2173,65 @@ async def write_analysis_result_activity(temp_dir: str, repo_path: str, final_an
         raise Exception(f"Failed to write analysis result: {str(e)}") from e
 
 
+# Dependency manifest file patterns per language, matched against file names
+DEPENDENCY_PATTERNS = {
+    "Python": {
+        "production": [
+            "requirements.txt", "requirements-prod.txt", "requirements-production.txt",
+            "pyproject.toml", "setup.py", "setup.cfg",
+            "Pipfile", "environment.yml", "environment.yaml",
+            "conda.yml", "conda.yaml"
+        ],
+        "dev": [
+            "requirements-dev.txt", "requirements-test.txt",
+            "requirements-development.txt", "test-requirements.txt",
+            "dev-requirements.txt"
+        ],
+        "exclude": ["Pipfile.lock", "poetry.lock"]
+    },
+    "JavaScript": {
+        "production": ["package.json", "bower.json", "lerna.json"],
+        "dev": [],  # package.json contains both
+        "exclude": ["package-lock.json", "yarn.lock", "pnpm-lock.yaml", "node_modules"]
+    },
+    "Ruby": {
+        "production": ["Gemfile", "*.gemspec"],
+        "dev": [],  # Gemfile contains both
+        "exclude": ["Gemfile.lock"]
+    },
+    "Go": {
+        "production": ["go.mod", "Gopkg.toml"],
+        "dev": [],
+        "exclude": ["go.sum", "Gopkg.lock"]
+    },
+    "Rust": {
+        "production": ["Cargo.toml"],
+        "dev": [],
+        "exclude": ["Cargo.lock"]
+    },
+    "Java": {
+        "production": ["pom.xml", "build.gradle", "build.gradle.kts", "settings.gradle", "settings.gradle.kts"],
+        "dev": [],
+        "exclude": []
+    },
+    "CSharp": {
+        "production": ["*.csproj", "*.fsproj", "*.vbproj", "packages.config", "Directory.Build.props"],
+        "dev": [],
+        "exclude": ["packages.lock.json"]
+    },
+    "PHP": {
+        "production": ["composer.json"],
+        "dev": [],
+        "exclude": ["composer.lock"]
+    },
+    "Other": {
+        "production": ["Dockerfile", "docker-compose.yml", "docker-compose.yaml", ".tool-versions"],
+        "dev": [],
+        "exclude": []
+    }
+}
+
+
 @activity.defn
 async def read_dependencies_activity(repo_path: str) -> dict:
     """
@@ -1242,191 +2246,52 @@ async def read_dependencies_activity(repo_path: str) -> dict:
     activity.logger.info(f"Reading dependency files from: {repo_path}")
     
     try:
-        import os
-        import glob
-        import json
-        from pathlib import Path
-        
-        # Define dependency file patterns
-        DEPENDENCY_PATTERNS = {
-            "Python": {
-                "production": [
-                    "requirements.txt", "requirements-prod.txt", "requirements-production.txt",
-                    "pyproject.toml", "setup.py", "setup.cfg",
-                    "Pipfile", "environment.yml", "environment.yaml",
-                    "conda.yml", "conda.yaml"
-                ],
-                "dev": [
-                    "requirements-dev.txt", "requirements-test.txt",
-                    "requirements-development.txt", "test-requirements.txt",
-                    "dev-requirements.txt"
-                ],
-                "exclude": ["Pipfile.lock", "poetry.lock"]
-            },
-            "JavaScript": {
-                "production": ["package.json", "bower.json", "lerna.json"],
-                "dev": [],  # package.json contains both
-                "exclude": ["package-lock.json", "yarn.lock", "pnpm-lock.yaml", "node_modules"]
-            },
-            "Ruby": {
-                "production": ["Gemfile", "*.gemspec"],
-                "dev": [],  # Gemfile contains both
-                "exclude": ["Gemfile.lock"]
-            },
-            "Go": {
-                "production": ["go.mod", "Gopkg.toml"],
-                "dev": [],
-                "exclude": ["go.sum", "Gopkg.lock"]
-            },
-            "Rust": {
-                "production": ["Cargo.toml"],
-                "dev": [],
-                "exclude": ["Cargo.lock"]
-            },
-            "Java": {
-                "production": ["pom.xml", "build.gradle", "build.gradle.kts", "settings.gradle", "settings.gradle.kts"],
-                "dev": [],
-                "exclude": []
-            },
-            "CSharp": {
-                "production": ["*.csproj", "*.fsproj", "*.vbproj", "packages.config", "Directory.Build.props"],
-                "dev": [],
-                "exclude": ["packages.lock.json"]
-            },
-            "PHP": {
-                "production": ["composer.json"],
-                "dev": [],
-                "exclude": ["composer.lock"]
-            },
-            "Other": {
-                "production": ["Dockerfile", "docker-compose.yml", "docker-compose.yaml", ".tool-versions"],
-                "dev": [],
-                "exclude": []
-            }
-        }
+        import time
+        from investigator.core.config import Config
         
-        repo_path_obj = Path(repo_path)
-        dependencies_by_language = {}
+        timings = {}
         
-        # Search for dependency files
-        for language, patterns in DEPENDENCY_PATTERNS.items():
-            production_deps = []
-            dev_deps = []
-            
-            # Search for production dependency files
-            for pattern in patterns["production"]:
-                found_files = list(repo_path_obj.rglob(pattern))
-                for file_path in found_files:
-                    # Skip excluded files
-                    if any(exclude in file_path.name for exclude in patterns["exclude"]):
-                        continue
-                    
-                    # Read file content
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                        
-                        # Get relative path from repo root
-                        relative_path = "/" + str(file_path.relative_to(repo_path_obj))
-                        
-                        # For JavaScript, parse package.json to separate prod and dev deps
-                        if language == "JavaScript" and file_path.name == "package.json":
-                            try:
-                                package_data = json.loads(content)
-                                
-                                # Create separate content for production dependencies
-                                prod_content = _extract_package_json_section(content, ["dependencies", "peerDependencies"])
-                                if prod_content.strip():
-                                    production_deps.append({
-                                        "full_path": relative_path,
-                                        "content": prod_content
-                                    })
-                                
-                                # Create separate content for dev dependencies
-                                dev_content = _extract_package_json_section(content, ["devDependencies"])
-                                if dev_content.strip():
-                                    dev_deps.append({
-                                        "full_path": relative_path + " (dev)",
-                                        "content": dev_content
-                                    })
-                                
-                            except json.JSONDecodeError:
-                                # If JSON parsing fails, treat as production
-                                production_deps.append({
-                                    "full_path": relative_path,
-                                    "content": content
-                                })
-                        
-                        # For Ruby Gemfile, parse groups
-                        elif language == "Ruby" and file_path.name == "Gemfile":
-                            prod_content, dev_content = _parse_gemfile_groups(content)
-                            
-                            if prod_content.strip():
-                                production_deps.append({
-                                    "full_path": relative_path,
-                                    "content": prod_content
-                                })
-                            
-                            if dev_content.strip():
-                                dev_deps.append({
-                                    "full_path": relative_path + " (dev/test)",
-                                    "content": dev_content
-                                })
-                        
-                        # For Python pyproject.toml, parse sections
-                        elif language == "Python" and file_path.name == "pyproject.toml":
-                            prod_content, dev_content = _parse_pyproject_dependencies(content)
-                            
-                            if prod_content.strip():
-                                production_deps.append({
-                                    "full_path": relative_path,
-                                    "content": prod_content
-                                })
-                            
-                            if dev_content.strip():
-                                dev_deps.append({
-                                    "full_path": relative_path + " (dev)",
-                                    "content": dev_content
-                                })
-                        
-                        else:
-                            # Default: treat as production dependency
-                            production_deps.append({
-                                "full_path": relative_path,
-                                "content": content
-                            })
-                            
-                    except Exception as e:
-                        activity.logger.warning(f"Failed to read dependency file {file_path}: {e}")
-                        continue
-            
-            # Search for dev dependency files
-            for pattern in patterns["dev"]:
-                found_files = list(repo_path_obj.rglob(pattern))
-                for file_path in found_files:
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                        
-                        relative_path = "/" + str(file_path.relative_to(repo_path_obj))
-                        dev_deps.append({
-                            "full_path": relative_path,
-                            "content": content
-                        })
-                        
-                    except Exception as e:
-                        activity.logger.warning(f"Failed to read dev dependency file {file_path}: {e}")
-                        continue
+        # Find dependency files in one pass over git objects (tree-only mode) or the checkout
+        phase_start = time.monotonic()
+        if Config.GIT_TREE_ONLY:
+            matched = await run_io(_scan_git_for_dependency_files, repo_path, activity.logger)
+        else:
+            matched = await run_io(_scan_checkout_for_dependency_files, repo_path)
+        timings["scan_seconds"] = round(time.monotonic() - phase_start, 3)
+        
+        phase_start = time.monotonic()
+        if Config.GIT_TREE_ONLY:
+            dependency_files = await run_io(_read_git_dependency_files, repo_path, matched, activity.logger)
+        else:
+            dependency_files = await run_io(_read_checkout_dependency_files, matched, activity.logger)
+        timings["read_seconds"] = round(time.monotonic() - phase_start, 3)
+        
+        phase_start = time.monotonic()
+        dependencies_by_language = {}
+        for language, category, relative_path, content in dependency_files:
+            production_deps, dev_deps = _split_dependency_file(language, category, relative_path, content)
             
-            # Only add language if we found files
+            # Only add language if we found dependencies
             if production_deps or dev_deps:
-                dependencies_by_language[language] = {
-                    "production_dependencies": production_deps,
-                    "developer_only_dependencies": dev_deps
-                }
+                lang_deps = dependencies_by_language.setdefault(language, {
+                    "production_dependencies": [],
+                    "developer_only_dependencies": []
+                })
+                lang_deps["production_dependencies"].extend(production_deps)
+                lang_deps["developer_only_dependencies"].extend(dev_deps)
+        
+        timings["parse_seconds"] = round(time.monotonic() - phase_start, 3)
         
         # Format dependencies for prompts
+        phase_start = time.monotonic()
         formatted_content = _format_dependencies_for_prompt(dependencies_by_language)
+        timings["format_seconds"] = round(time.monotonic() - phase_start, 3)
+        
+        activity.logger.info(
+            f"Dependency scan timings: scan={timings['scan_seconds']}s ({len(matched)} matches), "
+            f"read={timings['read_seconds']}s, parse={timings['parse_seconds']}s, "
+            f"format={timings['format_seconds']}s"
+        )
         
         total_files = sum(
             len(lang_deps["production_dependencies"]) + len(lang_deps["developer_only_dependencies"])
@@ -1444,7 +2309,8 @@ async def read_dependencies_activity(repo_path: str) -> dict:
             "status": "success",
             "formatted_content": formatted_content,
             "raw_dependencies": dependencies_by_language,
-            "message": message
+            "message": message,
+            "timings": timings
         }
         
     except Exception as e:
@@ -1457,6 +2323,196 @@ async def read_dependencies_activity(repo_path: str) -> dict:
         }
 
 
+def _match_dependency_file(file_name: str) -> list:
+    """Return the (language, category) pairs whose patterns match a file name."""
+    import fnmatch
+    
+    matches = []
+    for language, patterns in DEPENDENCY_PATTERNS.items():
+        # Skip excluded files
+        if any(exclude in file_name for exclude in patterns["exclude"]):
+            continue
+        if any(fnmatch.fnmatchcase(file_name, pattern) for pattern in patterns["production"]):
+            matches.append((language, "production"))
+        elif any(fnmatch.fnmatchcase(file_name, pattern) for pattern in patterns["dev"]):
+            matches.append((language, "dev"))
+    return matches
+
+
+def _scan_checkout_for_dependency_files(repo_path: str) -> list:
+    """
+    Find dependency files in a working-tree checkout with a single walk.
+    
+    Every pattern is matched in the same traversal, and RepositoryAnalyzer.SKIP_DIRS
+    (node_modules, .git, virtualenvs, build output...) are pruned, not descended.
+    The matches come back sorted by path, the order of the git tree scan, so the
+    dependency text (and its fingerprint) does not depend on the filesystem.
+    
+    Returns:
+        List of (language, category, relative_path, absolute_path) tuples
+    """
+    from investigator.core.repository_analyzer import RepositoryAnalyzer
+    
+    skip_dirs = RepositoryAnalyzer.SKIP_DIRS
+    matched = []
+    
+    for root, dirs, files in os.walk(repo_path):
+        dirs[:] = sorted(d for d in dirs if d not in skip_dirs and not d.endswith('.egg-info'))
+        
+        for file_name in sorted(files):
+            file_matches = _match_dependency_file(file_name)
+            if not file_matches:
+                continue
+            
+            absolute_path = os.path.join(root, file_name)
+            # Get relative path from repo root
+            relative_path = "/" + os.path.relpath(absolute_path, repo_path).replace(os.sep, '/')
+            for language, category in file_matches:
+                matched.append((language, category, relative_path, absolute_path))
+    
+    # os.walk visits "a/" before "a-b/"; git orders full paths
+    matched.sort(key=lambda match: match[2])
+    return matched
+
+
+def _read_checkout_dependency_files(matched: list, logger) -> list:
+    """Read the files found by _scan_checkout_for_dependency_files."""
+    dependency_files = []
+    for language, category, relative_path, absolute_path in matched:
+        try:
+            with open(absolute_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except Exception as e:
+            logger.warning(f"Failed to read dependency file {absolute_path}: {e}")
+            continue
+        dependency_files.append((language, category, relative_path, content))
+    
+    return dependency_files
+
+
+def _scan_git_for_dependency_files(repo_path: str, logger) -> list:
+    """
+    Find dependency files in the commit's tree, without a checkout.
+    
+    Returns:
+        List of (language, category, relative_path, object_id) tuples
+    """
+    from investigator.core.git_tree_reader import GitTreeReader
+    from investigator.core.repository_analyzer import RepositoryAnalyzer
+    
+    skip_dirs = RepositoryAnalyzer.SKIP_DIRS
+    matched = []
+    
+    for path, object_id in GitTreeReader(logger).list_files(repo_path).items():
+        *parents, file_name = path.split('/')
+        if any(part in skip_dirs or part.endswith('.egg-info') for part in parents):
+            continue
+        for language, category in _match_dependency_file(file_name):
+            matched.append((language, category, "/" + path, object_id))
+    
+    return matched
+
+
+def _read_git_dependency_files(repo_path: str, matched: list, logger) -> list:
+    """Read the blobs found by _scan_git_for_dependency_files in one batch."""
+    from investigator.core.git_tree_reader import GitTreeReader
+    
+    # Only the matched manifest blobs are read (and fetched, in a partial clone)
+    blobs = GitTreeReader(logger).read_blobs(repo_path, [object_id for *_, object_id in matched])
+    
+    dependency_files = []
+    for language, category, relative_path, object_id in matched:
+        try:
+            content = blobs[object_id].decode('utf-8')
+        except (KeyError, UnicodeDecodeError) as e:
+            logger.warning(f"Failed to read dependency file {relative_path}: {e}")
+            continue
+        dependency_files.append((language, category, relative_path, content))
+    
+    return dependency_files
+
+
+def _split_dependency_file(language: str, category: str, relative_path: str, content: str) -> tuple:
+    """Split a dependency file into production and developer-only entries."""
+    import json
+    
+    if category == "dev":
+        return [], [{"full_path": relative_path, "content": content}]
+    
+    file_name = relative_path.rsplit('/', 1)[-1]
+    production_deps = []
+    dev_deps = []
+    
+    # For JavaScript, parse package.json to separate prod and dev deps
+    if language == "JavaScript" and file_name == "package.json":
+        try:
+            json.loads(content)
+            
+            # Create separate content for production dependencies
+            prod_content = _extract_package_json_section(content, ["dependencies", "peerDependencies"])
+            if prod_content.strip():
+                production_deps.append({
+                    "full_path": relative_path,
+                    "content": prod_content
+                })
+            
+            # Create separate content for dev dependencies
+            dev_content = _extract_package_json_section(content, ["devDependencies"])
+            if dev_content.strip():
+                dev_deps.append({
+                    "full_path": relative_path + " (dev)",
+                    "content": dev_content
+                })
+            
+        except json.JSONDecodeError:
+            # If JSON parsing fails, treat as production
+            production_deps.append({
+                "full_path": relative_path,
+                "content": content
+            })
+    
+    # For Ruby Gemfile, parse groups
+    elif language == "Ruby" and file_name == "Gemfile":
+        prod_content, dev_content = _parse_gemfile_groups(content)
+        
+        if prod_content.strip():
+            production_deps.append({
+                "full_path": relative_path,
+                "content": prod_content
+            })
+        
+        if dev_content.strip():
+            dev_deps.append({
+                "full_path": relative_path + " (dev/test)",
+                "content": dev_content
+            })
+    
+    # For Python pyproject.toml, parse sections
+    elif language == "Python" and file_name == "pyproject.toml":
+        prod_content, dev_content = _parse_pyproject_dependencies(content)
+        
+        if prod_content.strip():
+            production_deps.append({
+                "full_path": relative_path,
+                "content": prod_content
+            })
+        
+        if dev_content.strip():
+            dev_deps.append({
+                "full_path": relative_path + " (dev)",
+                "content": dev_content
+            })
+    
+    else:
+        # Default: treat as production dependency
+        production_deps.append({
+            "full_path": relative_path,
+            "content": content
+        })
+    
+    return production_deps, dev_deps
+
+
 def _format_dependencies_for_prompt(dependencies: dict) -> str:
     """Format dependencies for inclusion in prompts."""
     if not dependencies:
@@ -1598,7 +2654,7 @@ async def cache_dependencies_activity(repo_name: str, dependencies_data: dict) -
         sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
         
         # Use the abstracted storage (file or DynamoDB based on env)
-        if os.environ.get('PROMPT_CONTEXT_STORAGE') == 'file':
+        if os.environ.get('PROMPT_CONTEXT_STORAGE') in ('file', 'sqlite'):
             from utils.prompt_context import create_prompt_context_manager
             storage_client = create_prompt_context_manager(repo_name)
         else:
@@ -1616,7 +2672,8 @@ async def cache_dependencies_activity(repo_name: str, dependencies_data: dict) -
         reference_key = deps_key.to_storage_key()
         
         # Save using the abstracted method
-        result = cache.save_dependencies(
+        result = await run_io(
+            cache.save_dependencies,
             repo_name=repo_name,
             dependencies_data=dependencies_data,
             reference_key=reference_key
@@ -710,6 +710,253 @@ class InvestigationCache:
                 "timestamp": None
             }
 
+    @staticmethod
+    def compute_input_fingerprint(
+        prompt_content: str,
+        repo_structure: str,
+        previous_context: Optional[str],
+        prompt_version: str = "1",
+        model_settings: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Hash the exact inputs an analysis step sends to Claude.
+
+        Two runs with the same fingerprint would send the same request, so the
+        earlier result can be reused whatever commit it was produced for.
+
+        Args:
+            prompt_content: Prompt template with dependencies already substituted
+            repo_structure: Repository structure text (including dependencies when prompt caching)
+            previous_context: Combined results of the steps this one consumes
+            prompt_version: Version of the prompt (a version bump always re-runs the step)
+            model_settings: Effective model, max_tokens and temperature
+
+        Returns:
+            Hex SHA-256 fingerprint
+        """
+        import hashlib
+        import json
+
+        digest = hashlib.sha256()
+        for part in (
+            prompt_version,
+            json.dumps(model_settings or {}, sort_keys=True),
+            prompt_content or "",
+            repo_structure or "",
+            previous_context or "",
+        ):
+            encoded = part.encode('utf-8')
+            # Length-prefix each part so boundaries cannot shift between inputs
+            digest.update(len(encoded).to_bytes(8, 'big'))
+            digest.update(encoded)
+        return digest.hexdigest()
+
+    def check_input_fingerprint(
+        self,
+        repo_name: str,
+        step_name: str,
+        fingerprint: str
+    ) -> Dict[str, Any]:
+        """
+        Look up a result cached under the fingerprint of a step's inputs.
+
+        Args:
+            repo_name: Name of the repository
+            step_name: Name of the analysis step/prompt
+            fingerprint: Fingerprint from compute_input_fingerprint
+
+        Returns:
+            Dictionary with the same fields as check_prompt_needs_analysis
+        """
+        fingerprint_key = KeyNameCreator.create_input_fingerprint_key(repo_name, step_name, fingerprint).to_storage_key()
+
+        self.logger.info(f"🔍 INPUT CACHE: Checking inputs of {repo_name}/{step_name} (fingerprint {fingerprint[:12]})")
+
+        try:
+            cached_result = self.storage_client.get_analysis_result(fingerprint_key)
+
+            if cached_result:
+                self.logger.info(f"✅ INPUT CACHE HIT: Inputs of {repo_name}/{step_name} are unchanged")
+                return {
+                    "needs_analysis": False,
+                    "cached_result_key": fingerprint_key,
+                    "cached_result": cached_result,
+                    "reason": f"Inputs unchanged (fingerprint {fingerprint[:12]})"
+                }
+
+            self.logger.info(f"❌ INPUT CACHE MISS: No result for these inputs of {repo_name}/{step_name}")
+            return {
+                "needs_analysis": True,
+                "cached_result_key": None,
+                "cached_result": None,
+                "reason": f"No cached result for fingerprint {fingerprint[:12]}"
+            }
+
+        except Exception as e:
+            self.logger.error(f"💥 INPUT CACHE ERROR: Error checking input cache for {repo_name}/{step_name}: {e}")
+            # On error, safer to re-run the analysis
+            return {
+                "needs_analysis": True,
+                "cached_result_key": None,
+                "cached_result": None,
+                "reason": f"Input cache check failed: {str(e)}"
+            }
+
+    def save_input_fingerprint_result(
+        self,
+        repo_name: str,
+        step_name: str,
+        fingerprint: str,
+        result_content: str,
+        ttl_days: int = 90
+    ) -> Dict[str, Any]:
+        """
+        Save a result under the fingerprint of the inputs that produced it.
+
+        Args:
+            repo_name: Name of the repository
+            step_name: Name of the analysis step/prompt
+            fingerprint: Fingerprint from compute_input_fingerprint
+            result_content: The analysis result content
+            ttl_days: Time-to-live in days for the cached result
+
+        Returns:
+            Dictionary with save status
+        """
+        fingerprint_key = KeyNameCreator.create_input_fingerprint_key(repo_name, step_name, fingerprint).to_storage_key()
+
+        try:
+            self.storage_client.save_analysis_result(
+                reference_key=fingerprint_key,
+                result_content=result_content,
+                step_name=step_name,
+                ttl_minutes=ttl_days * 24 * 60
+            )
+            self.logger.info(f"💾 INPUT CACHE SAVED: {repo_name}/{step_name} (fingerprint {fingerprint[:12]})")
+            return {"status": "success", "cache_key": fingerprint_key}
+
+        except Exception as e:
+            self.logger.error(f"💥 INPUT CACHE ERROR: Failed to save input cache for {repo_name}/{step_name}: {e}")
+            # Don't fail the workflow for cache save failures
+            return {"status": "error", "message": f"Failed to cache result: {str(e)}", "cache_key": None}
+
+    @staticmethod
+    def compute_result_hash(result_content: str) -> str:
+        """
+        Hash a step result, for the lineage of the steps that take it as context.
+
+        Args:
+            result_content: The analysis result content
+
+        Returns:
+            First 32 hex characters of the SHA-256 of the result
+        """
+        import hashlib
+
+        return hashlib.sha256((result_content or "").encode('utf-8')).hexdigest()[:32]
+
+    def save_result_lineage(
+        self,
+        result_key: str,
+        step_name: str,
+        result_hash: str,
+        upstream_hashes: Dict[str, str],
+        ttl_days: int = 90
+    ) -> Dict[str, Any]:
+        """
+        Record the upstream result hashes a cached step result was built from.
+
+        Args:
+            result_key: Reference key of the cached step result
+            step_name: Name of the analysis step/prompt
+            result_hash: Hash of the step's own result
+            upstream_hashes: Result hashes of the context steps, by step name
+            ttl_days: Time-to-live in days (should match the cached result)
+
+        Returns:
+            Dictionary with save status
+        """
+        import json
+
+        lineage_key = KeyNameCreator.create_result_lineage_key(result_key).to_storage_key()
+        lineage = {"result_hash": result_hash, "upstream": dict(upstream_hashes)}
+
+        try:
+            self.storage_client.save_analysis_result(
+                reference_key=lineage_key,
+                result_content=json.dumps(lineage, sort_keys=True),
+                step_name=step_name,
+                ttl_minutes=ttl_days * 24 * 60
+            )
+            self.logger.debug(f"🧬 LINEAGE SAVED: {result_key} <- {sorted(upstream_hashes)}")
+            return {"status": "success", "lineage_key": lineage_key}
+
+        except Exception as e:
+            self.logger.error(f"💥 LINEAGE ERROR: Failed to save lineage of {result_key}: {e}")
+            # Don't fail the workflow for cache save failures
+            return {"status": "error", "message": str(e), "lineage_key": None}
+
+    def check_result_lineage(
+        self,
+        result_key: str,
+        upstream_hashes: Dict[str, str]
+    ) -> Dict[str, Any]:
+        """
+        Check that a cached step result was built from the current upstream results.
+
+        A result cached before lineage was recorded has nothing to compare
+        against and is accepted.
+
+        Args:
+            result_key: Reference key of the cached step result
+            upstream_hashes: Current result hashes of the context steps, by step name
+
+        Returns:
+            Dictionary with is_valid, has_lineage, changed_steps and reason
+        """
+        import json
+
+        lineage_key = KeyNameCreator.create_result_lineage_key(result_key).to_storage_key()
+
+        try:
+            stored = self.storage_client.get_analysis_result(lineage_key)
+        except Exception as e:
+            self.logger.error(f"💥 LINEAGE ERROR: Failed to read lineage of {result_key}: {e}")
+            # On error, safer to re-run the analysis
+            return {
+                "is_valid": False,
+                "has_lineage": False,
+                "changed_steps": [],
+                "reason": f"Lineage check failed: {str(e)}"
+            }
+
+        if not stored:
+            return {
+                "is_valid": True,
+                "has_lineage": False,
+                "changed_steps": [],
+                "reason": "No lineage recorded for this result"
+            }
+
+        recorded = json.loads(stored).get("upstream", {})
+        changed_steps = sorted(
+            name for name in set(recorded) | set(upstream_hashes)
+            if recorded.get(name) != upstream_hashes.get(name)
+        )
+        if changed_steps:
+            return {
+                "is_valid": False,
+                "has_lineage": True,
+                "changed_steps": changed_steps,
+                "reason": f"Upstream results changed: {', '.join(changed_steps)}"
+            }
+        return {
+            "is_valid": True,
+            "has_lineage": True,
+            "changed_steps": [],
+            "reason": "Upstream results unchanged"
+        }
+
     def save_dependencies(
         self,
         repo_name: str,
@@ -12,6 +12,7 @@ from datetime import datetime, timezone
 
 from temporalio import activity
 
+from .executors import run_io
 from .investigation_cache import InvestigationCache
 from models.investigation import RepositoryState
 from models.activities import CacheCheckInput, CacheCheckOutput, SaveMetadataInput, SaveMetadataOutput
@@ -45,12 +46,21 @@ async def check_if_repo_needs_investigation(
     
     try:
         # Get current repository state
-        activity.logger.info(f"📊 Getting current repository state from {input_params.repo_path}")
-        current_state = RepositoryState(
-            commit_sha=_get_latest_commit(input_params.repo_path),
-            branch_name=_get_current_branch(input_params.repo_path),
-            has_uncommitted_changes=_has_uncommitted_changes(input_params.repo_path)
-        )
+        if input_params.repo_path:
+            activity.logger.info(f"📊 Getting current repository state from {input_params.repo_path}")
+            current_state = RepositoryState(
+                commit_sha=await run_io(_get_latest_commit, input_params.repo_path),
+                branch_name=await run_io(_get_current_branch, input_params.repo_path),
+                has_uncommitted_changes=await run_io(_has_uncommitted_changes, input_params.repo_path)
+            )
+        else:
+            # Pre-clone check - the state comes from git ls-remote
+            activity.logger.info(f"📊 Using remote repository state (not cloned yet)")
+            current_state = RepositoryState(
+                commit_sha=input_params.remote_commit,
+                branch_name=input_params.remote_branch or "unknown",
+                has_uncommitted_changes=False
+            )
         
         activity.logger.info(f"📊 Repository state: commit={current_state.commit_sha[:8]}, branch={current_state.branch_name}, uncommitted={current_state.has_uncommitted_changes}")
         
@@ -62,7 +72,9 @@ async def check_if_repo_needs_investigation(
         
         # Check if investigation is needed
         activity.logger.info(f"🔍 Calling cache.check_needs_investigation...")
-        decision = cache.check_needs_investigation(input_params.repo_name, current_state, input_params.prompt_versions)
+        decision = await run_io(
+            cache.check_needs_investigation, input_params.repo_name, current_state, input_params.prompt_versions
+        )
         
         # Convert decision to CacheCheckOutput model
         activity.logger.info(f"✅ ACTIVITY RESULT: needs_investigation={decision.needs_investigation}, reason='{decision.reason}'")
@@ -81,8 +93,12 @@ async def check_if_repo_needs_investigation(
         
         # Try to still get commit info from the repository
         try:
-            latest_commit = _get_latest_commit(input_params.repo_path)
-            branch_name = _get_current_branch(input_params.repo_path)
+            if input_params.repo_path:
+                latest_commit = await run_io(_get_latest_commit, input_params.repo_path)
+                branch_name = await run_io(_get_current_branch, input_params.repo_path)
+            else:
+                latest_commit = input_params.remote_commit
+                branch_name = input_params.remote_branch
             activity.logger.info(f"📊 Retrieved commit info despite error: commit={latest_commit[:8]}, branch={branch_name}")
         except Exception as git_error:
             activity.logger.warning(f"Could not retrieve git info: {git_error}")
@@ -133,7 +149,8 @@ async def save_investigation_metadata(
         
         # Save the investigation metadata
         activity.logger.info(f"💾 Calling cache.save_investigation_metadata...")
-        result = cache.save_investigation_metadata(
+        result = await run_io(
+            cache.save_investigation_metadata,
             repo_name=input_params.repo_name,
             repo_url=input_params.repo_url,
             commit_sha=input_params.latest_commit,
@@ -0,0 +1,161 @@
+"""
+Task queues for the stages of an investigation.
+
+clone_repository_activity leaves the clone on the local disk of the worker
+that ran it, and the activities after it (cache check, diff, structure,
+dependencies, writing results, cleanup) read that path. With more than one
+worker replica they must run on the same worker, so every worker also polls a
+task queue of its own. A workflow asks for the queues with
+get_worker_task_queues_activity on the shared queue, then schedules the clone
+and everything that reads it on that worker.
+
+With stage pools the stages also get separately sized activity slots, each
+on its own task queue, so slow Claude calls never hold up clones of the next
+repositories:
+
+- clone: cloning (worker-specific)
+- worker: structure, dependencies and the other clone-bound file work (worker-specific)
+- llm: Claude analysis steps
+- hub: architecture hub push and investigation metadata
+
+An activity on a worker queue that hits its schedule-to-start timeout is
+waiting either behind a busy worker or for a worker that stopped. The workflow
+tells them apart with check_worker_queue_polled_activity, which asks the
+Temporal server whether the queue still has a poller: a busy worker gets the
+activity again, a stopped one means re-cloning on another worker.
+"""
+
+import socket
+import time
+import uuid
+
+from temporalio import activity
+
+from models import WorkerTaskQueues
+from workflow_config import WorkflowConfig
+
+_worker_task_queues = WorkerTaskQueues()
+
+
+def unique_worker_task_queue(task_queue: str) -> str:
+    """Name a task queue only this worker process polls."""
+    return f"{task_queue}-{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+
+
+def configure_worker_task_queues(task_queue: str, sticky: bool, stage_pools: bool) -> WorkerTaskQueues:
+    """
+    Choose this worker's stage task queues.
+
+    The clone and file stage queues are always worker-specific: a queue name
+    shared by the replicas would let the clone run on one host and the
+    activities reading it on another.
+
+    Args:
+        task_queue: The shared task queue
+        sticky: Whether clone-bound activities get a worker-specific queue
+            (implied by stage_pools)
+        stage_pools: Whether stages get their own queues and activity slots
+
+    Returns:
+        The queues, also returned by get_worker_task_queues_activity
+    """
+    global _worker_task_queues
+    worker = unique_worker_task_queue(task_queue) if sticky or stage_pools else None
+    if stage_pools:
+        _worker_task_queues = WorkerTaskQueues(
+            worker=worker,
+            clone=f"{worker}-clone",
+            llm=f"{task_queue}-llm",
+            hub=f"{task_queue}-hub",
+        )
+    else:
+        _worker_task_queues = WorkerTaskQueues(worker=worker)
+    return _worker_task_queues
+
+
+@activity.defn
+async def get_worker_task_queues_activity() -> WorkerTaskQueues:
+    """
+    Activity returning the stage task queues of the worker that runs it.
+
+    Returns:
+        WorkerTaskQueues; stages without a queue stay on the shared queue
+        (single worker setups)
+    """
+    activity.logger.info(f"📌 Worker task queues: {_worker_task_queues.model_dump(exclude_none=True) or 'shared queue only'}")
+    return _worker_task_queues
+
+
+def stage_window_size(stage_pools: bool, llm_slots: int, clone_slots: int) -> int:
+    """
+    Default number of repositories in flight for a worker's stage pools.
+
+    A repository holds its place in the window for its whole investigation,
+    Claude waits included, so the window must cover more than the clone
+    stage for the next clones to overlap the analysis of earlier ones: one
+    repository per LLM slot (dependency chains often leave a repository with
+    a single ready step) plus one per clone slot.
+
+    Args:
+        stage_pools: Whether stages get their own queues and activity slots
+        llm_slots: LLM_STAGE_CONCURRENCY
+        clone_slots: CLONE_STAGE_CONCURRENCY
+
+    Returns:
+        The window size, WORKFLOW_CHUNK_SIZE without stage pools
+    """
+    if not stage_pools:
+        return WorkflowConfig.WORKFLOW_CHUNK_SIZE
+    # Within the chunk_size range accepted by validate_chunk_size
+    return max(1, min(llm_slots + clone_slots, 20))
+
+
+@activity.defn
+async def get_stage_window_activity() -> int:
+    """
+    Activity returning the default repository window for this worker's stage pools.
+
+    Returns:
+        See stage_window_size
+    """
+    from investigator.core.config import Config
+
+    window = stage_window_size(Config.STAGE_POOLS_ENABLED, Config.LLM_STAGE_CONCURRENCY,
+                               Config.CLONE_STAGE_CONCURRENCY)
+    activity.logger.info(f"📐 Default window from the stage pools: {window} repositories")
+    return window
+
+
+@activity.defn
+async def check_worker_queue_polled_activity(task_queue: str) -> bool:
+    """
+    Activity checking whether a worker still polls an activity task queue.
+
+    Workers poll continuously, so a live worker - however busy - was seen by
+    the server within the last few seconds to a minute. The server keeps a
+    stopped worker's poller for a few minutes, hence the staleness limit.
+
+    Args:
+        task_queue: The worker-specific task queue
+
+    Returns:
+        True when a poller was seen within WORKER_POLLER_STALE_SECONDS
+    """
+    from temporalio.api.enums.v1 import TaskQueueType
+    from temporalio.api.taskqueue.v1 import TaskQueue
+    from temporalio.api.workflowservice.v1 import DescribeTaskQueueRequest
+
+    client = activity.client()
+    response = await client.workflow_service.describe_task_queue(DescribeTaskQueueRequest(
+        namespace=client.namespace,
+        task_queue=TaskQueue(name=task_queue),
+        task_queue_type=TaskQueueType.TASK_QUEUE_TYPE_ACTIVITY,
+    ))
+    now = time.time()
+    polled = any(
+        now - poller.last_access_time.ToSeconds() <= WorkflowConfig.WORKER_POLLER_STALE_SECONDS
+        for poller in response.pollers
+    )
+    activity.logger.info(f"{'💓' if polled else '💀'} Task queue {task_queue}: "
+                         f"{len(response.pollers)} pollers, {'alive' if polled else 'no recent poll'}")
+    return polled
@@ -18,7 +18,8 @@ logger = logging.getLogger(__name__)
 
 async def run_investigate_repos_workflow(client: Client, force: bool = False, 
                                       claude_model: str = None, max_tokens: int = None, 
-                                      sleep_hours: float = None, chunk_size: int = None):
+                                      sleep_hours: float = None, chunk_size: int = None,
+                                      batch_mode: bool = False, adaptive_concurrency: bool = None):
     """Run the InvestigateReposWorkflow. Runs continuously every X hours.
     
     Args:
@@ -28,6 +29,9 @@ async def run_investigate_repos_workflow(client: Client, force: bool = False,
         max_tokens: Optional max tokens override  
         sleep_hours: Optional sleep hours override (supports fractional hours)
         chunk_size: Optional chunk size override (number of repos processed in parallel)
+        batch_mode: If True, run analysis steps through the Message Batches API
+        adaptive_concurrency: True to adapt the repos and steps in flight to Claude API feedback,
+            False to keep chunk_size fixed (default: WorkflowConfig.ADAPTIVE_CONCURRENCY, off)
     """
     from datetime import datetime
     
@@ -51,6 +55,8 @@ async def run_investigate_repos_workflow(client: Client, force: bool = False,
         max_tokens=max_tokens,
         sleep_hours=sleep_hours,
         chunk_size=chunk_size,
+        batch_mode=batch_mode,
+        adaptive_concurrency=adaptive_concurrency,
         iteration_count=0
     )
     
@@ -66,6 +72,14 @@ async def run_investigate_repos_workflow(client: Client, force: bool = False,
     if chunk_size:
         logger.info(f"🔧 Chunk size override: {chunk_size}")
     
+    if batch_mode:
+        logger.info("📦 Batch mode enabled - analysis steps will run through the Message Batches API")
+    
+    if adaptive_concurrency:
+        logger.info("📈 Adaptive concurrency - repos and steps in flight follow Claude API feedback")
+    elif adaptive_concurrency is False:
+        logger.info("🔧 Fixed concurrency - chunk size is not adapted to Claude API feedback")
+    
     result = await client.execute_workflow(
         InvestigateReposWorkflow.run,
         request,
@@ -245,6 +259,15 @@ async def main():
             max_tokens = None
             sleep_hours = None
             chunk_size = None
+            batch_mode = "--batch-mode" in sys.argv
+            adaptive_concurrency = None
+            if "--adaptive-concurrency" in sys.argv and "--fixed-concurrency" in sys.argv:
+                logger.error("--adaptive-concurrency and --fixed-concurrency cannot be combined")
+                return
+            if "--adaptive-concurrency" in sys.argv:
+                adaptive_concurrency = True
+            elif "--fixed-concurrency" in sys.argv:
+                adaptive_concurrency = False
             
             for arg in sys.argv[2:]:
                 if arg.startswith("--claude-model="):
@@ -269,7 +292,8 @@ async def main():
                         return
             
             await run_investigate_repos_workflow(client, force=force, claude_model=claude_model, 
-                                               max_tokens=max_tokens, sleep_hours=sleep_hours, chunk_size=chunk_size)
+                                               max_tokens=max_tokens, sleep_hours=sleep_hours, chunk_size=chunk_size,
+                                               batch_mode=batch_mode, adaptive_concurrency=adaptive_concurrency)
         elif workflow_name == "investigate-single":
             # Parse repository identifier and configuration overrides
             if len(sys.argv) < 3:
@@ -304,7 +328,7 @@ async def main():
         else:
             logger.error(f"Unknown workflow: {workflow_name}")
             logger.info("Available workflows: investigate, investigate-single")
-            logger.info("Usage: python client.py investigate [--force] [--claude-model=MODEL] [--max-tokens=NUM] [--sleep-hours=NUM] [--chunk-size=NUM]")
+            logger.info("Usage: python client.py investigate [--force] [--claude-model=MODEL] [--max-tokens=NUM] [--sleep-hours=NUM] [--chunk-size=NUM] [--batch-mode] [--adaptive-concurrency|--fixed-concurrency]")
             logger.info("Usage: python client.py investigate-single REPO_NAME_OR_URL [options]")
     else:
         # Default to investigate workflow
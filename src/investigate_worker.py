@@ -81,8 +81,15 @@ try:
     read_repos_config,
     update_repos_list,
     save_prompt_context_activity,
+    store_shared_inputs_activity,
     analyze_with_claude_context,
+    run_analysis_step_activity,
+    check_analysis_step_cache_activity,
+    submit_claude_batch_activity,
+    collect_claude_batch_activity,
     retrieve_all_results_activity,
+    get_remote_head_activity,
+    get_diff_affected_steps_activity,
     clone_repository_activity,
     analyze_repository_structure_activity,
     get_prompts_config_activity,
@@ -117,6 +124,33 @@ except ImportError as e:
     logger.error(f"  ✗ Failed to import DynamoDB health check activities: {e}")
     raise
 
+try:
+    from activities.worker_session import (
+        configure_worker_task_queues,
+        get_worker_task_queues_activity,
+        get_stage_window_activity,
+        check_worker_queue_polled_activity
+    )
+    logger.info("  ✓ Imported worker session activities")
+except ImportError as e:
+    logger.error(f"  ✗ Failed to import worker session activities: {e}")
+    raise
+
+try:
+    from activities.executors import configure_executors, shutdown_executors
+    from investigator.core.config import Config
+    logger.info("  ✓ Imported activity executors")
+except ImportError as e:
+    logger.error(f"  ✗ Failed to import activity executors: {e}")
+    raise
+
+try:
+    from activities.claude_client import close_claude_client, configure_claude_client, create_claude_client
+    logger.info("  ✓ Imported Claude client")
+except ImportError as e:
+    logger.error(f"  ✗ Failed to import Claude client: {e}")
+    raise
+
 logger.info("All imports successful!")
 
 # Health check file for ECS
@@ -232,8 +266,15 @@ async def main():
             read_repos_config,
             update_repos_list,
             save_prompt_context_activity,
+            store_shared_inputs_activity,
             analyze_with_claude_context,
+            run_analysis_step_activity,
+            check_analysis_step_cache_activity,
+            submit_claude_batch_activity,
+            collect_claude_batch_activity,
             retrieve_all_results_activity,
+            get_remote_head_activity,
+            get_diff_affected_steps_activity,
             clone_repository_activity,
             analyze_repository_structure_activity,
             get_prompts_config_activity,
@@ -245,16 +286,67 @@ async def main():
             check_dynamodb_health,
             cleanup_old_health_checks,
             read_dependencies_activity,
-            cache_dependencies_activity
+            cache_dependencies_activity,
+            get_worker_task_queues_activity,
+            get_stage_window_activity,
+            check_worker_queue_polled_activity
         ]
         logger.info(f"  Activities: {[a.__name__ for a in all_activities]}")
         
+        # Activities that use the local clone, also served on this worker's own queue
+        clone_activities = [
+            check_if_repo_needs_investigation,
+            get_diff_affected_steps_activity,
+            analyze_repository_structure_activity,
+            read_dependencies_activity,
+            write_analysis_result_activity,
+            cleanup_repository_activity
+        ]
+        task_queues = configure_worker_task_queues(
+            config['task_queue'], Config.WORKER_STICKY_QUEUE, Config.STAGE_POOLS_ENABLED
+        )
+        # Stage pools: (task queue, activities, concurrent activity slots)
+        if task_queues.clone:
+            stages = [
+                (task_queues.clone, [clone_repository_activity], Config.CLONE_STAGE_CONCURRENCY),
+                (task_queues.worker, clone_activities, Config.FILES_STAGE_CONCURRENCY),
+                (task_queues.llm, [run_analysis_step_activity], Config.LLM_STAGE_CONCURRENCY),
+                (task_queues.hub, [save_to_arch_hub, save_investigation_metadata], Config.HUB_STAGE_CONCURRENCY),
+            ]
+        elif task_queues.worker:
+            stages = [(task_queues.worker, [clone_repository_activity] + clone_activities, None)]
+        else:
+            stages = []
+
+        # Blocking work inside activities runs on these pools, off the event loop
+        configure_executors(Config.ACTIVITY_IO_WORKERS, Config.ACTIVITY_LLM_WORKERS)
+        logger.info(f"  I/O threads: {Config.ACTIVITY_IO_WORKERS}, LLM threads: {Config.ACTIVITY_LLM_WORKERS}")
+        
+        # One async Claude client for the worker, so analysis steps share its keep-alive connections
+        anthropic_api_key = os.getenv('ANTHROPIC_API_KEY')
+        if anthropic_api_key:
+            configure_claude_client(create_claude_client(anthropic_api_key))
+            logger.info(f"  Claude client: up to {Config.CLAUDE_MAX_CONNECTIONS} connections, "
+                        f"{Config.CLAUDE_KEEPALIVE_CONNECTIONS} kept alive for {Config.CLAUDE_KEEPALIVE_EXPIRY_SECONDS:g}s")
+        else:
+            logger.warning("  ANTHROPIC_API_KEY not set - Claude analysis steps will fail")
+        
         worker = Worker(
             client,
             task_queue=config['task_queue'],
             workflows=[InvestigateReposWorkflow, InvestigateSingleRepoWorkflow],
             activities=all_activities,
         )
+        workers = [worker]
+        for stage_queue, stage_activities, max_concurrent in stages:
+            workers.append(Worker(
+                client,
+                task_queue=stage_queue,
+                activities=stage_activities,
+                max_concurrent_activities=max_concurrent,
+            ))
+            logger.info(f"  Stage task queue: {stage_queue} ({len(stage_activities)} activities, "
+                        f"{max_concurrent or 'default'} slots)")
         logger.info("✓ Worker instance created successfully!")
         
         logger.info("Step 6: Starting worker run loop...")
@@ -264,7 +356,11 @@ async def main():
         logger.info("Waiting for workflows...")
         logger.info("=" * 60)
         
-        await worker.run()
+        try:
+            await asyncio.gather(*(w.run() for w in workers))
+        finally:
+            shutdown_executors(wait=False)
+            await close_claude_client()
         
     except ImportError as e:
         logger.error(f"Import error - missing dependency: {str(e)}", exc_info=True)
@@ -2,17 +2,55 @@
 Claude API integration for the Claude Investigator.
 """
 
-from anthropic import Anthropic
+import asyncio
+import inspect
+import time
+
+from anthropic import Anthropic, APIStatusError
 from typing import Optional
 from .config import Config
+from .rate_limiter import estimate_input_tokens, get_rate_limiter
 
 
 class ClaudeAnalyzer:
     """Handles Claude API interactions for analysis."""
     
-    def __init__(self, api_key: str, logger):
-        self.client = Anthropic(api_key=api_key)
+    # Replacements for the placeholders when the repo-wide material is sent as a cached prefix
+    REPO_STRUCTURE_REFERENCE = "(see the repository structure in the Repository Context above)"
+    REPO_DEPS_REFERENCE = "(see the Dependencies section in the Repository Context above)"
+    
+    # Replacements for the placeholders in update mode, where only the changes are sent
+    UPDATE_STRUCTURE_REFERENCE = "(the repository structure is not repeated here - see the changes below)"
+    UPDATE_DEPS_REFERENCE = "(dependency changes, if any, are part of the changes below)"
+    
+    # Token counters recorded from the API response usage
+    USAGE_FIELDS = (
+        "input_tokens",
+        "output_tokens",
+        "cache_creation_input_tokens",
+        "cache_read_input_tokens",
+    )
+    
+    # Rate limit headers as (remaining, limit) pairs, compared for the lowest remaining capacity
+    RATE_LIMIT_HEADERS = (
+        ("anthropic-ratelimit-requests-remaining", "anthropic-ratelimit-requests-limit"),
+        ("anthropic-ratelimit-input-tokens-remaining", "anthropic-ratelimit-input-tokens-limit"),
+        ("anthropic-ratelimit-output-tokens-remaining", "anthropic-ratelimit-output-tokens-limit"),
+    )
+    
+    def __init__(self, api_key: str, logger, async_client=None):
+        """
+        Args:
+            api_key: Anthropic API key for the synchronous client
+            logger: Logger for request and usage messages
+            async_client: Shared AsyncAnthropic client for the *_async methods;
+                when given, no synchronous client is created
+        """
+        self.client = Anthropic(api_key=api_key) if async_client is None else None
+        self.async_client = async_client
         self.logger = logger
+        self.last_usage = {}
+        self.last_api_feedback = {}
     
     def clean_prompt(self, prompt_template: str) -> str:
         """
@@ -48,7 +86,8 @@ class ClaudeAnalyzer:
     
     def analyze_with_context(self, prompt_template: str, repo_structure: str, 
                            previous_context: Optional[str] = None,
-                           config_overrides: Optional[dict] = None) -> str:
+                           config_overrides: Optional[dict] = None,
+                           use_prompt_cache: Optional[bool] = None) -> str:
         """
         Analyze using Claude with optional context from previous analyses.
         
@@ -57,53 +96,354 @@ class ClaudeAnalyzer:
             repo_structure: Repository structure string
             previous_context: Previous analysis results to include as context
             config_overrides: Optional dict with claude_model, max_tokens overrides
+            use_prompt_cache: Send repo_structure as a cached prefix block
+                (default: Config.PROMPT_CACHING_ENABLED)
             
         Returns:
-            Analysis result from Claude
+            Analysis result from Claude. Token usage is available in last_usage.
         """
-        if config_overrides is None:
-            config_overrides = {}
+        params = self.build_message_params(prompt_template, repo_structure, previous_context,
+                                           config_overrides, use_prompt_cache)
         
-        # Clean the prompt template first (remove version lines, etc.)
-        cleaned_template = self.clean_prompt(prompt_template)
+        try:
+            self.logger.info("Sending analysis request to Claude API")
+            self.logger.debug(f"Using model: {params['model']}, max_tokens: {params['max_tokens']}")
+            
+            response = self._create_message(params)
+            return self._response_text(response, "analysis")
+            
+        except Exception as e:
+            self.logger.error(f"Claude API request failed: {str(e)}")
+            raise Exception(f"Failed to get analysis from Claude: {str(e)}")
+    
+    async def analyze_with_context_async(self, prompt_template: str, repo_structure: str,
+                                         previous_context: Optional[str] = None,
+                                         config_overrides: Optional[dict] = None,
+                                         use_prompt_cache: Optional[bool] = None) -> str:
+        """
+        analyze_with_context on the shared async client, without blocking the event loop.
         
-        # Replace placeholders in the cleaned prompt
-        prompt = cleaned_template.replace("{repo_structure}", repo_structure)
+        Takes the same arguments and returns the same result.
+        """
+        params = self.build_message_params(prompt_template, repo_structure, previous_context,
+                                           config_overrides, use_prompt_cache)
         
-        # Add previous context if available
-        if previous_context:
-            context_section = f"\n\n## Previous Analysis Context\n\n{previous_context}\n\n"
-            prompt = prompt.replace("{previous_context}", context_section)
-        else:
-            # Remove the placeholder if no context
-            prompt = prompt.replace("{previous_context}", "")
+        try:
+            self.logger.info("Sending analysis request to Claude API")
+            self.logger.debug(f"Using model: {params['model']}, max_tokens: {params['max_tokens']}")
+            
+            response = await self._create_message_async(params)
+            return self._response_text(response, "analysis")
+            
+        except Exception as e:
+            self.logger.error(f"Claude API request failed: {str(e)}")
+            raise Exception(f"Failed to get analysis from Claude: {str(e)}")
+    
+    def update_section(self, prompt_template: str, previous_section: str, diff_summary: str,
+                       previous_context: Optional[str] = None,
+                       config_overrides: Optional[dict] = None) -> str:
+        """
+        Revise a previously generated section from the changes made since.
         
-        self.logger.debug(f"Prompt created ({len(prompt)} characters)")
-        self.logger.debug(f"Prompt preview (first 1000 chars): {prompt[:1000]}...")
+        Sends the step instructions, the previous section and a summary of the
+        commit diff instead of the full repository structure.
         
-        try:
-            # Use config overrides or defaults
-            claude_model = config_overrides.get("claude_model") or Config.CLAUDE_MODEL
-            max_tokens = config_overrides.get("max_tokens") or Config.MAX_TOKENS
+        Args:
+            prompt_template: Prompt template of the step
+            previous_section: The section generated for the earlier commit
+            diff_summary: Summary of the changes since that commit
+            previous_context: Previous analysis results to include as context
+            config_overrides: Optional dict with claude_model, max_tokens overrides
             
-            self.logger.info("Sending analysis request to Claude API")
-            self.logger.debug(f"Using model: {claude_model}, max_tokens: {max_tokens}")
+        Returns:
+            The revised section. Token usage is available in last_usage.
+        """
+        params = self.build_update_params(prompt_template, previous_section, diff_summary,
+                                          previous_context, config_overrides)
+        
+        try:
+            self.logger.info("Sending section update request to Claude API")
+            self.logger.debug(f"Using model: {params['model']}, max_tokens: {params['max_tokens']}")
             
-            response = self.client.messages.create(
-                model=claude_model,
-                max_tokens=max_tokens,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            response = self._create_message(params)
+            return self._response_text(response, "updated section")
             
-            analysis_text = response.content[0].text
-            self.logger.info(f"Received analysis from Claude ({len(analysis_text)} characters)")
-            self.logger.debug(f"Analysis preview (first 1000 chars): {analysis_text[:1000]}...")
+        except Exception as e:
+            self.logger.error(f"Claude API request failed: {str(e)}")
+            raise Exception(f"Failed to get updated section from Claude: {str(e)}")
+    
+    async def update_section_async(self, prompt_template: str, previous_section: str, diff_summary: str,
+                                   previous_context: Optional[str] = None,
+                                   config_overrides: Optional[dict] = None) -> str:
+        """
+        update_section on the shared async client, without blocking the event loop.
+        
+        Takes the same arguments and returns the same result.
+        """
+        params = self.build_update_params(prompt_template, previous_section, diff_summary,
+                                          previous_context, config_overrides)
+        
+        try:
+            self.logger.info("Sending section update request to Claude API")
+            self.logger.debug(f"Using model: {params['model']}, max_tokens: {params['max_tokens']}")
             
-            return analysis_text
+            response = await self._create_message_async(params)
+            return self._response_text(response, "updated section")
             
         except Exception as e:
             self.logger.error(f"Claude API request failed: {str(e)}")
-            raise Exception(f"Failed to get analysis from Claude: {str(e)}")
+            raise Exception(f"Failed to get updated section from Claude: {str(e)}")
+    
+    def _response_text(self, response, what: str) -> str:
+        """Log and return the text of a Messages API response."""
+        analysis_text = response.content[0].text
+        self.logger.info(f"Received {what} from Claude ({len(analysis_text)} characters)")
+        if self.last_usage:
+            self.logger.info(f"Token usage: {self.last_usage}")
+        self.logger.debug(f"Response preview (first 1000 chars): {analysis_text[:1000]}...")
+        return analysis_text
+    
+    def _create_message(self, params: dict):
+        """
+        Send a Messages API request once the shared rate limiter has room for it.
+        
+        Sets last_usage from the response and last_api_feedback from its
+        latency, retries and rate limit headers (also for a failed request).
+        """
+        rate_limiter = get_rate_limiter()
+        reservation = None
+        if rate_limiter:
+            reservation = rate_limiter.acquire(estimate_input_tokens(params), params["max_tokens"])
+        
+        self.last_usage = {}
+        self.last_api_feedback = {}
+        started = time.monotonic()
+        try:
+            raw_response = self.client.messages.with_raw_response.create(**params)
+            response = raw_response.parse()
+            self._record_response(raw_response, response, started)
+            return response
+        except APIStatusError as e:
+            self.last_api_feedback = self._extract_api_feedback(e.response.headers, started, 0)
+            raise
+        finally:
+            if reservation:
+                rate_limiter.settle(reservation, self.last_usage)
+    
+    async def _create_message_async(self, params: dict):
+        """
+        _create_message on the shared async client.
+        
+        The rate limiter may sleep and talk to SQLite or the rate limit server,
+        so it runs on a thread while the request itself is awaited.
+        """
+        rate_limiter = get_rate_limiter()
+        reservation = None
+        if rate_limiter:
+            reservation = await asyncio.to_thread(
+                rate_limiter.acquire, estimate_input_tokens(params), params["max_tokens"]
+            )
+        
+        self.last_usage = {}
+        self.last_api_feedback = {}
+        started = time.monotonic()
+        try:
+            raw_response = await self.async_client.messages.with_raw_response.create(**params)
+            response = raw_response.parse()
+            if inspect.isawaitable(response):
+                # Raw responses of newer SDK versions parse asynchronously
+                response = await response
+            self._record_response(raw_response, response, started)
+            return response
+        except APIStatusError as e:
+            self.last_api_feedback = self._extract_api_feedback(e.response.headers, started, 0)
+            raise
+        finally:
+            if reservation:
+                await asyncio.to_thread(rate_limiter.settle, reservation, self.last_usage)
+    
+    def _record_response(self, raw_response, response, started: float) -> None:
+        """Set last_usage and last_api_feedback from a successful call."""
+        self.last_usage = self._extract_usage(response)
+        self.last_api_feedback = self._extract_api_feedback(
+            raw_response.headers, started, getattr(raw_response, "retries_taken", 0)
+        )
+    
+    def _extract_api_feedback(self, headers, started: float, retries: int) -> dict:
+        """Latency, retries, retry-after and the lowest remaining rate limit capacity of a call."""
+        feedback = {
+            "latency_ms": int((time.monotonic() - started) * 1000),
+            "output_tokens": self.last_usage.get("output_tokens", 0),
+            "retries": retries if isinstance(retries, int) else 0,
+        }
+        
+        retry_after = self._header_number(headers, "retry-after")
+        if retry_after is not None:
+            feedback["retry_after_seconds"] = retry_after
+        
+        ratios = []
+        for remaining_header, limit_header in self.RATE_LIMIT_HEADERS:
+            remaining = self._header_number(headers, remaining_header)
+            limit = self._header_number(headers, limit_header)
+            if remaining is not None and limit:
+                ratios.append(remaining / limit)
+        if ratios:
+            feedback["capacity_remaining"] = round(min(ratios), 4)
+        return feedback
+    
+    @staticmethod
+    def _header_number(headers, name: str) -> Optional[float]:
+        """A numeric response header, or None when missing or not a number."""
+        try:
+            return float(headers.get(name))
+        except (AttributeError, TypeError, ValueError):
+            return None
+    
+    def build_update_params(self, prompt_template: str, previous_section: str, diff_summary: str,
+                            previous_context: Optional[str] = None,
+                            config_overrides: Optional[dict] = None) -> dict:
+        """
+        Build the Messages API parameters for an update-mode request.
+        
+        Args:
+            prompt_template: Prompt template of the step
+            previous_section: The section generated for the earlier commit
+            diff_summary: Summary of the changes since that commit
+            previous_context: Previous analysis results to include as context
+            config_overrides: Optional dict with claude_model, max_tokens overrides
+            
+        Returns:
+            Dict with model, max_tokens and messages
+        """
+        if config_overrides is None:
+            config_overrides = {}
+        
+        instructions = self.clean_prompt(prompt_template)
+        instructions = instructions.replace("{repo_structure}", self.UPDATE_STRUCTURE_REFERENCE)
+        instructions = instructions.replace("{repo_deps}", self.UPDATE_DEPS_REFERENCE)
+        instructions = self._fill_previous_context(instructions, previous_context)
+        
+        prompt = (
+            "You previously wrote the section below for this repository, following these instructions:\n\n"
+            f"<instructions>\n{instructions}\n</instructions>\n\n"
+            f"<previous_section>\n{previous_section}\n</previous_section>\n\n"
+            "The repository has changed since. These are the changes (long diffs are truncated):\n\n"
+            f"<changes>\n{diff_summary}\n</changes>\n\n"
+            "Revise the section so it describes the repository after these changes. Keep what the "
+            "changes do not affect as it is, follow the same structure and format, and reply with "
+            "the complete revised section only."
+        )
+        self.logger.debug(f"Update prompt created ({len(prompt)} characters)")
+        
+        return {
+            "model": config_overrides.get("claude_model") or Config.CLAUDE_MODEL,
+            "max_tokens": config_overrides.get("max_tokens") or Config.MAX_TOKENS,
+            "messages": [{"role": "user", "content": prompt}]
+        }
+    
+    def build_message_params(self, prompt_template: str, repo_structure: str,
+                             previous_context: Optional[str] = None,
+                             config_overrides: Optional[dict] = None,
+                             use_prompt_cache: Optional[bool] = None) -> dict:
+        """
+        Build the Messages API parameters for an analysis request.
+        
+        Shared by the synchronous call and the Message Batches submission so
+        both send exactly the same request.
+        
+        Args:
+            prompt_template: Prompt template to use
+            repo_structure: Repository structure string
+            previous_context: Previous analysis results to include as context
+            config_overrides: Optional dict with claude_model, max_tokens overrides
+            use_prompt_cache: Send repo_structure as a cached prefix block
+                (default: Config.PROMPT_CACHING_ENABLED)
+            
+        Returns:
+            Dict with model, max_tokens and messages
+        """
+        if config_overrides is None:
+            config_overrides = {}
+        if use_prompt_cache is None:
+            use_prompt_cache = Config.PROMPT_CACHING_ENABLED
+        
+        # Clean the prompt template first (remove version lines, etc.)
+        cleaned_template = self.clean_prompt(prompt_template)
+        
+        if use_prompt_cache:
+            # Repo-wide material goes first so every step shares the same cached prefix
+            prompt = self.build_cached_content(cleaned_template, repo_structure, previous_context)
+            prompt_length = sum(len(block["text"]) for block in prompt)
+        else:
+            # Replace placeholders in the cleaned prompt
+            prompt = cleaned_template.replace("{repo_structure}", repo_structure)
+            prompt = self._fill_previous_context(prompt, previous_context)
+            prompt_length = len(prompt)
+        
+        self.logger.debug(f"Prompt created ({prompt_length} characters, prompt caching: {use_prompt_cache})")
+        self.logger.debug(f"Prompt preview (first 1000 chars): {str(prompt)[:1000]}...")
+        
+        # Use config overrides or defaults
+        return {
+            "model": config_overrides.get("claude_model") or Config.CLAUDE_MODEL,
+            "max_tokens": config_overrides.get("max_tokens") or Config.MAX_TOKENS,
+            "messages": [{"role": "user", "content": prompt}]
+        }
+    
+    def build_cached_content(self, cleaned_template: str, repo_structure: str,
+                             previous_context: Optional[str] = None) -> list:
+        """
+        Build message content with the repo-wide material as a cacheable prefix.
+        
+        The repository structure (and dependencies, when they were folded into
+        it) is identical for every step of a repository, so it is sent first
+        with cache_control. The step instructions and previous-step context
+        follow it and are the only part that differs between requests.
+        
+        Args:
+            cleaned_template: Prompt template with the version line removed
+            repo_structure: Repo-wide material shared by all steps
+            previous_context: Previous analysis results to include as context
+            
+        Returns:
+            List of content blocks for a user message
+        """
+        step_prompt = cleaned_template.replace("{repo_structure}", self.REPO_STRUCTURE_REFERENCE)
+        step_prompt = self._fill_previous_context(step_prompt, previous_context)
+        
+        return [
+            {
+                "type": "text",
+                "text": f"# Repository Context\n\n{repo_structure}",
+                "cache_control": {"type": "ephemeral"}
+            },
+            {
+                "type": "text",
+                "text": step_prompt
+            }
+        ]
+    
+    def _fill_previous_context(self, prompt: str, previous_context: Optional[str]) -> str:
+        """Replace the {previous_context} placeholder."""
+        # Add previous context if available
+        if previous_context:
+            context_section = f"\n\n## Previous Analysis Context\n\n{previous_context}\n\n"
+            return prompt.replace("{previous_context}", context_section)
+        # Remove the placeholder if no context
+        return prompt.replace("{previous_context}", "")
+    
+    def _extract_usage(self, response) -> dict:
+        """Extract token counts, including prompt cache reads/writes, from a response."""
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return {}
+        
+        counts = {}
+        for field_name in self.USAGE_FIELDS:
+            value = getattr(usage, field_name, None)
+            if isinstance(value, int):
+                counts[field_name] = value
+        return counts
     
     def analyze_structure(self, repo_structure: str, prompt_template: str) -> str:
         """
@@ -0,0 +1,96 @@
+"""
+Message Batches API integration for the Claude Investigator.
+"""
+
+from anthropic import Anthropic
+from typing import Dict, List, Optional
+from .claude_analyzer import ClaudeAnalyzer
+from .config import Config
+
+
+class ClaudeBatchClient:
+    """Submits analysis requests as a Message Batch and reads back the results."""
+
+    def __init__(self, api_key: str, logger, base_url: Optional[str] = None):
+        base_url = base_url or Config.CLAUDE_BATCH_BASE_URL or None
+        self.client = Anthropic(api_key=api_key, base_url=base_url)
+        self.logger = logger
+
+    def submit(self, requests: List[dict]) -> str:
+        """
+        Create a message batch.
+
+        Args:
+            requests: List of {"custom_id": ..., "params": {model, max_tokens, messages}}
+
+        Returns:
+            The message batch ID
+        """
+        self.logger.info(f"Submitting message batch with {len(requests)} requests")
+        batch = self.client.messages.batches.create(requests=requests)
+        self.logger.info(f"Created message batch {batch.id} ({batch.processing_status})")
+        return batch.id
+
+    def get_status(self, batch_id: str) -> dict:
+        """
+        Get the processing status of a message batch.
+
+        Returns:
+            Dict with processing_status ("in_progress", "canceling" or "ended")
+            and request_counts
+        """
+        batch = self.client.messages.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        return {
+            "processing_status": batch.processing_status,
+            "request_counts": {
+                "processing": counts.processing,
+                "succeeded": counts.succeeded,
+                "errored": counts.errored,
+                "canceled": counts.canceled,
+                "expired": counts.expired,
+            }
+        }
+
+    def get_results(self, batch_id: str) -> Dict[str, dict]:
+        """
+        Read the results of an ended message batch.
+
+        Returns:
+            Mapping of custom_id to {"status": "succeeded", "text": ..., "usage": {...}}
+            or {"status": "errored"|"canceled"|"expired", "error": ...}
+        """
+        results = {}
+        for entry in self.client.messages.batches.results(batch_id):
+            result = entry.result
+            if result.type == "succeeded":
+                message = result.message
+                text = "".join(block.text for block in message.content if block.type == "text")
+                results[entry.custom_id] = {
+                    "status": "succeeded",
+                    "text": text,
+                    "usage": self._usage_to_dict(message.usage),
+                }
+            elif result.type == "errored":
+                error = getattr(result.error, "error", None)
+                results[entry.custom_id] = {
+                    "status": "errored",
+                    "error": getattr(error, "message", None) or str(result.error),
+                }
+            else:
+                results[entry.custom_id] = {
+                    "status": result.type,
+                    "error": f"Batch request {result.type}",
+                }
+
+        self.logger.info(f"Read {len(results)} results from message batch {batch_id}")
+        return results
+
+    def _usage_to_dict(self, usage) -> dict:
+        """Convert a usage object to a dict of token counts."""
+        counts = {}
+        for field_name in ClaudeAnalyzer.USAGE_FIELDS:
+            value = getattr(usage, field_name, None)
+            if isinstance(value, int):
+                counts[field_name] = value
+        return counts
@@ -12,6 +12,59 @@ class Config:
     CLAUDE_MODEL = "claude-opus-4-5-20251101"
     MAX_TOKENS = 6000
     
+    # Prompt caching - send the repo-wide structure/dependencies as a shared, cacheable prefix
+    PROMPT_CACHING_ENABLED = os.getenv("CLAUDE_PROMPT_CACHING", "false").lower() == "true"
+    
+    # Update mode - a step affected by new commits revises its previous section from the
+    # commit diff instead of re-reading the whole repository; larger diffs fall back to full analysis
+    UPDATE_MODE_ENABLED = os.getenv("CLAUDE_UPDATE_MODE", "false").lower() == "true"
+    UPDATE_MODE_MAX_DIFF_TOKENS = int(os.getenv("UPDATE_MODE_MAX_DIFF_TOKENS", "20000"))
+    UPDATE_MODE_MAX_FILE_LINES = int(os.getenv("UPDATE_MODE_MAX_FILE_LINES", "80"))  # diff lines kept per file
+    
+    # Message Batches mode - seconds between batch status polls, and an optional
+    # API base URL (e.g. the local stand-in server for offline runs)
+    CLAUDE_BATCH_POLL_SECONDS = int(os.getenv("CLAUDE_BATCH_POLL_SECONDS", "60"))
+    CLAUDE_BATCH_BASE_URL = os.getenv("CLAUDE_BATCH_BASE_URL", "")
+    
+    # Shared rate limiter for Claude requests - requests, input tokens and output tokens
+    # per minute (0 = no limit), used at HEADROOM times the org limits. The buckets are
+    # held in this process (memory), a SQLite file shared by one host's workers (sqlite)
+    # or the rate limit server shared by several hosts (http, see rate_limiter.py)
+    CLAUDE_RATE_LIMIT_RPM = int(os.getenv("CLAUDE_RATE_LIMIT_RPM", "0"))
+    CLAUDE_RATE_LIMIT_ITPM = int(os.getenv("CLAUDE_RATE_LIMIT_ITPM", "0"))
+    CLAUDE_RATE_LIMIT_OTPM = int(os.getenv("CLAUDE_RATE_LIMIT_OTPM", "0"))
+    CLAUDE_RATE_LIMIT_HEADROOM = float(os.getenv("CLAUDE_RATE_LIMIT_HEADROOM", "0.9"))
+    CLAUDE_RATE_LIMIT_BACKEND = os.getenv("CLAUDE_RATE_LIMIT_BACKEND", "memory")
+    CLAUDE_RATE_LIMIT_SQLITE_PATH = os.getenv("CLAUDE_RATE_LIMIT_SQLITE_PATH", "")  # empty means temp/
+    CLAUDE_RATE_LIMIT_URL = os.getenv("CLAUDE_RATE_LIMIT_URL", "")
+
+    # The worker's shared AsyncAnthropic client (see activities/claude_client.py) - pooled
+    # keep-alive connections and timeouts; the connect timeout is short, the read timeout
+    # leaves room for long generations
+    CLAUDE_MAX_CONNECTIONS = int(os.getenv("CLAUDE_MAX_CONNECTIONS", "32"))
+    CLAUDE_KEEPALIVE_CONNECTIONS = int(os.getenv("CLAUDE_KEEPALIVE_CONNECTIONS", "16"))
+    CLAUDE_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("CLAUDE_KEEPALIVE_EXPIRY_SECONDS", "60"))
+    CLAUDE_CONNECT_TIMEOUT_SECONDS = float(os.getenv("CLAUDE_CONNECT_TIMEOUT_SECONDS", "10"))
+    CLAUDE_TIMEOUT_SECONDS = float(os.getenv("CLAUDE_TIMEOUT_SECONDS", "600"))
+
+    # Worker thread pools for blocking activity work (see activities/executors.py)
+    ACTIVITY_IO_WORKERS = int(os.getenv("ACTIVITY_IO_WORKERS", "16"))  # git, subprocess, filesystem, DynamoDB
+    ACTIVITY_LLM_WORKERS = int(os.getenv("ACTIVITY_LLM_WORKERS", "8"))  # Claude API calls
+    
+    # Serve clone-bound activities on a worker-specific task queue too, so one
+    # investigation's clone, structure, dependency and cleanup activities run on
+    # the worker holding the clone (see activities/worker_session.py); always on with STAGE_POOLS
+    WORKER_STICKY_QUEUE = os.getenv("WORKER_STICKY_QUEUE", "true").lower() == "true"
+    
+    # Stage pools: cloning, clone-bound file work (structure, dependencies), Claude
+    # analysis and hub/metadata persistence each get their own task queue and
+    # activity slots per worker, so slow Claude calls never hold up the next clones
+    STAGE_POOLS_ENABLED = os.getenv("STAGE_POOLS", "true").lower() == "true"
+    CLONE_STAGE_CONCURRENCY = int(os.getenv("CLONE_STAGE_CONCURRENCY", "2"))
+    FILES_STAGE_CONCURRENCY = int(os.getenv("FILES_STAGE_CONCURRENCY", "4"))
+    LLM_STAGE_CONCURRENCY = int(os.getenv("LLM_STAGE_CONCURRENCY", str(ACTIVITY_LLM_WORKERS)))
+    HUB_STAGE_CONCURRENCY = int(os.getenv("HUB_STAGE_CONCURRENCY", "2"))
+    
     # Valid Claude model names for validation (4.x models only)
     # See: https://platform.claude.com/docs/en/about-claude/models/overview
     VALID_CLAUDE_MODELS = [
@@ -36,10 +89,20 @@ class Config:
     TEMP_DIR = "temp"
     PROMPTS_DIR = "prompts"
     
-    # Repository structure icons
+    # Repository structure icons (tree format)
     DIR_ICON = "📁"
     FILE_ICON = "📄"
     
+    # Repository structure encoding sent to every analysis step: "tree" (icons, one line
+    # per entry) or "compact" (no icons, collapsed directory chains, files grouped by extension)
+    REPO_STRUCTURE_FORMAT = os.getenv("REPO_STRUCTURE_FORMAT", "tree").lower()
+    STRUCTURE_GROUP_MIN_FILES = int(os.getenv("STRUCTURE_GROUP_MIN_FILES", "20"))  # compact: group larger dirs
+    
+    # Approximate token budget for the repository structure; 0 uses the fixed depth limit.
+    # With a budget, each directory is expanded or shown as a file count to fit it.
+    STRUCTURE_TOKEN_BUDGET = int(os.getenv("STRUCTURE_TOKEN_BUDGET", "0"))
+    STRUCTURE_BUDGET_MAX_DEPTH = int(os.getenv("STRUCTURE_BUDGET_MAX_DEPTH", "12"))  # deeper dirs are only counted
+    
     # Size units for human-readable format
     SIZE_UNITS = ['B', 'KB', 'MB', 'GB', 'TB']
     
@@ -58,6 +121,18 @@ class Config:
     GIT_USER_NAME = os.getenv("GIT_USER_NAME", "Architecture Bot")
     GIT_USER_EMAIL = os.getenv("GIT_USER_EMAIL", "architecture-bot@your-org.com")
     
+    # Git mirror cache - persistent bare mirrors reused across investigations on a worker
+    GIT_MIRROR_CACHE_ENABLED = os.getenv("GIT_MIRROR_CACHE_ENABLED", "true").lower() == "true"
+    GIT_MIRROR_DIR = os.getenv("GIT_MIRROR_DIR", "")  # Empty string means <src>/temp/mirrors
+    # Mirror upkeep - git gc every GC_HOURS, and above MAX_GB the least recently used mirrors
+    # idle for MIN_IDLE_HOURS (longer than any investigation using them) are removed (0 = off)
+    GIT_MIRROR_GC_HOURS = float(os.getenv("GIT_MIRROR_GC_HOURS", "24"))
+    GIT_MIRROR_MAX_GB = float(os.getenv("GIT_MIRROR_MAX_GB", "50"))
+    GIT_MIRROR_MIN_IDLE_HOURS = float(os.getenv("GIT_MIRROR_MIN_IDLE_HOURS", "6"))
+    
+    # Tree-only mode - read structure and manifests from git objects on a no-checkout clone
+    GIT_TREE_ONLY = os.getenv("GIT_TREE_ONLY", "false").lower() == "true"
+    
     @staticmethod
     def get_arch_hub_repo_url() -> str:
         """Get the full repository URL for the architecture hub."""
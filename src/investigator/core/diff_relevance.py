@@ -0,0 +1,132 @@
+"""
+Decide which analysis steps a commit range can affect.
+
+Steps in prompts.json may declare the paths they care about:
+
+    {"name": "deployment", "file": "...", "paths": ["Dockerfile*", ".github/**"]}
+
+A step with `paths` re-runs only when a changed path matches one of them; a
+step without `paths` re-runs on any relevant change. Paths matching the
+config's `diff_ignore_paths` (tests, docs) are never relevant, so commits that
+only touch them re-run nothing.
+
+Patterns are globs on repository-relative paths. A pattern without a slash
+matches the file name in any directory, and a leading `**/` also matches at
+the repository root.
+
+summarize_diff condenses a patch for update mode, where an affected step
+revises its previous section from the changes instead of re-reading the
+whole repository.
+"""
+
+import fnmatch
+from typing import Iterable, List, Optional, Set
+
+# Rough characters per token, for budgeting diff summaries
+CHARS_PER_TOKEN = 4
+
+
+def path_matches(path: str, pattern: str) -> bool:
+    """Check whether a repository-relative path matches a relevance pattern."""
+    if '/' not in pattern:
+        return fnmatch.fnmatchcase(path.rsplit('/', 1)[-1], pattern)
+    if fnmatch.fnmatchcase(path, pattern):
+        return True
+    return pattern.startswith('**/') and fnmatch.fnmatchcase(path, pattern[3:])
+
+
+def matches_any(path: str, patterns: Iterable[str]) -> bool:
+    """Check whether a path matches any of the patterns."""
+    return any(path_matches(path, pattern) for pattern in patterns)
+
+
+def relevant_changed_paths(changed_paths: Iterable[str], ignore_patterns: Optional[Iterable[str]]) -> List[str]:
+    """Drop the changed paths no step cares about (tests, docs)."""
+    ignore_patterns = list(ignore_patterns or [])
+    return [path for path in changed_paths if not matches_any(path, ignore_patterns)]
+
+
+def steps_affected_by_diff(processing_order: list, changed_paths: Iterable[str],
+                           ignore_patterns: Optional[Iterable[str]] = None) -> Set[str]:
+    """
+    Names of the steps whose path rules match the changed paths.
+
+    Args:
+        processing_order: Steps from the prompts configuration
+        changed_paths: Paths changed between the two commits
+        ignore_patterns: Patterns of paths that never affect any step
+
+    Returns:
+        Set of step names that need to re-run
+    """
+    relevant = relevant_changed_paths(changed_paths, ignore_patterns)
+    affected = set()
+    if not relevant:
+        return affected
+
+    for step in processing_order:
+        step_name = step.get("name", "unknown")
+        step_paths = step.get("paths")
+        if not step_paths:
+            affected.add(step_name)
+        elif any(matches_any(path, step_paths) for path in relevant):
+            affected.add(step_name)
+    return affected
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a text."""
+    return len(text) // CHARS_PER_TOKEN
+
+
+def summarize_diff(patch: str, ignore_patterns: Optional[Iterable[str]] = None,
+                   max_file_lines: int = 80) -> str:
+    """
+    Condense a unified diff: a list of changed files, then each file's hunks
+    truncated to max_file_lines lines. Files matching ignore_patterns are left out.
+
+    Args:
+        patch: Output of git diff
+        ignore_patterns: Patterns of paths that never affect any step
+        max_file_lines: Diff lines kept per file
+
+    Returns:
+        The summary text (empty when no relevant file changed)
+    """
+    ignore_patterns = list(ignore_patterns or [])
+    files = []  # (path, added, removed, lines)
+    current = None
+    in_hunks = False
+    for line in patch.splitlines():
+        if line.startswith('diff --git '):
+            path = line.split(' b/', 1)[-1]
+            current = [path, 0, 0, []]
+            files.append(current)
+            in_hunks = False
+            continue
+        if current is None:
+            continue
+        if not in_hunks:
+            # Skip the file header (index, mode and ---/+++ lines) up to the first hunk
+            if line.startswith('@@'):
+                in_hunks = True
+            elif not line.startswith('Binary files'):
+                continue
+        elif line.startswith('+'):
+            current[1] += 1
+        elif line.startswith('-'):
+            current[2] += 1
+        current[3].append(line)
+
+    files = [f for f in files if not matches_any(f[0], ignore_patterns)]
+    if not files:
+        return ""
+
+    summary = [f"Changed files ({len(files)}):"]
+    summary.extend(f"- {path} (+{added} -{removed})" for path, added, removed, _ in files)
+    for path, _, _, lines in files:
+        summary.append(f"\n### {path}")
+        summary.extend(lines[:max_file_lines])
+        if len(lines) > max_file_lines:
+            summary.append(f"... ({len(lines) - max_file_lines} more diff lines)")
+    return "\n".join(summary)
@@ -46,7 +46,10 @@ class FileManager:
                         processing_order.append(prompt)
                     self.logger.debug(f"Added {len(config['additional_prompts'])} domain-specific prompts")
                 
-                return {"processing_order": processing_order}
+                return {
+                    "processing_order": processing_order,
+                    "diff_ignore_paths": config.get("diff_ignore_paths", base_config.get("diff_ignore_paths", []))
+                }
             else:
                 # No inheritance, return config as-is
                 return config
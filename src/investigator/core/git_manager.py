@@ -2,10 +2,16 @@
 Git repository management for the Claude Investigator.
 """
 
+import functools
 import os
 import shutil
 import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
 from urllib.parse import urlparse, urlunparse
+from .config import Config
 from .utils import Utils
 
 
@@ -77,7 +83,377 @@ class GitRepositoryManager:
             return self._update_repository(target_dir, auth_repo_location)
         else:
             return self._clone_repository(auth_repo_location, target_dir)
-    
+
+    def get_remote_head(self, repo_location: str, timeout: int = 60) -> dict:
+        """
+        Resolve the default branch and its commit SHA on the remote without cloning.
+
+        Uses `git ls-remote --symref <url> HEAD`, which only transfers the ref
+        advertisement, so it is cheap enough to run before every clone.
+
+        Args:
+            repo_location: URL or path to the repository
+            timeout: Maximum seconds to wait for the remote
+
+        Returns:
+            Dictionary with commit_sha and branch_name
+        """
+        auth_repo_location = self._add_authentication(repo_location)
+        safe_url = self._sanitize_url_for_logging(repo_location)
+        self.logger.debug(f"Resolving remote HEAD for: {safe_url}")
+
+        try:
+            result = subprocess.run(
+                ['git', 'ls-remote', '--symref', auth_repo_location, 'HEAD'],
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+                check=True,
+                env={**os.environ, 'GIT_TERMINAL_PROMPT': '0'}
+            )
+        except subprocess.CalledProcessError as e:
+            # Clean up error message to not expose token
+            error_msg = e.stderr or str(e)
+            if self.github_token and self.github_token in error_msg:
+                error_msg = error_msg.replace(self.github_token, '***HIDDEN***')
+            raise Exception(f"git ls-remote failed: {error_msg.strip()}")
+        except subprocess.TimeoutExpired:
+            raise Exception(f"git ls-remote timed out after {timeout} seconds")
+
+        commit_sha = None
+        branch_name = None
+        for line in result.stdout.splitlines():
+            ref, _, name = line.partition('\t')
+            if name != 'HEAD':
+                continue
+            if ref.startswith('ref: '):
+                # Symbolic ref line, e.g. "ref: refs/heads/main\tHEAD"
+                branch_name = ref[len('ref: '):].replace('refs/heads/', '', 1)
+            else:
+                commit_sha = ref.strip()
+
+        if not commit_sha:
+            raise Exception(f"Remote HEAD not found for {safe_url}")
+
+        return {
+            "commit_sha": commit_sha,
+            "branch_name": branch_name
+        }
+
+    def clone_from_mirror(self, repo_location: str, target_dir: str, mirror_root: str, no_checkout: bool = False,
+                          cancel_event: Optional[threading.Event] = None) -> str:
+        """
+        Check out a repository through a persistent, worker-local bare mirror.
+
+        The first call creates an empty bare repository; every call then fetches
+        only branches and tags into it (not the refs/pull/* and other hidden refs
+        a `git clone --mirror` would bring along), incrementally after the first.
+        The working copy is then a local `git clone --shared` of the mirror, which
+        borrows its objects instead of copying them, so it takes seconds even for
+        large monorepos. A file lock per mirror stops concurrent investigations on
+        this worker from fetching into the same mirror at once.
+
+        Mirrors are garbage collected every GIT_MIRROR_GC_HOURS in the background,
+        and when the mirrors take more than GIT_MIRROR_MAX_GB the least recently
+        used idle ones are removed.
+
+        Args:
+            repo_location: URL or path to the repository
+            target_dir: Directory for the working copy
+            mirror_root: Directory holding the bare mirrors
+            no_checkout: If True, don't write the working tree (tree-only mode)
+            cancel_event: When set, the running git command is killed, so a cancelled
+                activity does not keep fetching while holding the mirror lock
+
+        Returns:
+            Path to the repository working copy
+        """
+        run_git = functools.partial(self._run_git_command, cancel_event=cancel_event)
+        auth_repo_location = self._add_authentication(repo_location)
+        mirror_dir = self._get_mirror_path(repo_location, mirror_root)
+        os.makedirs(mirror_root, exist_ok=True)
+
+        with self._mirror_lock(mirror_dir):
+            if cancel_event is not None and cancel_event.is_set():
+                raise Exception("git mirror checkout cancelled")
+            if os.path.isdir(os.path.join(mirror_dir, 'objects')):
+                self.logger.info(f"Updating git mirror: {mirror_dir}")
+            else:
+                self.logger.info(f"Creating git mirror: {mirror_dir}")
+                if os.path.exists(mirror_dir):
+                    shutil.rmtree(mirror_dir)
+                run_git(['git', 'init', '--bare', '--quiet', mirror_dir])
+
+            # Fetch with the authenticated URL so the token is never written to the mirror config
+            run_git([
+                'git', '--git-dir', mirror_dir, 'fetch', '--prune', '--no-auto-gc',
+                auth_repo_location, '+refs/heads/*:refs/heads/*', '+refs/tags/*:refs/tags/*'
+            ])
+            # Follow default branch changes on the remote
+            remote_head = self.get_remote_head(repo_location)
+            if remote_head.get('branch_name'):
+                run_git([
+                    'git', '--git-dir', mirror_dir, 'symbolic-ref', 'HEAD',
+                    f"refs/heads/{remote_head['branch_name']}"
+                ])
+
+            # Clone while holding the lock so a concurrent fetch cannot move refs mid-checkout
+            self._ensure_clean_directory(target_dir)
+            clone_cmd = ['git', 'clone', '--shared', '--quiet']
+            if no_checkout:
+                clone_cmd.append('--no-checkout')
+            run_git(clone_cmd + [mirror_dir, target_dir])
+
+        self._gc_mirror_if_due(mirror_dir)
+        run_git(['git', '-C', target_dir, 'remote', 'set-url', 'origin', repo_location])
+        self.logger.info(f"Repository checked out from mirror to: {target_dir}")
+        self._evict_mirrors(mirror_root, keep=mirror_dir)
+        return target_dir
+
+    def _gc_mirror_if_due(self, mirror_dir: str) -> None:
+        """Start `git gc` on a mirror once GIT_MIRROR_GC_HOURS passed since the last one.
+
+        The gc runs on a background thread without the mirror lock, so neither
+        this checkout nor concurrent ones on the same mirror wait for it (fetches
+        run with --no-auto-gc for the same reason). git gc is safe alongside
+        fetches and clones and skips a mirror another gc is running on, and plain
+        `git gc` keeps recently unreachable objects, so working copies sharing
+        the mirror's objects stay intact.
+        """
+        if Config.GIT_MIRROR_GC_HOURS <= 0:
+            return
+        stamp = f"{mirror_dir}.gc"
+        if os.path.exists(stamp) and time.time() - os.path.getmtime(stamp) < Config.GIT_MIRROR_GC_HOURS * 3600:
+            return
+        if not os.path.exists(stamp):
+            # A new mirror is packed by its first fetch; start its gc interval now
+            open(stamp, 'w').close()
+            return
+        # Claim the interval before starting, so the next checkout does not start another gc
+        os.utime(stamp)
+        threading.Thread(
+            target=self._gc_mirror, args=(mirror_dir,), name=f"git-gc-{os.path.basename(mirror_dir)}", daemon=True
+        ).start()
+
+    def _gc_mirror(self, mirror_dir: str) -> None:
+        """Run `git gc` on a mirror (see _gc_mirror_if_due)."""
+        self.logger.info(f"🧹 Garbage collecting git mirror: {mirror_dir}")
+        try:
+            self._run_git_command(['git', '--git-dir', mirror_dir, 'gc', '--quiet'])
+        except Exception as e:
+            self.logger.warning(f"git gc failed for {mirror_dir}: {e}")
+
+    def _evict_mirrors(self, mirror_root: str, keep: str) -> None:
+        """Remove least recently used mirrors while the mirrors take more than GIT_MIRROR_MAX_GB.
+
+        Only mirrors unused for GIT_MIRROR_MIN_IDLE_HOURS - longer than any
+        investigation, whose working copy may borrow the mirror's objects - and
+        not locked right now are removed.
+        """
+        if Config.GIT_MIRROR_MAX_GB <= 0:
+            return
+        max_bytes = Config.GIT_MIRROR_MAX_GB * 1024 ** 3
+        mirrors = []
+        for name in os.listdir(mirror_root):
+            path = os.path.join(mirror_root, name)
+            if name.endswith('.git') and os.path.isdir(path):
+                last_used = os.path.getmtime(f"{path}.lock") if os.path.exists(f"{path}.lock") else 0
+                mirrors.append((last_used, path, self._directory_size(path)))
+
+        total = sum(size for _, _, size in mirrors)
+        idle_before = time.time() - Config.GIT_MIRROR_MIN_IDLE_HOURS * 3600
+        for last_used, path, size in sorted(mirrors):
+            if total <= max_bytes:
+                break
+            if path == keep or last_used > idle_before:
+                continue
+            with self._mirror_lock(path, blocking=False) as locked:
+                if not locked:
+                    continue
+                self.logger.info(f"🗑️  Removing least recently used git mirror ({size / 1024 ** 2:.0f} MB): {path}")
+                shutil.rmtree(path, ignore_errors=True)
+                for suffix in ('.gc', '.lock'):
+                    if os.path.exists(f"{path}{suffix}"):
+                        os.remove(f"{path}{suffix}")
+            total -= size
+
+    @staticmethod
+    def _directory_size(path: str) -> int:
+        """Total size in bytes of the files under path."""
+        total = 0
+        for root, _, files in os.walk(path):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass
+        return total
+
+    def partial_clone(self, repo_location: str, target_dir: str) -> str:
+        """
+        Clone only commits and trees, without blobs or a working tree.
+
+        Uses `git clone --filter=blob:none --no-checkout`. File contents are
+        fetched lazily when read through GitTreeReader.read_blobs.
+
+        Args:
+            repo_location: URL or path to the repository
+            target_dir: Directory to clone into
+
+        Returns:
+            Path to the cloned repository
+        """
+        auth_repo_location = self._add_authentication(repo_location)
+        self._ensure_clean_directory(target_dir)
+
+        safe_url = self._sanitize_url_for_logging(repo_location)
+        self.logger.info(f"Partial cloning repository (no blobs, no checkout) from: {safe_url}")
+        self._run_git_command([
+            'git', 'clone', '--filter=blob:none', '--no-checkout', '--quiet',
+            auth_repo_location, target_dir
+        ])
+        self.logger.info(f"Repository successfully partial cloned to: {target_dir}")
+        return target_dir
+
+    def get_changed_paths(self, repo_dir: str, base_commit: str, head_commit: str = 'HEAD') -> list:
+        """
+        List the paths changed between two commits of a local repository.
+
+        Uses `git diff --name-only --no-renames`, so a renamed file shows up
+        under both its old and new path. Only trees are compared, which works
+        for partial (blob-less) clones too. When the base commit is missing
+        from a shallow clone it is fetched with depth 1 first.
+
+        Args:
+            repo_dir: Local repository (working copy or clone)
+            base_commit: The earlier commit, e.g. the last investigated one
+            head_commit: The later commit
+
+        Returns:
+            List of repository-relative paths
+        """
+        try:
+            self._run_git_command(['git', '-C', repo_dir, 'cat-file', '-e', f"{base_commit}^{{commit}}"], timeout=60)
+        except Exception:
+            self.logger.info(f"Fetching base commit {base_commit[:8]} for diff")
+            origin_url = self._run_git_command(['git', '-C', repo_dir, 'remote', 'get-url', 'origin'], timeout=60).strip()
+            self._run_git_command([
+                'git', '-C', repo_dir, 'fetch', '--depth=1', '--quiet', '--no-tags',
+                self._add_authentication(origin_url), base_commit
+            ], timeout=600)
+
+        output = self._run_git_command([
+            'git', '-C', repo_dir, 'diff', '--name-only', '--no-renames', base_commit, head_commit
+        ])
+        return [line for line in output.splitlines() if line]
+
+    def get_diff(self, repo_dir: str, base_commit: str, head_commit: str = 'HEAD') -> str:
+        """
+        Get the unified diff between two commits (call get_changed_paths first
+        so the base commit is available).
+
+        Args:
+            repo_dir: Local repository (working copy or clone)
+            base_commit: The earlier commit
+            head_commit: The later commit
+
+        Returns:
+            The patch text
+        """
+        return self._run_git_command([
+            'git', '-C', repo_dir, 'diff', '--no-color', '--no-renames', '--no-ext-diff',
+            base_commit, head_commit
+        ])
+
+    def _get_mirror_path(self, repo_location: str, mirror_root: str) -> str:
+        """Get the mirror directory for a repository, unique per URL."""
+        import hashlib
+
+        # Strip credentials so the same repository always maps to the same mirror
+        parsed = urlparse(repo_location)
+        if parsed.username or parsed.password:
+            repo_location = urlunparse(parsed._replace(netloc=parsed.hostname or ''))
+        url_hash = hashlib.sha1(repo_location.rstrip('/').encode('utf-8')).hexdigest()[:12]
+        return os.path.join(mirror_root, f"{Utils.extract_repo_name(repo_location)}_{url_hash}.git")
+
+    @contextmanager
+    def _mirror_lock(self, mirror_dir: str, blocking: bool = True):
+        """Hold an exclusive file lock for a mirror directory.
+
+        The lock file's mtime records when the mirror was last used. With
+        blocking=False, yields False instead of waiting when the lock is held
+        (and leaves the last use alone).
+        """
+        lock_path = f"{mirror_dir}.lock"
+        with open(lock_path, 'a') as lock_file:
+            try:
+                import fcntl
+            except ImportError:
+                # File locking is unavailable (e.g. Windows) - run without it
+                fcntl = None
+
+            if fcntl:
+                self.logger.debug(f"Waiting for mirror lock: {lock_path}")
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    yield False
+                    return
+            if blocking:
+                os.utime(lock_path)
+            try:
+                yield True
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _run_git_command(self, cmd: list, timeout: int = 1800,
+                         cancel_event: Optional[threading.Event] = None) -> str:
+        """Run a git command, hiding the GitHub token from any error message.
+
+        With cancel_event, the command is killed as soon as the event is set.
+        """
+        env = {**os.environ, 'GIT_TERMINAL_PROMPT': '0'}
+        try:
+            if cancel_event is not None:
+                return self._run_cancellable(cmd, timeout, env, cancel_event)
+            result = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+                check=True,
+                env=env
+            )
+            return result.stdout
+        except subprocess.CalledProcessError as e:
+            error_msg = e.stderr or str(e)
+            if self.github_token and self.github_token in error_msg:
+                error_msg = error_msg.replace(self.github_token, '***HIDDEN***')
+            raise Exception(f"Git command failed: {error_msg.strip()}")
+        except subprocess.TimeoutExpired:
+            raise Exception(f"git command timed out after {timeout} seconds")
+
+    @staticmethod
+    def _run_cancellable(cmd: list, timeout: int, env: dict, cancel_event: threading.Event) -> str:
+        """subprocess.run(check=True) that also kills the command once cancel_event is set."""
+        deadline = time.monotonic() + timeout
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=env) as process:
+            while True:
+                try:
+                    stdout, stderr = process.communicate(timeout=0.5)
+                    break
+                except subprocess.TimeoutExpired:
+                    if cancel_event.is_set() or time.monotonic() > deadline:
+                        process.kill()
+                        process.communicate()
+                        if cancel_event.is_set():
+                            raise Exception("git command cancelled")
+                        raise subprocess.TimeoutExpired(cmd, timeout)
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, cmd, stdout, stderr)
+        return stdout
+
     def _add_authentication(self, repo_location: str) -> str:
         """
         Add GitHub token authentication to repository URL if available.
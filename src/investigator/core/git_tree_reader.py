@@ -0,0 +1,129 @@
+"""
+Read repository trees and file contents straight from git objects.
+
+This lets the investigator work on a partial clone (`--filter=blob:none
+--no-checkout`) without ever writing the working tree to disk.
+"""
+
+import os
+import subprocess
+from typing import Dict, Iterator, List, Tuple
+
+
+class GitTreeReader:
+    """Reads the file tree and blobs of a commit using git plumbing commands."""
+
+    def __init__(self, logger):
+        self.logger = logger
+
+    def list_files(self, repo_path: str, rev: str = "HEAD") -> Dict[str, str]:
+        """
+        List every file in a commit using `git ls-tree -r`.
+
+        Args:
+            repo_path: Path to the git repository (a checkout is not required)
+            rev: Commit to read (default: HEAD)
+
+        Returns:
+            Mapping of repository-relative POSIX paths to blob object IDs
+        """
+        output = self._run_git(repo_path, ['ls-tree', '-r', '-z', '--full-tree', rev])
+
+        files = {}
+        for entry in output.split(b'\0'):
+            if not entry:
+                continue
+            meta, _, path = entry.partition(b'\t')
+            _mode, object_type, object_id = meta.split(b' ')
+            # Submodules show up as "commit" entries - they have no content here
+            if object_type != b'blob':
+                continue
+            files[path.decode('utf-8', errors='surrogateescape')] = object_id.decode('ascii')
+
+        self.logger.debug(f"Listed {len(files)} files from {rev} in {repo_path}")
+        return files
+
+    def walk(self, repo_path: str, rev: str = "HEAD") -> Iterator[Tuple[str, List[str], List[str]]]:
+        """
+        Walk a commit's tree top-down, like os.walk over a checkout.
+
+        Yields (relative_dir, dirs, files) tuples where relative_dir is '' for
+        the repository root. As with os.walk, callers may prune the traversal
+        by modifying dirs in place.
+
+        Args:
+            repo_path: Path to the git repository (a checkout is not required)
+            rev: Commit to read (default: HEAD)
+        """
+        tree = {}
+        for path in self.list_files(repo_path, rev):
+            node = tree
+            *parents, file_name = path.split('/')
+            for parent in parents:
+                node = node.setdefault(parent, {})
+            node.setdefault(None, []).append(file_name)
+
+        yield from self._walk_tree(tree, '')
+
+    def _walk_tree(self, node: dict, rel_dir: str) -> Iterator[Tuple[str, List[str], List[str]]]:
+        """Yield a directory node and then recurse into the subdirectories left in dirs."""
+        dirs = sorted(name for name in node if name is not None)
+        files = list(node.get(None, []))
+        yield rel_dir, dirs, files
+
+        for dir_name in dirs:
+            yield from self._walk_tree(node[dir_name], f"{rel_dir}/{dir_name}" if rel_dir else dir_name)
+
+    def read_blobs(self, repo_path: str, object_ids: List[str]) -> Dict[str, bytes]:
+        """
+        Read several blobs in a single `git cat-file --batch` call.
+
+        In a partial clone git fetches any missing blob from the promisor
+        remote on demand, so only the requested files are ever downloaded.
+
+        Args:
+            repo_path: Path to the git repository
+            object_ids: Blob object IDs to read
+
+        Returns:
+            Mapping of object ID to raw blob content (missing objects are omitted)
+        """
+        unique_ids = list(dict.fromkeys(object_ids))
+        if not unique_ids:
+            return {}
+
+        output = self._run_git(repo_path, ['cat-file', '--batch'], input_data=''.join(f"{oid}\n" for oid in unique_ids).encode('ascii'))
+
+        blobs = {}
+        offset = 0
+        for _ in unique_ids:
+            header_end = output.index(b'\n', offset)
+            header = output[offset:header_end].split(b' ')
+            offset = header_end + 1
+            if len(header) < 3 or header[1] == b'missing':
+                self.logger.warning(f"Git object missing: {header[0].decode('ascii', errors='replace')}")
+                continue
+            size = int(header[2])
+            blobs[header[0].decode('ascii')] = output[offset:offset + size]
+            # Content is followed by a newline
+            offset += size + 1
+
+        return blobs
+
+    def _run_git(self, repo_path: str, args: List[str], input_data: bytes = None) -> bytes:
+        """Run a git command in the repository and return its raw stdout."""
+        try:
+            result = subprocess.run(
+                ['git', '-C', repo_path, *args],
+                input=input_data,
+                capture_output=True,
+                timeout=600,
+                check=True,
+                env={**os.environ, 'GIT_TERMINAL_PROMPT': '0'}
+            )
+            return result.stdout
+        except subprocess.CalledProcessError as e:
+            error_msg = e.stderr.decode('utf-8', errors='replace').strip()
+            raise Exception(f"git {args[0]} failed: {error_msg}")
+        except subprocess.TimeoutExpired:
+            raise Exception(f"git {args[0]} timed out after 10 minutes")
@@ -0,0 +1,223 @@
+"""
+Local stand-in for the Anthropic Message Batches API.
+
+Implements the create, retrieve and results endpoints closely enough for the
+Anthropic SDK, so batch mode can be exercised offline. Point the investigator
+at it with CLAUDE_BATCH_BASE_URL:
+
+    python -m investigator.core.local_batch_server --port 8765
+    CLAUDE_BATCH_BASE_URL=http://127.0.0.1:8765
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+
+
+def default_responder(custom_id: str, params: dict) -> str:
+    """Return a canned analysis text for a batch request."""
+    return f"Local batch stand-in analysis for {custom_id} (model: {params.get('model')})"
+
+
+class LocalBatchServer:
+    """In-process HTTP server that answers Message Batches API calls."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 responder: Optional[Callable[[str, dict], str]] = None,
+                 processing_seconds: float = 0.0):
+        """
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            responder: Callable (custom_id, params) -> response text. Raising
+                an exception turns that request into an errored result.
+            processing_seconds: How long a batch stays in_progress after creation
+        """
+        self.responder = responder or default_responder
+        self.processing_seconds = processing_seconds
+        self.batches: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "LocalBatchServer":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Shut the server down."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "LocalBatchServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def create_batch(self, requests: list) -> dict:
+        """Record a new batch and compute its results up front."""
+        batch_id = f"msgbatch_local_{uuid.uuid4().hex[:24]}"
+        results = [self._run_request(request) for request in requests]
+        with self._lock:
+            self.batches[batch_id] = {
+                "created": time.monotonic(),
+                "created_at": datetime.now(timezone.utc),
+                "results": results,
+            }
+        return self.batch_object(batch_id)
+
+    def batch_object(self, batch_id: str) -> Optional[dict]:
+        """Build the MessageBatch JSON for a batch."""
+        with self._lock:
+            batch = self.batches.get(batch_id)
+        if batch is None:
+            return None
+
+        ended = time.monotonic() - batch["created"] >= self.processing_seconds
+        counts = {"processing": 0, "succeeded": 0, "errored": 0, "canceled": 0, "expired": 0}
+        for result in batch["results"]:
+            if ended:
+                counts[result["result"]["type"]] += 1
+            else:
+                counts["processing"] += 1
+
+        created_at = batch["created_at"]
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": counts,
+            "created_at": created_at.isoformat(),
+            "expires_at": (created_at + timedelta(hours=24)).isoformat(),
+            "ended_at": datetime.now(timezone.utc).isoformat() if ended else None,
+            "cancel_initiated_at": None,
+            "archived_at": None,
+            "results_url": f"{self.base_url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    def _run_request(self, request: dict) -> dict:
+        """Produce the individual result line for one batch request."""
+        custom_id = request["custom_id"]
+        params = request.get("params", {})
+        try:
+            text = self.responder(custom_id, params)
+        except Exception as e:
+            return {
+                "custom_id": custom_id,
+                "result": {
+                    "type": "errored",
+                    "error": {"type": "error", "error": {"type": "api_error", "message": str(e)}},
+                },
+            }
+
+        prompt_chars = len(json.dumps(params.get("messages", [])))
+        return {
+            "custom_id": custom_id,
+            "result": {
+                "type": "succeeded",
+                "message": {
+                    "id": f"msg_local_{uuid.uuid4().hex[:24]}",
+                    "type": "message",
+                    "role": "assistant",
+                    "model": params.get("model", "local-stand-in"),
+                    "content": [{"type": "text", "text": text}],
+                    "stop_reason": "end_turn",
+                    "stop_sequence": None,
+                    "usage": {
+                        "input_tokens": prompt_chars // 4,
+                        "output_tokens": len(text) // 4,
+                        "cache_creation_input_tokens": 0,
+                        "cache_read_input_tokens": 0,
+                    },
+                },
+            },
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                path = self.path.split("?", 1)[0].rstrip("/")
+                if path != "/v1/messages/batches":
+                    return self._send_error(404, f"Unknown endpoint: {path}")
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                self._send_json(200, server.create_batch(body.get("requests", [])))
+
+            def do_GET(self):
+                parts = self.path.split("?", 1)[0].strip("/").split("/")
+                if parts[:3] != ["v1", "messages", "batches"] or len(parts) not in (4, 5):
+                    return self._send_error(404, f"Unknown endpoint: {self.path}")
+
+                batch = server.batch_object(parts[3])
+                if batch is None:
+                    return self._send_error(404, f"Batch not found: {parts[3]}")
+
+                if len(parts) == 4:
+                    return self._send_json(200, batch)
+                if parts[4] != "results":
+                    return self._send_error(404, f"Unknown endpoint: {self.path}")
+                if batch["processing_status"] != "ended":
+                    return self._send_error(400, "Batch is still in progress")
+
+                with server._lock:
+                    results = server.batches[parts[3]]["results"]
+                body = "".join(json.dumps(result) + "\n" for result in results).encode("utf-8")
+                self._send(200, body, "application/x-jsonl")
+
+            def _send_json(self, status: int, payload: dict):
+                self._send(status, json.dumps(payload).encode("utf-8"), "application/json")
+
+            def _send_error(self, status: int, message: str):
+                self._send_json(status, {"type": "error", "error": {"type": "not_found_error", "message": message}})
+
+            def _send(self, status: int, body: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Keep test and worker output quiet
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Message Batches API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--processing-seconds", type=float, default=5.0,
+                        help="How long each batch stays in_progress")
+    args = parser.parse_args()
+
+    server = LocalBatchServer(args.host, args.port, processing_seconds=args.processing_seconds)
+    print(f"🧪 Local batch server listening on {server.base_url} (set CLAUDE_BATCH_BASE_URL to use it)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
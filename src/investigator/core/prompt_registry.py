@@ -0,0 +1,90 @@
+"""
+Worker-local registry of prompt files.
+
+Every analysis step needs its prompt template and version. Instead of a
+separate activity round-trip per step, the fused step activity looks prompts
+up here; each file is read once per worker and re-read only when its
+modification time changes.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from .analysis_results_collector import AnalysisResultsCollector
+
+
+class PromptRegistry:
+    """Caches prompt contents and versions keyed by resolved file path."""
+
+    def __init__(self, max_entries: int = 512):
+        """
+        Args:
+            max_entries: Maximum number of prompt files kept in memory
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def resolve_path(prompts_dir: str, file_name: str) -> str:
+        """Resolve a prompt file name the same way FileManager.read_prompt_file does."""
+        if file_name.startswith('../'):
+            return os.path.normpath(os.path.join(prompts_dir, file_name))
+        return os.path.join(prompts_dir, file_name)
+
+    def get(self, prompts_dir: str, file_name: str) -> Optional[Tuple[str, str]]:
+        """
+        Get a prompt template and its version.
+
+        Args:
+            prompts_dir: Directory containing the prompts
+            file_name: Prompt file name from processing_order
+
+        Returns:
+            Tuple of (prompt_content, prompt_version), or None if the file does not exist
+        """
+        path = self.resolve_path(prompts_dir, file_name)
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            with self._lock:
+                self._entries.pop(path, None)
+            return None
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] == mtime:
+                self._entries.move_to_end(path)
+                return entry[1], entry[2]
+
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        version = AnalysisResultsCollector.extract_prompt_version(content)
+
+        with self._lock:
+            self._entries[path] = (mtime, content, version)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return content, version
+
+    def clear(self) -> None:
+        """Forget all cached prompts."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_prompt_registry: Optional[PromptRegistry] = None
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Get the worker's singleton PromptRegistry."""
+    global _prompt_registry
+    if _prompt_registry is None:
+        _prompt_registry = PromptRegistry()
+    return _prompt_registry
@@ -0,0 +1,112 @@
+"""
+Stand-in server holding the Claude rate limit buckets for several hosts.
+
+Workers on different hosts cannot share an in-process or SQLite bucket, so
+they point CLAUDE_RATE_LIMIT_URL at this server instead. It keeps the
+buckets in memory with the limits it was started with:
+
+    python -m investigator.core.rate_limit_server --port 8766 --rpm 50 --itpm 40000 --otpm 8000
+    CLAUDE_RATE_LIMIT_BACKEND=http CLAUDE_RATE_LIMIT_URL=http://127.0.0.1:8766
+"""
+
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .rate_limiter import MemoryRateLimitBackend, RateLimits
+
+
+class RateLimitServer:
+    """In-process HTTP server that takes from and gives back to shared buckets."""
+
+    def __init__(self, limits: RateLimits, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            limits: The per-minute limits shared by all clients
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+        """
+        self.buckets = MemoryRateLimitBackend(limits)
+        self._thread = None
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "RateLimitServer":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Shut the server down."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "RateLimitServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                path = self.path.split("?", 1)[0].rstrip("/")
+                length = int(self.headers.get("Content-Length", 0))
+                amounts = json.loads(self.rfile.read(length) or b"{}").get("amounts", {})
+                if path == "/v1/rate_limit/take":
+                    return self._send_json(200, {"wait_seconds": server.buckets.take(amounts)})
+                if path == "/v1/rate_limit/give_back":
+                    server.buckets.give_back(amounts)
+                    return self._send_json(200, {})
+                self._send_json(404, {"type": "error", "error": {"type": "not_found_error",
+                                                                 "message": f"Unknown endpoint: {path}"}})
+
+            def _send_json(self, status: int, payload: dict):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Keep test and worker output quiet
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared Claude rate limit buckets for several hosts")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--rpm", type=int, default=0, help="Requests per minute (0 = unlimited)")
+    parser.add_argument("--itpm", type=int, default=0, help="Input tokens per minute (0 = unlimited)")
+    parser.add_argument("--otpm", type=int, default=0, help="Output tokens per minute (0 = unlimited)")
+    parser.add_argument("--headroom", type=float, default=0.9, help="Fraction of the limits to use")
+    args = parser.parse_args()
+
+    limits = RateLimits(args.rpm, args.itpm, args.otpm, args.headroom)
+    server = RateLimitServer(limits, args.host, args.port)
+    print(f"🚦 Rate limit server listening on {server.base_url} "
+          f"(set CLAUDE_RATE_LIMIT_BACKEND=http and CLAUDE_RATE_LIMIT_URL to use it)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
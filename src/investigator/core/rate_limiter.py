@@ -0,0 +1,340 @@
+"""
+Token-bucket rate limiter for Anthropic API requests.
+
+Every Claude call first takes one request, its estimated input tokens and
+its max_tokens of output from three buckets - requests, input tokens and
+output tokens per minute - and waits while any of them is short. Once the
+response arrives the reservation is settled against the reported usage, so
+unused output tokens go back to the bucket. The buckets refill continuously
+at CLAUDE_RATE_LIMIT_HEADROOM times the organisation limits, which keeps
+sustained throughput just under them instead of running into 429/529
+responses and retries.
+
+The bucket levels live in a backend shared by everything that calls Claude:
+
+- memory: this process only (one worker)
+- sqlite: a database file shared by all worker processes on one host
+- http: the stand-in server (python -m investigator.core.rate_limit_server)
+  shared by workers on several hosts
+
+Select it with CLAUDE_RATE_LIMIT_BACKEND. The limiter is off unless at least
+one of CLAUDE_RATE_LIMIT_RPM, CLAUDE_RATE_LIMIT_ITPM and CLAUDE_RATE_LIMIT_OTPM
+is set.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import urllib.request
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+# Bucket names
+REQUESTS = "requests"
+INPUT_TOKENS = "input_tokens"
+OUTPUT_TOKENS = "output_tokens"
+
+# Upper bound for a single sleep, so waiters re-check the shared buckets regularly
+MAX_SLEEP_SECONDS = 5.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    name TEXT PRIMARY KEY,
+    level REAL NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+@dataclass(frozen=True)
+class RateLimits:
+    """Per-minute limits; 0 leaves that bucket unlimited."""
+    requests_per_minute: int = 0
+    input_tokens_per_minute: int = 0
+    output_tokens_per_minute: int = 0
+    headroom: float = 1.0
+
+    @classmethod
+    def from_config(cls) -> "RateLimits":
+        return cls(
+            requests_per_minute=Config.CLAUDE_RATE_LIMIT_RPM,
+            input_tokens_per_minute=Config.CLAUDE_RATE_LIMIT_ITPM,
+            output_tokens_per_minute=Config.CLAUDE_RATE_LIMIT_OTPM,
+            headroom=Config.CLAUDE_RATE_LIMIT_HEADROOM,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return any(self.capacities().values())
+
+    def capacities(self) -> Dict[str, float]:
+        """Bucket sizes: one minute of the limit, reduced by the headroom factor."""
+        return {
+            REQUESTS: self.requests_per_minute * self.headroom,
+            INPUT_TOKENS: self.input_tokens_per_minute * self.headroom,
+            OUTPUT_TOKENS: self.output_tokens_per_minute * self.headroom,
+        }
+
+
+def take_from_buckets(levels: Dict[str, Tuple[float, float]], limits: RateLimits,
+                      amounts: Dict[str, float], now: float,
+                      force: bool = False) -> Tuple[Dict[str, Tuple[float, float]], float]:
+    """
+    Refill the buckets up to now and take the amounts if all of them fit.
+
+    Shared by every backend, which only stores the levels and runs this under
+    its lock. A bucket may go negative through a forced take, which makes
+    later requests wait until the overdraft has refilled.
+
+    Args:
+        levels: Bucket name -> (level, updated_at); missing buckets start full
+        limits: The per-minute limits
+        amounts: Bucket name -> amount to take (negative amounts are returned)
+        now: Current time in seconds
+        force: Apply the amounts even if they do not fit (settling a reservation)
+
+    Returns:
+        (new levels, seconds to wait). Nothing is taken when the wait is above 0.
+    """
+    refilled = {}
+    wait = 0.0
+    for name, capacity in limits.capacities().items():
+        if not capacity:
+            continue
+        level, updated_at = levels.get(name, (capacity, now))
+        level = min(capacity, level + (now - updated_at) * capacity / 60)
+        # A request larger than the whole bucket only needs a full bucket
+        amount = min(amounts.get(name, 0), capacity)
+        if amount > level and not force:
+            wait = max(wait, (amount - level) * 60 / capacity)
+        refilled[name] = level
+
+    if wait > 0:
+        return {name: (level, now) for name, level in refilled.items()}, wait
+    return {
+        name: (min(level - amounts.get(name, 0), limits.capacities()[name]), now)
+        for name, level in refilled.items()
+    }, 0.0
+
+
+class MemoryRateLimitBackend:
+    """Buckets held in this process."""
+
+    def __init__(self, limits: RateLimits):
+        self.limits = limits
+        self._levels: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, amounts: Dict[str, float], force: bool = False) -> float:
+        """Take the amounts if they fit; returns the seconds to wait otherwise (0 when taken)."""
+        with self._lock:
+            self._levels, wait = take_from_buckets(self._levels, self.limits, amounts, time.time(), force)
+        return wait
+
+    def give_back(self, amounts: Dict[str, float]) -> None:
+        """Adjust the buckets by the given amounts (positive returns capacity, negative takes more)."""
+        self.take({name: -amount for name, amount in amounts.items()}, force=True)
+
+
+class SQLiteRateLimitBackend:
+    """
+    Buckets in a SQLite database shared by the worker processes of one host.
+
+    Each take runs in an IMMEDIATE transaction, so processes update the levels
+    one at a time.
+    """
+
+    def __init__(self, limits: RateLimits, db_path: Path):
+        self.limits = limits
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connection().executescript(_SCHEMA)
+        logger.info(f"Using SQLite rate limit buckets at: {self.db_path}")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def take(self, amounts: Dict[str, float], force: bool = False) -> float:
+        """Take the amounts if they fit; returns the seconds to wait otherwise (0 when taken)."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            levels = {name: (level, updated_at)
+                      for name, level, updated_at in conn.execute("SELECT name, level, updated_at FROM buckets")}
+            levels, wait = take_from_buckets(levels, self.limits, amounts, time.time(), force)
+            conn.executemany(
+                "INSERT OR REPLACE INTO buckets (name, level, updated_at) VALUES (?, ?, ?)",
+                [(name, level, updated_at) for name, (level, updated_at) in levels.items()]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def give_back(self, amounts: Dict[str, float]) -> None:
+        """Adjust the buckets by the given amounts (positive returns capacity, negative takes more)."""
+        self.take({name: -amount for name, amount in amounts.items()}, force=True)
+
+
+class HttpRateLimitBackend:
+    """Buckets kept by the rate limit server, shared by workers on several hosts."""
+
+    def __init__(self, base_url: str, timeout: float = 10.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _post(self, path: str, amounts: Dict[str, float]) -> dict:
+        request = urllib.request.Request(
+            f"{self.base_url}{path}",
+            data=json.dumps({"amounts": amounts}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read() or b"{}")
+
+    def take(self, amounts: Dict[str, float]) -> float:
+        """Take the amounts if they fit; returns the seconds to wait otherwise (0 when taken)."""
+        return float(self._post("/v1/rate_limit/take", amounts)["wait_seconds"])
+
+    def give_back(self, amounts: Dict[str, float]) -> None:
+        """Adjust the buckets by the given amounts (positive returns capacity, negative takes more)."""
+        self._post("/v1/rate_limit/give_back", amounts)
+
+
+class ClaudeRateLimiter:
+    """Blocks Claude calls until the shared buckets have room for them."""
+
+    def __init__(self, backend, sleep=time.sleep):
+        """
+        Args:
+            backend: Bucket backend (memory, SQLite or HTTP)
+            sleep: Sleep function, replaceable in tests
+        """
+        self.backend = backend
+        self._sleep = sleep
+
+    def acquire(self, input_tokens: int, max_output_tokens: int) -> Dict[str, float]:
+        """
+        Wait until one request with these token counts fits, and take it.
+
+        Output tokens are reserved at max_tokens, the way the API itself
+        counts them until the response is complete.
+
+        Returns:
+            The reservation, to be passed to settle()
+        """
+        reservation = {REQUESTS: 1, INPUT_TOKENS: input_tokens, OUTPUT_TOKENS: max_output_tokens}
+        waited = 0.0
+        while True:
+            wait = self.backend.take(reservation)
+            if wait <= 0:
+                break
+            if not waited:
+                logger.info(f"⏳ Claude rate limit reached, waiting for capacity (~{wait:.1f}s)")
+            wait = min(wait, MAX_SLEEP_SECONDS)
+            self._sleep(wait)
+            waited += wait
+        if waited:
+            logger.info(f"⏳ Claude rate limit wait over after {waited:.1f}s")
+        return reservation
+
+    def settle(self, reservation: Dict[str, float], usage: Optional[dict]) -> None:
+        """
+        Correct a reservation with the usage reported by the API.
+
+        Cache reads do not count towards the input token limit, cache writes do.
+        Without usage (a failed request) the output reservation is returned.
+        """
+        usage = usage or {}
+        if "input_tokens" in usage:
+            input_used = usage["input_tokens"] + usage.get("cache_creation_input_tokens", 0)
+        else:
+            input_used = reservation[INPUT_TOKENS]
+        unused = {
+            INPUT_TOKENS: reservation[INPUT_TOKENS] - input_used,
+            OUTPUT_TOKENS: reservation[OUTPUT_TOKENS] - usage.get("output_tokens", 0),
+        }
+        if any(unused.values()):
+            self.backend.give_back(unused)
+
+
+def estimate_input_tokens(params: dict) -> int:
+    """Estimate the input tokens of a Messages API request from its text."""
+    from .repository_analyzer import RepositoryAnalyzer
+
+    text = []
+    for message in params.get("messages", []):
+        content = message.get("content", "")
+        if isinstance(content, str):
+            text.append(content)
+        else:
+            text.extend(block.get("text", "") for block in content)
+    if params.get("system"):
+        text.append(str(params["system"]))
+    return RepositoryAnalyzer.estimate_tokens("".join(text))
+
+
+def create_rate_limit_backend(limits: RateLimits, backend: Optional[str] = None):
+    """
+    Create the bucket backend named by CLAUDE_RATE_LIMIT_BACKEND.
+
+    Args:
+        limits: The per-minute limits (the http backend uses the server's)
+        backend: 'memory', 'sqlite' or 'http' (default: Config.CLAUDE_RATE_LIMIT_BACKEND)
+    """
+    backend = backend or Config.CLAUDE_RATE_LIMIT_BACKEND
+    if backend == "sqlite":
+        project_root = Path(__file__).parent.parent.parent.parent  # Go up from src/investigator/core/
+        db_path = Config.CLAUDE_RATE_LIMIT_SQLITE_PATH or project_root / "temp" / "claude_rate_limit.sqlite3"
+        return SQLiteRateLimitBackend(limits, db_path)
+    if backend == "http":
+        if not Config.CLAUDE_RATE_LIMIT_URL:
+            raise ValueError("CLAUDE_RATE_LIMIT_URL must be set for the http rate limit backend")
+        return HttpRateLimitBackend(Config.CLAUDE_RATE_LIMIT_URL)
+    if backend != "memory":
+        logger.warning(f"Unknown rate limit backend: {backend}, defaulting to memory")
+    return MemoryRateLimitBackend(limits)
+
+
+_rate_limiter: Optional[ClaudeRateLimiter] = None
+_rate_limiter_configured = False
+_lock = threading.Lock()
+
+
+def get_rate_limiter() -> Optional[ClaudeRateLimiter]:
+    """Return the process-wide limiter, or None when no limit is configured."""
+    global _rate_limiter, _rate_limiter_configured
+    with _lock:
+        if not _rate_limiter_configured:
+            limits = RateLimits.from_config()
+            if limits.enabled:
+                _rate_limiter = ClaudeRateLimiter(create_rate_limit_backend(limits))
+                logger.info(f"🚦 Claude rate limiter: {Config.CLAUDE_RATE_LIMIT_BACKEND} backend, "
+                            f"{limits.requests_per_minute} RPM, {limits.input_tokens_per_minute} ITPM, "
+                            f"{limits.output_tokens_per_minute} OTPM, headroom {limits.headroom}")
+            _rate_limiter_configured = True
+        return _rate_limiter
+
+
+def reset_rate_limiter() -> None:
+    """Forget the process-wide limiter so the next call reads Config again."""
+    global _rate_limiter, _rate_limiter_configured
+    with _lock:
+        _rate_limiter = None
+        _rate_limiter_configured = False
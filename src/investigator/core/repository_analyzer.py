@@ -1,8 +1,23 @@
 """
 Repository structure analysis for the Claude Investigator.
+
+Two encodings of the structure are available (Config.REPO_STRUCTURE_FORMAT):
+
+- tree: one line per entry with folder/file icons and two-space indentation
+- compact: no icons, chains of single-child directories collapsed into
+  `a/b/c/`, and the files of large directories grouped by extension, e.g.
+  `*.py x42 (e.g. api.py, models.py, views.py)`. The structure is sent with
+  every analysis step, so the saving applies to each of them.
+
+With a token budget (Config.STRUCTURE_TOKEN_BUDGET) the fixed depth limit is
+replaced by a per-directory choice: directories are expanded shallowest and
+most source-dense first while the structure fits the budget, and the others
+are shown as `name/ [N files]`. Vendored and generated trees are never expanded.
 """
 
+import heapq
 import os
+from collections import defaultdict
 from .config import Config
 
 
@@ -32,43 +47,137 @@ class RepositoryAnalyzer:
         '.eggs',
     }
     
+    # Number of example names shown for a group of files with the same extension
+    GROUP_EXAMPLES = 3
+    
+    # Directories shown only as file counts under a token budget
+    VENDORED_DIRS = {
+        'vendor',
+        'vendors',
+        'third_party',
+        'third-party',
+        'thirdparty',
+        'external',
+        'generated',
+        '__generated__',
+        'gen',
+        'Pods',
+        'bower_components',
+        'target',
+        'out',
+        '.yarn',
+        '.gradle',
+        '.terraform',
+    }
+    
+    # Characters per token of structure text. File paths tokenize densely: counting with the
+    # Anthropic API gave 2.0-3.1 characters per token on sample repositories, so 2 keeps budgets safe.
+    CHARS_PER_TOKEN = 2
+    
+    # Levels of depth a directory made only of source files is preferred by under a token budget
+    SOURCE_DENSITY_WEIGHT = 3
+    
+    # Extensions that make a directory dense in source code, expanded first under a token budget
+    SOURCE_EXTENSIONS = {
+        '.py', '.js', '.jsx', '.ts', '.tsx', '.mjs', '.go', '.rs', '.java', '.kt', '.kts', '.scala',
+        '.rb', '.php', '.cs', '.fs', '.c', '.cc', '.cpp', '.h', '.hpp', '.m', '.mm', '.swift', '.dart',
+        '.ex', '.exs', '.erl', '.clj', '.lua', '.sql', '.proto', '.graphql', '.tf', '.sh', '.vue', '.svelte',
+    }
+    
     def __init__(self, logger):
         self.logger = logger
     
-    def get_structure(self, repo_path: str, max_depth: int = None) -> str:
+    @classmethod
+    def estimate_tokens(cls, structure: str) -> int:
+        """Conservative token count of a structure string."""
+        return len(structure) // cls.CHARS_PER_TOKEN
+    
+    def get_structure(self, repo_path: str, max_depth: int = None, structure_format: str = None,
+                      token_budget: int = None) -> str:
         """
         Get the file and directory structure of the repository.
         
         Args:
             repo_path: Path to the repository
             max_depth: Maximum depth to traverse (default: MAX_DEPTH)
+            structure_format: "tree" or "compact" (default: Config.REPO_STRUCTURE_FORMAT)
+            token_budget: Approximate token budget; when set, replaces the fixed depth limit
             
         Returns:
             String representation of the repository structure with repository name
         """
-        if max_depth is None:
-            max_depth = self.MAX_DEPTH
+        self.logger.debug(f"Scanning repository structure in: {repo_path}")
+        
+        def walk_checkout():
+            for root, dirs, files in os.walk(repo_path):
+                rel_path = os.path.relpath(root, repo_path)
+                yield ('' if rel_path == '.' else rel_path.replace(os.sep, '/')), dirs, files
+        
+        return self._build_structure(repo_path, walk_checkout(), max_depth, structure_format, token_budget)
+    
+    def get_structure_from_git(self, repo_path: str, rev: str = "HEAD", max_depth: int = None,
+                               structure_format: str = None, token_budget: int = None) -> str:
+        """
+        Get the repository structure from git objects instead of a checkout.
+        
+        Produces the same output as get_structure, but reads the tree with
+        `git ls-tree`, so it works on a `--no-checkout` partial clone.
+        
+        Args:
+            repo_path: Path to the git repository
+            rev: Commit to read (default: HEAD)
+            max_depth: Maximum depth to traverse (default: MAX_DEPTH)
+            structure_format: "tree" or "compact" (default: Config.REPO_STRUCTURE_FORMAT)
+            token_budget: Approximate token budget; when set, replaces the fixed depth limit
             
-        self.logger.debug(f"Scanning repository structure in: {repo_path} (max depth: {max_depth})")
+        Returns:
+            String representation of the repository structure with repository name
+        """
+        from .git_tree_reader import GitTreeReader
+        
+        self.logger.debug(f"Reading repository structure from git objects in: {repo_path} ({rev})")
+        return self._build_structure(repo_path, GitTreeReader(self.logger).walk(repo_path, rev), max_depth,
+                                     structure_format, token_budget)
+    
+    def _build_structure(self, repo_path: str, walker, max_depth: int = None, structure_format: str = None,
+                         token_budget: int = None) -> str:
+        """
+        Render the structure string from a top-down walker.
+        
+        Args:
+            repo_path: Path to the repository (used for the repository name)
+            walker: Iterator of (relative_dir, dirs, files) tuples, where
+                relative_dir is '' for the root and uses '/' separators.
+                Pruning dirs in place must stop the walker descending.
+            max_depth: Maximum depth to traverse (default: MAX_DEPTH)
+            structure_format: "tree" or "compact" (default: Config.REPO_STRUCTURE_FORMAT)
+            token_budget: Approximate token budget; when set, replaces the fixed depth limit
+        """
+        if structure_format is None:
+            structure_format = Config.REPO_STRUCTURE_FORMAT
+        if structure_format not in ("tree", "compact"):
+            raise ValueError(f"Unknown repository structure format: {structure_format}")
         
         # Extract repository name from the path
         repo_name = os.path.basename(repo_path.rstrip(os.sep))
         
-        structure = []
-        # Add repository name as header
-        structure.append(f"Repository: {repo_name}")
-        structure.append("=" * (len(f"Repository: {repo_name}")))
-        structure.append("")  # Empty line for better formatting
+        if token_budget:
+            return self._build_budgeted_structure(
+                repo_name, walker, max_depth or Config.STRUCTURE_BUDGET_MAX_DEPTH, structure_format, token_budget
+            )
+        
+        if max_depth is None:
+            max_depth = self.MAX_DEPTH
+        if structure_format == "compact":
+            return self._build_compact_structure(repo_name, walker, max_depth)
+        
+        structure = self._structure_header(repo_name)
         
         stats = {'files': 0, 'dirs': 0, 'nested': 0}
         
-        for root, dirs, files in os.walk(repo_path):
-            # Calculate depth relative to repo_path
-            rel_path = os.path.relpath(root, repo_path)
-            if rel_path == '.':
-                level = 0
-            else:
-                level = rel_path.count(os.sep) + 1
+        for rel_path, dirs, files in walker:
+            # Calculate depth relative to repo root
+            level = rel_path.count('/') + 1 if rel_path else 0
             
             indent = '  ' * level
             
@@ -77,7 +186,7 @@ class RepositoryAnalyzer:
             
             # Add directory (except for root)
             if level > 0:
-                dir_name = os.path.basename(root)
+                dir_name = rel_path.rsplit('/', 1)[-1]
                 structure.append(f"{indent}{Config.DIR_ICON} {dir_name}/")
                 stats['dirs'] += 1
             
@@ -88,7 +197,7 @@ class RepositoryAnalyzer:
                     for dir_name in sorted(dirs):
                         structure.append(f"{indent}  {Config.DIR_ICON} {dir_name}/ [NESTED]")
                         stats['nested'] += 1
-                dirs[:] = []  # Stop os.walk from descending
+                dirs[:] = []  # Stop the walker from descending
                 
                 # At max depth, indicate files exist but don't list them
                 if files:
@@ -105,4 +214,210 @@ class RepositoryAnalyzer:
             f"Repository structure scan complete for '{repo_name}': "
             f"{stats['dirs']} directories, {stats['files']} files, {stats['nested']} nested (not expanded)"
         )
-        return '\n'.join(structure) 
\ No newline at end of file
+        return '\n'.join(structure)
+
+    
+    def _structure_header(self, repo_name: str) -> list:
+        """Header lines naming the repository."""
+        return [
+            f"Repository: {repo_name}",
+            "=" * (len(f"Repository: {repo_name}")),
+            "",  # Empty line for better formatting
+        ]
+    
+    def _build_compact_structure(self, repo_name: str, walker, max_depth: int) -> str:
+        """
+        Render the compact encoding: no icons, single-child directory chains
+        collapsed, files of large directories grouped by extension.
+        
+        Covers the same entries as the tree encoding, with the same depth limit.
+        """
+        # relative_dir -> {"dirs": [...], "files": [...], "nested": bool}
+        nodes = {}
+        for rel_path, dirs, files in walker:
+            level = rel_path.count('/') + 1 if rel_path else 0
+            dirs[:] = [d for d in dirs if d not in self.SKIP_DIRS and not d.endswith('.egg-info')]
+            node = {"dirs": sorted(dirs), "files": sorted(files), "nested": level >= max_depth}
+            nodes[rel_path] = node
+            if node["nested"]:
+                dirs[:] = []  # Stop the walker from descending
+        
+        structure = self._structure_header(repo_name)
+        if '' in nodes:
+            self._render_compact_entries(nodes, '', 0, structure)
+        
+        self.logger.debug(
+            f"Compact repository structure for '{repo_name}': {len(nodes)} directories, {len(structure)} lines"
+        )
+        return '\n'.join(structure)
+    
+    def _render_compact_entries(self, nodes: dict, rel_path: str, level: int, structure: list) -> None:
+        """Append the subdirectories and files of a directory."""
+        node = nodes[rel_path]
+        indent = '  ' * level
+        
+        if node["nested"]:
+            # At max depth: name what is below without expanding it
+            for dir_name in node["dirs"]:
+                structure.append(f"{indent}{dir_name}/ [NESTED]")
+            if node["files"]:
+                structure.append(f"{indent}[{len(node['files'])} files]")
+            return
+        
+        for dir_name in node["dirs"]:
+            child_path = f"{rel_path}/{dir_name}" if rel_path else dir_name
+            label = dir_name
+            # Collapse a/b/c/ while a directory holds nothing but one subdirectory
+            while child_path in nodes:
+                child = nodes[child_path]
+                if child["nested"] or child["files"] or len(child["dirs"]) != 1:
+                    break
+                label = f"{label}/{child['dirs'][0]}"
+                child_path = f"{child_path}/{child['dirs'][0]}"
+            if child_path in nodes:
+                structure.append(f"{indent}{label}/")
+                self._render_compact_entries(nodes, child_path, level + 1, structure)
+            else:
+                structure.append(f"{indent}{label}/ [NESTED]")
+        
+        structure.extend(f"{indent}{line}" for line in self._compact_file_lines(node["files"]))
+    
+    def _compact_file_lines(self, files: list) -> list:
+        """File lines of a directory, grouped by extension when the directory is large."""
+        if len(files) < Config.STRUCTURE_GROUP_MIN_FILES:
+            return list(files)
+        
+        by_extension = defaultdict(list)
+        for file_name in files:
+            stem, dot, extension = file_name.rpartition('.')
+            by_extension[f".{extension}" if dot and stem else ''].append(file_name)
+        
+        lines = []
+        for extension in sorted(by_extension, key=lambda ext: (-len(by_extension[ext]), ext)):
+            names = by_extension[extension]
+            if extension and len(names) > self.GROUP_EXAMPLES:
+                examples = ', '.join(names[:self.GROUP_EXAMPLES])
+                lines.append(f"*{extension} x{len(names)} (e.g. {examples})")
+            else:
+                lines.extend(names)
+        return lines
+
+    
+    def _build_budgeted_structure(self, repo_name: str, walker, max_depth: int, structure_format: str,
+                                  token_budget: int) -> str:
+        """
+        Render the structure choosing per directory whether to expand it, so the
+        result fits token_budget (estimated at CHARS_PER_TOKEN characters per token).
+        
+        Directories deeper than max_depth are only counted.
+        """
+        # relative_dir -> {"dirs": [...], "files": [...], "total_files": int}
+        nodes = {}
+        for rel_path, dirs, files in walker:
+            level = rel_path.count('/') + 1 if rel_path else 0
+            dirs[:] = [d for d in dirs if d not in self.SKIP_DIRS and not d.endswith('.egg-info')]
+            nodes[rel_path] = {"dirs": sorted(dirs), "files": sorted(files)}
+            if level >= max_depth:
+                dirs[:] = []  # Counted from here on, never expanded
+        
+        # Files and source files per subtree, children before parents
+        for rel_path in sorted(nodes, key=lambda path: -path.count('/') if path else 1):
+            node = nodes[rel_path]
+            node["total_files"] = len(node["files"])
+            node["source_files"] = sum(1 for f in node["files"] if os.path.splitext(f)[1] in self.SOURCE_EXTENSIONS)
+            for dir_name in node["dirs"]:
+                child = nodes.get(f"{rel_path}/{dir_name}" if rel_path else dir_name)
+                if child:
+                    node["total_files"] += child["total_files"]
+                    node["source_files"] += child["source_files"]
+        
+        header = self._structure_header(repo_name)
+        expanded = self._plan_expansion(nodes, structure_format, token_budget * self.CHARS_PER_TOKEN
+                                        - sum(len(line) + 1 for line in header))
+        
+        structure = header
+        if '' in nodes:
+            self._render_budgeted_entries(nodes, expanded, structure_format, '', 0, structure)
+        
+        structure_text = '\n'.join(structure)
+        self.logger.debug(
+            f"Budgeted repository structure for '{repo_name}': {len(expanded)} of {len(nodes)} directories expanded, "
+            f"~{self.estimate_tokens(structure_text)} of {token_budget} tokens"
+        )
+        return structure_text
+    
+    def _plan_expansion(self, nodes: dict, structure_format: str, budget_chars: int) -> set:
+        """
+        Choose the directories to expand. The root is always expanded; then
+        directories are taken shallowest and most source-dense first, each
+        expanded only if its listing still fits the remaining budget.
+        """
+        expanded = {''}
+        if '' not in nodes:
+            return expanded
+        used = self._listing_chars(nodes, '', 0, structure_format)
+        
+        def candidates(rel_path):
+            for dir_name in nodes[rel_path]["dirs"]:
+                child_path = f"{rel_path}/{dir_name}" if rel_path else dir_name
+                if child_path in nodes and dir_name not in self.VENDORED_DIRS:
+                    child = nodes[child_path]
+                    level = child_path.count('/') + 1
+                    density = child["source_files"] / child["total_files"] if child["total_files"] else 0
+                    yield (level + self.SOURCE_DENSITY_WEIGHT * (1 - density), child_path)
+        
+        queue = list(candidates(''))
+        heapq.heapify(queue)
+        while queue:
+            _, rel_path = heapq.heappop(queue)
+            level = rel_path.count('/') + 1
+            # The count line is replaced by the directory line and its listing
+            node = nodes[rel_path]
+            cost = (self._listing_chars(nodes, rel_path, level, structure_format)
+                    - len(f"[{node['total_files']} files]") - 1)
+            if used + cost > budget_chars:
+                continue
+            used += cost
+            expanded.add(rel_path)
+            for candidate in candidates(rel_path):
+                heapq.heappush(queue, candidate)
+        return expanded
+    
+    def _listing_chars(self, nodes: dict, rel_path: str, level: int, structure_format: str) -> int:
+        """Characters added by expanding a directory whose subdirectories are shown as counts."""
+        lines = []
+        self._render_budgeted_entries(nodes, {rel_path}, structure_format, rel_path, level, lines)
+        return sum(len(line) + 1 for line in lines)
+    
+    def _render_budgeted_entries(self, nodes: dict, expanded: set, structure_format: str, rel_path: str,
+                                 level: int, structure: list) -> None:
+        """Append the subdirectories and files of an expanded directory."""
+        node = nodes[rel_path]
+        # The tree encoding indents the root's entries, the compact one does not
+        indent = '  ' * (level + 1 if structure_format == "tree" else level)
+        dir_icon = f"{Config.DIR_ICON} " if structure_format == "tree" else ""
+        
+        for dir_name in node["dirs"]:
+            child_path = f"{rel_path}/{dir_name}" if rel_path else dir_name
+            label = dir_name
+            if structure_format == "compact":
+                # Collapse a/b/c/ while an expanded directory holds nothing but one subdirectory
+                while child_path in expanded:
+                    child = nodes[child_path]
+                    grandchild_path = f"{child_path}/{child['dirs'][0]}" if len(child["dirs"]) == 1 else None
+                    if child["files"] or grandchild_path not in expanded:
+                        break
+                    label = f"{label}/{child['dirs'][0]}"
+                    child_path = grandchild_path
+            if child_path in expanded:
+                structure.append(f"{indent}{dir_icon}{label}/")
+                self._render_budgeted_entries(nodes, expanded, structure_format, child_path, level + 1, structure)
+            else:
+                child = nodes.get(child_path)
+                counts = f"[{child['total_files']} files]" if child else "[NESTED]"
+                structure.append(f"{indent}{dir_icon}{label}/ {counts}")
+        
+        if structure_format == "compact":
+            structure.extend(f"{indent}{line}" for line in self._compact_file_lines(node["files"]))
+        else:
+            structure.extend(f"{indent}{Config.FILE_ICON} {file_name}" for file_name in node["files"])
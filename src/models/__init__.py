@@ -32,6 +32,16 @@ from .activities import (
     ClaudeConfigOverrides,
     AnalyzeWithClaudeInput,
     AnalyzeWithClaudeOutput,
+    ClaudeApiFeedback,
+    RunAnalysisStepInput,
+    AnalysisStepCacheCheckOutput,
+    StoreSharedInputsOutput,
+    ClaudeBatchItem,
+    ClaudeBatchSubmitInput,
+    ClaudeBatchSubmitOutput,
+    ClaudeBatchCollectInput,
+    ClaudeBatchCollectOutput,
+    WorkerTaskQueues,
 )
 
 # Workflow models
@@ -54,6 +64,8 @@ from .workflows import (
     SaveToHubResult,
     SaveToDynamoResult,
     InvestigationResult,
+    BatchAnalysisRequest,
+    BatchAnalysisResult,
 )
 
 __all__ = [
@@ -77,6 +89,16 @@ __all__ = [
     "ClaudeConfigOverrides",
     "AnalyzeWithClaudeInput",
     "AnalyzeWithClaudeOutput",
+    "ClaudeApiFeedback",
+    "RunAnalysisStepInput",
+    "AnalysisStepCacheCheckOutput",
+    "StoreSharedInputsOutput",
+    "ClaudeBatchItem",
+    "ClaudeBatchSubmitInput",
+    "ClaudeBatchSubmitOutput",
+    "ClaudeBatchCollectInput",
+    "ClaudeBatchCollectOutput",
+    "WorkerTaskQueues",
     # Workflows (legacy)
     "WorkflowParams",
     "WorkflowResult",
@@ -96,4 +118,6 @@ __all__ = [
     "SaveToHubResult",
     "SaveToDynamoResult",
     "InvestigationResult",
+    "BatchAnalysisRequest",
+    "BatchAnalysisResult",
 ]
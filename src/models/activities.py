@@ -13,8 +13,10 @@ class CacheCheckInput(BaseModel):
     """Input parameters for check_if_repo_needs_investigation activity."""
     repo_name: str = Field(..., description="Name of the repository")
     repo_url: str = Field(..., description="URL of the repository")
-    repo_path: str = Field(..., description="Local path to the cloned repository")
+    repo_path: Optional[str] = Field(None, description="Local path to the cloned repository")
     prompt_versions: Optional[Dict[str, str]] = Field(None, description="Mapping of prompt names to versions")
+    remote_commit: Optional[str] = Field(None, description="Remote HEAD commit SHA, used when the repository is not cloned yet")
+    remote_branch: Optional[str] = Field(None, description="Remote default branch name, used when the repository is not cloned yet")
     
     @validator('repo_name')
     def validate_repo_name(cls, v):
@@ -25,10 +27,19 @@ class CacheCheckInput(BaseModel):
     
     @validator('repo_path')
     def validate_repo_path(cls, v):
-        """Ensure repo path is not empty."""
-        if not v or not v.strip():
+        """Ensure repo path is not empty when provided."""
+        if v is None:
+            return v
+        if not v.strip():
             raise ValueError("Repository path must not be empty")
         return v.strip()
+    
+    @validator('remote_commit', always=True)
+    def validate_state_source(cls, v, values):
+        """Ensure the repository state can be determined from a clone or the remote."""
+        if not values.get('repo_path') and not v:
+            raise ValueError("Either repo_path or remote_commit must be provided")
+        return v
 
 
 class CacheCheckOutput(BaseModel):
@@ -128,6 +139,7 @@ class PromptContextDict(BaseModel):
     context_reference_keys: List[str] = Field(default_factory=list, description="Reference keys for context data")
     result_reference_key: Optional[str] = Field(None, description="Reference key for result data")
     prompt_version: str = Field(default="1", description="Version of the prompt being used")
+    repo_structure_ref: Optional[str] = Field(None, description="Shared-input key of the repository structure")
     
     @validator('repo_name')
     def validate_repo_name(cls, v):
@@ -169,6 +181,7 @@ class ClaudeConfigOverrides(BaseModel):
     claude_model: Optional[str] = Field(None, description="Claude model to use (e.g., claude-3-sonnet-20240229)")
     max_tokens: Optional[int] = Field(None, ge=1, le=200000, description="Maximum tokens for Claude response")
     temperature: Optional[float] = Field(None, ge=0.0, le=1.0, description="Temperature for Claude response")
+    force_section: Optional[str] = Field(None, description="Re-run this section (prompt name) even if cached")
     
     @validator('claude_model')
     def validate_claude_model(cls, v):
@@ -183,6 +196,8 @@ class AnalyzeWithClaudeInput(BaseModel):
     context_dict: PromptContextDict = Field(..., description="Dictionary representation of PromptContext")
     config_overrides: Optional[ClaudeConfigOverrides] = Field(None, description="Optional configuration overrides for Claude API")
     latest_commit: Optional[str] = Field(None, description="Current commit SHA for cache checking")
+    upstream_hashes: Optional[Dict[str, str]] = Field(None, description="Result hashes of the steps this one takes context from, recorded as the result's lineage")
+    input_fingerprint: Optional[str] = Field(None, description="Fingerprint of the step's inputs, to cache the result under")
     
     @validator('latest_commit')
     def validate_commit(cls, v):
@@ -195,6 +210,17 @@ class AnalyzeWithClaudeInput(BaseModel):
         return v.strip() if v else v
 
 
+class ClaudeApiFeedback(BaseModel):
+    """How the Claude API responded to one or more calls; drives the adaptive concurrency controller."""
+    calls: int = Field(default=1, ge=0, description="Number of Claude calls summarized")
+    latency_ms: int = Field(default=0, ge=0, description="Total wall time of the calls, SDK retries included")
+    output_tokens: int = Field(default=0, ge=0, description="Total output tokens of the calls")
+    retries: int = Field(default=0, ge=0, description="Requests the SDK retried (429, 529, other 5xx, timeouts)")
+    failed_attempts: int = Field(default=0, ge=0, description="Earlier activity attempts that failed")
+    retry_after_seconds: Optional[float] = Field(None, ge=0, description="Longest retry-after the API asked for")
+    capacity_remaining: Optional[float] = Field(None, ge=0, description="Lowest remaining/limit ratio in the rate limit headers")
+
+
 class AnalyzeWithClaudeOutput(BaseModel):
     """Output from analyze_with_claude_context activity."""
     status: str = Field(..., description="Status of the analysis (success/error)")
@@ -202,6 +228,9 @@ class AnalyzeWithClaudeOutput(BaseModel):
     result_length: int = Field(..., ge=0, description="Length of the analysis result in characters")
     cached: bool = Field(..., description="Whether the result was served from cache")
     cache_reason: Optional[str] = Field(None, description="Reason for cache hit/miss if applicable")
+    usage: Optional[Dict[str, int]] = Field(None, description="Claude token usage, including prompt cache reads/writes")
+    result_hash: Optional[str] = Field(None, description="Content hash of the result, checked by the steps that take it as context")
+    api_feedback: Optional[ClaudeApiFeedback] = Field(None, description="Latency and rate limit feedback of the Claude call")
     
     @validator('status')
     def validate_status(cls, v):
@@ -216,3 +245,92 @@ class AnalyzeWithClaudeOutput(BaseModel):
         if values.get('cached') is True and (not v or not v.strip() if v else True):
             raise ValueError("Cache reason must be provided when result is cached")
         return v
+
+
+class RunAnalysisStepInput(BaseModel):
+    """Input parameters for run_analysis_step_activity."""
+    context_dict: PromptContextDict = Field(..., description="Step context with the result keys of the steps it builds on")
+    prompts_dir: str = Field(..., description="Directory containing the prompt files")
+    prompt_file: str = Field(..., description="Prompt file name from processing_order")
+    repo_structure: Optional[str] = Field(None, description="Repository structure string (when not passed by reference)")
+    deps_formatted_content: Optional[str] = Field(None, description="Formatted dependencies for the {repo_deps} placeholder")
+    repo_structure_ref: Optional[str] = Field(None, description="Shared-input key of the repository structure")
+    deps_ref: Optional[str] = Field(None, description="Shared-input key of the formatted dependencies")
+    config_overrides: Optional[ClaudeConfigOverrides] = Field(None, description="Optional configuration overrides for Claude API")
+    latest_commit: Optional[str] = Field(None, description="Current commit SHA for cache checking")
+    upstream_hashes: Dict[str, str] = Field(default_factory=dict, description="Result hashes of the steps this one takes context from, by step name")
+    reuse_commit: Optional[str] = Field(None, description="Earlier commit whose result can be reused (no relevant changes since)")
+    update_from_commit: Optional[str] = Field(None, description="Earlier commit whose result is revised from the diff (update mode)")
+    diff_ref: Optional[str] = Field(None, description="Shared-input key of the diff summary since update_from_commit")
+    
+    @validator('repo_structure_ref', always=True)
+    def validate_repo_structure_source(cls, v, values):
+        """Ensure the repository structure is passed by value or by reference."""
+        if not v and values.get('repo_structure') is None:
+            raise ValueError("Either repo_structure or repo_structure_ref must be provided")
+        return v
+    
+    @validator('latest_commit')
+    def validate_commit(cls, v):
+        """Ensure commit SHA is valid if provided."""
+        if v is not None and (not v or not v.strip()):
+            raise ValueError("Commit SHA must not be empty if provided")
+        if v is not None and len(v.strip()) < 7:
+            raise ValueError("Commit SHA must be at least 7 characters")
+        return v.strip() if v else v
+
+
+class AnalysisStepCacheCheckOutput(BaseModel):
+    """Output from check_analysis_step_cache_activity."""
+    cached_output: Optional[AnalyzeWithClaudeOutput] = Field(None, description="Cached analysis output, when the step can be skipped")
+    input_fingerprint: Optional[str] = Field(None, description="Fingerprint of the step's inputs, when it needs analysis")
+
+
+class StoreSharedInputsOutput(BaseModel):
+    """Output from store_shared_inputs_activity."""
+    repo_structure_ref: str = Field(..., description="Shared-input key of the repository structure")
+    deps_ref: Optional[str] = Field(None, description="Shared-input key of the formatted dependencies, if any")
+
+
+class ClaudeBatchItem(BaseModel):
+    """One analysis step submitted through the Message Batches API."""
+    custom_id: str = Field(..., pattern=r'^[a-zA-Z0-9_-]{1,64}$', description="Batch request ID, unique within the batch")
+    workflow_id: str = Field(..., description="ID of the workflow waiting for this step")
+    step_name: str = Field(..., description="Name of the analysis step")
+    analyze_input: AnalyzeWithClaudeInput = Field(..., description="Same input as analyze_with_claude_context")
+
+
+class ClaudeBatchSubmitInput(BaseModel):
+    """Input parameters for submit_claude_batch_activity."""
+    items: List[ClaudeBatchItem] = Field(..., description="Analysis steps to submit")
+
+
+class ClaudeBatchSubmitOutput(BaseModel):
+    """Output from submit_claude_batch_activity."""
+    batch_id: Optional[str] = Field(None, description="Message batch ID (None when nothing had to be submitted)")
+    submitted: List[ClaudeBatchItem] = Field(default_factory=list, description="Items included in the batch")
+    completed: Dict[str, AnalyzeWithClaudeOutput] = Field(default_factory=dict, description="Items served from the prompt cache, by custom_id")
+    errors: Dict[str, str] = Field(default_factory=dict, description="Items that could not be prepared, by custom_id")
+
+
+class ClaudeBatchCollectInput(BaseModel):
+    """Input parameters for collect_claude_batch_activity."""
+    batch_id: str = Field(..., description="Message batch ID")
+    items: List[ClaudeBatchItem] = Field(..., description="Items included in the batch")
+
+
+class ClaudeBatchCollectOutput(BaseModel):
+    """Output from collect_claude_batch_activity."""
+    completed: Dict[str, AnalyzeWithClaudeOutput] = Field(default_factory=dict, description="Saved results, by custom_id")
+    errors: Dict[str, str] = Field(default_factory=dict, description="Failed requests, by custom_id")
+
+
+class WorkerTaskQueues(BaseModel):
+    """Task queues for the stages of one investigation, from get_worker_task_queues_activity.
+
+    A stage without a queue runs on the workflow's own task queue.
+    """
+    worker: Optional[str] = Field(None, description="Queue of the worker holding the clone, for activities reading it")
+    clone: Optional[str] = Field(None, description="Queue of the clone stage pool (defaults to worker)")
+    llm: Optional[str] = Field(None, description="Queue of the Claude analysis stage pool")
+    hub: Optional[str] = Field(None, description="Queue of the hub and metadata persistence stage pool")
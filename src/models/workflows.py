@@ -9,6 +9,8 @@ from typing import Optional, Dict, Any, List
 from pydantic import BaseModel, Field, validator, HttpUrl, ConfigDict
 from datetime import datetime
 
+from .activities import AnalyzeWithClaudeInput, AnalyzeWithClaudeOutput, ClaudeApiFeedback
+
 
 class ConfigOverrides(BaseModel):
     """Configuration overrides for workflows."""
@@ -16,8 +18,11 @@ class ConfigOverrides(BaseModel):
     max_tokens: Optional[int] = Field(None, ge=1, le=200000, description="Maximum tokens for Claude response")
     temperature: Optional[float] = Field(None, ge=0.0, le=1.0, description="Temperature for Claude response")
     sleep_hours: Optional[float] = Field(None, ge=0.1, le=168.0, description="Hours to sleep between executions")
-    chunk_size: Optional[int] = Field(None, ge=1, le=100, description="Number of repos to process in parallel")
+    chunk_size: Optional[int] = Field(None, ge=1, le=100, description="Number of repos in flight, the starting point with adaptive concurrency (each stage has its own worker pool)")
     force_section: Optional[str] = Field(None, description="Force re-execution of specific section (prompt name)")
+    batch_mode: Optional[bool] = Field(None, description="Run analysis steps through the Message Batches API")
+    step_concurrency: Optional[int] = Field(None, ge=1, le=50, description="Number of analysis steps of one repo to run in parallel")
+    adaptive_concurrency: Optional[bool] = Field(None, description="Adjust repos and steps in flight from Claude API feedback (chunk_size is the starting point)")
     
     @validator('claude_model')
     def validate_claude_model(cls, v):
@@ -72,6 +77,7 @@ class PromptsConfigResult(BaseModel):
     prompts_dir: str = Field(..., description="Directory containing prompts")
     processing_order: List[Dict[str, Any]] = Field(..., description="Order of prompt processing")
     prompt_versions: Dict[str, str] = Field(default_factory=dict, description="Mapping of prompt names to versions")
+    diff_ignore_paths: List[str] = Field(default_factory=list, description="Path patterns that never affect any analysis step")
     status: str = Field(default="success", description="Status of the operation")
 
 
@@ -89,6 +95,8 @@ class ProcessAnalysisResult(BaseModel):
     all_results: List[Dict[str, Any]] = Field(..., description="All analysis results")
     total_steps: int = Field(..., ge=0, description="Total number of steps processed")
     cached_steps: int = Field(default=0, ge=0, description="Number of steps served from cache")
+    token_usage: Dict[str, Dict[str, int]] = Field(default_factory=dict, description="Claude token usage per analyzed step")
+    api_feedback: Optional[ClaudeApiFeedback] = Field(None, description="Claude API feedback summed over the analyzed steps")
 
 
 class WriteResultsOutput(BaseModel):
@@ -146,6 +154,7 @@ class InvestigateSingleRepoResult(BaseModel):
     cleanup: Optional[Dict[str, Any]] = Field(None, description="Cleanup operation result")
     last_investigation_timestamp: Optional[str] = Field(None, description="Timestamp of last investigation")
     message: str = Field(..., description="Human-readable message about the result")
+    api_feedback: Optional[ClaudeApiFeedback] = Field(None, description="Claude API feedback summed over the analyzed steps")
     
     @validator('status')
     def validate_status(cls, v):
@@ -205,7 +214,9 @@ class InvestigateReposRequest(BaseModel):
     claude_model: Optional[str] = Field(None, description="Override the Claude model to use")
     max_tokens: Optional[int] = Field(None, ge=1, le=200000, description="Override the max tokens")
     sleep_hours: Optional[float] = Field(None, ge=0.1, le=168.0, description="Hours to sleep between executions")
-    chunk_size: Optional[int] = Field(None, ge=1, le=100, description="Number of repos to process in parallel")
+    chunk_size: Optional[int] = Field(None, ge=1, le=100, description="Number of repos in flight, the starting point with adaptive concurrency (each stage has its own worker pool)")
+    batch_mode: bool = Field(default=False, description="Run analysis steps through the Message Batches API")
+    adaptive_concurrency: Optional[bool] = Field(None, description="Adjust repos and steps in flight from Claude API feedback (default: off)")
     iteration_count: int = Field(default=0, ge=0, description="Current iteration number")
     
     @validator('claude_model')
@@ -216,6 +227,20 @@ class InvestigateReposRequest(BaseModel):
         return v.strip() if v else v
 
 
+class BatchAnalysisRequest(BaseModel):
+    """Signal from a single-repo workflow asking the parent to batch one analysis step."""
+    workflow_id: str = Field(..., description="ID of the requesting workflow")
+    step_name: str = Field(..., description="Name of the analysis step")
+    analyze_input: AnalyzeWithClaudeInput = Field(..., description="Same input as analyze_with_claude_context")
+
+
+class BatchAnalysisResult(BaseModel):
+    """Signal from the parent workflow delivering one batched analysis step."""
+    step_name: str = Field(..., description="Name of the analysis step")
+    output: Optional[AnalyzeWithClaudeOutput] = Field(None, description="Analysis output when the step succeeded")
+    error: Optional[str] = Field(None, description="Error message when the step failed")
+
+
 class InvestigateReposResult(BaseModel):
     """Result from multi-repository investigation workflow."""
     status: str = Field(..., description="Workflow status")
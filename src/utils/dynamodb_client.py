@@ -16,8 +16,21 @@ import boto3
 from boto3.dynamodb.conditions import Key, Attr
 from botocore.exceptions import ClientError
 
+from .storage_codecs import get_default_codec, decode_item_payload
+
 logger = logging.getLogger(__name__)
 
+# Items looked up by reference key (results, temporary data and their chunks) are
+# written with this fixed sort key. Their full primary key is then known up front,
+# so many of them can be read with one BatchGetItem instead of a Query each.
+REFERENCE_ITEM_TIMESTAMP = 0
+
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_MAX_KEYS = 100
+
+# Chunks are up to 350KB, so this many stay well under the 16MB BatchGetItem response limit
+CHUNKS_PER_BATCH = 16
+
 
 class DynamoDBClient:
     """Client for interacting with the architecture hub DynamoDB table."""
@@ -345,8 +358,6 @@ class DynamoDBClient:
             ttl_timestamp = current_timestamp + (ttl_minutes * 60)
             
             # Check if data needs compression or chunking
-            import gzip
-            import base64
             import json
             
             # Prepare the data
@@ -365,39 +376,40 @@ class DynamoDBClient:
             if data_size > 300 * 1024:  # 300KB threshold
                 logger.info(f"Large data detected ({data_size} bytes), compressing before saving...")
                 
-                # Compress the data
-                compressed_data = gzip.compress(data_json.encode('utf-8'))
-                compressed_b64 = base64.b64encode(compressed_data).decode('utf-8')
-                compressed_size = len(compressed_b64)
+                # Compress the data into a Binary attribute
+                codec = get_default_codec()
+                compressed_data = codec.compress(data_json.encode('utf-8'))
+                compressed_size = len(compressed_data)
                 
-                logger.info(f"Compressed from {data_size} to {compressed_size} bytes (ratio: {compressed_size/data_size:.2%})")
+                logger.info(f"Compressed from {data_size} to {compressed_size} bytes with {codec.name} (ratio: {compressed_size/data_size:.2%})")
                 
                 # Check if even compressed data is too large (> 380KB to leave room for metadata)
                 if compressed_size > 380 * 1024:
                     # Need to use chunking strategy
                     return self._save_chunked_analysis_data(
-                        reference_key, prompt_content, repo_structure, 
-                        context, ttl_minutes, current_timestamp, ttl_timestamp
+                        reference_key, compressed_data, codec,
+                        ttl_minutes, REFERENCE_ITEM_TIMESTAMP, ttl_timestamp
                     )
                 
                 # Save compressed data
                 item = {
                     'repository_name': f"_temp_{reference_key}",
-                    'analysis_timestamp': current_timestamp,
+                    'analysis_timestamp': REFERENCE_ITEM_TIMESTAMP,
                     'analysis_type': 'temporary_analysis_data',
                     'reference_key': reference_key,
-                    'compressed_data': compressed_b64,
+                    'compressed_data': compressed_data,
                     'is_compressed': True,
                     'original_size': data_size,
                     'compressed_size': compressed_size,
                     'ttl_timestamp': ttl_timestamp,
-                    'created_at': datetime.now(timezone.utc).isoformat()
+                    'created_at': datetime.now(timezone.utc).isoformat(),
+                    **codec.item_attributes()
                 }
             else:
                 # Data is small enough, save as-is
                 item = {
                     'repository_name': f"_temp_{reference_key}",
-                    'analysis_timestamp': current_timestamp,
+                    'analysis_timestamp': REFERENCE_ITEM_TIMESTAMP,
                     'analysis_type': 'temporary_analysis_data',
                     'reference_key': reference_key,
                     'prompt_content': prompt_content,
@@ -428,47 +440,28 @@ class DynamoDBClient:
             logger.error(f"Error saving temporary analysis data to DynamoDB: {e}")
             raise
     
-    def _save_chunked_analysis_data(self, reference_key: str, prompt_content: str, 
-                                   repo_structure: str, context: Optional[str],
-                                   ttl_minutes: int, current_timestamp: int, 
+    def _save_chunked_analysis_data(self, reference_key: str, compressed_data: bytes,
+                                   codec, ttl_minutes: int, analysis_timestamp: int,
                                    ttl_timestamp: int) -> Dict[str, Any]:
         """
         Save analysis data in chunks when it's too large even after compression.
         
         Args:
             reference_key: Unique reference key
-            prompt_content: The prompt template content
-            repo_structure: Repository structure string
-            context: Optional context from previous analyses
+            compressed_data: The compressed analysis data
+            codec: StorageCodec that compressed the data
             ttl_minutes: TTL in minutes
-            current_timestamp: Current timestamp
+            analysis_timestamp: Sort key shared by the metadata item and all chunks
             ttl_timestamp: TTL timestamp
             
         Returns:
             Dictionary with save status
         """
-        import json
-        import gzip
-        import base64
-        
         logger.info(f"Data too large even after compression, using chunking strategy for: {reference_key}")
         
-        # Prepare data
-        data_to_store = {
-            'prompt_content': prompt_content,
-            'repo_structure': repo_structure
-        }
-        if context:
-            data_to_store['context'] = context
-        
-        # Compress the entire data
-        data_json = json.dumps(data_to_store)
-        compressed_data = gzip.compress(data_json.encode('utf-8'))
-        compressed_b64 = base64.b64encode(compressed_data).decode('utf-8')
-        
         # Split into chunks (350KB per chunk to leave room for metadata)
         chunk_size = 350 * 1024  # 350KB chunks
-        total_size = len(compressed_b64)
+        total_size = len(compressed_data)
         total_chunks = (total_size + chunk_size - 1) // chunk_size  # Ceiling division
         
         logger.info(f"Splitting {total_size} bytes into {total_chunks} chunks")
@@ -477,14 +470,15 @@ class DynamoDBClient:
             # Save metadata item
             metadata_item = {
                 'repository_name': f"_temp_{reference_key}",
-                'analysis_timestamp': current_timestamp,
+                'analysis_timestamp': analysis_timestamp,
                 'analysis_type': 'temporary_analysis_data',
                 'reference_key': reference_key,
                 'is_chunked': True,
                 'total_chunks': total_chunks,
                 'total_size': total_size,
                 'ttl_timestamp': ttl_timestamp,
-                'created_at': datetime.now(timezone.utc).isoformat()
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                **codec.item_attributes()
             }
             metadata_item = self._convert_floats_to_decimal(metadata_item)
             self.table.put_item(Item=metadata_item)
@@ -493,11 +487,11 @@ class DynamoDBClient:
             for i in range(total_chunks):
                 start_idx = i * chunk_size
                 end_idx = min((i + 1) * chunk_size, total_size)
-                chunk_data = compressed_b64[start_idx:end_idx]
+                chunk_data = compressed_data[start_idx:end_idx]
                 
                 chunk_item = {
                     'repository_name': f"_temp_{reference_key}_chunk_{i}",
-                    'analysis_timestamp': current_timestamp,
+                    'analysis_timestamp': analysis_timestamp,
                     'analysis_type': 'temporary_analysis_chunk',
                     'reference_key': reference_key,
                     'chunk_index': i,
@@ -523,47 +517,49 @@ class DynamoDBClient:
             logger.error(f"Error saving chunked data to DynamoDB: {e}")
             raise
     
-    def _get_chunked_analysis_data(self, reference_key: str, total_chunks: int) -> Optional[Dict[str, Any]]:
+    def _get_chunked_analysis_data(self, metadata_item: Dict[str, Any],
+                                   reference_key: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve and reassemble chunked analysis data from DynamoDB.
         
+        Chunks share the metadata item's sort key, so they are fetched with
+        BatchGetItem, several batches in parallel.
+        
         Args:
+            metadata_item: The chunked data's metadata item
             reference_key: Reference key for the chunked data
-            total_chunks: Total number of chunks to retrieve
             
         Returns:
             Dictionary with the reassembled analysis data or None if not found
         """
-        import gzip
-        import base64
         import json
         
+        total_chunks = int(metadata_item.get('total_chunks', 0))
+        analysis_timestamp = int(metadata_item.get('analysis_timestamp', REFERENCE_ITEM_TIMESTAMP))
+        
         logger.info(f"Retrieving {total_chunks} chunks for reference key: {reference_key}")
         
         try:
-            # Retrieve all chunks
+            chunk_names = [f"_temp_{reference_key}_chunk_{i}" for i in range(total_chunks)]
+            keys = [self._item_key(name, analysis_timestamp) for name in chunk_names]
+            items = self.batch_get_items(keys, keys_per_request=CHUNKS_PER_BATCH, parallel=True)
+            
             chunks = []
-            for i in range(total_chunks):
-                response = self.table.query(
-                    KeyConditionExpression=Key('repository_name').eq(f"_temp_{reference_key}_chunk_{i}"),
-                    ScanIndexForward=False,
-                    Limit=1
-                )
-                
-                items = response.get('Items', [])
-                if items:
-                    chunk_data = items[0].get('chunk_data', '')
-                    chunks.append(chunk_data)
-                else:
+            for i, name in enumerate(chunk_names):
+                if name not in items:
                     logger.error(f"Missing chunk {i} for reference key: {reference_key}")
                     return None
+                chunk = items[name].get('chunk_data', b'')
+                chunks.append(chunk.value if hasattr(chunk, 'value') else chunk)
             
-            # Reassemble compressed data
-            compressed_b64 = ''.join(chunks)
+            # Reassemble compressed data (legacy chunks are base64 strings)
+            if all(isinstance(chunk, str) for chunk in chunks):
+                payload = ''.join(chunks)
+            else:
+                payload = b''.join(bytes(chunk) for chunk in chunks)
             
-            # Decompress
-            compressed_data = base64.b64decode(compressed_b64)
-            decompressed_json = gzip.decompress(compressed_data).decode('utf-8')
+            # Decompress with the codec recorded on the metadata item
+            decompressed_json = decode_item_payload(metadata_item, payload).decode('utf-8')
             data = json.loads(decompressed_json)
             
             logger.info(f"Successfully retrieved and reassembled {total_chunks} chunks for {reference_key}")
@@ -586,51 +582,10 @@ class DynamoDBClient:
             Dictionary with the analysis data or None if not found
         """
         try:
-            # Query using the special temporary prefix
-            response = self.table.query(
-                KeyConditionExpression=Key('repository_name').eq(f"_temp_{reference_key}"),
-                ScanIndexForward=False,
-                Limit=1
-            )
+            item = self._get_reference_item(f"_temp_{reference_key}")
             
-            items = response.get('Items', [])
-            
-            if items:
-                item = items[0]
-                # Check if item hasn't expired (though DynamoDB should auto-delete)
-                current_timestamp = int(datetime.now(timezone.utc).timestamp())
-                ttl_timestamp = item.get('ttl_timestamp', 0)
-                
-                if ttl_timestamp > 0 and current_timestamp > ttl_timestamp:
-                    logger.warning(f"Temporary analysis data has expired for key: {reference_key}")
-                    return None
-                
-                # Check if data is chunked
-                if item.get('is_chunked', False):
-                    return self._get_chunked_analysis_data(reference_key, item.get('total_chunks', 0))
-                
-                # Check if data is compressed
-                if item.get('is_compressed', False):
-                    import gzip
-                    import base64
-                    import json
-                    
-                    compressed_b64 = item.get('compressed_data')
-                    if compressed_b64:
-                        # Decompress the data
-                        compressed_data = base64.b64decode(compressed_b64)
-                        decompressed_json = gzip.decompress(compressed_data).decode('utf-8')
-                        data = json.loads(decompressed_json)
-                        
-                        logger.info(f"Retrieved and decompressed temporary analysis data for reference key: {reference_key}")
-                        data['reference_key'] = reference_key
-                        return data
-                    else:
-                        logger.error(f"Compressed data flag set but no compressed_data found for: {reference_key}")
-                        return None
-                
-                # Regular uncompressed data - convert and return
-                return self._convert_decimal_to_float(item)
+            if item:
+                return self._decode_temporary_item(item, reference_key)
             
             logger.warning(f"No temporary analysis data found for key: {reference_key}")
             return None
@@ -639,6 +594,40 @@ class DynamoDBClient:
             logger.error(f"Error retrieving temporary analysis data from DynamoDB: {e}")
             raise
     
+    def _decode_temporary_item(self, item: Dict[str, Any], reference_key: str) -> Optional[Dict[str, Any]]:
+        """Turn a stored temporary analysis data item back into its data, or None if expired/broken."""
+        # Check if item hasn't expired (though DynamoDB should auto-delete)
+        current_timestamp = int(datetime.now(timezone.utc).timestamp())
+        ttl_timestamp = item.get('ttl_timestamp', 0)
+        
+        if ttl_timestamp > 0 and current_timestamp > ttl_timestamp:
+            logger.warning(f"Temporary analysis data has expired for key: {reference_key}")
+            return None
+        
+        # Check if data is chunked
+        if item.get('is_chunked', False):
+            return self._get_chunked_analysis_data(item, reference_key)
+        
+        # Check if data is compressed
+        if item.get('is_compressed', False):
+            import json
+            
+            compressed_data = item.get('compressed_data')
+            if compressed_data:
+                # Decompress the data with the codec recorded on the item
+                decompressed_json = decode_item_payload(item, compressed_data).decode('utf-8')
+                data = json.loads(decompressed_json)
+                
+                logger.info(f"Retrieved and decompressed temporary analysis data for reference key: {reference_key}")
+                data['reference_key'] = reference_key
+                return data
+            else:
+                logger.error(f"Compressed data flag set but no compressed_data found for: {reference_key}")
+                return None
+        
+        # Regular uncompressed data - convert and return
+        return self._convert_decimal_to_float(item)
+    
     def delete_temporary_analysis_data(self, reference_key: str) -> bool:
         """
         Delete temporary analysis data from DynamoDB.
@@ -650,19 +639,17 @@ class DynamoDBClient:
             True if deleted successfully
         """
         try:
-            # First get the item to find the timestamp
-            item = self.get_temporary_analysis_data(reference_key)
-            if not item:
-                logger.info(f"No temporary data to delete for key: {reference_key}")
-                return True
+            repository_name = f"_temp_{reference_key}"
+            self.table.delete_item(Key=self._item_key(repository_name))
             
-            # Delete the item
-            self.table.delete_item(
-                Key={
-                    'repository_name': f"_temp_{reference_key}",
-                    'analysis_timestamp': item['analysis_timestamp']
-                }
+            # Items written before the fixed sort key, which reads would otherwise fall back to
+            response = self.table.query(
+                KeyConditionExpression=Key('repository_name').eq(repository_name),
+                ProjectionExpression='analysis_timestamp'
             )
+            for item in response.get('Items', []):
+                self.table.delete_item(Key=self._item_key(repository_name, item['analysis_timestamp']))
+            
             logger.info(f"Deleted temporary analysis data for key: {reference_key}")
             return True
             
@@ -670,6 +657,40 @@ class DynamoDBClient:
             logger.error(f"Error deleting temporary analysis data from DynamoDB: {e}")
             raise
     
+    def save_shared_input(self, reference_key: str, content: str, ttl_minutes: int = 60) -> Dict[str, Any]:
+        """
+        Save a large input shared by all analysis steps of a run under its
+        content-addressed key. Stored like temporary analysis data, so the same
+        compression and chunking apply.
+        
+        Args:
+            reference_key: Content-addressed key (see KeyNameCreator.create_shared_input_key)
+            content: The shared content
+            ttl_minutes: TTL in minutes (default 60 minutes)
+        
+        Returns:
+            Dictionary with save status
+        """
+        return self.save_temporary_analysis_data(
+            reference_key=reference_key,
+            prompt_content="",
+            repo_structure=content,
+            ttl_minutes=ttl_minutes
+        )
+    
+    def get_shared_input(self, reference_key: str) -> Optional[str]:
+        """
+        Retrieve a shared input saved with save_shared_input.
+        
+        Args:
+            reference_key: Content-addressed key of the input
+        
+        Returns:
+            The shared content or None if not found
+        """
+        data = self.get_temporary_analysis_data(reference_key)
+        return data.get('repo_structure') if data else None
+    
     def save_analysis_result(self,
                            reference_key: str,
                            result_content: str,
@@ -694,40 +715,38 @@ class DynamoDBClient:
             ttl_timestamp = current_timestamp + (ttl_minutes * 60)
             
             # Check if result needs compression
-            import gzip
-            import base64
-            
             result_size = len(result_content.encode('utf-8'))
             
             # If result is large (> 300KB), compress it
             if result_size > 300 * 1024:  # 300KB threshold
                 logger.info(f"Large result detected ({result_size} bytes), compressing before saving...")
                 
-                # Compress the result
-                compressed_data = gzip.compress(result_content.encode('utf-8'))
-                compressed_b64 = base64.b64encode(compressed_data).decode('utf-8')
-                compressed_size = len(compressed_b64)
+                # Compress the result into a Binary attribute
+                codec = get_default_codec()
+                compressed_data = codec.compress(result_content.encode('utf-8'))
+                compressed_size = len(compressed_data)
                 
-                logger.info(f"Compressed result from {result_size} to {compressed_size} bytes (ratio: {compressed_size/result_size:.2%})")
+                logger.info(f"Compressed result from {result_size} to {compressed_size} bytes with {codec.name} (ratio: {compressed_size/result_size:.2%})")
                 
                 # Save compressed result
                 item = {
                     'repository_name': f"_result_{reference_key}",
-                    'analysis_timestamp': current_timestamp,
+                    'analysis_timestamp': REFERENCE_ITEM_TIMESTAMP,
                     'analysis_type': 'analysis_result',
                     'reference_key': reference_key,
-                    'compressed_result': compressed_b64,
+                    'compressed_result': compressed_data,
                     'is_compressed': True,
                     'original_size': result_size,
                     'compressed_size': compressed_size,
                     'ttl_timestamp': ttl_timestamp,
-                    'created_at': datetime.now(timezone.utc).isoformat()
+                    'created_at': datetime.now(timezone.utc).isoformat(),
+                    **codec.item_attributes()
                 }
             else:
                 # Result is small enough, save as-is
                 item = {
                     'repository_name': f"_result_{reference_key}",
-                    'analysis_timestamp': current_timestamp,
+                    'analysis_timestamp': REFERENCE_ITEM_TIMESTAMP,
                     'analysis_type': 'analysis_result',
                     'reference_key': reference_key,
                     'result_content': result_content,
@@ -769,44 +788,10 @@ class DynamoDBClient:
             The result content string or None if not found
         """
         try:
-            # Query using the result prefix
-            response = self.table.query(
-                KeyConditionExpression=Key('repository_name').eq(f"_result_{reference_key}"),
-                ScanIndexForward=False,
-                Limit=1
-            )
+            item = self._get_reference_item(f"_result_{reference_key}")
             
-            items = response.get('Items', [])
-            
-            if items:
-                item = items[0]
-                # Check if item hasn't expired
-                current_timestamp = int(datetime.now(timezone.utc).timestamp())
-                ttl_timestamp = item.get('ttl_timestamp', 0)
-                
-                if ttl_timestamp > 0 and current_timestamp > ttl_timestamp:
-                    logger.warning(f"Analysis result has expired for key: {reference_key}")
-                    return None
-                
-                # Check if result is compressed
-                if item.get('is_compressed', False):
-                    import gzip
-                    import base64
-                    
-                    compressed_b64 = item.get('compressed_result')
-                    if compressed_b64:
-                        # Decompress the result
-                        compressed_data = base64.b64decode(compressed_b64)
-                        decompressed_result = gzip.decompress(compressed_data).decode('utf-8')
-                        
-                        logger.info(f"Retrieved and decompressed analysis result for key: {reference_key}")
-                        return decompressed_result
-                    else:
-                        logger.error(f"Compressed result flag set but no compressed_result found for: {reference_key}")
-                        return None
-                
-                # Return uncompressed result
-                return item.get('result_content')
+            if item:
+                return self._decode_result_item(item, reference_key)
             
             logger.warning(f"No analysis result found for key: {reference_key}")
             return None
@@ -815,11 +800,141 @@ class DynamoDBClient:
             logger.error(f"Error retrieving analysis result from DynamoDB: {e}")
             raise
     
+    def _decode_result_item(self, item: Dict[str, Any], reference_key: str) -> Optional[str]:
+        """Turn a stored analysis result item back into its content, or None if expired/broken."""
+        # Check if item hasn't expired
+        current_timestamp = int(datetime.now(timezone.utc).timestamp())
+        ttl_timestamp = item.get('ttl_timestamp', 0)
+        
+        if ttl_timestamp > 0 and current_timestamp > ttl_timestamp:
+            logger.warning(f"Analysis result has expired for key: {reference_key}")
+            return None
+        
+        # Check if result is compressed
+        if item.get('is_compressed', False):
+            compressed_data = item.get('compressed_result')
+            if compressed_data:
+                # Decompress the result with the codec recorded on the item
+                decompressed_result = decode_item_payload(item, compressed_data).decode('utf-8')
+                
+                logger.info(f"Retrieved and decompressed analysis result for key: {reference_key}")
+                return decompressed_result
+            else:
+                logger.error(f"Compressed result flag set but no compressed_result found for: {reference_key}")
+                return None
+        
+        # Return uncompressed result
+        return item.get('result_content')
+    
+    def get_analysis_results(self, reference_keys: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Retrieve several analysis results with BatchGetItem.
+        
+        Results written before reference items had a fixed sort key are not found
+        by the batch read; those fall back to get_analysis_result one by one.
+        
+        Args:
+            reference_keys: Reference keys of the results
+        
+        Returns:
+            Dictionary mapping each reference key to its content (None if not found)
+        """
+        unique_keys = list(dict.fromkeys(k for k in reference_keys if k))
+        items = self.batch_get_items([self._item_key(f"_result_{k}") for k in unique_keys])
+        
+        results = {}
+        for key in unique_keys:
+            item = items.get(f"_result_{key}")
+            if item is not None:
+                results[key] = self._decode_result_item(item, key)
+            else:
+                results[key] = self.get_analysis_result(key)
+        return results
+    
+    def _get_reference_item(self, repository_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Read an item addressed by reference key.
+        
+        Items are written at REFERENCE_ITEM_TIMESTAMP, so that key is read first;
+        only when it is missing does a Query fall back to the newest item written
+        before the fixed sort key, which would otherwise sort above every new write.
+        """
+        response = self.table.get_item(Key=self._item_key(repository_name), ConsistentRead=True)
+        if 'Item' in response:
+            return response['Item']
+        
+        response = self.table.query(
+            KeyConditionExpression=Key('repository_name').eq(repository_name),
+            ScanIndexForward=False,
+            Limit=1
+        )
+        items = response.get('Items', [])
+        return items[0] if items else None
+    
+    @staticmethod
+    def _item_key(repository_name: str, analysis_timestamp: int = REFERENCE_ITEM_TIMESTAMP) -> Dict[str, Any]:
+        """Primary key of an item addressed by reference key."""
+        return {'repository_name': repository_name, 'analysis_timestamp': analysis_timestamp}
+    
+    def batch_get_items(self, keys: List[Dict[str, Any]], keys_per_request: int = BATCH_GET_MAX_KEYS,
+                        parallel: bool = False, max_attempts: int = 8) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch items by primary key with BatchGetItem, retrying unprocessed keys.
+        
+        Args:
+            keys: Primary keys ({'repository_name': ..., 'analysis_timestamp': ...})
+            keys_per_request: Keys per BatchGetItem request (at most 100)
+            parallel: Send the requests concurrently instead of one after another
+            max_attempts: Attempts per request before unprocessed keys are an error
+        
+        Returns:
+            Dictionary mapping repository_name to the item for every key that exists
+        """
+        import time
+        
+        keys_per_request = min(keys_per_request, BATCH_GET_MAX_KEYS)
+        groups = [keys[i:i + keys_per_request] for i in range(0, len(keys), keys_per_request)]
+        # The resource's low-level client is thread-safe (unlike the resource) and
+        # still converts attribute values to and from Python types
+        client = self.dynamodb.meta.client
+        
+        def fetch(group: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            request = {self.table_name: {
+                'Keys': group,
+                'ConsistentRead': True
+            }}
+            found = []
+            for attempt in range(max_attempts):
+                response = client.batch_get_item(RequestItems=request)
+                found.extend(response.get('Responses', {}).get(self.table_name, []))
+                request = response.get('UnprocessedKeys') or {}
+                if not request:
+                    return found
+                # Throttled or over the response size limit - back off and ask again
+                time.sleep(min(0.05 * (2 ** attempt), 2.0))
+            raise Exception(f"BatchGetItem left {len(request[self.table_name]['Keys'])} keys unprocessed after {max_attempts} attempts")
+        
+        if parallel and len(groups) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(len(groups), 8)) as pool:
+                found_groups = list(pool.map(fetch, groups))
+        else:
+            found_groups = [fetch(group) for group in groups]
+        
+        items = {}
+        for group_items in found_groups:
+            for item in group_items:
+                items[item['repository_name']] = item
+        return items
+    
     def get_multiple_analysis_data(self, reference_keys: list) -> Dict[str, Any]:
         """
         Retrieve multiple analysis data items from DynamoDB.
         Used for combining context from multiple previous steps.
         
+        Temporary data and results for all keys are read with BatchGetItem;
+        keys it does not find fall back to the per-key lookups.
+        
         Args:
             reference_keys: List of reference keys to retrieve
         
@@ -828,10 +943,21 @@ class DynamoDBClient:
         """
         results = {}
         
+        try:
+            item_keys = []
+            for key in reference_keys:
+                item_keys.append(self._item_key(f"_temp_{key}"))
+                item_keys.append(self._item_key(f"_result_{key}"))
+            items = self.batch_get_items(item_keys)
+        except Exception as e:
+            logger.warning(f"Batch read failed, falling back to per-key reads: {e}")
+            items = {}
+        
         for key in reference_keys:
             try:
                 # Try to get as temporary analysis data first
-                data = self.get_temporary_analysis_data(key)
+                temp_item = items.get(f"_temp_{key}")
+                data = self._decode_temporary_item(temp_item, key) if temp_item else self.get_temporary_analysis_data(key)
                 if data:
                     results[key] = {
                         'type': 'analysis_data',
@@ -840,7 +966,8 @@ class DynamoDBClient:
                     continue
                 
                 # Try to get as result
-                result = self.get_analysis_result(key)
+                result_item = items.get(f"_result_{key}")
+                result = self._decode_result_item(result_item, key) if result_item else self.get_analysis_result(key)
                 if result:
                     results[key] = {
                         'type': 'result',
@@ -2,7 +2,8 @@
 PromptContext factory and utilities for managing analysis data references.
 
 This module provides factory functions to create the appropriate PromptContext
-implementation based on the environment (DynamoDB for production, file-based for local testing).
+implementation based on the environment (DynamoDB for production, file-based or SQLite
+for local testing and single-host deployments).
 """
 
 import os
@@ -12,6 +13,7 @@ from typing import Dict, Any, Union
 from .prompt_context_base import PromptContextBase, PromptContextManagerBase
 from .prompt_context_dynamodb import DynamoDBPromptContext, DynamoDBPromptContextManager
 from .prompt_context_file import FileBasedPromptContext, FileBasedPromptContextManager
+from .prompt_context_sqlite import SQLitePromptContext, SQLitePromptContextManager
 
 logger = logging.getLogger(__name__)
 
@@ -21,13 +23,15 @@ def get_storage_backend() -> str:
     Determine which storage backend to use based on environment.
     
     Returns:
-        'dynamodb' for production or 'file' for local testing
+        'dynamodb' for production, 'sqlite' for a single-host database or 'file' for local testing
     """
     # Check environment variables
     storage_backend = os.environ.get('PROMPT_CONTEXT_STORAGE', 'auto')
     
     if storage_backend == 'file':
         return 'file'
+    elif storage_backend == 'sqlite':
+        return 'sqlite'
     elif storage_backend == 'dynamodb':
         return 'dynamodb'
     elif storage_backend == 'auto':
@@ -68,13 +72,16 @@ def create_prompt_context(repo_name: str, step_name: str, prompt_version: str =
         prompt_version: Version of the prompt (default "1")
         
     Returns:
-        PromptContext instance (either DynamoDB or file-based)
+        PromptContext instance (DynamoDB, SQLite or file-based)
     """
     backend = get_storage_backend()
     
     if backend == 'dynamodb':
         logger.debug(f"Creating DynamoDBPromptContext for {repo_name}/{step_name} v{prompt_version}")
         return DynamoDBPromptContext.create_for_step(repo_name, step_name, prompt_version)
+    elif backend == 'sqlite':
+        logger.debug(f"Creating SQLitePromptContext for {repo_name}/{step_name} v{prompt_version}")
+        return SQLitePromptContext.create_for_step(repo_name, step_name, prompt_version)
     else:
         logger.debug(f"Creating FileBasedPromptContext for {repo_name}/{step_name} v{prompt_version}")
         return FileBasedPromptContext.create_for_step(repo_name, step_name, prompt_version)
@@ -88,13 +95,16 @@ def create_prompt_context_from_dict(data: Dict[str, Any]) -> PromptContextBase:
         data: Dictionary containing context data
         
     Returns:
-        PromptContext instance (either DynamoDB or file-based)
+        PromptContext instance (DynamoDB, SQLite or file-based)
     """
     backend = get_storage_backend()
     
     if backend == 'dynamodb':
         logger.debug(f"Creating DynamoDBPromptContext from dict")
         return DynamoDBPromptContext.from_dict(data)
+    elif backend == 'sqlite':
+        logger.debug(f"Creating SQLitePromptContext from dict")
+        return SQLitePromptContext.from_dict(data)
     else:
         logger.debug(f"Creating FileBasedPromptContext from dict")
         return FileBasedPromptContext.from_dict(data)
@@ -108,13 +118,16 @@ def create_prompt_context_manager(repo_name: str) -> PromptContextManagerBase:
         repo_name: Name of the repository being analyzed
         
     Returns:
-        PromptContextManager instance (either DynamoDB or file-based)
+        PromptContextManager instance (DynamoDB, SQLite or file-based)
     """
     backend = get_storage_backend()
     
     if backend == 'dynamodb':
         logger.debug(f"Creating DynamoDBPromptContextManager for {repo_name}")
         return DynamoDBPromptContextManager(repo_name)
+    elif backend == 'sqlite':
+        logger.debug(f"Creating SQLitePromptContextManager for {repo_name}")
+        return SQLitePromptContextManager(repo_name)
     else:
         logger.debug(f"Creating FileBasedPromptContextManager for {repo_name}")
         return FileBasedPromptContextManager(repo_name)
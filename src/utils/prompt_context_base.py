@@ -28,6 +28,7 @@ class PromptContextBase(ABC):
     context_reference_keys: List[str] = field(default_factory=list)
     result_reference_key: str = None
     prompt_version: str = "1"
+    repo_structure_ref: str = None  # Shared-input key used instead of storing the structure per step
     
     @classmethod
     def create_for_step(cls, repo_name: str, step_name: str, prompt_version: str = "1") -> 'PromptContextBase':
@@ -45,13 +46,14 @@ class PromptContextBase(ABC):
         return cls(repo_name=repo_name, step_name=step_name, prompt_version=prompt_version)
     
     @abstractmethod
-    def save_prompt_data(self, prompt_content: str, repo_structure: str, ttl_minutes: int = 60) -> str:
+    def save_prompt_data(self, prompt_content: str, repo_structure: Optional[str], ttl_minutes: int = 60) -> str:
         """
         Save prompt and repository structure to storage.
         
         Args:
             prompt_content: The prompt template content
-            repo_structure: Repository structure string
+            repo_structure: Repository structure string, or None when repo_structure_ref
+                points to the shared copy
             ttl_minutes: TTL for the data in minutes (may be ignored by some implementations)
             
         Returns:
@@ -69,6 +71,16 @@ class PromptContextBase(ABC):
         """
         pass
     
+    @abstractmethod
+    def get_context(self) -> Optional[str]:
+        """
+        Build the context text from the results of the referenced previous steps.
+        
+        Returns:
+            Combined context, or None if there are no context references
+        """
+        pass
+    
     @abstractmethod
     def get_result(self) -> Optional[str]:
         """
@@ -124,7 +136,8 @@ class PromptContextBase(ABC):
             "data_reference_key": self.data_reference_key,
             "context_reference_keys": self.context_reference_keys,
             "result_reference_key": self.result_reference_key,
-            "prompt_version": self.prompt_version
+            "prompt_version": self.prompt_version,
+            "repo_structure_ref": self.repo_structure_ref
         }
     
     @classmethod
@@ -144,7 +157,8 @@ class PromptContextBase(ABC):
             data_reference_key=data.get("data_reference_key"),
             context_reference_keys=data.get("context_reference_keys", []),
             result_reference_key=data.get("result_reference_key"),
-            prompt_version=data.get("prompt_version", "1")
+            prompt_version=data.get("prompt_version", "1"),
+            repo_structure_ref=data.get("repo_structure_ref")
         )
     
     def to_json(self) -> str:
@@ -218,6 +232,34 @@ class PromptContextManagerBase(ABC):
         """
         pass
     
+    @abstractmethod
+    def save_shared_input(self, content: str, ttl_minutes: int = 60) -> str:
+        """
+        Save a large input shared by all steps of a run (repository structure,
+        formatted dependencies) under a content-addressed key.
+        
+        Args:
+            content: The shared content
+            ttl_minutes: TTL for the data in minutes (may be ignored by some implementations)
+            
+        Returns:
+            Reference key for the content; identical content gets the same key
+        """
+        pass
+    
+    @abstractmethod
+    def get_shared_input(self, reference_key: str) -> Optional[str]:
+        """
+        Retrieve a shared input saved with save_shared_input.
+        
+        Args:
+            reference_key: Reference key returned by save_shared_input
+            
+        Returns:
+            The shared content or None if not found
+        """
+        pass
+    
     def register_result(self, step_name: str, result_key: str):
         """
         Register a step's result key for use as context in later steps.
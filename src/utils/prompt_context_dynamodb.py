@@ -11,6 +11,7 @@ from dataclasses import dataclass, field
 
 from .prompt_context_base import PromptContextBase, PromptContextManagerBase
 from .dynamodb_client import get_dynamodb_client
+from .storage_keys import KeyNameCreator
 
 logger = logging.getLogger(__name__)
 
@@ -30,13 +31,14 @@ class DynamoDBPromptContext(PromptContextBase):
         if self._dynamodb_client is None:
             self._dynamodb_client = get_dynamodb_client()
     
-    def save_prompt_data(self, prompt_content: str, repo_structure: str, ttl_minutes: int = 60) -> str:
+    def save_prompt_data(self, prompt_content: str, repo_structure: Optional[str], ttl_minutes: int = 60) -> str:
         """
         Save prompt and repository structure to DynamoDB.
         
         Args:
             prompt_content: The prompt template content
-            repo_structure: Repository structure string
+            repo_structure: Repository structure string, or None when repo_structure_ref
+                points to the shared copy
             ttl_minutes: TTL for the data in minutes
             
         Returns:
@@ -51,7 +53,7 @@ class DynamoDBPromptContext(PromptContextBase):
         result = self._dynamodb_client.save_temporary_analysis_data(
             reference_key=self.data_reference_key,
             prompt_content=prompt_content,
-            repo_structure=repo_structure,
+            repo_structure=repo_structure or "",
             context=None,  # Context is handled separately through reference keys
             ttl_minutes=ttl_minutes
         )
@@ -80,15 +82,30 @@ class DynamoDBPromptContext(PromptContextBase):
         
         prompt_content = temp_data.get('prompt_content')
         repo_structure = temp_data.get('repo_structure')
+        if self.repo_structure_ref:
+            repo_structure = self._dynamodb_client.get_shared_input(self.repo_structure_ref)
         
-        # Build context from reference keys
+        return {
+            "prompt_content": prompt_content,
+            "repo_structure": repo_structure,
+            "context": self.get_context()
+        }
+    
+    def get_context(self) -> Optional[str]:
+        """
+        Build the context text from the results of previous steps.
+        
+        Returns:
+            Combined context, or None if there are no context references
+        """
         context = None
         if self.context_reference_keys:
             logger.info(f"Building context from {len(self.context_reference_keys)} references")
             context_parts = []
+            results = self._dynamodb_client.get_analysis_results(self.context_reference_keys)
             
             for context_key in self.context_reference_keys:
-                result = self._dynamodb_client.get_analysis_result(context_key)
+                result = results.get(context_key)
                 if result:
                     # Extract step name from key for better formatting
                     parts = context_key.split('_')
@@ -100,11 +117,7 @@ class DynamoDBPromptContext(PromptContextBase):
             if context_parts:
                 context = "\n\n".join(context_parts)
         
-        return {
-            "prompt_content": prompt_content,
-            "repo_structure": repo_structure,
-            "context": context
-        }
+        return context
     
     def save_result(self, result_content: str, ttl_minutes: int = 60) -> str:
         """
@@ -210,12 +223,42 @@ class DynamoDBPromptContextManager(PromptContextManagerBase):
         """
         dynamodb_client = get_dynamodb_client()
         results = {}
+        contents = dynamodb_client.get_analysis_results(list(self.step_results.values()))
         
         for step_name, result_key in self.step_results.items():
-            content = dynamodb_client.get_analysis_result(result_key)
+            content = contents.get(result_key)
             if content:
                 results[step_name] = content
             else:
                 logger.warning(f"No content found in DynamoDB for step {step_name}")
         
         return results
+    
+    def save_shared_input(self, content: str, ttl_minutes: int = 60) -> str:
+        """
+        Save a shared input to DynamoDB under its content-addressed key.
+        
+        Args:
+            content: The shared content
+            ttl_minutes: TTL for the data in minutes
+            
+        Returns:
+            Reference key for the content
+        """
+        reference_key = KeyNameCreator.create_shared_input_key(self.repo_name, content).to_storage_key()
+        result = get_dynamodb_client().save_shared_input(reference_key, content, ttl_minutes=ttl_minutes)
+        if result["status"] != "success":
+            raise Exception(f"Failed to save shared input {reference_key}")
+        return reference_key
+    
+    def get_shared_input(self, reference_key: str) -> Optional[str]:
+        """
+        Retrieve a shared input from DynamoDB.
+        
+        Args:
+            reference_key: Reference key returned by save_shared_input
+            
+        Returns:
+            The shared content or None if not found
+        """
+        return get_dynamodb_client().get_shared_input(reference_key)
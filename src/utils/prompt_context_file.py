@@ -20,6 +20,21 @@ from .storage_keys import KeyNameCreator
 logger = logging.getLogger(__name__)
 
 
+def _shared_input_path(storage_dir: Path, reference_key: str) -> Path:
+    """File holding a shared input."""
+    return storage_dir / f"_shared_{reference_key}.json"
+
+
+def _read_shared_input(storage_dir: Path, reference_key: str) -> Optional[str]:
+    """Read a shared input file, or None if it does not exist."""
+    file_path = _shared_input_path(storage_dir, reference_key)
+    if not file_path.exists():
+        logger.warning(f"No shared input file found for key: {reference_key}")
+        return None
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('content')
+
+
 @dataclass
 class FileBasedPromptContext(PromptContextBase):
     """
@@ -50,13 +65,14 @@ class FileBasedPromptContext(PromptContextBase):
         """Get the file path for a given key."""
         return self._storage_dir / f"{key}.json"
     
-    def save_prompt_data(self, prompt_content: str, repo_structure: str, ttl_minutes: int = 60) -> str:
+    def save_prompt_data(self, prompt_content: str, repo_structure: Optional[str], ttl_minutes: int = 60) -> str:
         """
         Save prompt and repository structure to files.
         
         Args:
             prompt_content: The prompt template content
-            repo_structure: Repository structure string
+            repo_structure: Repository structure string, or None when repo_structure_ref
+                points to the shared copy
             ttl_minutes: TTL for the data in minutes (ignored in file implementation)
             
         Returns:
@@ -76,7 +92,7 @@ class FileBasedPromptContext(PromptContextBase):
         # Save to file using file-safe key
         data = {
             "prompt_content": prompt_content,
-            "repo_structure": repo_structure,
+            "repo_structure": repo_structure or "",
             "step_name": self.step_name,
             "repo_name": self.repo_name
         }
@@ -110,15 +126,31 @@ class FileBasedPromptContext(PromptContextBase):
         
         prompt_content = temp_data.get('prompt_content')
         repo_structure = temp_data.get('repo_structure')
+        if self.repo_structure_ref:
+            repo_structure = _read_shared_input(self._storage_dir, self.repo_structure_ref)
+        
+        return {
+            "prompt_content": prompt_content,
+            "repo_structure": repo_structure,
+            "context": self.get_context()
+        }
+    
+    def get_context(self) -> Optional[str]:
+        """
+        Build the context text from the results of previous steps.
         
-        # Build context from reference keys
+        Returns:
+            Combined context, or None if there are no context references
+        """
         context = None
         if self.context_reference_keys:
             logger.info(f"Building context from {len(self.context_reference_keys)} references")
             context_parts = []
             
             for context_key in self.context_reference_keys:
-                result_file = self._get_file_path(context_key)
+                # Results are stored under the file-safe key with the _result_ prefix
+                result_key_obj = KeyNameCreator.create_analysis_result_key(context_key)
+                result_file = self._get_file_path(result_key_obj.to_file_safe_key())
                 if result_file.exists():
                     with open(result_file, 'r', encoding='utf-8') as f:
                         result_data = json.load(f)
@@ -134,11 +166,7 @@ class FileBasedPromptContext(PromptContextBase):
             if context_parts:
                 context = "\n\n".join(context_parts)
         
-        return {
-            "prompt_content": prompt_content,
-            "repo_structure": repo_structure,
-            "context": context
-        }
+        return context
     
     def get_result(self) -> Optional[str]:
         """
@@ -270,6 +298,37 @@ class FileBasedPromptContextManager(PromptContextManagerBase):
         
         return results
     
+    def save_shared_input(self, content: str, ttl_minutes: int = 60) -> str:
+        """
+        Save a shared input to a content-addressed file.
+        
+        Args:
+            content: The shared content
+            ttl_minutes: TTL in minutes (ignored in file implementation)
+            
+        Returns:
+            Reference key for the content
+        """
+        reference_key = KeyNameCreator.create_shared_input_key(self.repo_name, content).to_file_safe_key()
+        file_path = _shared_input_path(self._storage_dir, reference_key)
+        if not file_path.exists():
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump({"content": content, "reference_key": reference_key}, f)
+            logger.info(f"Saved shared input to: {file_path}")
+        return reference_key
+    
+    def get_shared_input(self, reference_key: str) -> Optional[str]:
+        """
+        Retrieve a shared input from file storage.
+        
+        Args:
+            reference_key: Reference key returned by save_shared_input
+            
+        Returns:
+            The shared content or None if not found
+        """
+        return _read_shared_input(self._storage_dir, reference_key)
+    
     def cleanup_all(self):
         """Clean up all contexts and the storage directory."""
         super().cleanup_all()
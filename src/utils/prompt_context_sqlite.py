@@ -0,0 +1,581 @@
+"""
+SQLite implementation of prompt context storage.
+
+Keeps prompt data, results, shared inputs and investigation metadata in one
+SQLite database in WAL mode, so several worker threads and processes on one
+host can read and write concurrently. Unlike the file backend it honours
+ttl_minutes (expired rows are never returned and are purged periodically)
+and reads many results with one query.
+
+Select it with PROMPT_CONTEXT_STORAGE=sqlite. The database lives at
+PROMPT_CONTEXT_SQLITE_PATH, or prompt_context.sqlite3 in the file backend's
+storage directory.
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterable, List, Optional
+
+from .prompt_context_base import PromptContextBase, PromptContextManagerBase
+from .storage_keys import KeyNameCreator
+
+logger = logging.getLogger(__name__)
+
+# Item kinds stored in the items table
+KIND_PROMPT_DATA = "prompt_data"
+KIND_RESULT = "result"
+KIND_SHARED = "shared"
+KIND_TEMP = "temp"
+
+# Stay below SQLite's limit on bound parameters per statement
+MAX_KEYS_PER_QUERY = 500
+
+# Seconds between purges of expired rows
+PURGE_INTERVAL_SECONDS = 600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    kind TEXT NOT NULL,
+    item_key TEXT NOT NULL,
+    repo_name TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (kind, item_key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_items_repo ON items (repo_name);
+CREATE INDEX IF NOT EXISTS idx_items_expires ON items (expires_at) WHERE expires_at IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS investigations (
+    repository_name TEXT NOT NULL,
+    analysis_type TEXT NOT NULL,
+    analysis_timestamp REAL NOT NULL,
+    metadata TEXT NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (repository_name, analysis_type, analysis_timestamp)
+) WITHOUT ROWID;
+"""
+
+
+def get_sqlite_path() -> Path:
+    """Path of the SQLite database for prompt context storage."""
+    if os.environ.get('PROMPT_CONTEXT_SQLITE_PATH'):
+        return Path(os.environ['PROMPT_CONTEXT_SQLITE_PATH'])
+    if os.environ.get('PROMPT_CONTEXT_STORAGE_DIR'):
+        base_dir = Path(os.environ['PROMPT_CONTEXT_STORAGE_DIR'])
+    else:
+        # Same default directory as the file backend
+        project_root = Path(__file__).parent.parent.parent  # Go up from src/utils/ to project root
+        base_dir = project_root / 'temp' / 'prompt_context_storage'
+    return base_dir / 'prompt_context.sqlite3'
+
+
+class SQLiteStore:
+    """
+    Key-value store with TTL on top of one SQLite database.
+
+    Each thread gets its own connection; WAL mode lets readers proceed while
+    another connection writes.
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Args:
+            db_path: Path of the database file (created if missing)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._last_purge = 0.0
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+        logger.info(f"Using SQLite storage at: {self.db_path}")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _expires_at(ttl_minutes: Optional[int]) -> Optional[float]:
+        return time.time() + ttl_minutes * 60 if ttl_minutes else None
+
+    def put(self, kind: str, item_key: str, repo_name: str, content: str,
+            ttl_minutes: Optional[int] = None) -> None:
+        """Insert or replace an item; ttl_minutes of None or 0 never expires."""
+        self._connection().execute(
+            "INSERT OR REPLACE INTO items (kind, item_key, repo_name, content, created_at, expires_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (kind, item_key, repo_name, content, time.time(), self._expires_at(ttl_minutes))
+        )
+        self._maybe_purge()
+
+    def get(self, kind: str, item_key: str) -> Optional[str]:
+        """Get an item's content, or None if missing or expired."""
+        row = self._connection().execute(
+            "SELECT content FROM items WHERE kind = ? AND item_key = ? "
+            "AND (expires_at IS NULL OR expires_at > ?)",
+            (kind, item_key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_many(self, kind: str, item_keys: Iterable[str]) -> Dict[str, str]:
+        """Get the content of several items; missing and expired keys are left out."""
+        keys = list(dict.fromkeys(item_keys))
+        found = {}
+        now = time.time()
+        conn = self._connection()
+        for i in range(0, len(keys), MAX_KEYS_PER_QUERY):
+            batch = keys[i:i + MAX_KEYS_PER_QUERY]
+            placeholders = ",".join("?" * len(batch))
+            rows = conn.execute(
+                f"SELECT item_key, content FROM items WHERE kind = ? AND item_key IN ({placeholders}) "
+                "AND (expires_at IS NULL OR expires_at > ?)",
+                (kind, *batch, now)
+            ).fetchall()
+            found.update(rows)
+        return found
+
+    def exists(self, kind: str, item_key: str) -> bool:
+        return self.get(kind, item_key) is not None
+
+    def delete(self, kind: str, item_key: str) -> None:
+        self._connection().execute("DELETE FROM items WHERE kind = ? AND item_key = ?", (kind, item_key))
+
+    def delete_repo(self, repo_name: str) -> int:
+        """Delete every item of a repository; returns the number of rows removed."""
+        return self._connection().execute("DELETE FROM items WHERE repo_name = ?", (repo_name,)).rowcount
+
+    def put_investigation(self, repository_name: str, analysis_type: str, metadata: Dict[str, Any],
+                          ttl_days: Optional[int] = None) -> None:
+        """Append an investigation metadata record."""
+        expires_at = self._expires_at(ttl_days * 24 * 60 if ttl_days else None)
+        self._connection().execute(
+            "INSERT OR REPLACE INTO investigations "
+            "(repository_name, analysis_type, analysis_timestamp, metadata, expires_at) VALUES (?, ?, ?, ?, ?)",
+            (repository_name, analysis_type, metadata['analysis_timestamp'], json.dumps(metadata), expires_at)
+        )
+
+    def get_latest_investigation(self, repository_name: str,
+                                 analysis_type: str = "investigation") -> Optional[Dict[str, Any]]:
+        """Newest unexpired investigation metadata record for a repository."""
+        row = self._connection().execute(
+            "SELECT metadata FROM investigations WHERE repository_name = ? AND analysis_type = ? "
+            "AND (expires_at IS NULL OR expires_at > ?) ORDER BY analysis_timestamp DESC LIMIT 1",
+            (repository_name, analysis_type, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def purge_expired(self) -> int:
+        """Delete expired rows; returns the number removed."""
+        now = time.time()
+        conn = self._connection()
+        removed = conn.execute("DELETE FROM items WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)).rowcount
+        removed += conn.execute(
+            "DELETE FROM investigations WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        ).rowcount
+        self._last_purge = now
+        if removed:
+            logger.info(f"Purged {removed} expired rows from {self.db_path}")
+        return removed
+
+    def _maybe_purge(self) -> None:
+        if time.time() - self._last_purge > PURGE_INTERVAL_SECONDS:
+            self.purge_expired()
+
+
+_stores: Dict[str, SQLiteStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_sqlite_store(db_path: Optional[Path] = None) -> SQLiteStore:
+    """Get the process-wide SQLiteStore for a database path (default get_sqlite_path())."""
+    path = str(db_path or get_sqlite_path())
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = SQLiteStore(Path(path))
+            _stores[path] = store
+    return store
+
+
+def _format_context(context_keys: List[str], results: Dict[str, str]) -> Optional[str]:
+    """Combine the results of previous steps into the context text."""
+    context_parts = []
+    for context_key in context_keys:
+        result = results.get(context_key)
+        if result:
+            # Extract step name from key for better formatting
+            parts = context_key.split('_')
+            step_name = parts[1] if len(parts) > 1 else context_key
+            context_parts.append(f"## {step_name}\n\n{result}")
+        else:
+            logger.warning(f"No result found for context key: {context_key}")
+    return "\n\n".join(context_parts) if context_parts else None
+
+
+@dataclass
+class SQLitePromptContext(PromptContextBase):
+    """
+    SQLite implementation of PromptContext.
+    """
+
+    _store: SQLiteStore = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        """Attach the process-wide store after dataclass initialization."""
+        if self._store is None:
+            self._store = get_sqlite_store()
+
+    def save_prompt_data(self, prompt_content: str, repo_structure: Optional[str], ttl_minutes: int = 60) -> str:
+        """
+        Save prompt and repository structure to SQLite.
+
+        Args:
+            prompt_content: The prompt template content
+            repo_structure: Repository structure string, or None when repo_structure_ref
+                points to the shared copy
+            ttl_minutes: TTL for the data in minutes
+
+        Returns:
+            Reference key for the saved data
+        """
+        unique_id = str(uuid.uuid4())[:8]
+        key_obj = KeyNameCreator.create_prompt_data_key(
+            repo_name=self.repo_name,
+            step_name=self.step_name,
+            unique_id=unique_id
+        )
+        self.data_reference_key = key_obj.to_storage_key()
+
+        data = {
+            "prompt_content": prompt_content,
+            "repo_structure": repo_structure or "",
+            "step_name": self.step_name,
+            "repo_name": self.repo_name
+        }
+        self._store.put(KIND_PROMPT_DATA, self.data_reference_key, self.repo_name, json.dumps(data), ttl_minutes)
+
+        logger.info(f"Saved prompt data to SQLite with key: {self.data_reference_key}")
+        return self.data_reference_key
+
+    def get_prompt_and_context(self) -> Dict[str, Any]:
+        """
+        Retrieve prompt data and context from SQLite.
+
+        Returns:
+            Dictionary containing prompt_content, repo_structure, and context
+        """
+        if not self.data_reference_key:
+            raise ValueError("No data reference key set. Call save_prompt_data first.")
+
+        logger.info(f"Retrieving prompt data from SQLite with key: {self.data_reference_key}")
+
+        content = self._store.get(KIND_PROMPT_DATA, self.data_reference_key)
+        if content is None:
+            raise Exception(f"No prompt data found for key: {self.data_reference_key}")
+        temp_data = json.loads(content)
+
+        repo_structure = temp_data.get('repo_structure')
+        if self.repo_structure_ref:
+            repo_structure = self._store.get(KIND_SHARED, self.repo_structure_ref)
+
+        return {
+            "prompt_content": temp_data.get('prompt_content'),
+            "repo_structure": repo_structure,
+            "context": self.get_context()
+        }
+
+    def get_context(self) -> Optional[str]:
+        """
+        Build the context text from the results of previous steps.
+
+        Returns:
+            Combined context, or None if there are no context references
+        """
+        if not self.context_reference_keys:
+            return None
+        logger.info(f"Building context from {len(self.context_reference_keys)} references")
+        results = self._store.get_many(KIND_RESULT, self.context_reference_keys)
+        return _format_context(self.context_reference_keys, results)
+
+    def get_result(self) -> Optional[str]:
+        """
+        Retrieve the analysis result from SQLite.
+
+        Returns:
+            The result content or None if not found
+        """
+        if not self.result_reference_key:
+            logger.warning("No result reference key set")
+            return None
+        return self._store.get(KIND_RESULT, self.result_reference_key)
+
+    def cleanup(self):
+        """
+        Delete the prompt data and result associated with this context.
+        """
+        if self.data_reference_key:
+            self._store.delete(KIND_PROMPT_DATA, self.data_reference_key)
+        if self.result_reference_key:
+            self._store.delete(KIND_RESULT, self.result_reference_key)
+
+
+class SQLitePromptContextManager(PromptContextManagerBase):
+    """
+    SQLite implementation of PromptContextManager.
+
+    Also provides the storage client methods InvestigationCache uses.
+    """
+
+    def __init__(self, repo_name: str):
+        """
+        Initialize the manager for a repository.
+
+        Args:
+            repo_name: Name of the repository being analyzed
+        """
+        super().__init__(repo_name)
+        self._store = get_sqlite_store()
+
+    def create_context_for_step(self, step_name: str, context_config: List = None) -> SQLitePromptContext:
+        """
+        Create a new SQLite context for an analysis step with proper context references.
+
+        Args:
+            step_name: Name of the analysis step
+            context_config: Configuration for which previous steps to include as context
+
+        Returns:
+            New SQLitePromptContext instance
+        """
+        context = SQLitePromptContext.create_for_step(self.repo_name, step_name)
+
+        # Add context references based on configuration
+        if context_config:
+            for context_step in context_config:
+                # Handle both string and dict formats
+                if isinstance(context_step, dict):
+                    step_ref = context_step.get("val")
+                else:
+                    step_ref = context_step
+
+                if step_ref and step_ref in self.step_results:
+                    context.add_context_reference(self.step_results[step_ref])
+
+        self.contexts[step_name] = context
+        return context
+
+    def retrieve_all_results(self) -> Dict[str, str]:
+        """
+        Retrieve all results from SQLite in one query.
+
+        Returns:
+            Dictionary mapping step names to their result content
+        """
+        contents = self._store.get_many(KIND_RESULT, self.step_results.values())
+        results = {}
+        for step_name, result_key in self.step_results.items():
+            if result_key in contents:
+                results[step_name] = contents[result_key]
+            else:
+                logger.warning(f"No result found in SQLite for step {step_name}")
+        return results
+
+    def save_shared_input(self, content: str, ttl_minutes: int = 60) -> str:
+        """
+        Save a shared input under its content-addressed key.
+
+        Args:
+            content: The shared content
+            ttl_minutes: TTL in minutes
+
+        Returns:
+            Reference key for the content
+        """
+        reference_key = KeyNameCreator.create_shared_input_key(self.repo_name, content).to_storage_key()
+        self._store.put(KIND_SHARED, reference_key, self.repo_name, content, ttl_minutes)
+        return reference_key
+
+    def get_shared_input(self, reference_key: str) -> Optional[str]:
+        """
+        Retrieve a shared input from SQLite.
+
+        Args:
+            reference_key: Reference key returned by save_shared_input
+
+        Returns:
+            The shared content or None if not found
+        """
+        content = self._store.get(KIND_SHARED, reference_key)
+        if content is None:
+            logger.warning(f"No shared input found for key: {reference_key}")
+        return content
+
+    def cleanup_all(self):
+        """Clean up all contexts and every stored item of this repository."""
+        super().cleanup_all()
+        removed = self._store.delete_repo(self.repo_name)
+        logger.info(f"Removed {removed} SQLite items for {self.repo_name}")
+
+    def save_analysis_result(self, reference_key: str, result_content: str,
+                           step_name: str = None, ttl_minutes: int = 60) -> Dict[str, Any]:
+        """
+        Save analysis result to SQLite.
+
+        Args:
+            reference_key: Unique reference key for this result
+            result_content: The analysis result content
+            step_name: Optional step name for tracking
+            ttl_minutes: TTL in minutes
+
+        Returns:
+            Dictionary with save status
+        """
+        try:
+            self._store.put(KIND_RESULT, reference_key, self.repo_name, result_content, ttl_minutes)
+            logger.info(f"Saved analysis result to SQLite with key: {reference_key}")
+            return {
+                "status": "success",
+                "reference_key": reference_key,
+                "timestamp": time.time()
+            }
+        except Exception as e:
+            logger.error(f"Failed to save analysis result: {str(e)}")
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+
+    def get_analysis_result(self, reference_key: str) -> Optional[str]:
+        """
+        Retrieve analysis result from SQLite.
+
+        Args:
+            reference_key: The unique reference key for the result
+
+        Returns:
+            The result content string or None if not found or expired
+        """
+        return self._store.get(KIND_RESULT, reference_key)
+
+    def get_analysis_results(self, reference_keys: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Retrieve several analysis results in one query.
+
+        Args:
+            reference_keys: Reference keys of the results
+
+        Returns:
+            Dictionary mapping each reference key to its content (None if not found)
+        """
+        found = self._store.get_many(KIND_RESULT, reference_keys)
+        return {key: found.get(key) for key in reference_keys}
+
+    def save_temporary_analysis_data(self, reference_key: str, prompt_content: str,
+                                    repo_structure: str, context: Optional[str] = None,
+                                    ttl_minutes: int = 60) -> Dict[str, Any]:
+        """
+        Save temporary analysis data to SQLite.
+
+        Args:
+            reference_key: Unique reference key for this analysis data
+            prompt_content: The prompt template content
+            repo_structure: Repository structure string
+            context: Optional context from previous analyses
+            ttl_minutes: TTL in minutes
+
+        Returns:
+            Dictionary with save status
+        """
+        data = {'prompt_content': prompt_content, 'repo_structure': repo_structure}
+        if context:
+            data['context'] = context
+        self._store.put(KIND_TEMP, reference_key, self.repo_name, json.dumps(data), ttl_minutes)
+        return {"status": "success", "reference_key": reference_key, "ttl_minutes": ttl_minutes}
+
+    def get_temporary_analysis_data(self, reference_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve temporary analysis data from SQLite.
+
+        Args:
+            reference_key: The unique reference key for the analysis data
+
+        Returns:
+            Dictionary with the analysis data or None if not found or expired
+        """
+        content = self._store.get(KIND_TEMP, reference_key)
+        if content is None:
+            logger.warning(f"No temporary analysis data found for key: {reference_key}")
+            return None
+        data = json.loads(content)
+        data['reference_key'] = reference_key
+        return data
+
+    def save_investigation_metadata(self, repository_name: str, repository_url: str,
+                                   latest_commit: str, branch_name: str,
+                                   analysis_type: str = "investigation",
+                                   analysis_data: Dict[str, Any] = None,
+                                   ttl_days: int = 90) -> Dict[str, Any]:
+        """
+        Save investigation metadata to SQLite.
+
+        Every investigation is kept as its own row; get_latest_investigation
+        returns the newest one.
+
+        Args:
+            repository_name: Name of the repository
+            repository_url: URL of the repository
+            latest_commit: Latest commit SHA
+            branch_name: Branch name
+            analysis_type: Type of analysis
+            analysis_data: Additional analysis data
+            ttl_days: TTL in days
+
+        Returns:
+            The saved metadata
+        """
+        metadata = {
+            "repository_name": repository_name,
+            "repository_url": repository_url,
+            "latest_commit": latest_commit,
+            "branch_name": branch_name,
+            "analysis_type": analysis_type,
+            "analysis_timestamp": time.time(),
+            "analysis_data": analysis_data or {}
+        }
+
+        # Include prompt metadata if provided
+        if analysis_data and 'prompt_metadata' in analysis_data:
+            metadata['prompt_metadata'] = analysis_data['prompt_metadata']
+
+        self._store.put_investigation(repository_name, analysis_type, metadata, ttl_days)
+        logger.info(f"Saved investigation metadata to SQLite for {repository_name} (commit: {latest_commit[:8]})")
+        return metadata
+
+    def get_latest_investigation(self, repository_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the latest investigation metadata for a repository.
+
+        Args:
+            repository_name: Name of the repository
+
+        Returns:
+            Investigation metadata dictionary or None if not found
+        """
+        metadata = self._store.get_latest_investigation(repository_name)
+        if metadata is None:
+            logger.debug(f"No investigation metadata found for: {repository_name}")
+        return metadata
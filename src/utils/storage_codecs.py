@@ -0,0 +1,192 @@
+"""
+Compression codecs for large items in the DynamoDB storage.
+
+Large results and temporary analysis data are compressed and stored in Binary
+attributes. Every compressed item records the codec that wrote it (the
+`codec` attribute), so items written with an older codec keep decoding after
+the default changes:
+
+- zstd: default when the `zstandard` package is installed, optionally with a
+  dictionary trained on existing .arch.md files (DYNAMODB_ZSTD_DICT)
+- gzip: fallback when zstandard is not installed
+- gzip+base64: items written before codecs were recorded (string attributes)
+
+Environment:
+    DYNAMODB_STORAGE_CODEC: codec for new items ("zstd" or "gzip", default "zstd")
+    DYNAMODB_ZSTD_LEVEL: zstd compression level (default 9)
+    DYNAMODB_ZSTD_DICT: path to a zstd dictionary (see scripts/train_zstd_dictionary.py)
+"""
+
+import base64
+import gzip
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Union
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Codec of items written before the codec was recorded on the item
+LEGACY_CODEC = "gzip+base64"
+
+
+class StorageCodec(ABC):
+    """Compresses and decompresses stored payloads."""
+
+    name = ""
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        """Compress a payload for storage."""
+        pass
+
+    @abstractmethod
+    def decompress(self, data: bytes) -> bytes:
+        """Decompress a payload written by compress."""
+        pass
+
+    def item_attributes(self) -> Dict[str, Union[str, int]]:
+        """Attributes recorded on every item this codec writes."""
+        return {"codec": self.name}
+
+
+class GzipCodec(StorageCodec):
+    name = "gzip"
+
+    def compress(self, data: bytes) -> bytes:
+        return gzip.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return gzip.decompress(data)
+
+
+class LegacyGzipBase64Codec(StorageCodec):
+    """Reads items stored as base64-encoded gzip strings."""
+
+    name = LEGACY_CODEC
+
+    def compress(self, data: bytes) -> bytes:
+        return base64.b64encode(gzip.compress(data))
+
+    def decompress(self, data: bytes) -> bytes:
+        return gzip.decompress(base64.b64decode(data))
+
+
+class ZstdCodec(StorageCodec):
+    name = "zstd"
+
+    def __init__(self, level: int = 9, dict_data: Optional[bytes] = None):
+        """
+        Args:
+            level: zstd compression level
+            dict_data: Optional trained zstd dictionary
+        """
+        if not ZSTD_AVAILABLE:
+            raise ImportError("The zstandard package is required for the zstd storage codec")
+        self.level = level
+        self.dictionary = zstandard.ZstdCompressionDict(dict_data) if dict_data else None
+        self.dict_id = self.dictionary.dict_id() if self.dictionary else 0
+
+    def compress(self, data: bytes) -> bytes:
+        return zstandard.ZstdCompressor(level=self.level, dict_data=self.dictionary).compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zstandard.ZstdDecompressor(dict_data=self.dictionary).decompress(data)
+
+    def item_attributes(self) -> Dict[str, Union[str, int]]:
+        attributes = super().item_attributes()
+        if self.dict_id:
+            attributes["codec_dict_id"] = self.dict_id
+        return attributes
+
+
+_codecs: Dict[str, StorageCodec] = {}
+_warned_zstd_missing = False
+
+
+def _create_zstd_codec() -> ZstdCodec:
+    level = int(os.environ.get("DYNAMODB_ZSTD_LEVEL", "9"))
+    dict_path = os.environ.get("DYNAMODB_ZSTD_DICT", "")
+    dict_data = None
+    if dict_path:
+        with open(dict_path, "rb") as f:
+            dict_data = f.read()
+        logger.info(f"📚 Loaded zstd dictionary from {dict_path}")
+    return ZstdCodec(level=level, dict_data=dict_data)
+
+
+def get_codec(name: Optional[str]) -> StorageCodec:
+    """
+    Get the codec that wrote an item.
+
+    Args:
+        name: Value of the item's `codec` attribute (None for legacy items)
+
+    Returns:
+        The codec instance
+
+    Raises:
+        ValueError: If the codec is unknown or unavailable on this worker
+    """
+    name = name or LEGACY_CODEC
+    codec = _codecs.get(name)
+    if codec is None:
+        if name == GzipCodec.name:
+            codec = GzipCodec()
+        elif name == LEGACY_CODEC:
+            codec = LegacyGzipBase64Codec()
+        elif name == ZstdCodec.name:
+            if not ZSTD_AVAILABLE:
+                raise ValueError("Item was stored with zstd but the zstandard package is not installed")
+            codec = _create_zstd_codec()
+        else:
+            raise ValueError(f"Unknown storage codec: {name}")
+        _codecs[name] = codec
+    return codec
+
+
+def get_default_codec() -> StorageCodec:
+    """Get the codec used for new items (falls back to gzip without zstandard)."""
+    global _warned_zstd_missing
+    name = os.environ.get("DYNAMODB_STORAGE_CODEC", ZstdCodec.name).lower()
+    if name == ZstdCodec.name and not ZSTD_AVAILABLE:
+        if not _warned_zstd_missing:
+            logger.warning("⚠️ zstandard is not installed, storing large items with gzip")
+            _warned_zstd_missing = True
+        name = GzipCodec.name
+    return get_codec(name)
+
+
+def decode_item_payload(item: Dict, payload: Union[bytes, str, object]) -> bytes:
+    """
+    Decompress a payload read from an item, using the codec the item records.
+
+    Args:
+        item: The DynamoDB item (for its `codec` and `codec_dict_id` attributes)
+        payload: The stored payload - bytes, a boto3 Binary or a legacy base64 string
+
+    Returns:
+        The decompressed bytes
+    """
+    codec = get_codec(item.get("codec"))
+    expected_dict_id = int(item.get("codec_dict_id", 0) or 0)
+    if expected_dict_id and getattr(codec, "dict_id", 0) != expected_dict_id:
+        raise ValueError(f"Item needs zstd dictionary {expected_dict_id}, which is not loaded (DYNAMODB_ZSTD_DICT)")
+
+    if hasattr(payload, "value"):  # boto3.dynamodb.types.Binary
+        payload = payload.value
+    elif isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    return codec.decompress(bytes(payload))
+
+
+def reset_codecs() -> None:
+    """Forget cached codec instances (picks up changed environment settings)."""
+    _codecs.clear()
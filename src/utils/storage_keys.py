@@ -188,6 +188,48 @@ class PromptDataKey(BaseModel):
         return None
 
 
+class SharedInputKey(BaseModel):
+    """Model for content-addressed keys of inputs shared by all steps of a run."""
+    repo_name: str = Field(..., description="Repository name")
+    content_hash: str = Field(..., description="SHA-256 of the content")
+    
+    def to_storage_key(self) -> str:
+        """Generate the storage key for shared input data."""
+        return f"{self.repo_name}_shared_{self.content_hash}"
+    
+    def to_file_safe_key(self) -> str:
+        """Generate a file-system safe version of the key - SAME as storage key."""
+        return self.to_storage_key()
+
+
+class InputFingerprintKey(BaseModel):
+    """Model for keys of results cached by a hash of the exact inputs of a step."""
+    repo_name: str = Field(..., description="Repository name")
+    step_name: str = Field(..., description="Analysis step name")
+    fingerprint: str = Field(..., description="SHA-256 of the step's effective inputs")
+    
+    def to_storage_key(self) -> str:
+        """Generate the storage key for an input-fingerprint cache entry."""
+        return f"{self.repo_name}_{self.step_name}_fp_{self.fingerprint}"
+    
+    def to_file_safe_key(self) -> str:
+        """Generate a file-system safe version of the key - SAME as storage key."""
+        return self.to_storage_key()
+
+
+class ResultLineageKey(BaseModel):
+    """Model for keys of the upstream result hashes a cached step result was built from."""
+    result_key: str = Field(..., description="Reference key of the step result")
+    
+    def to_storage_key(self) -> str:
+        """Generate the storage key for a result's lineage record."""
+        return f"{self.result_key}_lineage"
+    
+    def to_file_safe_key(self) -> str:
+        """Generate a file-system safe version of the key - SAME as storage key."""
+        return self.to_storage_key()
+
+
 class KeyNameCreator:
     """
     Centralized utility for creating consistent storage keys across providers.
@@ -278,6 +320,51 @@ class KeyNameCreator:
             unique_id=unique_id
         )
     
+    @staticmethod
+    def create_shared_input_key(repo_name: str, content: str) -> SharedInputKey:
+        """
+        Create a content-addressed key for a large input shared by all analysis steps
+        (repository structure, formatted dependencies).
+        
+        Args:
+            repo_name: Repository name
+            content: The shared content
+            
+        Returns:
+            SharedInputKey object; identical content always gets the same key
+        """
+        import hashlib
+        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()[:32]
+        return SharedInputKey(repo_name=repo_name, content_hash=content_hash)
+    
+    @staticmethod
+    def create_input_fingerprint_key(repo_name: str, step_name: str, fingerprint: str) -> InputFingerprintKey:
+        """
+        Create a key for a result cached by the fingerprint of a step's inputs.
+        
+        Args:
+            repo_name: Repository name
+            step_name: Analysis step name
+            fingerprint: Hash of the step's effective inputs
+            
+        Returns:
+            InputFingerprintKey object with methods to get storage and file-safe keys
+        """
+        return InputFingerprintKey(repo_name=repo_name, step_name=step_name, fingerprint=fingerprint)
+    
+    @staticmethod
+    def create_result_lineage_key(result_key: str) -> ResultLineageKey:
+        """
+        Create a key for the lineage record of a cached step result.
+        
+        Args:
+            result_key: Reference key of the step result
+            
+        Returns:
+            ResultLineageKey object with methods to get storage and file-safe keys
+        """
+        return ResultLineageKey(result_key=result_key)
+    
     @staticmethod
     def create_dependencies_key(repo_name: str) -> AnalysisResultKey:
         """
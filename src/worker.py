@@ -191,7 +191,7 @@ async def main():
     - TEMPORAL_TASK_QUEUE: Task queue name (default: investigate-task-queue)
     - TEMPORAL_IDENTITY: Worker identity (default: investigate-worker)
     - TEMPORAL_API_KEY: Temporal Cloud API key (optional, for cloud deployment)
-    - PROMPT_CONTEXT_STORAGE: Storage backend (default: auto)
+    - PROMPT_CONTEXT_STORAGE: Storage backend - auto, dynamodb, sqlite or file (default: auto)
     - DYNAMODB_TABLE_NAME: DynamoDB table name (recommended for production)
     - CLAUDE_MODEL: Claude model to use (default: claude-sonnet-4-20250514)
     - MAX_TOKENS: Maximum tokens per request (default: 6000)
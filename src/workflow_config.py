@@ -31,8 +31,37 @@ class WorkflowConfig:
     ]
     
     # Workflow configuration
-    WORKFLOW_CHUNK_SIZE = 8  # Number of sub-workflows to run in parallel 
+    WORKFLOW_CHUNK_SIZE = 8  # Sub-workflows in flight without stage pools (with them, see worker_session.stage_window_size)
     WORKFLOW_SLEEP_HOURS = 6  # Hours to sleep between workflow executions
+    STEP_CONCURRENCY = 4  # Analysis steps of one repo running in parallel
+    
+    # Adaptive concurrency (see workflows/adaptive_concurrency.py), opt-in per request
+    # (client.py investigate --adaptive-concurrency) - the repos in flight start at the
+    # chunk size and the steps per repo at STEP_CONCURRENCY, then follow the Claude API
+    ADAPTIVE_CONCURRENCY = False
+    ADAPTIVE_MAX_REPOS = 20
+    ADAPTIVE_MAX_STEPS = 8
+    ADAPTIVE_DECREASE_FACTOR = 0.5
+    ADAPTIVE_DECREASE_COOLDOWN_SECONDS = 120  # One cut per burst of bad reports
+    ADAPTIVE_LOW_CAPACITY = 0.1  # Remaining share of a rate limit that counts as congestion
+    ADAPTIVE_LATENCY_TOLERANCE = 2.0  # Latency per output token above this multiple of the best counts as congestion
+    
+    # Clone-bound activities run on the worker holding the clone; when they wait this
+    # long to start, the workflow asks the server whether that worker still polls its
+    # queue (seen within WORKER_POLLER_STALE_SECONDS). A busy worker gets the activity
+    # again, a gone one means re-cloning the repository on another worker
+    CLONE_WORKER_SCHEDULE_TO_START_MINUTES = 5
+    WORKER_POLLER_STALE_SECONDS = 120
+    MAX_RECLONES = 2
+    
+    # Clone activity - long enough for the first mirror fetch of a large repository
+    # (the git command timeout); the activity heartbeats while git runs
+    CLONE_TIMEOUT_MINUTES = 30
+    CLONE_HEARTBEAT_TIMEOUT_SECONDS = 120
+    
+    # Message Batches mode
+    BATCH_MAX_REQUESTS = 1000  # Maximum analysis steps per batch submission
+    BATCH_FLUSH_SECONDS = 60  # How long to gather ready steps before submitting a batch
     
     @staticmethod
     def validate_claude_model(model_name: str) -> str:
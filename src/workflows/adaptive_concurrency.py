@@ -0,0 +1,135 @@
+"""
+AIMD controller for the number of repositories and analysis steps in flight.
+
+Every finished investigation reports how the Claude API treated its calls
+(ClaudeApiFeedback). The controller treats any of these as a sign that the
+API is being over-driven:
+
+- the SDK had to retry requests (429, 529 and other 5xx responses)
+- activity attempts failed and were retried
+- the API asked for a retry-after
+- the rate limit headers show less than ADAPTIVE_LOW_CAPACITY left
+- latency per output token rose above ADAPTIVE_LATENCY_TOLERANCE times the
+  best seen this cycle
+
+On such a sign both limits are cut by ADAPTIVE_DECREASE_FACTOR, at most once
+per ADAPTIVE_DECREASE_COOLDOWN_SECONDS so the reports of repositories started
+before the cut do not cut again, and new repositories wait out any
+retry-after. Every clean report raises each limit by 1/limit, about one per
+window's worth of repositories. The window starts at chunk_size and the step
+limit at STEP_CONCURRENCY.
+
+Pure Python with explicit timestamps, so it is safe to run inside workflow code.
+"""
+
+from typing import Iterable, Optional
+
+from models import ClaudeApiFeedback
+from workflow_config import WorkflowConfig
+
+
+def merge_api_feedback(feedbacks: Iterable[Optional[ClaudeApiFeedback]]) -> Optional[ClaudeApiFeedback]:
+    """Sum the feedback of several Claude calls; None when there was none."""
+    merged = None
+    for feedback in feedbacks:
+        if feedback is None:
+            continue
+        if merged is None:
+            merged = feedback.model_copy()
+            continue
+        merged.calls += feedback.calls
+        merged.latency_ms += feedback.latency_ms
+        merged.output_tokens += feedback.output_tokens
+        merged.retries += feedback.retries
+        merged.failed_attempts += feedback.failed_attempts
+        if feedback.retry_after_seconds is not None:
+            merged.retry_after_seconds = max(merged.retry_after_seconds or 0, feedback.retry_after_seconds)
+        if feedback.capacity_remaining is not None:
+            merged.capacity_remaining = min(
+                merged.capacity_remaining if merged.capacity_remaining is not None else 1.0,
+                feedback.capacity_remaining
+            )
+    return merged
+
+
+class AdaptiveConcurrency:
+    """Additive-increase/multiplicative-decrease limits for repos and steps in flight."""
+
+    def __init__(self, repos: int, steps: int,
+                 max_repos: int = WorkflowConfig.ADAPTIVE_MAX_REPOS,
+                 max_steps: int = WorkflowConfig.ADAPTIVE_MAX_STEPS):
+        """
+        Args:
+            repos: Starting number of repositories in flight (chunk_size)
+            steps: Starting number of parallel analysis steps per repository
+            max_repos: Upper bound for the repository window
+            max_steps: Upper bound for the step limit
+        """
+        self.max_repos = max(max_repos, repos)
+        self.max_steps = max(max_steps, steps)
+        self._repos = float(repos)
+        self._steps = float(steps)
+        self._best_ms_per_token: Optional[float] = None
+        self._last_decrease: Optional[float] = None
+        self.hold_until = 0.0
+
+    @property
+    def repos(self) -> int:
+        """Repositories allowed in flight."""
+        return max(1, int(self._repos))
+
+    @property
+    def steps(self) -> int:
+        """Parallel analysis steps for the next repositories started."""
+        return max(1, int(self._steps))
+
+    def can_start(self, now: float) -> bool:
+        """Whether new repositories may start (no retry-after pending)."""
+        return now >= self.hold_until
+
+    def record(self, feedback: Optional[ClaudeApiFeedback], now: float) -> Optional[str]:
+        """
+        Adjust the limits from one investigation's Claude API feedback.
+
+        Args:
+            feedback: Summed feedback of the investigation; None or no calls
+                (cached, skipped or failed early) leaves the limits alone
+            now: Current workflow time in seconds
+
+        Returns:
+            The congestion sign that cut the limits, or None
+        """
+        if feedback is None or not feedback.calls:
+            return None
+
+        if feedback.retry_after_seconds:
+            self.hold_until = max(self.hold_until, now + feedback.retry_after_seconds)
+
+        reason = self._congestion(feedback)
+        if reason is None:
+            self._repos = min(self.max_repos, self._repos + 1 / self._repos)
+            self._steps = min(self.max_steps, self._steps + 1 / self._steps)
+        elif self._last_decrease is None or now - self._last_decrease >= WorkflowConfig.ADAPTIVE_DECREASE_COOLDOWN_SECONDS:
+            self._repos = max(1.0, self._repos * WorkflowConfig.ADAPTIVE_DECREASE_FACTOR)
+            self._steps = max(1.0, self._steps * WorkflowConfig.ADAPTIVE_DECREASE_FACTOR)
+            self._last_decrease = now
+        return reason
+
+    def _congestion(self, feedback: ClaudeApiFeedback) -> Optional[str]:
+        """Name the first sign of an over-driven API in the feedback, if any."""
+        if feedback.retries:
+            return f"{feedback.retries} retried requests"
+        if feedback.failed_attempts:
+            return f"{feedback.failed_attempts} failed attempts"
+        if feedback.retry_after_seconds:
+            return f"retry-after {feedback.retry_after_seconds:g}s"
+        if feedback.capacity_remaining is not None and feedback.capacity_remaining < WorkflowConfig.ADAPTIVE_LOW_CAPACITY:
+            return f"{feedback.capacity_remaining:.0%} rate limit capacity left"
+
+        if feedback.output_tokens:
+            ms_per_token = feedback.latency_ms / feedback.output_tokens
+            if self._best_ms_per_token is None or ms_per_token < self._best_ms_per_token:
+                self._best_ms_per_token = ms_per_token
+            elif ms_per_token > self._best_ms_per_token * WorkflowConfig.ADAPTIVE_LATENCY_TOLERANCE:
+                return f"latency {ms_per_token:.0f} ms per output token"
+        return None
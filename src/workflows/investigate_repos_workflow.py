@@ -2,20 +2,33 @@
 
 from temporalio import workflow
 from temporalio.common import RetryPolicy
-from activities.investigate_activities import read_repos_config, update_repos_list
+from temporalio.exceptions import ActivityError
+from activities.investigate_activities import (
+    read_repos_config,
+    update_repos_list,
+    submit_claude_batch_activity,
+    collect_claude_batch_activity
+)
+from activities.worker_session import get_stage_window_activity
 from workflows.investigate_single_repo_workflow import InvestigateSingleRepoWorkflow
+from workflows.adaptive_concurrency import AdaptiveConcurrency
 from workflow_config import WorkflowConfig
 from models import (
     InvestigateReposRequest,
     InvestigateReposResult,
     InvestigateSingleRepoRequest,
     InvestigateSingleRepoResult,
-    ConfigOverrides
+    ConfigOverrides,
+    BatchAnalysisRequest,
+    BatchAnalysisResult,
+    ClaudeBatchItem,
+    ClaudeBatchSubmitInput,
+    ClaudeBatchCollectInput
 )
 import logging
 from datetime import timedelta
 import asyncio
-from typing import Optional
+from typing import List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +36,17 @@ logger = logging.getLogger(__name__)
 class InvestigateReposWorkflow:
     """Workflow that investigates multiple repositories from repos.json."""
 
+    def __init__(self) -> None:
+        # Message Batches mode - analysis steps queued by child workflows
+        self._batch_queue: List[BatchAnalysisRequest] = []
+        self._batch_dispatch_open = False
+        self._batch_counter = 0
+
+    @workflow.signal
+    def submit_batch_analysis(self, request: BatchAnalysisRequest) -> None:
+        """Queue an analysis step from a child workflow for the next Message Batch."""
+        self._batch_queue.append(request)
+
     @workflow.query
     async def get_status(self) -> str:
         """Query method to get the current status of the workflow."""
@@ -88,6 +112,14 @@ class InvestigateReposWorkflow:
                     logger.error(f"Invalid chunk_size in request: {e}")
                     raise
             
+            if request.batch_mode:
+                config_overrides.batch_mode = True
+                logger.info("📦 Batch mode enabled - analysis steps will run through the Message Batches API")
+            
+            if request.adaptive_concurrency is not None:
+                config_overrides.adaptive_concurrency = request.adaptive_concurrency
+                logger.info(f"🔧 Adaptive concurrency: {'on' if request.adaptive_concurrency else 'off'}")
+            
             if force_first_run and iteration_count == 0:
                 logger.info("🚀 Force flag detected - will force investigation of all repositories on first run")
             else:
@@ -122,6 +154,8 @@ class InvestigateReposWorkflow:
             max_tokens=config_overrides.max_tokens,
             sleep_hours=config_overrides.sleep_hours,
             chunk_size=config_overrides.chunk_size,
+            batch_mode=bool(config_overrides.batch_mode),
+            adaptive_concurrency=config_overrides.adaptive_concurrency,
             iteration_count=iteration_count + 1
         )
         
@@ -220,8 +254,10 @@ class InvestigateReposWorkflow:
         if force:
             logger.info("⚡ Force mode enabled - all repositories will be investigated regardless of cache")
         
-        # Process repositories in chunks - only specified number run in parallel at a time
-        window_size = config_overrides.chunk_size or WorkflowConfig.WORKFLOW_CHUNK_SIZE  # Maximum concurrent workflows
+        # Sliding window - at most window_size child workflows run at a time. A child keeps
+        # its place while it waits on Claude, so without a chunk_size the window is sized
+        # from the workers' stage pools for the next clones to overlap the analysis
+        window_size = config_overrides.chunk_size or await self._default_window_size()
         repo_items = list(repositories.items())
         
         # Filter out repos without URLs (and skip comment entries which are strings)
@@ -236,106 +272,87 @@ class InvestigateReposWorkflow:
                 continue
             valid_repos.append((repo_name, repo_info))
         
-        logger.info(f"Processing {len(valid_repos)} repositories in chunks of {window_size} (max {window_size} parallel)")
+        logger.info(f"Processing {len(valid_repos)} repositories with a sliding window of {window_size} (max {window_size} parallel)")
         
-        # Track all results as we go
-        all_results = []
+        # The window and the steps per repo follow the Claude API's feedback; batch
+        # mode has no per-call feedback and is paced by the Message Batches API
+        adaptive = config_overrides.adaptive_concurrency
+        if adaptive is None:
+            adaptive = WorkflowConfig.ADAPTIVE_CONCURRENCY
+        concurrency = None
+        if adaptive and not config_overrides.batch_mode:
+            concurrency = AdaptiveConcurrency(
+                window_size, config_overrides.step_concurrency or WorkflowConfig.STEP_CONCURRENCY
+            )
+            logger.info(f"📈 Adaptive concurrency: starting at {concurrency.repos} repos x {concurrency.steps} steps "
+                        f"(max {concurrency.max_repos} x {concurrency.max_steps})")
+        
+        # In batch mode children signal their ready steps here and wait for the results
+        batch_dispatcher = None
+        if config_overrides.batch_mode:
+            self._batch_dispatch_open = True
+            batch_dispatcher = asyncio.create_task(self._run_batch_dispatcher())
+        
+        # Results are stored by position so the summary keeps repos.json order
+        results_by_index = {}
         failed_count = 0
         success_count = 0
         
-        # Process repositories in chunks - wait for each chunk to complete before starting next
-        for chunk_idx in range(0, len(valid_repos), window_size):
-            chunk = valid_repos[chunk_idx:chunk_idx + window_size]
-            chunk_num = chunk_idx // window_size + 1
-            total_chunks = (len(valid_repos) + window_size - 1) // window_size
-            
-            logger.info(f"Starting chunk {chunk_num}/{total_chunks} with {len(chunk)} repositories")
-            
-            # Start all workflows in this chunk
-            chunk_handles = []
-            chunk_info_map = {}
-            
-            for repo_name, repo_info in chunk:
-                repo_url = repo_info.get("url")
-                repo_type = repo_info.get("type", "generic")
-                
-                logger.info(f"Starting investigation for repository: {repo_name} (type: {repo_type})")
-                
-                # Create Pydantic request model
-                request = InvestigateSingleRepoRequest(
-                    repo_name=repo_name,
-                    repo_url=repo_url,
-                    repo_type=repo_type,
-                    force=force,
-                    config_overrides=config_overrides
+        # Start a new child as soon as any running child finishes, so one slow
+        # repository never leaves the rest of the window idle
+        pending = {}
+        next_index = 0
+        while next_index < len(valid_repos) or pending:
+            # New repositories wait out a retry-after the API asked for
+            hold_seconds = 0.0
+            if concurrency and concurrency.hold_until:
+                now = workflow.now().timestamp()
+                if not concurrency.can_start(now):
+                    hold_seconds = concurrency.hold_until - now
+            limit = concurrency.repos if concurrency else window_size
+            while not hold_seconds and next_index < len(valid_repos) and len(pending) < limit:
+                repo_name, repo_info = valid_repos[next_index]
+                child_overrides = config_overrides
+                if concurrency:
+                    child_overrides = config_overrides.model_copy(update={"step_concurrency": concurrency.steps})
+                task = asyncio.create_task(
+                    self._investigate_single_repo(repo_name, repo_info, force, child_overrides)
                 )
-                
-                # Start the child workflow (non-blocking)
-                handle = await workflow.start_child_workflow(
-                    InvestigateSingleRepoWorkflow.run,
-                    args=[request],
-                    id=f"investigate-single-repo-{repo_name}",
-                    task_queue="investigate-task-queue",
-                    retry_policy=RetryPolicy(maximum_attempts=3),
-                    execution_timeout=timedelta(hours=20),
-                    run_timeout=timedelta(hours=1),
-                    task_timeout=timedelta(minutes=10),
-                )
-                
-                chunk_handles.append(handle)
-                chunk_info_map[handle] = {
-                    "repo_name": repo_name,
-                    "repo_url": repo_url
-                }
+                pending[task] = next_index
+                next_index += 1
                 
                 # Yield control after starting each workflow to prevent timeout
                 await workflow.sleep(0)
             
-            logger.info(f"Chunk {chunk_num}: Started {len(chunk_handles)} workflows, waiting for them to complete...")
+            if not pending:
+                await workflow.sleep(timedelta(seconds=hold_seconds))
+                continue
+            done, _ = await workflow.wait(list(pending), timeout=hold_seconds or None,
+                                          return_when=asyncio.FIRST_COMPLETED)
             
-            # Wait for all workflows in this chunk to complete before starting next chunk
-            for handle in chunk_handles:
-                repo_info = chunk_info_map[handle]
+            # Handle completions in start order so the workflow stays deterministic
+            for task in sorted(done, key=lambda t: pending[t]):
+                index = pending.pop(task)
+                result: InvestigateSingleRepoResult = task.result()
+                results_by_index[index] = result
                 
-                try:
-                    # Wait for this workflow to complete
-                    result: InvestigateSingleRepoResult = await handle
-                    all_results.append(result)
-                    
-                    if result.status == "success":
-                        success_count += 1
-                        logger.info(f"Chunk {chunk_num}: ✓ Completed {repo_info['repo_name']}")
-                    elif result.status == "skipped":
-                        # Don't count skipped as failed - it's a separate category
-                        logger.info(f"Chunk {chunk_num}: ⊘ Skipped {repo_info['repo_name']} (cached): {result.reason or 'Unknown reason'}")
-                    else:
-                        failed_count += 1
-                        logger.warning(f"Chunk {chunk_num}: ✗ Failed {repo_info['repo_name']}: {result.message or 'Unknown error'}")
-                        
-                except Exception as e:
-                    # Handle exceptions from child workflows
-                    logger.error(f"Chunk {chunk_num}: ✗ Exception for {repo_info['repo_name']}: {str(e)}")
-                    error_result = InvestigateSingleRepoResult(
-                        status="failed",
-                        repo_name=repo_info["repo_name"],
-                        repo_url=repo_info["repo_url"],
-                        repo_type="generic",
-                        latest_commit="unknown",
-                        branch_name="unknown",
-                        reason=f"Failed to execute investigation: {str(e)}",
-                        message=f"Failed to execute investigation for {repo_info['repo_name']}: {str(e)}"
-                    )
-                    all_results.append(error_result)
+                if result.status == "success":
+                    success_count += 1
+                elif result.status != "skipped":
+                    # Don't count skipped as failed - it's a separate category
                     failed_count += 1
+                
+                if concurrency and result.api_feedback:
+                    self._record_api_feedback(concurrency, result)
             
-            logger.info(f"Chunk {chunk_num}/{total_chunks} completed. Progress: {len(all_results)}/{len(valid_repos)} repos")
-            
-            # Yield control between chunks
-            if chunk_idx + window_size < len(valid_repos):
-                logger.info("Yielding control before starting next chunk...")
-                await workflow.sleep(1)
+            logger.info(f"Progress: {len(results_by_index)}/{len(valid_repos)} repos completed, {len(pending)} in flight")
         
-        # All results have been collected during chunk processing
+        if batch_dispatcher:
+            self._batch_dispatch_open = False
+            await batch_dispatcher
+        
+        # All results have been collected by the sliding window
+        all_results = [results_by_index[index] for index in sorted(results_by_index)]
         logger.info(f"All {len(all_results)} investigations completed!")
         results = all_results
         
@@ -402,4 +419,203 @@ class InvestigateReposWorkflow:
                     "message": "Architecture analysis skipped - no successful saves to hub"
                 }
         
-        return summary 
\ No newline at end of file
+        return summary 
+    
+    async def _default_window_size(self) -> int:
+        """Repositories in flight without a chunk_size: sized by a worker from its stage pools."""
+        try:
+            return await workflow.execute_activity(
+                get_stage_window_activity,
+                args=[],
+                start_to_close_timeout=timedelta(seconds=30),
+                retry_policy=RetryPolicy(maximum_attempts=3),
+            )
+        except ActivityError as e:
+            logger.warning(f"Could not size the window from the stage pools, using {WorkflowConfig.WORKFLOW_CHUNK_SIZE}: {e}")
+            return WorkflowConfig.WORKFLOW_CHUNK_SIZE
+    
+    def _record_api_feedback(self, concurrency: AdaptiveConcurrency, result: InvestigateSingleRepoResult) -> None:
+        """Let the adaptive concurrency controller react to a finished investigation's Claude API feedback."""
+        before = (concurrency.repos, concurrency.steps)
+        congestion = concurrency.record(result.api_feedback, workflow.now().timestamp())
+        after = (concurrency.repos, concurrency.steps)
+        if congestion and after != before:
+            logger.warning(f"📉 Claude API congested ({congestion} in {result.repo_name}): "
+                           f"{after[0]} repos x {after[1]} steps in flight")
+        elif after != before:
+            logger.info(f"📈 Claude API has room: {after[0]} repos x {after[1]} steps in flight")
+    
+    async def _investigate_single_repo(
+        self,
+        repo_name: str,
+        repo_info: dict,
+        force: bool,
+        config_overrides: ConfigOverrides
+    ) -> InvestigateSingleRepoResult:
+        """Start a child workflow for one repository and wait for its result.
+        
+        Exceptions from the child are converted to a failed result so a single
+        repository can never abort the whole sliding window.
+        
+        Args:
+            repo_name: Name of the repository
+            repo_info: Repository entry from repos.json
+            force: If True, forces investigation ignoring cache
+            config_overrides: ConfigOverrides passed to the child workflow
+        """
+        repo_url = repo_info.get("url")
+        repo_type = repo_info.get("type", "generic")
+        
+        logger.info(f"Starting investigation for repository: {repo_name} (type: {repo_type})")
+        
+        # Create Pydantic request model
+        request = InvestigateSingleRepoRequest(
+            repo_name=repo_name,
+            repo_url=repo_url,
+            repo_type=repo_type,
+            force=force,
+            config_overrides=config_overrides
+        )
+        
+        # Message batches may take up to 24 hours to end
+        if config_overrides.batch_mode:
+            execution_timeout, run_timeout = timedelta(hours=72), timedelta(hours=26)
+        else:
+            execution_timeout, run_timeout = timedelta(hours=20), timedelta(hours=1)
+        
+        try:
+            result: InvestigateSingleRepoResult = await workflow.execute_child_workflow(
+                InvestigateSingleRepoWorkflow.run,
+                args=[request],
+                id=f"investigate-single-repo-{repo_name}",
+                task_queue="investigate-task-queue",
+                retry_policy=RetryPolicy(maximum_attempts=3),
+                execution_timeout=execution_timeout,
+                run_timeout=run_timeout,
+                task_timeout=timedelta(minutes=10),
+            )
+        except Exception as e:
+            # Handle exceptions from child workflows
+            logger.error(f"✗ Exception for {repo_name}: {str(e)}")
+            return InvestigateSingleRepoResult(
+                status="failed",
+                repo_name=repo_name,
+                repo_url=repo_url,
+                repo_type="generic",
+                latest_commit="unknown",
+                branch_name="unknown",
+                reason=f"Failed to execute investigation: {str(e)}",
+                message=f"Failed to execute investigation for {repo_name}: {str(e)}"
+            )
+        
+        if result.status == "success":
+            logger.info(f"✓ Completed {repo_name}")
+        elif result.status == "skipped":
+            logger.info(f"⊘ Skipped {repo_name} (cached): {result.reason or 'Unknown reason'}")
+        else:
+            logger.warning(f"✗ Failed {repo_name}: {result.message or 'Unknown error'}")
+        
+        return result
+    
+    async def _run_batch_dispatcher(self) -> None:
+        """Group queued analysis steps from all children into Message Batches.
+        
+        After the first step arrives, the dispatcher waits up to
+        BATCH_FLUSH_SECONDS (or until BATCH_MAX_REQUESTS are queued) so steps
+        from other repositories can join the same batch. Each batch is then
+        submitted and collected in its own task, so new batches keep forming
+        while earlier ones are processing.
+        """
+        max_requests = WorkflowConfig.BATCH_MAX_REQUESTS
+        in_flight = []
+        
+        while True:
+            await workflow.wait_condition(lambda: bool(self._batch_queue) or not self._batch_dispatch_open)
+            if not self._batch_queue:
+                break
+            
+            try:
+                await workflow.wait_condition(
+                    lambda: len(self._batch_queue) >= max_requests or not self._batch_dispatch_open,
+                    timeout=timedelta(seconds=WorkflowConfig.BATCH_FLUSH_SECONDS)
+                )
+            except asyncio.TimeoutError:
+                pass
+            
+            requests = self._batch_queue[:max_requests]
+            del self._batch_queue[:max_requests]
+            in_flight.append(asyncio.create_task(self._run_batch(requests)))
+        
+        if in_flight:
+            await asyncio.gather(*in_flight)
+    
+    async def _run_batch(self, requests: List[BatchAnalysisRequest]) -> None:
+        """Submit one Message Batch, wait for it and signal each result to its child.
+        
+        Failures never raise - every requesting child always gets a result
+        signal, carrying the error when its step could not be analyzed.
+        
+        Args:
+            requests: Queued analysis steps to include in the batch
+        """
+        items = []
+        for request in requests:
+            self._batch_counter += 1
+            items.append(ClaudeBatchItem(
+                custom_id=f"step-{self._batch_counter}",
+                workflow_id=request.workflow_id,
+                step_name=request.step_name,
+                analyze_input=request.analyze_input
+            ))
+        
+        outputs = {}
+        errors = {}
+        try:
+            submit_result = await workflow.execute_activity(
+                submit_claude_batch_activity,
+                args=[ClaudeBatchSubmitInput(items=items)],
+                start_to_close_timeout=timedelta(minutes=30),
+                retry_policy=RetryPolicy(
+                    maximum_attempts=3,
+                    initial_interval=timedelta(seconds=5),
+                    maximum_interval=timedelta(seconds=60),
+                    backoff_coefficient=2.0
+                ),
+            )
+            outputs.update(submit_result.completed)
+            errors.update(submit_result.errors)
+            
+            if submit_result.batch_id:
+                logger.info(f"📦 Submitted batch {submit_result.batch_id} with {len(submit_result.submitted)} steps")
+                collect_result = await workflow.execute_activity(
+                    collect_claude_batch_activity,
+                    args=[ClaudeBatchCollectInput(batch_id=submit_result.batch_id, items=submit_result.submitted)],
+                    start_to_close_timeout=timedelta(hours=25),
+                    heartbeat_timeout=timedelta(minutes=10),
+                    retry_policy=RetryPolicy(
+                        maximum_attempts=3,
+                        initial_interval=timedelta(seconds=30),
+                        maximum_interval=timedelta(minutes=5),
+                        backoff_coefficient=2.0
+                    ),
+                )
+                outputs.update(collect_result.completed)
+                errors.update(collect_result.errors)
+        except Exception as e:
+            logger.error(f"✗ Message batch failed: {str(e)}")
+            for item in items:
+                errors.setdefault(item.custom_id, str(e))
+        
+        logger.info(f"📦 Batch finished: {len(outputs)} steps succeeded, {len(items) - len(outputs)} failed")
+        
+        for item in items:
+            output = outputs.get(item.custom_id)
+            result = BatchAnalysisResult(
+                step_name=item.step_name,
+                output=output,
+                error=None if output else errors.get(item.custom_id, "No result returned")
+            )
+            try:
+                await workflow.get_external_workflow_handle(item.workflow_id).signal("batch_analysis_result", result)
+            except Exception as e:
+                logger.warning(f"Failed to deliver batch result for {item.workflow_id}/{item.step_name}: {str(e)}")
@@ -4,19 +4,25 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from temporalio import workflow
 from temporalio.common import RetryPolicy
+from temporalio.exceptions import ActivityError, TimeoutError as TemporalTimeoutError, TimeoutType
 from datetime import timedelta, datetime
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
+import asyncio
 import logging
 import uuid
 
 from activities.investigate_activities import (
     save_to_arch_hub,
+    get_remote_head_activity,
+    get_diff_affected_steps_activity,
     clone_repository_activity,
     analyze_repository_structure_activity, 
     get_prompts_config_activity,
     read_prompt_file_activity,
     save_prompt_context_activity,
-    analyze_with_claude_context,
+    store_shared_inputs_activity,
+    run_analysis_step_activity,
+    check_analysis_step_cache_activity,
     retrieve_all_results_activity,
     write_analysis_result_activity,
     cleanup_repository_activity,
@@ -28,9 +34,14 @@ from activities.investigation_cache_activities import (
     save_investigation_metadata
 )
 from activities.dynamodb_health_check_activity import check_dynamodb_health
+from activities.worker_session import check_worker_queue_polled_activity, get_worker_task_queues_activity
 from investigator.core.analysis_results_collector import AnalysisResultsCollector
+from workflow_config import WorkflowConfig
+from workflows.adaptive_concurrency import merge_api_feedback
 from models import (
     AnalyzeWithClaudeInput, 
+    RunAnalysisStepInput,
+    StoreSharedInputsOutput,
     PromptContextDict, 
     ClaudeConfigOverrides, 
     CacheCheckInput, 
@@ -44,7 +55,10 @@ from models import (
     SaveToHubResult,
     SaveToDynamoResult,
     ConfigOverrides,
-    InvestigationResult
+    InvestigationResult,
+    BatchAnalysisRequest,
+    BatchAnalysisResult,
+    WorkerTaskQueues
 )
 
 logger = logging.getLogger(__name__)
@@ -59,6 +73,19 @@ class InvestigateSingleRepoWorkflow:
         self._last_heartbeat = None
         self._investigation_progress = None
         self._repo_name = None
+        self._repo_url = None
+        self._batch_results: Dict[str, BatchAnalysisResult] = {}
+        self._shared_inputs: Optional[StoreSharedInputsOutput] = None
+        self._reuse_commit: Optional[str] = None
+        self._diff_affected_steps: Optional[set] = None
+        self._diff_ref: Optional[str] = None
+        self._task_queues = WorkerTaskQueues()
+        self._clone: Optional[CloneRepositoryResult] = None
+    
+    @workflow.signal
+    def batch_analysis_result(self, result: BatchAnalysisResult) -> None:
+        """Receive a batched analysis step from the parent workflow."""
+        self._batch_results[result.step_name] = result
     
     async def _perform_health_check(self) -> None:
         """Perform DynamoDB health check before starting investigation."""
@@ -87,34 +114,166 @@ class InvestigateSingleRepoWorkflow:
         logger.info(f"DynamoDB health check passed: {health_check_result.get('message')}")
 
     async def _clone_repository(self, repo_url: str, repo_name: str) -> CloneRepositoryResult:
-        """Clone the repository and return clone results."""
+        """Clone the repository on a worker and pin the clone-bound activities to that worker.
+        
+        The clone is kept as self._clone; when its worker is lost, the
+        activities that use it re-clone through this method. The worker also
+        names the stage pool queues used for the rest of the investigation.
+        """
         self._status = "cloning"
         self._last_heartbeat = workflow.now()
         
-        clone_result = await workflow.execute_activity(
-            clone_repository_activity,
-            args=[repo_url, repo_name],
-            start_to_close_timeout=timedelta(minutes=3),
-            retry_policy=RetryPolicy(
-                maximum_attempts=3,
-                initial_interval=timedelta(seconds=5),
-                maximum_interval=timedelta(minutes=1),
-            ),
-        )
+        for attempt in range(WorkflowConfig.MAX_RECLONES + 1):
+            # Whichever worker picks this up from the shared queue holds the clone
+            self._task_queues = await workflow.execute_activity(
+                get_worker_task_queues_activity,
+                args=[],
+                start_to_close_timeout=timedelta(seconds=30),
+                retry_policy=RetryPolicy(maximum_attempts=3),
+            )
+            try:
+                clone_result = await self._execute_on_worker(
+                    clone_repository_activity,
+                    [repo_url, repo_name],
+                    self._task_queues.clone,
+                    # The first mirror fetch of a large repository can take long; heartbeats show it is alive
+                    start_to_close_timeout=timedelta(minutes=WorkflowConfig.CLONE_TIMEOUT_MINUTES),
+                    heartbeat_timeout=timedelta(seconds=WorkflowConfig.CLONE_HEARTBEAT_TIMEOUT_SECONDS),
+                    retry_policy=RetryPolicy(
+                        maximum_attempts=3,
+                        initial_interval=timedelta(seconds=5),
+                        maximum_interval=timedelta(minutes=1),
+                    ),
+                )
+                break
+            except ActivityError as e:
+                if not self._clone_worker_lost(e) or attempt == WorkflowConfig.MAX_RECLONES:
+                    raise
+                logger.warning(f"🔁 Worker {self._task_queues.worker} is gone before cloning {repo_name}, retrying on another worker")
         
         # Convert dict result to Pydantic model
-        return CloneRepositoryResult(
+        self._clone = CloneRepositoryResult(
             repo_path=clone_result["repo_path"],
             temp_dir=clone_result["temp_dir"],
             status=clone_result.get("status", "success"),
             message=clone_result.get("message")
         )
+        return self._clone
+    
+    def _clone_worker_options(self, task_queue: Optional[str] = None) -> dict:
+        """Activity options routing to the worker holding the clone (none without a worker queue).
+        
+        task_queue selects one of that worker's stage queues instead of its file work queue.
+        """
+        task_queue = task_queue or self._task_queues.worker
+        if not task_queue:
+            return {}
+        return {
+            "task_queue": task_queue,
+            "schedule_to_start_timeout": timedelta(minutes=WorkflowConfig.CLONE_WORKER_SCHEDULE_TO_START_MINUTES),
+        }
+    
+    @staticmethod
+    def _clone_worker_lost(error: ActivityError) -> bool:
+        """Whether an activity failed because nothing polls the clone worker's queue any more.
+        
+        Only meaningful for errors raised by _execute_on_worker, which lets a
+        schedule-to-start timeout through only once the worker is found gone.
+        """
+        return isinstance(error.cause, TemporalTimeoutError) and error.cause.type == TimeoutType.SCHEDULE_TO_START
+    
+    async def _execute_on_worker(self, activity_fn, args: list, task_queue: Optional[str] = None, **options):
+        """Run an activity on the worker holding the clone, for as long as that worker is alive.
+        
+        A schedule-to-start timeout there means the worker is either busy with
+        other repositories or gone. A busy worker, one still polling its queue,
+        gets the activity again; for a gone one the timeout is raised.
+        """
+        worker_options = self._clone_worker_options(task_queue)
+        while True:
+            try:
+                return await workflow.execute_activity(activity_fn, args=args, **options, **worker_options)
+            except ActivityError as e:
+                if not worker_options or not self._clone_worker_lost(e):
+                    raise
+                if not await self._worker_queue_polled(worker_options["task_queue"]):
+                    raise
+                logger.info(f"⏳ Worker queue {worker_options['task_queue']} is busy, waiting for it again")
+    
+    async def _worker_queue_polled(self, task_queue: str) -> bool:
+        """Whether a worker still polls task_queue (False when that cannot be checked)."""
+        try:
+            return await workflow.execute_activity(
+                check_worker_queue_polled_activity,
+                args=[task_queue],
+                start_to_close_timeout=timedelta(seconds=30),
+                retry_policy=RetryPolicy(maximum_attempts=3),
+            )
+        except ActivityError as e:
+            logger.warning(f"Could not check task queue {task_queue}, taking its worker as gone: {e}")
+            return False
+    
+    async def _execute_on_clone(self, activity_fn, clone_args: Callable[[CloneRepositoryResult], list], **options):
+        """Run an activity that uses the clone on the worker holding it.
+        
+        clone_args builds the activity arguments from the clone. When the
+        worker holding the clone is gone, the repository is re-cloned on
+        another worker and the activity runs there with the new paths.
+        """
+        reclones = 0
+        while True:
+            try:
+                return await self._execute_on_worker(activity_fn, clone_args(self._clone), **options)
+            except ActivityError as e:
+                if not self._clone_worker_lost(e) or reclones >= WorkflowConfig.MAX_RECLONES:
+                    raise
+                reclones += 1
+                logger.warning(
+                    f"🔁 Worker {self._task_queues.worker} holding the clone of {self._repo_name} is gone, "
+                    f"re-cloning ({reclones}/{WorkflowConfig.MAX_RECLONES})"
+                )
+                await self._clone_repository(self._repo_url, self._repo_name)
+
+    async def _check_remote_cache(self, repo_name: str, repo_url: str, prompt_versions: Optional[Dict[str, str]] = None) -> Optional[Dict]:
+        """Check the cache against the remote HEAD before cloning.
+        
+        Returns None when the remote HEAD could not be resolved, in which case
+        the regular post-clone cache check decides.
+        """
+        self._status = "checking_remote"
+        self._last_heartbeat = workflow.now()
+        
+        remote_head = await workflow.execute_activity(
+            get_remote_head_activity,
+            args=[repo_url, repo_name],
+            start_to_close_timeout=timedelta(minutes=2),
+            retry_policy=RetryPolicy(
+                maximum_attempts=2,
+                initial_interval=timedelta(seconds=2),
+                maximum_interval=timedelta(seconds=10),
+            ),
+        )
+        
+        if remote_head.get("status") != "success" or not remote_head.get("commit_sha"):
+            workflow.logger.warning(f"⚠️  WORKFLOW: Remote HEAD unavailable for {repo_name}, checking cache after clone: {remote_head.get('message', 'Unknown error')}")
+            return None
+        
+        return await self._check_cache(
+            repo_name, repo_url, None, prompt_versions,
+            remote_commit=remote_head["commit_sha"],
+            remote_branch=remote_head.get("branch_name")
+        )
 
-    async def _check_cache(self, repo_name: str, repo_url: str, repo_path: str, prompt_versions: Optional[Dict[str, str]] = None) -> Dict:
-        """Check if repository needs investigation using DynamoDB cache."""
+    async def _check_cache(self, repo_name: str, repo_url: str, repo_path: Optional[str], prompt_versions: Optional[Dict[str, str]] = None,
+                           remote_commit: Optional[str] = None, remote_branch: Optional[str] = None) -> Dict:
+        """Check if repository needs investigation using DynamoDB cache.
+        
+        The repository state is read from the clone at repo_path, or taken from
+        remote_commit/remote_branch when the repository has not been cloned yet.
+        """
         workflow.logger.info(f"🔍 WORKFLOW: Starting cache check for {repo_name}")
         workflow.logger.info(f"   repo_url: {repo_url}")
-        workflow.logger.info(f"   repo_path: {repo_path}")
+        workflow.logger.info(f"   repo_path: {repo_path or 'not cloned (remote check)'}")
         if prompt_versions:
             workflow.logger.info(f"   prompt_versions: {len(prompt_versions)} prompts provided")
         else:
@@ -124,16 +283,17 @@ class InvestigateSingleRepoWorkflow:
         self._last_heartbeat = workflow.now()
         
         # Create Pydantic input model for cache check
-        cache_check_input = CacheCheckInput(
-            repo_name=repo_name,
-            repo_url=repo_url,
-            repo_path=repo_path,
-            prompt_versions=prompt_versions
-        )
+        def cache_check_args(clone: Optional[CloneRepositoryResult]) -> list:
+            return [CacheCheckInput(
+                repo_name=repo_name,
+                repo_url=repo_url,
+                repo_path=clone.repo_path if clone else None,
+                prompt_versions=prompt_versions,
+                remote_commit=remote_commit,
+                remote_branch=remote_branch
+            )]
         
-        cache_check_result = await workflow.execute_activity(
-            check_if_repo_needs_investigation,
-            args=[cache_check_input],
+        options = dict(
             start_to_close_timeout=timedelta(minutes=2),
             retry_policy=RetryPolicy(
                 maximum_attempts=2,
@@ -141,6 +301,12 @@ class InvestigateSingleRepoWorkflow:
                 maximum_interval=timedelta(seconds=10),
             ),
         )
+        if repo_path:
+            cache_check_result = await self._execute_on_clone(check_if_repo_needs_investigation, cache_check_args, **options)
+        else:
+            cache_check_result = await workflow.execute_activity(
+                check_if_repo_needs_investigation, args=cache_check_args(None), **options
+            )
         
         workflow.logger.info(f"🎯 WORKFLOW: Cache check result: needs_investigation={cache_check_result.needs_investigation}")
         workflow.logger.info(f"   reason: {cache_check_result.reason}")
@@ -148,14 +314,49 @@ class InvestigateSingleRepoWorkflow:
         
         return cache_check_result
 
-    async def _analyze_repository_structure(self, repo_path: str) -> Dict:
+    async def _find_diff_affected_steps(self, base_commit: str, prompts_result: PromptsConfigResult) -> None:
+        """Find the steps affected by the changes since the last investigated commit.
+        
+        The other steps may reuse their results from base_commit. In update mode
+        the activity also stores a diff summary, and steps revise their result
+        from base_commit with it. When the diff cannot be computed every step
+        runs as before.
+        """
+        self._status = "diffing"
+        self._last_heartbeat = workflow.now()
+        
+        diff_result = await self._execute_on_clone(
+            get_diff_affected_steps_activity,
+            lambda clone: [clone.repo_path, base_commit, prompts_result.processing_order,
+                           prompts_result.diff_ignore_paths, self._repo_name],
+            start_to_close_timeout=timedelta(minutes=10),
+            retry_policy=RetryPolicy(
+                maximum_attempts=2,
+                initial_interval=timedelta(seconds=5),
+                maximum_interval=timedelta(seconds=30),
+            ),
+        )
+        
+        if diff_result.get("status") != "success":
+            logger.info(f"Diff against {base_commit[:8]} unavailable, running every step: {diff_result.get('message')}")
+            return
+        
+        self._reuse_commit = base_commit
+        self._diff_affected_steps = set(diff_result["affected_steps"])
+        self._diff_ref = diff_result.get("diff_ref")
+        logger.info(
+            f"🔀 {diff_result['relevant_paths']} relevant of {diff_result['changed_paths']} changed paths since "
+            f"{base_commit[:8]} affect steps: {sorted(self._diff_affected_steps) or 'none'}"
+        )
+
+    async def _analyze_repository_structure(self) -> Dict:
         """Analyze the repository structure."""
         self._status = "analyzing_structure"
         self._last_heartbeat = workflow.now()
         
-        structure_result = await workflow.execute_activity(
+        structure_result = await self._execute_on_clone(
             analyze_repository_structure_activity,
-            args=[repo_path],
+            lambda clone: [clone.repo_path],
             start_to_close_timeout=timedelta(minutes=5),
             retry_policy=RetryPolicy(
                 maximum_attempts=2,
@@ -186,20 +387,21 @@ class InvestigateSingleRepoWorkflow:
             prompts_dir=prompts_result["prompts_dir"],
             processing_order=prompts_result["processing_order"],
             prompt_versions=prompts_result.get("prompt_versions", {}),
+            diff_ignore_paths=prompts_result.get("diff_ignore_paths", []),
             status=prompts_result.get("status", "success")
         )
 
-    async def _read_and_cache_dependencies(self, repo_path: str) -> dict:
+    async def _read_and_cache_dependencies(self) -> dict:
         """Read dependency files and cache them."""
         self._status = "reading_dependencies"
         self._last_heartbeat = workflow.now()
         
-        logger.info(f"Reading and caching dependencies for repository at: {repo_path}")
+        logger.info(f"Reading and caching dependencies for repository at: {self._clone.repo_path}")
         
         # Read and format dependencies
-        deps_data = await workflow.execute_activity(
+        deps_data = await self._execute_on_clone(
             read_dependencies_activity,
-            args=[repo_path],
+            lambda clone: [clone.repo_path],
             start_to_close_timeout=timedelta(minutes=2),
             retry_policy=RetryPolicy(
                 maximum_attempts=2,
@@ -215,7 +417,7 @@ class InvestigateSingleRepoWorkflow:
                 "formatted_content": "Error reading dependency files!"
             }
         
-        logger.info(f"Dependencies read successfully: {deps_data['message']}")
+        logger.info(f"Dependencies read successfully: {deps_data['message']} (timings: {deps_data.get('timings', {})})")
         
         # Cache the dependencies data if we found any
         if deps_data["raw_dependencies"]:
@@ -245,6 +447,21 @@ class InvestigateSingleRepoWorkflow:
             "formatted_content": deps_data["formatted_content"]
         }
 
+    async def _store_shared_inputs(self, repo_structure: str, deps_formatted_content: Optional[str]) -> StoreSharedInputsOutput:
+        """Store the inputs every analysis step shares under content-addressed keys."""
+        shared_inputs = await workflow.execute_activity(
+            store_shared_inputs_activity,
+            args=[self._repo_name, repo_structure, deps_formatted_content],
+            start_to_close_timeout=timedelta(minutes=2),
+            retry_policy=RetryPolicy(
+                maximum_attempts=2,
+                initial_interval=timedelta(seconds=2),
+                maximum_interval=timedelta(seconds=10),
+            ),
+        )
+        logger.info(f"Shared inputs stored: structure={shared_inputs.repo_structure_ref}, deps={shared_inputs.deps_ref}")
+        return shared_inputs
+
     async def _process_analysis_steps(self, processing_order: list, prompts_dir: str, repo_structure: Dict, config_overrides: ConfigOverrides = None, deps_formatted_content: str = None) -> ProcessAnalysisResult:
         """Process each analysis step using PromptContext for cleaner abstraction."""
         if config_overrides is None:
@@ -269,123 +486,75 @@ class InvestigateSingleRepoWorkflow:
         
         # Track step results for building context
         step_results = {}  # Maps step names to result reference keys
+        step_hashes = {}  # Maps step names to result content hashes
         all_result_info = []   # Stores metadata about results
         cached_steps = 0
-        
-        for step in processing_order:
-            step_name = step.get("name", "unknown")
-            file_name = step.get("file", "")
-            is_required = True
-            description = step.get("description", "")
-            context_config = step.get("context", None)
-            
-            logger.info(f"Processing step: {step_name} - {description}")
-            
-            # Read the prompt file
-            prompt_result = await workflow.execute_activity(
-                read_prompt_file_activity,
-                args=[prompts_dir, file_name],
-                start_to_close_timeout=timedelta(minutes=2),
-                retry_policy=RetryPolicy(
-                    maximum_attempts=2,
-                    initial_interval=timedelta(seconds=1),
-                    maximum_interval=timedelta(seconds=10),
-                ),
-            )
-            
-            if prompt_result["status"] == "not_found":
-                if is_required:
-                    logger.error(f"Required prompt file not found: {file_name}")
-                    raise Exception(f"Required prompt file not found: {file_name}")
-                else:
-                    logger.warning(f"Optional prompt file not found, skipping: {file_name}")
+        token_usage = {}  # Maps step names to Claude token usage
+        
+        # Run each step as soon as the steps it takes context from have finished
+        step_dependencies = self._build_step_dependencies(processing_order)
+        max_parallel_steps = config_overrides.step_concurrency or WorkflowConfig.STEP_CONCURRENCY
+        logger.info(f"Running {len(processing_order)} analysis steps with up to {max_parallel_steps} in parallel")
+        
+        step_outcomes = {}  # Maps step index to AnalyzeWithClaudeOutput (None for skipped steps)
+        pending = {}
+        while len(step_outcomes) < len(processing_order):
+            # Start ready steps in processing order until the per-repo cap is reached
+            for index, step in enumerate(processing_order):
+                if len(pending) >= max_parallel_steps:
+                    break
+                if index in step_outcomes or index in pending.values():
                     continue
+                if all(dep in step_outcomes for dep in step_dependencies[index]):
+                    task = asyncio.create_task(self._run_analysis_step(
+                        step, prompts_dir, repo_structure, config_overrides, deps_formatted_content,
+                        step_results, step_hashes
+                    ))
+                    pending[task] = index
             
-            prompt_content = prompt_result["prompt_content"]
-            prompt_version = prompt_result.get("prompt_version", "1")
-            
-            # Create PromptContext for this step with proper context references
-            context_dict = {
-                "repo_name": self._repo_name,
-                "step_name": step_name,
-                "prompt_version": prompt_version,
-                "context_reference_keys": []
-            }
-            
-            # Add context references from previous steps
-            if context_config:
-                for context_step in context_config:
-                    # Handle both string and dict formats
-                    if isinstance(context_step, dict) and "val" in context_step:
-                        step_ref = context_step["val"]
-                    else:
-                        step_ref = context_step
-                    
-                    if step_ref and step_ref in step_results:
-                        result_key = step_results[step_ref]
-                        # Only add non-None result keys
-                        if result_key is not None:
-                            context_dict["context_reference_keys"].append(result_key)
-                        else:
-                            logger.warning(f"Step {step_ref} has None result key, skipping from context")
-            
-            # Save prompt data to DynamoDB using PromptContext
-            logger.info(f"Saving prompt data for step: {step_name}")
-            save_result = await workflow.execute_activity(
-                save_prompt_context_activity,
-                args=[context_dict, prompt_content, repo_structure, deps_formatted_content],
-                start_to_close_timeout=timedelta(minutes=2),
-                retry_policy=RetryPolicy(
-                    maximum_attempts=2,
-                    initial_interval=timedelta(seconds=1),
-                    maximum_interval=timedelta(seconds=10),
-                ),
-            )
-            
-            if save_result["status"] != "success":
-                raise Exception(f"Failed to save prompt context for step {step_name}")
-            
-            # Get updated context with data reference key
-            updated_context = save_result["context"]
-            
-            # Execute Claude analysis using PromptContext with prompt-level caching
-            logger.info(f"Calling Claude for step: {step_name}")
-            # Get latest_commit from workflow state (passed from parent)
-            latest_commit = getattr(self, '_latest_commit', None)
-            
-            # Create Pydantic input model
-            claude_input = AnalyzeWithClaudeInput(
-                context_dict=PromptContextDict(**updated_context),
-                config_overrides=ClaudeConfigOverrides(**config_overrides.model_dump()) if config_overrides else None,
-                latest_commit=latest_commit
-            )
-            
-            claude_result = await workflow.execute_activity(
-                analyze_with_claude_context,
-                args=[claude_input],
-                start_to_close_timeout=timedelta(minutes=15),
-                retry_policy=RetryPolicy(
-                    maximum_attempts=3,
-                    initial_interval=timedelta(seconds=5),
-                    maximum_interval=timedelta(seconds=30),
-                    backoff_coefficient=2.0
-                ),
-            )
+            done, _ = await workflow.wait(list(pending), return_when=asyncio.FIRST_COMPLETED)
             
-            if claude_result.status != "success":
-                raise Exception(f"Claude analysis failed for step {step_name}")
-            
-            # Log if result was from cache
-            if claude_result.cached:
-                logger.info(f"✅ Used cached result for step {step_name}: {claude_result.cache_reason or 'Unknown reason'}")
-                cached_steps += 1
+            # Handle completions in processing order so the workflow stays deterministic
+            for task in sorted(done, key=lambda t: pending[t]):
+                index = pending.pop(task)
+                claude_result = task.result()
+                step_outcomes[index] = claude_result
+                if claude_result is None:
+                    continue
+                
+                step_name = processing_order[index].get("name", "unknown")
+                
+                # Log if result was from cache
+                if claude_result.cached:
+                    logger.info(f"✅ Used cached result for step {step_name}: {claude_result.cache_reason or 'Unknown reason'}")
+                    cached_steps += 1
+                elif claude_result.usage:
+                    token_usage[step_name] = claude_result.usage
+                    logger.info(
+                        f"📊 Step {step_name} prompt cache: "
+                        f"read={claude_result.usage.get('cache_read_input_tokens', 0)}, "
+                        f"write={claude_result.usage.get('cache_creation_input_tokens', 0)}, "
+                        f"uncached input={claude_result.usage.get('input_tokens', 0)}"
+                    )
+                
+                # Store result key for future context use
+                result_key = claude_result.context.model_dump()["result_reference_key"]
+                step_results[step_name] = result_key
+                if claude_result.result_hash:
+                    step_hashes[step_name] = claude_result.result_hash
+                logger.info(f"Step {step_name} completed with result key: {result_key}")
+        
+        # Record results in processing order regardless of completion order
+        for index, step in enumerate(processing_order):
+            claude_result = step_outcomes[index]
+            if claude_result is None:
+                continue
             
-            # Get the result context with result key
-            result_context = claude_result.context.model_dump()
-            result_key = result_context["result_reference_key"]
+            step_name = step.get("name", "unknown")
+            description = step.get("description", "")
+            context_config = step.get("context", None)
+            result_key = step_results[step_name]
             
-            # Store result key for future context use
-            step_results[step_name] = result_key
             all_result_info.append({
                 "name": step_name,
                 "description": description,
@@ -398,11 +567,9 @@ class InvestigateSingleRepoWorkflow:
                 step_name=step_name,
                 description=description,
                 result_key=result_key,
-                required=is_required,
+                required=True,
                 context_dependencies=[ctx.get("val") for ctx in context_config or [] if isinstance(ctx, dict) and "val" in ctx]
             )
-            
-            logger.info(f"Step {step_name} completed with result key: {result_key}")
         
         # Retrieve all results from DynamoDB for final processing
         logger.info(f"Retrieving all {len(step_results)} results from DynamoDB")
@@ -440,6 +607,15 @@ class InvestigateSingleRepoWorkflow:
         # Get statistics for logging
         stats = results_collector.get_statistics()
         logger.info(f"Results collection statistics: {stats}")
+        if token_usage:
+            cache_read_total = sum(u.get("cache_read_input_tokens", 0) for u in token_usage.values())
+            cache_write_total = sum(u.get("cache_creation_input_tokens", 0) for u in token_usage.values())
+            logger.info(f"📊 Prompt cache totals: read={cache_read_total}, write={cache_write_total} tokens over {len(token_usage)} steps")
+        
+        # Reported to the parent's adaptive concurrency controller
+        api_feedback = merge_api_feedback(
+            outcome.api_feedback for outcome in step_outcomes.values() if outcome is not None and not outcome.cached
+        )
         
         # Note: Cleanup is handled automatically by TTL in DynamoDB
         # We could add explicit cleanup here if needed
@@ -448,17 +624,275 @@ class InvestigateSingleRepoWorkflow:
             step_results=step_results,
             all_results=all_results,
             total_steps=len(step_results),
-            cached_steps=cached_steps
+            cached_steps=cached_steps,
+            token_usage=token_usage,
+            api_feedback=api_feedback
+        )
+
+    def _build_step_dependencies(self, processing_order: list) -> Dict[int, list]:
+        """Map each step index to the indices of the earlier steps it takes context from.
+        
+        Only earlier steps count as dependencies - a context reference to a
+        later or unknown step never had a result available when the step ran
+        sequentially, so it is ignored here too.
+        """
+        first_index = {}
+        dependencies = {}
+        for index, step in enumerate(processing_order):
+            deps = []
+            for context_step in step.get("context", None) or []:
+                # Handle both string and dict formats
+                if isinstance(context_step, dict) and "val" in context_step:
+                    step_ref = context_step["val"]
+                else:
+                    step_ref = context_step
+                if isinstance(step_ref, str) and step_ref in first_index and first_index[step_ref] not in deps:
+                    deps.append(first_index[step_ref])
+            dependencies[index] = deps
+            first_index.setdefault(step.get("name", "unknown"), index)
+        return dependencies
+
+    async def _run_analysis_step(self, step: dict, prompts_dir: str, repo_structure: Dict,
+                                 config_overrides: ConfigOverrides, deps_formatted_content: Optional[str],
+                                 step_results: Dict[str, str], step_hashes: Optional[Dict[str, str]] = None):
+        """Run one analysis step.
+        
+        Normally a single run_analysis_step_activity does the whole step. In batch
+        mode the prompt is read and saved first so the parent can submit it in a
+        Message Batch.
+        
+        Args:
+            step: Step entry from processing_order
+            prompts_dir: Directory containing the prompt files
+            repo_structure: Repository structure
+            config_overrides: ConfigOverrides for the Claude call
+            deps_formatted_content: Optional formatted dependencies
+            step_results: Result keys of the steps finished so far
+            step_hashes: Result hashes of the steps finished so far
+            
+        Returns:
+            AnalyzeWithClaudeOutput, or None when an optional prompt file is missing
+        """
+        step_name = step.get("name", "unknown")
+        description = step.get("description", "")
+        
+        logger.info(f"Processing step: {step_name} - {description}")
+        
+        context_dict = {
+            "repo_name": self._repo_name,
+            "step_name": step_name,
+            "context_reference_keys": self._context_reference_keys(step.get("context", None), step_results)
+        }
+        
+        # Pass the shared inputs by reference when they have been stored
+        shared = self._shared_inputs
+        step_input = RunAnalysisStepInput(
+            context_dict=PromptContextDict(**context_dict),
+            prompts_dir=prompts_dir,
+            prompt_file=step.get("file", ""),
+            repo_structure=None if shared else repo_structure,
+            deps_formatted_content=None if shared and shared.deps_ref else deps_formatted_content,
+            repo_structure_ref=shared.repo_structure_ref if shared else None,
+            deps_ref=shared.deps_ref if shared else None,
+            config_overrides=ClaudeConfigOverrides(**config_overrides.model_dump()) if config_overrides else None,
+            # Get latest_commit from workflow state (passed from parent)
+            latest_commit=getattr(self, '_latest_commit', None),
+            upstream_hashes=self._upstream_hashes(step.get("context", None), step_hashes or {}),
+            reuse_commit=self._step_reuse_commit(step_name),
+            update_from_commit=self._reuse_commit if self._diff_ref else None,
+            diff_ref=self._diff_ref
+        )
+        
+        if config_overrides.batch_mode and workflow.info().parent:
+            return await self._run_batched_analysis_step(
+                step, prompts_dir, repo_structure, config_overrides, deps_formatted_content, context_dict,
+                step_input
+            )
+        
+        logger.info(f"Running analysis step activity for: {step_name}")
+        claude_result = await workflow.execute_activity(
+            run_analysis_step_activity,
+            task_queue=self._task_queues.llm,
+            args=[step_input],
+            start_to_close_timeout=timedelta(minutes=15),
+            retry_policy=RetryPolicy(
+                maximum_attempts=3,
+                initial_interval=timedelta(seconds=5),
+                maximum_interval=timedelta(seconds=30),
+                backoff_coefficient=2.0,
+                non_retryable_error_types=["FileNotFoundError"]  # Missing prompt files don't fix themselves
+            ),
+        )
+        
+        if claude_result.status != "success":
+            raise Exception(f"Claude analysis failed for step {step_name}")
+        
+        return claude_result
+
+    def _context_reference_keys(self, context_config: Optional[list], step_results: Dict[str, str]) -> list:
+        """Result keys of the finished steps a step takes context from."""
+        context_reference_keys = []
+        for context_step in context_config or []:
+            # Handle both string and dict formats
+            if isinstance(context_step, dict) and "val" in context_step:
+                step_ref = context_step["val"]
+            else:
+                step_ref = context_step
+            
+            if step_ref and step_ref in step_results:
+                result_key = step_results[step_ref]
+                # Only add non-None result keys
+                if result_key is not None:
+                    context_reference_keys.append(result_key)
+                else:
+                    logger.warning(f"Step {step_ref} has None result key, skipping from context")
+        return context_reference_keys
+
+    def _step_reuse_commit(self, step_name: str) -> Optional[str]:
+        """Earlier commit a step can reuse its result from, when the diff since then doesn't affect it."""
+        if self._reuse_commit and self._diff_affected_steps is not None and step_name not in self._diff_affected_steps:
+            return self._reuse_commit
+        return None
+
+    def _upstream_hashes(self, context_config: Optional[list], step_hashes: Dict[str, str]) -> Dict[str, str]:
+        """Result hashes of the finished steps a step takes context from, by step name."""
+        upstream_hashes = {}
+        for context_step in context_config or []:
+            # Handle both string and dict formats
+            if isinstance(context_step, dict) and "val" in context_step:
+                step_ref = context_step["val"]
+            else:
+                step_ref = context_step
+            
+            if step_ref and step_ref in step_hashes:
+                upstream_hashes[step_ref] = step_hashes[step_ref]
+        return upstream_hashes
+
+    async def _run_batched_analysis_step(self, step: dict, prompts_dir: str, repo_structure: Dict,
+                                         config_overrides: ConfigOverrides, deps_formatted_content: Optional[str],
+                                         context_dict: dict, step_input: RunAnalysisStepInput):
+        """Check a step's caches, then read and save its prompt and hand it to the parent's Message Batch.
+        
+        The cache checks are those of run_analysis_step_activity (prompt cache with
+        lineage, reuse commit, input fingerprint), so unchanged steps are not
+        resubmitted. Update mode does not apply: a batched step is analyzed in full.
+        """
+        step_name = step.get("name", "unknown")
+        file_name = step.get("file", "")
+        is_required = True
+        
+        cache_check = await workflow.execute_activity(
+            check_analysis_step_cache_activity,
+            args=[step_input],
+            start_to_close_timeout=timedelta(minutes=5),
+            retry_policy=RetryPolicy(
+                maximum_attempts=3,
+                initial_interval=timedelta(seconds=5),
+                maximum_interval=timedelta(seconds=30),
+                backoff_coefficient=2.0,
+                non_retryable_error_types=["FileNotFoundError"]  # Missing prompt files don't fix themselves
+            ),
+        )
+        if cache_check.cached_output:
+            logger.info(f"♻️ Step {step_name} served from cache - not queued for batch analysis")
+            return cache_check.cached_output
+        
+        # Read the prompt file
+        prompt_result = await workflow.execute_activity(
+            read_prompt_file_activity,
+            args=[prompts_dir, file_name],
+            start_to_close_timeout=timedelta(minutes=2),
+            retry_policy=RetryPolicy(
+                maximum_attempts=2,
+                initial_interval=timedelta(seconds=1),
+                maximum_interval=timedelta(seconds=10),
+            ),
+        )
+        
+        if prompt_result["status"] == "not_found":
+            if is_required:
+                logger.error(f"Required prompt file not found: {file_name}")
+                raise Exception(f"Required prompt file not found: {file_name}")
+            else:
+                logger.warning(f"Optional prompt file not found, skipping: {file_name}")
+                return None
+        
+        prompt_content = prompt_result["prompt_content"]
+        context_dict = {**context_dict, "prompt_version": prompt_result.get("prompt_version", "1")}
+        
+        # Save prompt data to DynamoDB using PromptContext
+        logger.info(f"Saving prompt data for step: {step_name}")
+        shared = self._shared_inputs
+        if shared:
+            save_args = [context_dict, prompt_content, None, None, shared.repo_structure_ref, shared.deps_ref]
+        else:
+            save_args = [context_dict, prompt_content, repo_structure, deps_formatted_content]
+        save_result = await workflow.execute_activity(
+            save_prompt_context_activity,
+            args=save_args,
+            start_to_close_timeout=timedelta(minutes=2),
+            retry_policy=RetryPolicy(
+                maximum_attempts=2,
+                initial_interval=timedelta(seconds=1),
+                maximum_interval=timedelta(seconds=10),
+            ),
+        )
+        
+        if save_result["status"] != "success":
+            raise Exception(f"Failed to save prompt context for step {step_name}")
+        
+        # Create Pydantic input model with the updated context (now holding the data reference key)
+        claude_input = AnalyzeWithClaudeInput(
+            context_dict=PromptContextDict(**save_result["context"]),
+            config_overrides=ClaudeConfigOverrides(**config_overrides.model_dump()) if config_overrides else None,
+            latest_commit=step_input.latest_commit,
+            upstream_hashes=step_input.upstream_hashes,
+            input_fingerprint=cache_check.input_fingerprint
         )
+        
+        # Let the parent group this step with other repos into a Message Batch
+        claude_result = await self._analyze_via_parent_batch(step_name, claude_input)
+        
+        if claude_result.status != "success":
+            raise Exception(f"Claude analysis failed for step {step_name}")
+        
+        return claude_result
 
-    async def _write_analysis_results(self, temp_dir: str, repo_path: str, final_analysis: str) -> WriteResultsOutput:
+    async def _analyze_via_parent_batch(self, step_name: str, claude_input: AnalyzeWithClaudeInput):
+        """Ask the parent workflow to run a step through the Message Batches API and wait for it.
+        
+        Args:
+            step_name: Name of the analysis step
+            claude_input: Same input the synchronous analyze_with_claude_context would get
+            
+        Returns:
+            AnalyzeWithClaudeOutput delivered by the parent
+        """
+        info = workflow.info()
+        parent = workflow.get_external_workflow_handle(info.parent.workflow_id)
+        
+        logger.info(f"📦 Queuing step {step_name} for batch analysis")
+        self._batch_results.pop(step_name, None)
+        await parent.signal(
+            "submit_batch_analysis",
+            BatchAnalysisRequest(workflow_id=info.workflow_id, step_name=step_name, analyze_input=claude_input)
+        )
+        
+        await workflow.wait_condition(lambda: step_name in self._batch_results)
+        result = self._batch_results.pop(step_name)
+        
+        if result.error or not result.output:
+            raise Exception(f"Batched Claude analysis failed for step {step_name}: {result.error or 'no result'}")
+        return result.output
+    
+    async def _write_analysis_results(self, final_analysis: str) -> WriteResultsOutput:
         """Write final analysis to file."""
         self._status = "writing_results"
         self._last_heartbeat = workflow.now()
         
-        write_result = await workflow.execute_activity(
+        write_result = await self._execute_on_clone(
             write_analysis_result_activity,
-            args=[temp_dir, repo_path, final_analysis],
+            lambda clone: [clone.temp_dir, clone.repo_path, final_analysis],
             start_to_close_timeout=timedelta(minutes=5),
             retry_policy=RetryPolicy(
                 maximum_attempts=2,
@@ -509,7 +943,7 @@ class InvestigateSingleRepoWorkflow:
                     initial_interval=timedelta(seconds=30),
                     maximum_interval=timedelta(minutes=2)
                 ),
-                task_queue="investigate-task-queue"
+                task_queue=self._task_queues.hub or "investigate-task-queue"
             )
             
             logger.info(f"Architecture hub save result for {repo_name}: {hub_result.get('message', 'Unknown')}")
@@ -571,6 +1005,7 @@ class InvestigateSingleRepoWorkflow:
             metadata_result = await workflow.execute_activity(
                 save_investigation_metadata,
                 args=[save_metadata_input],
+                task_queue=self._task_queues.hub,
                 start_to_close_timeout=timedelta(minutes=2),
                 retry_policy=RetryPolicy(
                     maximum_attempts=3,
@@ -617,6 +1052,7 @@ class InvestigateSingleRepoWorkflow:
         
         # Initialize workflow state
         self._repo_name = repo_name
+        self._repo_url = repo_url
         self._status = "started"
         self._last_heartbeat = workflow.now()
         self._latest_commit = None  # Will be set after cache check
@@ -624,21 +1060,49 @@ class InvestigateSingleRepoWorkflow:
         logger.info(f"Starting investigation for repository: {repo_name} (type: {repo_type})")
         if force:
             logger.info(f"⚡ Force mode enabled for {repo_name} - will investigate regardless of cache")
+        elif config_overrides.force_section:
+            # The forced section and the steps that depend on it re-run, the other steps hit their caches
+            logger.info(f"⚡ Force section {config_overrides.force_section} for {repo_name} - will investigate regardless of cache")
+            force = True
         
         # Step 0: DynamoDB Health Check
         await self._perform_health_check()
         
-        # Step 1: Clone the repository
-        clone_result = await self._clone_repository(repo_url, repo_name)
-        repo_path = clone_result.repo_path
-        temp_dir = clone_result.temp_dir
-        
-        # Step 1.5: Get prompts configuration early to extract prompt versions for cache comparison
+        # Step 1: Get prompts configuration early to extract prompt versions for cache comparison
+        # The prompts directory only depends on the repository type, so no clone is needed yet
         logger.info(f"🔍 WORKFLOW: Loading prompts configuration early for cache comparison")
-        early_prompts_result = await self._get_prompts_config(repo_path, repo_type, repo_url)
+        early_prompts_result = await self._get_prompts_config("", repo_type, repo_url)
         prompt_versions = early_prompts_result.prompt_versions
         logger.info(f"📝 WORKFLOW: Extracted {len(prompt_versions)} prompt versions for cache check")
         
+        # Step 1.5: Pre-clone cache check against the remote HEAD (git ls-remote)
+        # Unchanged repositories are skipped without cloning them at all
+        if not force:
+            remote_check_result = await self._check_remote_cache(repo_name, repo_url, prompt_versions)
+            if remote_check_result is not None and not remote_check_result.needs_investigation:
+                cache_reason = remote_check_result.reason
+                logger.info(f"⏭️  WORKFLOW: Skipping investigation for {repo_name} before cloning: {cache_reason}")
+                logger.info(f"🎯 FINAL DECISION: Repository {repo_name} will be SKIPPED")
+                last_investigation = remote_check_result.last_investigation or {}
+                
+                return InvestigateSingleRepoResult(
+                    status="skipped",
+                    repo_name=repo_name,
+                    repo_url=repo_url,
+                    repo_type=repo_type,
+                    prompt_versions=prompt_versions,
+                    latest_commit=remote_check_result.latest_commit,
+                    branch_name=remote_check_result.branch_name,
+                    cached=True,
+                    reason=cache_reason,
+                    last_investigation_timestamp=last_investigation.get("analysis_timestamp"),
+                    message=f"Repository {repo_name} skipped: {cache_reason}"
+                )
+        
+        # Step 1.6: Clone the repository; the activities using the clone follow it to its worker
+        clone_result = await self._clone_repository(repo_url, repo_name)
+        repo_path = clone_result.repo_path
+        
         # Step 2: Check if repository needs investigation (using DynamoDB cache)
         # Skip cache check if force is True
         cache_check_result = await self._check_cache(repo_name, repo_url, repo_path, prompt_versions)
@@ -665,10 +1129,12 @@ class InvestigateSingleRepoWorkflow:
             # Clean up the cloned repository since we're not investigating
             try:
                 logger.info(f"Cleaning up cloned repository for skipped repo {repo_name}")
+                # No re-clone on a lost worker: its clone is gone along with it
                 cleanup_result = await workflow.execute_activity(
                     cleanup_repository_activity,
-                    args=[repo_path, temp_dir],
+                    args=[self._clone.repo_path, self._clone.temp_dir],
                     start_to_close_timeout=timedelta(minutes=2),
+                    **self._clone_worker_options(),
                     retry_policy=RetryPolicy(
                         maximum_attempts=1,  # Don't retry cleanup failures
                         initial_interval=timedelta(seconds=1),
@@ -697,15 +1163,28 @@ class InvestigateSingleRepoWorkflow:
         logger.info(f"🚀 WORKFLOW: Proceeding with full investigation for {repo_name}")
         logger.info(f"🎯 FINAL DECISION: Repository {repo_name} will be INVESTIGATED")
         
+        # Step 2.5: Steps the changes since the last investigation don't touch reuse its results
+        last_commit = (cache_check_result.last_investigation or {}).get("latest_commit")
+        if last_commit and latest_commit and last_commit != latest_commit:
+            await self._find_diff_affected_steps(last_commit, early_prompts_result)
+        
         # Step 3: Analyze repository structure
-        structure_result = await self._analyze_repository_structure(repo_path)
+        structure_result = await self._analyze_repository_structure()
         repo_structure = structure_result["repo_structure"]
+        if structure_result.get("structure_token_budget"):
+            logger.info(
+                f"📐 Repository structure: ~{structure_result['structure_tokens']} tokens "
+                f"(budget {structure_result['structure_token_budget']})"
+            )
         
         # Step 3.5: Read and cache dependencies
-        deps_result = await self._read_and_cache_dependencies(repo_path)
+        deps_result = await self._read_and_cache_dependencies()
         deps_reference_key = deps_result.get("deps_reference_key")
         deps_formatted_content = deps_result.get("formatted_content")
         
+        # Step 3.6: Store structure and dependencies once - steps get them by reference
+        self._shared_inputs = await self._store_shared_inputs(repo_structure, deps_formatted_content)
+        
         # Step 4: Reuse prompts configuration (already loaded for cache check)
         logger.info(f"📝 WORKFLOW: Reusing prompts configuration loaded earlier")
         prompts_result = early_prompts_result  # Reuse the configuration loaded before cache check
@@ -733,7 +1212,7 @@ class InvestigateSingleRepoWorkflow:
         final_analysis = results_collector_final.generate_final_analysis(all_results)
         
         # Step 7: Write final analysis to file
-        write_result = await self._write_analysis_results(temp_dir, repo_path, final_analysis)
+        write_result = await self._write_analysis_results(final_analysis)
         arch_file_path = write_result.arch_file_path
         
         investigation_result = InvestigationResult(
@@ -800,8 +1279,9 @@ class InvestigateSingleRepoWorkflow:
             logger.info(f"Cleaning up cloned repository for {repo_name}")
             cleanup_result = await workflow.execute_activity(
                 cleanup_repository_activity,
-                args=[repo_path, temp_dir],
+                args=[self._clone.repo_path, self._clone.temp_dir],
                 start_to_close_timeout=timedelta(minutes=2),
+                **self._clone_worker_options(),
                 retry_policy=RetryPolicy(
                     maximum_attempts=1,  # Don't retry cleanup failures
                     initial_interval=timedelta(seconds=1),
@@ -834,5 +1314,6 @@ class InvestigateSingleRepoWorkflow:
             architecture_hub=investigation_result.architecture_hub,
             metadata_saved=investigation_result.metadata_saved,
             cleanup=cleanup,
-            message=f"Repository {repo_name} investigation completed successfully"
+            message=f"Repository {repo_name} investigation completed successfully",
+            api_feedback=analysis_result.api_feedback
         )
\ No newline at end of file
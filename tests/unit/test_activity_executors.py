@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the I/O and LLM thread pools used by async activities.
+"""
+
+import sys
+import time
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from activities import executors
+
+
+@pytest.fixture(autouse=True)
+def small_pools():
+    executors.configure_executors(io_workers=2, llm_workers=1)
+    yield
+    executors.shutdown_executors()
+
+
+def test_work_runs_on_the_named_pool_threads():
+    async def run():
+        return (
+            await executors.run_io(lambda: threading.current_thread().name),
+            await executors.run_llm(lambda: threading.current_thread().name),
+        )
+
+    io_thread, llm_thread = asyncio.run(run())
+
+    assert io_thread.startswith("activity-io")
+    assert llm_thread.startswith("activity-llm")
+    assert executors.get_executor("io")._max_workers == 2
+    assert executors.get_executor("llm")._max_workers == 1
+
+
+def test_arguments_and_exceptions_pass_through():
+    def fail():
+        raise ValueError("boom")
+
+    async def run():
+        assert await executors.run_io(divmod, 7, 2) == (3, 1)
+        with pytest.raises(ValueError, match="boom"):
+            await executors.run_llm(fail)
+
+    asyncio.run(run())
+
+
+def test_event_loop_keeps_running_during_blocking_call():
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def run():
+        task = asyncio.create_task(ticker())
+        await executors.run_io(time.sleep, 0.2)
+        task.cancel()
+
+    asyncio.run(run())
+
+    assert len(ticks) >= 5
+
+
+def test_context_variables_are_visible_in_the_thread():
+    import contextvars
+    var = contextvars.ContextVar("var", default=None)
+
+    async def run():
+        var.set("activity-context")
+        return await executors.run_io(var.get)
+
+    assert asyncio.run(run()) == "activity-context"
+
+
+def test_pools_are_created_lazily_after_shutdown():
+    executors.shutdown_executors()
+
+    assert asyncio.run(executors.run_io(lambda: 42)) == 42
+
+
+def test_hub_clone_is_created_and_removed_on_the_io_pool(tmp_path, monkeypatch):
+    import os
+    from activities import investigate_activities
+    from investigator.core.git_manager import GitRepositoryManager
+
+    pooled = []
+    real_run_io = investigate_activities.run_io
+
+    async def recording_run_io(fn, *args, **kwargs):
+        pooled.append((getattr(fn, "__name__", repr(fn)), args))
+        return await real_run_io(fn, *args, **kwargs)
+
+    def failing_clone(self, repo_url, repo_dir):
+        assert os.path.isdir(os.path.dirname(repo_dir))
+        raise RuntimeError("remote unavailable")
+
+    monkeypatch.setattr(investigate_activities, "run_io", recording_run_io)
+    monkeypatch.setattr(investigate_activities.activity, "heartbeat", lambda *args: None)
+    monkeypatch.setattr(GitRepositoryManager, "clone_or_update", failing_clone)
+
+    with pytest.raises(Exception, match="remote unavailable"):
+        asyncio.run(investigate_activities.save_to_arch_hub([{"repo_name": "repo", "arch_file_content": "x"}]))
+
+    names = [name for name, _ in pooled]
+    assert names[0] == "mkdtemp" and names[-1] == "rmtree"
+    temp_dir = pooled[-1][1][0]
+    assert not os.path.exists(temp_dir)
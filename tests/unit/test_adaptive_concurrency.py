@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the adaptive concurrency controller, the Claude API feedback it
+reads and its use in InvestigateReposWorkflow's sliding window.
+"""
+
+import sys
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from anthropic import RateLimitError
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from investigator.core.claude_analyzer import ClaudeAnalyzer
+from models import ClaudeApiFeedback, ConfigOverrides, InvestigateSingleRepoResult
+from workflow_config import WorkflowConfig
+from workflows.adaptive_concurrency import AdaptiveConcurrency, merge_api_feedback
+from workflows.investigate_repos_workflow import InvestigateReposWorkflow
+
+
+def _clean(latency_ms=10_000, output_tokens=1000):
+    return ClaudeApiFeedback(calls=1, latency_ms=latency_ms, output_tokens=output_tokens, capacity_remaining=0.8)
+
+
+def test_merge_sums_calls_and_keeps_the_worst_signals():
+    merged = merge_api_feedback([
+        _clean(),
+        None,
+        ClaudeApiFeedback(latency_ms=5000, output_tokens=500, retries=2, retry_after_seconds=7, capacity_remaining=0.3),
+        ClaudeApiFeedback(latency_ms=1000, failed_attempts=1, retry_after_seconds=3),
+    ])
+
+    assert merged.calls == 3
+    assert merged.latency_ms == 16_000
+    assert merged.output_tokens == 1500
+    assert merged.retries == 2 and merged.failed_attempts == 1
+    assert merged.retry_after_seconds == 7
+    assert merged.capacity_remaining == 0.3
+    assert merge_api_feedback([None, None]) is None
+
+
+def test_clean_reports_add_about_one_repo_per_window():
+    concurrency = AdaptiveConcurrency(repos=4, steps=4, max_repos=20, max_steps=8)
+
+    for i in range(4):
+        assert concurrency.record(_clean(), now=i) is None
+
+    assert concurrency.repos == 4  # 4 + 1/4 + 1/4.25 + ... stays just under 5
+    concurrency.record(_clean(), now=5)
+    assert concurrency.repos == 5
+    assert concurrency.steps == 5
+
+
+@pytest.mark.parametrize("feedback, sign", [
+    (ClaudeApiFeedback(retries=1), "retried requests"),
+    (ClaudeApiFeedback(failed_attempts=2), "failed attempts"),
+    (ClaudeApiFeedback(retry_after_seconds=30), "retry-after"),
+    (ClaudeApiFeedback(capacity_remaining=0.05), "capacity left"),
+])
+def test_congestion_halves_both_limits(feedback, sign):
+    concurrency = AdaptiveConcurrency(repos=8, steps=4)
+
+    assert sign in concurrency.record(feedback, now=0)
+
+    assert (concurrency.repos, concurrency.steps) == (4, 2)
+
+
+def test_one_cut_per_cooldown():
+    concurrency = AdaptiveConcurrency(repos=16, steps=8)
+
+    concurrency.record(ClaudeApiFeedback(retries=1), now=0)
+    concurrency.record(ClaudeApiFeedback(retries=1), now=10)
+    assert concurrency.repos == 8
+
+    concurrency.record(ClaudeApiFeedback(retries=1), now=WorkflowConfig.ADAPTIVE_DECREASE_COOLDOWN_SECONDS)
+    assert concurrency.repos == 4
+    assert concurrency.steps == 2
+
+
+def test_latency_rise_against_the_best_seen_is_congestion():
+    concurrency = AdaptiveConcurrency(repos=8, steps=4)
+
+    assert concurrency.record(_clean(latency_ms=10_000), now=0) is None
+    assert concurrency.record(_clean(latency_ms=15_000), now=1) is None
+    assert "latency" in concurrency.record(_clean(latency_ms=25_000), now=2)
+    assert concurrency.repos == 4
+
+
+def test_retry_after_holds_new_starts_and_empty_reports_are_ignored():
+    concurrency = AdaptiveConcurrency(repos=1, steps=1)
+
+    concurrency.record(ClaudeApiFeedback(retry_after_seconds=30), now=100)
+    assert not concurrency.can_start(120) and concurrency.can_start(130)
+    assert concurrency.repos == 1 and concurrency.steps == 1
+
+    assert concurrency.record(ClaudeApiFeedback(calls=0, retries=5), now=500) is None
+    assert concurrency.record(None, now=500) is None
+
+
+def test_analyzer_reports_latency_retries_and_rate_limit_headers():
+    analyzer = ClaudeAnalyzer("test-key", logging.getLogger(__name__))
+    response = SimpleNamespace(content=[SimpleNamespace(text="analysis")],
+                               usage=SimpleNamespace(input_tokens=10, output_tokens=40))
+    headers = {
+        "anthropic-ratelimit-requests-remaining": "45", "anthropic-ratelimit-requests-limit": "50",
+        "anthropic-ratelimit-input-tokens-remaining": "4000", "anthropic-ratelimit-input-tokens-limit": "40000",
+        "anthropic-ratelimit-output-tokens-remaining": "7000", "anthropic-ratelimit-output-tokens-limit": "8000",
+    }
+    analyzer.client = MagicMock()
+    analyzer.client.messages.with_raw_response.create.return_value = SimpleNamespace(
+        parse=lambda: response, headers=headers, retries_taken=2
+    )
+
+    analyzer.analyze_with_context("Describe {repo_structure}", "src/")
+
+    feedback = ClaudeApiFeedback(**analyzer.last_api_feedback)
+    assert feedback.retries == 2
+    assert feedback.output_tokens == 40
+    assert feedback.capacity_remaining == 0.1
+    assert feedback.retry_after_seconds is None
+
+
+def test_analyzer_reports_retry_after_of_a_rate_limited_request():
+    analyzer = ClaudeAnalyzer("test-key", logging.getLogger(__name__))
+    # Built without __init__ so the test does not depend on the SDK's HTTP client types
+    error = RateLimitError.__new__(RateLimitError)
+    Exception.__init__(error, "rate limited")
+    error.response = SimpleNamespace(status_code=429, headers={"retry-after": "12"})
+    analyzer.client = MagicMock()
+    analyzer.client.messages.with_raw_response.create.side_effect = error
+
+    with pytest.raises(Exception, match="rate limited"):
+        analyzer.analyze_with_context("Describe {repo_structure}", "src/")
+
+    assert analyzer.last_api_feedback["retry_after_seconds"] == 12
+
+
+def _repos_config(count):
+    return {"repositories": {
+        f"repo-{i}": {"url": f"https://github.com/org/repo-{i}", "type": "generic"} for i in range(count)
+    }}
+
+
+async def _run_fleet(child_fn, repo_count, chunk_size, adaptive=None):
+    """Run the sliding window with patched workflow APIs and a fake clock; returns (result, sleeps)."""
+    clock = {"now": datetime(2025, 1, 1)}
+    sleeps = []
+
+    async def fake_execute_activity(activity, *args, **kwargs):
+        if activity.__name__ == "update_repos_list":
+            return {"status": "success", "message": "ok"}
+        return _repos_config(repo_count)
+
+    async def fake_execute_child_workflow(run_fn, args, **kwargs):
+        return await child_fn(args[0])
+
+    async def fake_sleep(duration):
+        if duration:
+            sleeps.append(duration)
+            clock["now"] += duration
+        await asyncio.sleep(0)
+
+    async def fake_wait(fs, *, timeout=None, return_when=asyncio.ALL_COMPLETED):
+        return await asyncio.wait(fs, timeout=timeout, return_when=return_when)
+
+    target = "workflows.investigate_repos_workflow.workflow"
+    with patch(f"{target}.execute_activity", fake_execute_activity), \
+         patch(f"{target}.execute_child_workflow", fake_execute_child_workflow), \
+         patch(f"{target}.sleep", fake_sleep), \
+         patch(f"{target}.wait", fake_wait), \
+         patch(f"{target}.now", lambda: clock["now"]):
+        result = await InvestigateReposWorkflow()._run_investigation(
+            force=False, config_overrides=ConfigOverrides(chunk_size=chunk_size, adaptive_concurrency=adaptive)
+        )
+    return result, sleeps
+
+
+def _result(request, feedback):
+    return InvestigateSingleRepoResult(
+        status="success", repo_name=request.repo_name, repo_url=request.repo_url, latest_commit="abc123",
+        branch_name="main", message="done", api_feedback=feedback,
+    )
+
+
+def _fleet_child(feedback_for):
+    """Child completing repos one at a time in order; records in-flight counts and step limits at start."""
+    trace = {"in_flight": 0, "at_start": {}, "steps": {}}
+    finished = {}
+
+    async def child(request):
+        index = int(request.repo_name.split("-")[1])
+        trace["in_flight"] += 1
+        trace["at_start"][index] = trace["in_flight"]
+        trace["steps"][index] = request.config_overrides.step_concurrency
+        # Give the workflow time to fill its window, then finish in order so the feedback arrives deterministically
+        for _ in range(10):
+            await asyncio.sleep(0)
+        while index and not finished.get(index - 1):
+            await asyncio.sleep(0)
+        trace["in_flight"] -= 1
+        finished[index] = True
+        return _result(request, feedback_for(index))
+
+    return child, trace
+
+
+def test_congested_repo_shrinks_the_window_and_the_steps_of_later_repos():
+    child, trace = _fleet_child(lambda index: ClaudeApiFeedback(retries=3) if index == 0 else None)
+
+    result, _ = asyncio.run(_run_fleet(child, repo_count=8, chunk_size=4, adaptive=True))
+
+    assert result.successful == 8
+    assert max(trace["at_start"][i] for i in range(4)) == 4
+    # After repo-0 reported retries the window is 2 and new repos get half the steps
+    assert max(trace["at_start"][i] for i in range(4, 8)) <= 3
+    assert trace["steps"][0] == WorkflowConfig.STEP_CONCURRENCY
+    assert trace["steps"][4] == WorkflowConfig.STEP_CONCURRENCY // 2
+
+
+def test_clean_repos_widen_the_window():
+    child, trace = _fleet_child(lambda index: _clean())
+
+    asyncio.run(_run_fleet(child, repo_count=12, chunk_size=2, adaptive=True))
+
+    assert max(trace["at_start"].values()) > 2
+    assert trace["steps"][11] > WorkflowConfig.STEP_CONCURRENCY
+
+
+@pytest.mark.parametrize("adaptive", [False, None])
+def test_fixed_concurrency_ignores_feedback(adaptive):
+    # Adaptive concurrency is opt-in: without a request setting the window stays at chunk_size
+    assert WorkflowConfig.ADAPTIVE_CONCURRENCY is False
+    child, trace = _fleet_child(lambda index: ClaudeApiFeedback(retries=3))
+
+    asyncio.run(_run_fleet(child, repo_count=8, chunk_size=4, adaptive=adaptive))
+
+    assert max(trace["at_start"][i] for i in range(4, 8)) == 4
+    assert set(trace["steps"].values()) == {None}
+
+
+def test_retry_after_delays_the_next_start():
+    child, trace = _fleet_child(lambda index: ClaudeApiFeedback(retry_after_seconds=30) if index == 0 else None)
+
+    result, sleeps = asyncio.run(_run_fleet(child, repo_count=2, chunk_size=1, adaptive=True))
+
+    assert result.successful == 2
+    assert sleeps == [timedelta(seconds=30)]
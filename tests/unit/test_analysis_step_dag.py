@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Unit tests for DAG-parallel analysis steps in InvestigateSingleRepoWorkflow.
+The Temporal workflow APIs are patched with plain asyncio equivalents.
+"""
+
+import sys
+import json
+import asyncio
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from workflows.investigate_single_repo_workflow import InvestigateSingleRepoWorkflow
+from models import AnalyzeWithClaudeOutput, ConfigOverrides, PromptContextDict, WorkerTaskQueues
+
+
+BASE_PROMPTS = Path(__file__).parent.parent.parent / "prompts" / "base_prompts.json"
+
+
+def _processing_order():
+    with open(BASE_PROMPTS) as f:
+        return json.load(f)["processing_order"]
+
+
+async def _run_steps(processing_order, step_concurrency=None, step_delays=None, diff_affected_steps=None,
+                     task_queues=None):
+    """Run _process_analysis_steps with fake activities and record the execution trace."""
+    step_delays = step_delays or {}
+    trace = {"running": 0, "max_running": 0, "finished": [], "contexts": {}, "upstream_hashes": {}, "reuse": {},
+             "task_queues": set()}
+
+    async def fake_execute_activity(activity, args, **kwargs):
+        name = activity.__name__
+        if name == "run_analysis_step_activity":
+            context = args[0].context_dict
+            step_name = context.step_name
+            trace["contexts"][step_name] = list(context.context_reference_keys)
+            trace["upstream_hashes"][step_name] = dict(args[0].upstream_hashes)
+            trace["reuse"][step_name] = args[0].reuse_commit
+            trace["task_queues"].add(kwargs.get("task_queue"))
+            trace["running"] += 1
+            trace["max_running"] = max(trace["max_running"], trace["running"])
+            for _ in range(step_delays.get(step_name, 1)):
+                await asyncio.sleep(0)
+            trace["running"] -= 1
+            trace["finished"].append(step_name)
+            return AnalyzeWithClaudeOutput(
+                status="success",
+                context=PromptContextDict(
+                    repo_name=context.repo_name,
+                    step_name=step_name,
+                    result_reference_key=f"key-{step_name}",
+                ),
+                result_length=10,
+                cached=False,
+                result_hash=f"hash-{step_name}",
+            )
+        if name == "retrieve_all_results_activity":
+            return {
+                "status": "success",
+                "results": {step: f"content of {step}" for step in args[0]["step_results"]},
+            }
+        raise AssertionError(f"Unexpected activity {name}")
+
+    async def fake_wait(fs, *, timeout=None, return_when=asyncio.ALL_COMPLETED):
+        return await asyncio.wait(fs, timeout=timeout, return_when=return_when)
+
+    wf = InvestigateSingleRepoWorkflow()
+    wf._repo_name = "repo"
+    wf._latest_commit = "a" * 40
+    if diff_affected_steps is not None:
+        wf._reuse_commit = "0" * 40
+        wf._diff_affected_steps = set(diff_affected_steps)
+    if task_queues is not None:
+        wf._task_queues = task_queues
+
+    target = "workflows.investigate_single_repo_workflow.workflow"
+    with patch(f"{target}.execute_activity", fake_execute_activity), \
+         patch(f"{target}.wait", fake_wait), \
+         patch(f"{target}.now", lambda: datetime(2025, 1, 1)), \
+         patch(f"{target}.info", lambda: SimpleNamespace(parent=None)):
+        result = await wf._process_analysis_steps(
+            processing_order, "prompts/base", "src/", ConfigOverrides(step_concurrency=step_concurrency)
+        )
+    return result, trace
+
+
+def test_independent_steps_run_concurrently_up_to_the_cap():
+    processing_order = _processing_order()
+
+    result, trace = asyncio.run(_run_steps(processing_order, step_concurrency=4))
+
+    assert trace["max_running"] == 4
+    assert result.total_steps == len(processing_order)
+
+
+def test_dependents_wait_for_their_context_steps():
+    processing_order = _processing_order()
+
+    # hl_overview is slow, so every step depending on it must still start after it
+    _, trace = asyncio.run(_run_steps(processing_order, step_concurrency=8, step_delays={"hl_overview": 20}))
+
+    finished = trace["finished"]
+    assert finished.index("hl_overview") < finished.index("module_deep_dive")
+    assert finished.index("dependencies") < finished.index("deployment")
+    assert finished.index("ml_services") < finished.index("prompt_security_check")
+    # Independent steps did not wait for the slow one
+    assert finished.index("core_entities") < finished.index("hl_overview")
+
+    assert trace["contexts"]["service_dependencies"] == ["key-hl_overview", "key-APIs", "key-events"]
+    assert trace["contexts"]["core_entities"] == []
+
+
+def test_combined_results_keep_processing_order():
+    processing_order = _processing_order()
+    delays = {step["name"]: len(processing_order) - i for i, step in enumerate(processing_order)}
+
+    result, _ = asyncio.run(_run_steps(processing_order, step_concurrency=5, step_delays=delays))
+
+    expected = [step["name"] for step in processing_order]
+    assert [r["name"] for r in result.all_results] == expected
+    assert list(result.step_results) != expected  # completion order differed
+    assert all(r["content"] == f"content of {r['name']}" for r in result.all_results)
+
+
+def test_concurrency_of_one_matches_sequential_order():
+    processing_order = _processing_order()
+
+    _, trace = asyncio.run(_run_steps(processing_order, step_concurrency=1))
+
+    assert trace["max_running"] == 1
+    assert trace["finished"] == [step["name"] for step in processing_order]
+
+
+def test_references_to_later_steps_are_ignored():
+    processing_order = [
+        {"name": "first", "file": "first.md", "context": [{"type": "step", "val": "second"}]},
+        {"name": "second", "file": "second.md", "context": ["first"]},
+    ]
+
+    _, trace = asyncio.run(_run_steps(processing_order, step_concurrency=2))
+
+    assert trace["finished"] == ["first", "second"]
+    assert trace["contexts"] == {"first": [], "second": ["key-first"]}
+    assert trace["upstream_hashes"] == {"first": {}, "second": {"first": "hash-first"}}
+
+
+def test_steps_unaffected_by_the_diff_may_reuse_the_last_commit():
+    processing_order = _processing_order()
+
+    _, trace = asyncio.run(_run_steps(processing_order, step_concurrency=4, diff_affected_steps={"DBs"}))
+
+    assert trace["reuse"]["DBs"] is None
+    assert trace["reuse"]["deployment"] == "0" * 40
+
+    _, trace = asyncio.run(_run_steps(processing_order, step_concurrency=4))
+    assert set(trace["reuse"].values()) == {None}
+
+
+def test_steps_run_on_the_llm_stage_queue():
+    processing_order = _processing_order()
+
+    _, shared = asyncio.run(_run_steps(processing_order))
+    _, staged = asyncio.run(_run_steps(processing_order, task_queues=WorkerTaskQueues(llm="tq-llm")))
+
+    assert shared["task_queues"] == {None}
+    assert staged["task_queues"] == {"tq-llm"}
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Message Batches execution mode, run against the local
+stand-in batch server so no network access is needed.
+"""
+
+import sys
+import asyncio
+import logging
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from investigator.core.claude_batch_client import ClaudeBatchClient
+from investigator.core.config import Config
+from investigator.core.local_batch_server import LocalBatchServer
+from models import (
+    AnalyzeWithClaudeInput,
+    AnalysisStepCacheCheckOutput,
+    AnalyzeWithClaudeOutput,
+    BatchAnalysisRequest,
+    ClaudeBatchCollectInput,
+    ClaudeBatchItem,
+    ClaudeBatchSubmitInput,
+    PromptContextDict,
+    RunAnalysisStepInput,
+)
+
+
+def _params(text="hello"):
+    return {"model": "claude-test", "max_tokens": 10, "messages": [{"role": "user", "content": text}]}
+
+
+def _responder(custom_id, params):
+    if custom_id == "broken":
+        raise RuntimeError("overloaded")
+    return f"analysis of {params['messages'][0]['content']}"
+
+
+def _item(custom_id, step_name, repo_name="repo"):
+    return ClaudeBatchItem(
+        custom_id=custom_id,
+        workflow_id=f"investigate-single-repo-{repo_name}",
+        step_name=step_name,
+        analyze_input=AnalyzeWithClaudeInput(
+            context_dict=PromptContextDict(repo_name=repo_name, step_name=step_name, prompt_version="2"),
+            latest_commit="a" * 40,
+        ),
+    )
+
+
+def test_batch_client_round_trip_against_local_server():
+    with LocalBatchServer(responder=_responder) as server:
+        client = ClaudeBatchClient("test-key", logging.getLogger(__name__), base_url=server.base_url)
+        batch_id = client.submit([
+            {"custom_id": "ok", "params": _params("the repo")},
+            {"custom_id": "broken", "params": _params()},
+        ])
+
+        status = client.get_status(batch_id)
+        results = client.get_results(batch_id)
+
+    assert status["processing_status"] == "ended"
+    assert status["request_counts"]["succeeded"] == 1
+    assert status["request_counts"]["errored"] == 1
+    assert results["ok"]["status"] == "succeeded"
+    assert results["ok"]["text"] == "analysis of the repo"
+    assert "input_tokens" in results["ok"]["usage"]
+    assert results["broken"] == {"status": "errored", "error": "overloaded"}
+
+
+def test_local_server_reports_in_progress_until_processing_time_passes():
+    with LocalBatchServer(processing_seconds=60) as server:
+        client = ClaudeBatchClient("test-key", logging.getLogger(__name__), base_url=server.base_url)
+        batch_id = client.submit([{"custom_id": "ok", "params": _params()}])
+
+        status = client.get_status(batch_id)
+
+    assert status["processing_status"] == "in_progress"
+    assert status["request_counts"]["processing"] == 1
+
+
+@pytest.mark.asyncio
+async def test_submit_and_collect_activities_save_results(monkeypatch):
+    from activities import investigate_activities
+
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    cached_output = AnalyzeWithClaudeOutput(
+        status="success",
+        context=PromptContextDict(repo_name="repo", step_name="cached_step", result_reference_key="cached-key"),
+        result_length=10,
+        cached=True,
+        cache_reason="No changes",
+    )
+
+    def fake_cache_check(context_dict, config_overrides, latest_commit, upstream_hashes=None):
+        return cached_output if context_dict["step_name"] == "cached_step" else None
+
+    prompt_context = Mock()
+    prompt_context.get_prompt_and_context.return_value = {
+        "prompt_content": "Describe {repo_structure}",
+        "repo_structure": "src/",
+        "context": None,
+    }
+    saved = {}
+
+    def fake_save(context_dict, latest_commit, result):
+        key = f"{context_dict['repo_name']}_{context_dict['step_name']}_{latest_commit}_v2"
+        saved[key] = result
+        return key
+
+    with LocalBatchServer() as server, \
+         patch.object(Config, "CLAUDE_BATCH_BASE_URL", server.base_url), \
+         patch.object(investigate_activities, "_check_prompt_cache", side_effect=fake_cache_check), \
+         patch.object(investigate_activities, "_save_prompt_result", side_effect=fake_save), \
+         patch("utils.prompt_context.create_prompt_context_from_dict", return_value=prompt_context), \
+         patch("temporalio.activity.heartbeat") as heartbeat:
+        submit_result = await investigate_activities.submit_claude_batch_activity(ClaudeBatchSubmitInput(items=[
+            _item("step-1", "hl_overview"),
+            _item("step-2", "cached_step"),
+        ]))
+        collect_result = await investigate_activities.collect_claude_batch_activity(ClaudeBatchCollectInput(
+            batch_id=submit_result.batch_id,
+            items=submit_result.submitted,
+        ))
+
+    assert submit_result.batch_id
+    assert [item.custom_id for item in submit_result.submitted] == ["step-1"]
+    assert submit_result.completed["step-2"].cached is True
+
+    output = collect_result.completed["step-1"]
+    assert output.cached is False
+    assert output.context.result_reference_key == f"repo_hl_overview_{'a' * 40}_v2"
+    assert saved[output.context.result_reference_key].startswith("Local batch stand-in analysis")
+    assert output.usage["input_tokens"] > 0
+    assert collect_result.errors == {}
+    heartbeat.assert_called()
+
+
+def test_dispatcher_groups_steps_across_repos_into_one_batch():
+    from workflows.investigate_repos_workflow import InvestigateReposWorkflow
+
+    submitted_batches = []
+    signals = []
+
+    async def fake_execute_activity(activity, args, **kwargs):
+        request = args[0]
+        if activity.__name__ == "submit_claude_batch_activity":
+            submitted_batches.append([item.custom_id for item in request.items])
+            return Mock(
+                batch_id="msgbatch_1",
+                submitted=request.items[:2],
+                completed={},
+                errors={request.items[2].custom_id: "missing prompt data"},
+            )
+        return Mock(
+            completed={
+                item.custom_id: AnalyzeWithClaudeOutput(
+                    status="success",
+                    context=item.analyze_input.context_dict,
+                    result_length=5,
+                    cached=False,
+                )
+                for item in request.items
+            },
+            errors={},
+        )
+
+    def fake_get_handle(workflow_id):
+        handle = Mock()
+
+        async def signal(name, payload):
+            signals.append((workflow_id, name, payload))
+
+        handle.signal = signal
+        return handle
+
+    async def fake_wait_condition(fn, *, timeout=None):
+        for _ in range(100):
+            if fn():
+                return
+            await asyncio.sleep(0)
+        raise asyncio.TimeoutError()
+
+    async def run():
+        wf = InvestigateReposWorkflow()
+        wf._batch_dispatch_open = True
+        dispatcher = asyncio.create_task(wf._run_batch_dispatcher())
+        for repo_name, step_name in [("a", "hl_overview"), ("b", "hl_overview"), ("c", "apis")]:
+            item = _item("unused", step_name, repo_name)
+            wf.submit_batch_analysis(BatchAnalysisRequest(
+                workflow_id=item.workflow_id, step_name=step_name, analyze_input=item.analyze_input
+            ))
+        await asyncio.sleep(0)
+        wf._batch_dispatch_open = False
+        await dispatcher
+
+    target = "workflows.investigate_repos_workflow.workflow"
+    with patch(f"{target}.execute_activity", fake_execute_activity), \
+         patch(f"{target}.wait_condition", fake_wait_condition), \
+         patch(f"{target}.get_external_workflow_handle", fake_get_handle):
+        asyncio.run(run())
+
+    assert submitted_batches == [["step-1", "step-2", "step-3"]]
+    delivered = {workflow_id: payload for workflow_id, name, payload in signals}
+    assert all(name == "batch_analysis_result" for _, name, _ in signals)
+    assert delivered["investigate-single-repo-a"].output.context.repo_name == "a"
+    assert delivered["investigate-single-repo-b"].error is None
+    assert delivered["investigate-single-repo-c"].output is None
+    assert delivered["investigate-single-repo-c"].error == "missing prompt data"
+
+
+@pytest.mark.asyncio
+async def test_collect_saves_the_fingerprint_and_lineage_of_batched_steps(monkeypatch):
+    from activities import investigate_activities
+
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    item = _item("step-1", "deps")
+    item.analyze_input.input_fingerprint = "f" * 64
+    item.analyze_input.upstream_hashes = {"hl_overview": "h" * 16}
+    fingerprints, lineages = [], []
+
+    with LocalBatchServer() as server, \
+         patch.object(Config, "CLAUDE_BATCH_BASE_URL", server.base_url), \
+         patch.object(investigate_activities, "_save_prompt_result", return_value="repo_deps_key"), \
+         patch.object(investigate_activities, "_save_input_fingerprint_result",
+                      side_effect=lambda context_dict, fingerprint, result: fingerprints.append(fingerprint)), \
+         patch.object(investigate_activities, "_save_result_lineage",
+                      side_effect=lambda context_dict, key, result_hash, upstream: lineages.append((key, upstream))), \
+         patch("temporalio.activity.heartbeat"):
+        batch_id = ClaudeBatchClient("test-key", logging.getLogger(__name__), base_url=server.base_url).submit(
+            [{"custom_id": "step-1", "params": _params()}]
+        )
+        result = await investigate_activities.collect_claude_batch_activity(
+            ClaudeBatchCollectInput(batch_id=batch_id, items=[item])
+        )
+
+    assert result.completed["step-1"].result_hash
+    assert fingerprints == ["f" * 64]
+    assert lineages == [("repo_deps_key", {"hl_overview": "h" * 16})]
+
+
+def _batched_step_run(cache_check):
+    """Run one batched step of a single-repo workflow, returning the activities and the queued input."""
+    from workflows.investigate_single_repo_workflow import InvestigateSingleRepoWorkflow
+    from models import ConfigOverrides
+
+    activities = []
+    queued = []
+
+    async def fake_execute_activity(activity, args=None, **kwargs):
+        activities.append(activity.__name__)
+        if activity.__name__ == "check_analysis_step_cache_activity":
+            return cache_check
+        if activity.__name__ == "read_prompt_file_activity":
+            return {"status": "success", "prompt_content": "Describe {repo_structure}", "prompt_version": "2"}
+        return {"status": "success", "context": {**args[0], "data_reference_key": "data-key"}}
+
+    async def fake_analyze_via_parent_batch(step_name, claude_input):
+        queued.append(claude_input)
+        return AnalyzeWithClaudeOutput(status="success", context=claude_input.context_dict, result_length=5, cached=False)
+
+    async def run():
+        wf = InvestigateSingleRepoWorkflow()
+        wf._latest_commit = "a" * 40
+        wf._analyze_via_parent_batch = fake_analyze_via_parent_batch
+        step_input = RunAnalysisStepInput(
+            context_dict=PromptContextDict(repo_name="repo", step_name="deps"),
+            prompts_dir="/prompts",
+            prompt_file="deps.md",
+            repo_structure="src/",
+            latest_commit="a" * 40,
+            upstream_hashes={"hl_overview": "h" * 16},
+        )
+        return await wf._run_batched_analysis_step(
+            {"name": "deps", "file": "deps.md"}, "/prompts", "src/", ConfigOverrides(batch_mode=True), None,
+            {"repo_name": "repo", "step_name": "deps", "context_reference_keys": []}, step_input
+        )
+
+    with patch("workflows.investigate_single_repo_workflow.workflow.execute_activity", fake_execute_activity):
+        result = asyncio.run(run())
+    return result, activities, queued
+
+
+def test_batched_step_served_from_cache_is_not_queued():
+    cached_output = AnalyzeWithClaudeOutput(
+        status="success",
+        context=PromptContextDict(repo_name="repo", step_name="deps", result_reference_key="cached-key"),
+        result_length=10,
+        cached=True,
+        cache_reason="Inputs unchanged",
+    )
+
+    result, activities, queued = _batched_step_run(AnalysisStepCacheCheckOutput(cached_output=cached_output))
+
+    assert result == cached_output
+    assert activities == ["check_analysis_step_cache_activity"]
+    assert queued == []
+
+
+def test_batched_step_carries_its_fingerprint_and_lineage_into_the_batch():
+    result, activities, queued = _batched_step_run(AnalysisStepCacheCheckOutput(input_fingerprint="f" * 64))
+
+    assert activities == ["check_analysis_step_cache_activity", "read_prompt_file_activity", "save_prompt_context_activity"]
+    assert queued[0].input_fingerprint == "f" * 64
+    assert queued[0].upstream_hashes == {"hl_overview": "h" * 16}
+    assert queued[0].context_dict.data_reference_key == "data-key"
+    assert result.cached is False
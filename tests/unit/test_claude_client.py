@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the worker's shared AsyncAnthropic client: connection reuse
+across analysis calls, the async analyzer methods and their use by the
+analysis step activity.
+"""
+
+import json
+import logging
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from activities.claude_client import configure_claude_client, create_claude_client, get_claude_client
+from investigator.core import rate_limiter
+from investigator.core.claude_analyzer import ClaudeAnalyzer
+from investigator.core.config import Config
+from investigator.core.rate_limiter import OUTPUT_TOKENS
+from models import ClaudeConfigOverrides, PromptContextDict, RunAnalysisStepInput
+
+
+class MessagesServer:
+    """Keep-alive HTTP server answering /v1/messages and recording the connections used."""
+
+    def __init__(self):
+        self.connections = set()
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                server.requests.append(json.loads(self.rfile.read(length)))
+                server.connections.add(self.client_address)
+                body = json.dumps({
+                    "id": f"msg_{len(server.requests)}", "type": "message", "role": "assistant",
+                    "model": "claude-test", "stop_reason": "end_turn", "stop_sequence": None,
+                    "content": [{"type": "text", "text": f"analysis {len(server.requests)}"}],
+                    "usage": {"input_tokens": 12, "output_tokens": 30},
+                }).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("anthropic-ratelimit-requests-remaining", "40")
+                self.send_header("anthropic-ratelimit-requests-limit", "50")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+
+
+@pytest.fixture
+def server():
+    with MessagesServer() as server:
+        yield server
+
+
+@pytest.mark.asyncio
+async def test_analysis_calls_share_one_keep_alive_connection(server):
+    client = create_claude_client("test-key", base_url=server.base_url)
+    try:
+        results = []
+        for _ in range(3):
+            # A new analyzer per step, as the activity does, on the one shared client
+            analyzer = ClaudeAnalyzer("test-key", logging.getLogger(__name__), async_client=client)
+            results.append(await analyzer.analyze_with_context_async("Describe {repo_structure}", "src/"))
+    finally:
+        await client.close()
+
+    assert results == ["analysis 1", "analysis 2", "analysis 3"]
+    assert len(server.connections) == 1
+    assert analyzer.client is None
+    assert analyzer.last_usage == {"input_tokens": 12, "output_tokens": 30}
+    assert analyzer.last_api_feedback["capacity_remaining"] == 0.8
+    assert "Describe src/" in json.dumps(server.requests[0]["messages"])
+
+
+def test_client_uses_the_configured_timeouts():
+    client = create_claude_client("test-key")
+
+    assert client.timeout.connect == Config.CLAUDE_CONNECT_TIMEOUT_SECONDS
+    assert client.timeout.read == Config.CLAUDE_TIMEOUT_SECONDS
+
+
+@pytest.fixture
+def limited(monkeypatch):
+    monkeypatch.setattr(Config, "CLAUDE_RATE_LIMIT_OTPM", 600_000)
+    monkeypatch.setattr(Config, "CLAUDE_RATE_LIMIT_BACKEND", "memory")
+    # Freeze the buckets so they do not refill during the request
+    monkeypatch.setattr(rate_limiter.time, "time", lambda: 1000.0)
+    rate_limiter.reset_rate_limiter()
+    yield rate_limiter.get_rate_limiter()
+    rate_limiter.reset_rate_limiter()
+
+
+@pytest.mark.asyncio
+async def test_async_update_goes_through_the_rate_limiter(server, limited):
+    client = create_claude_client("test-key", base_url=server.base_url)
+    analyzer = ClaudeAnalyzer("test-key", logging.getLogger(__name__), async_client=client)
+    try:
+        result = await analyzer.update_section_async("Describe {repo_structure}", "old section", "M app.py")
+    finally:
+        await client.close()
+
+    assert result == "analysis 1"
+    assert "old section" in json.dumps(server.requests[0]["messages"])
+    # The max_tokens reservation was settled down to the 30 output tokens used
+    capacity = 600_000 * Config.CLAUDE_RATE_LIMIT_HEADROOM
+    assert limited.backend._levels[OUTPUT_TOKENS][0] == pytest.approx(capacity - 30, abs=1)
+
+
+@pytest.fixture
+def shared_client():
+    configure_claude_client(create_claude_client("test-key"))
+    yield get_claude_client()
+    configure_claude_client(None)
+
+
+@pytest.mark.asyncio
+async def test_step_activity_awaits_the_shared_client(tmp_path, monkeypatch, shared_client):
+    from activities.investigate_activities import run_analysis_step_activity
+
+    monkeypatch.setenv("PROMPT_CONTEXT_STORAGE", "file")
+    monkeypatch.setenv("PROMPT_CONTEXT_STORAGE_DIR", str(tmp_path / "storage"))
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    prompts = tmp_path / "prompts"
+    prompts.mkdir()
+    (prompts / "overview.md").write_text("version=1\nDescribe {repo_structure}")
+    clients = []
+
+    async def fake_analyze(self, prompt_template, repo_structure, previous_context=None, config_overrides=None):
+        clients.append(self.async_client)
+        return "analysis"
+
+    with patch("investigator.core.claude_analyzer.ClaudeAnalyzer.analyze_with_context_async", fake_analyze), \
+         patch("investigator.core.claude_analyzer.ClaudeAnalyzer.analyze_with_context",
+               side_effect=AssertionError("synchronous client used")):
+        output = await run_analysis_step_activity(RunAnalysisStepInput(
+            context_dict=PromptContextDict(repo_name="repo", step_name="overview"),
+            prompts_dir=str(prompts),
+            prompt_file="overview.md",
+            repo_structure="src/",
+            config_overrides=ClaudeConfigOverrides(),
+            latest_commit="c" * 40,
+        ))
+
+    assert output.cached is False
+    assert output.result_length == len("analysis")
+    assert clients == [shared_client]
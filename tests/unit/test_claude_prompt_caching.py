@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Unit tests for sending the repo-wide prompt prefix with Anthropic prompt caching.
+"""
+
+import sys
+import logging
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from investigator.core.claude_analyzer import ClaudeAnalyzer
+
+
+TEMPLATE = """version=3
+## Repository Structure
+
+{repo_structure}
+
+{previous_context}
+
+Describe the architecture of this repository."""
+
+
+def _analyzer(usage=None):
+    analyzer = ClaudeAnalyzer("test-api-key", logging.getLogger(__name__))
+    analyzer.client = Mock()
+    analyzer.client.messages.with_raw_response.create.return_value.parse.return_value = SimpleNamespace(
+        content=[SimpleNamespace(text="analysis")],
+        usage=usage,
+    )
+    return analyzer
+
+
+def _sent_content(analyzer):
+    return analyzer.client.messages.with_raw_response.create.call_args[1]["messages"][0]["content"]
+
+
+def test_cached_prefix_is_identical_across_steps():
+    analyzer = _analyzer()
+
+    analyzer.analyze_with_context(TEMPLATE, "repo tree", None, use_prompt_cache=True)
+    first = _sent_content(analyzer)
+    analyzer.analyze_with_context("Step two\n{repo_structure}\n{previous_context}", "repo tree", "step one result", use_prompt_cache=True)
+    second = _sent_content(analyzer)
+
+    assert first[0] == second[0]
+    assert first[0]["cache_control"] == {"type": "ephemeral"}
+    assert "repo tree" in first[0]["text"]
+
+    # The per-step block references the prefix instead of repeating it
+    assert "repo tree" not in first[1]["text"]
+    assert ClaudeAnalyzer.REPO_STRUCTURE_REFERENCE in first[1]["text"]
+    assert "version=3" not in first[1]["text"]
+    assert "cache_control" not in first[1]
+    assert "step one result" in second[1]["text"]
+
+
+def test_default_mode_sends_plain_string():
+    analyzer = _analyzer()
+
+    analyzer.analyze_with_context(TEMPLATE, "repo tree", None, use_prompt_cache=False)
+
+    content = _sent_content(analyzer)
+    assert isinstance(content, str)
+    assert "repo tree" in content
+
+
+def test_usage_records_cache_tokens():
+    usage = SimpleNamespace(
+        input_tokens=120,
+        output_tokens=800,
+        cache_creation_input_tokens=0,
+        cache_read_input_tokens=45000,
+    )
+    analyzer = _analyzer(usage)
+
+    analyzer.analyze_with_context(TEMPLATE, "repo tree", None, use_prompt_cache=True)
+
+    assert analyzer.last_usage == {
+        "input_tokens": 120,
+        "output_tokens": 800,
+        "cache_creation_input_tokens": 0,
+        "cache_read_input_tokens": 45000,
+    }
+
+
+def test_usage_is_empty_without_usage_data():
+    analyzer = _analyzer(usage=None)
+
+    analyzer.analyze_with_context(TEMPLATE, "repo tree", None, use_prompt_cache=True)
+
+    assert analyzer.last_usage == {}
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared Claude rate limiter: the token bucket arithmetic,
+waiting for capacity, settling reservations against usage and the memory,
+SQLite and HTTP backends.
+"""
+
+import sys
+import logging
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from investigator.core import rate_limiter
+from investigator.core.claude_analyzer import ClaudeAnalyzer
+from investigator.core.config import Config
+from investigator.core.rate_limit_server import RateLimitServer
+from investigator.core.rate_limiter import (
+    INPUT_TOKENS,
+    OUTPUT_TOKENS,
+    REQUESTS,
+    ClaudeRateLimiter,
+    HttpRateLimitBackend,
+    MemoryRateLimitBackend,
+    RateLimits,
+    SQLiteRateLimitBackend,
+    take_from_buckets,
+)
+
+LIMITS = RateLimits(requests_per_minute=60, input_tokens_per_minute=6000, output_tokens_per_minute=600)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    clock = FakeClock()
+    with patch.object(rate_limiter.time, "time", clock.time):
+        yield clock
+
+
+def test_buckets_start_full_and_refill_per_second():
+    amounts = {REQUESTS: 1, INPUT_TOKENS: 6000, OUTPUT_TOKENS: 100}
+
+    levels, wait = take_from_buckets({}, LIMITS, amounts, now=0)
+    assert wait == 0
+    assert levels[INPUT_TOKENS] == (0, 0)
+
+    # 6000 ITPM refill 100 tokens per second
+    _, wait = take_from_buckets(levels, LIMITS, {INPUT_TOKENS: 300}, now=1)
+    assert wait == pytest.approx(2.0)
+
+
+def test_nothing_is_taken_while_any_bucket_is_short():
+    levels = {REQUESTS: (60, 0), INPUT_TOKENS: (6000, 0), OUTPUT_TOKENS: (50, 0)}
+
+    new_levels, wait = take_from_buckets(levels, LIMITS, {REQUESTS: 1, INPUT_TOKENS: 10, OUTPUT_TOKENS: 100}, now=0)
+
+    assert wait == pytest.approx(5.0)
+    assert new_levels == levels
+
+
+def test_headroom_and_unlimited_buckets():
+    limits = RateLimits(requests_per_minute=100, headroom=0.5)
+
+    levels, wait = take_from_buckets({}, limits, {REQUESTS: 50, INPUT_TOKENS: 10**9}, now=0)
+
+    assert wait == 0
+    assert set(levels) == {REQUESTS}
+    assert not RateLimits().enabled
+
+
+def test_request_larger_than_the_bucket_waits_for_a_full_bucket():
+    levels = {OUTPUT_TOKENS: (0, 0)}
+
+    _, wait = take_from_buckets(levels, LIMITS, {OUTPUT_TOKENS: 6000}, now=0)
+
+    assert wait == pytest.approx(60.0)
+
+
+def test_acquire_waits_for_capacity_instead_of_failing(clock):
+    limiter = ClaudeRateLimiter(MemoryRateLimitBackend(LIMITS), sleep=clock.sleep)
+
+    limiter.acquire(input_tokens=100, max_output_tokens=600)
+    limiter.acquire(input_tokens=100, max_output_tokens=300)
+
+    # The first request emptied the output bucket; 300 tokens refill in 30 seconds
+    assert sum(clock.sleeps) == pytest.approx(30.0)
+    assert max(clock.sleeps) <= rate_limiter.MAX_SLEEP_SECONDS
+
+
+def test_settle_returns_unused_output_and_cache_reads(clock):
+    backend = MemoryRateLimitBackend(LIMITS)
+    limiter = ClaudeRateLimiter(backend, sleep=clock.sleep)
+
+    reservation = limiter.acquire(input_tokens=5000, max_output_tokens=600)
+    limiter.settle(reservation, {"input_tokens": 200, "cache_creation_input_tokens": 300,
+                                 "cache_read_input_tokens": 4000, "output_tokens": 150})
+
+    assert backend._levels[INPUT_TOKENS][0] == pytest.approx(6000 - 500)
+    assert backend._levels[OUTPUT_TOKENS][0] == pytest.approx(600 - 150)
+
+
+def test_settle_charges_input_beyond_the_estimate(clock):
+    backend = MemoryRateLimitBackend(LIMITS)
+    limiter = ClaudeRateLimiter(backend, sleep=clock.sleep)
+
+    reservation = limiter.acquire(input_tokens=5000, max_output_tokens=600)
+    limiter.settle(reservation, {"input_tokens": 8000, "output_tokens": 600})
+
+    # The overdraft has to refill before the next request fits
+    assert backend._levels[INPUT_TOKENS][0] == pytest.approx(-2000)
+    assert backend.take({INPUT_TOKENS: 1}) == pytest.approx(20.01)
+
+
+def test_sqlite_buckets_are_shared_between_processes(tmp_path, clock):
+    db_path = tmp_path / "limits.sqlite3"
+    first = SQLiteRateLimitBackend(LIMITS, db_path)
+    second = SQLiteRateLimitBackend(LIMITS, db_path)
+
+    assert first.take({OUTPUT_TOKENS: 500}) == 0
+    assert second.take({OUTPUT_TOKENS: 200}) == pytest.approx(10.0)
+    second.give_back({OUTPUT_TOKENS: 100})
+    assert first.take({OUTPUT_TOKENS: 200}) == 0
+
+
+def test_http_backend_shares_the_server_buckets():
+    with RateLimitServer(LIMITS) as server:
+        first = HttpRateLimitBackend(server.base_url)
+        second = HttpRateLimitBackend(server.base_url)
+
+        assert first.take({OUTPUT_TOKENS: 600}) == 0
+        assert second.take({OUTPUT_TOKENS: 300}) == pytest.approx(30.0, abs=0.5)
+        first.give_back({OUTPUT_TOKENS: 600})
+        assert second.take({OUTPUT_TOKENS: 300}) == 0
+
+
+@pytest.fixture
+def limited(monkeypatch, clock):
+    monkeypatch.setattr(Config, "CLAUDE_RATE_LIMIT_OTPM", 600_000)
+    monkeypatch.setattr(Config, "CLAUDE_RATE_LIMIT_BACKEND", "memory")
+    rate_limiter.reset_rate_limiter()
+    yield rate_limiter.get_rate_limiter()
+    rate_limiter.reset_rate_limiter()
+
+
+def test_analyzer_reserves_max_tokens_and_settles_with_usage(limited):
+    analyzer = ClaudeAnalyzer("test-key", logging.getLogger(__name__))
+    capacity = 600_000 * Config.CLAUDE_RATE_LIMIT_HEADROOM
+
+    def create(**params):
+        assert limited.backend._levels[OUTPUT_TOKENS][0] == pytest.approx(capacity - params["max_tokens"], abs=1)
+        response = SimpleNamespace(content=[SimpleNamespace(text="analysis")],
+                                   usage=SimpleNamespace(input_tokens=10, output_tokens=40))
+        return SimpleNamespace(parse=lambda: response, headers={}, retries_taken=0)
+
+    analyzer.client = MagicMock()
+    analyzer.client.messages.with_raw_response.create.side_effect = create
+
+    assert analyzer.analyze_with_context("Describe {repo_structure}", "src/") == "analysis"
+    assert limited.backend._levels[OUTPUT_TOKENS][0] == pytest.approx(capacity - 40, abs=1)
+
+
+def test_failed_request_returns_its_output_reservation(limited):
+    analyzer = ClaudeAnalyzer("test-key", logging.getLogger(__name__))
+    analyzer.client = MagicMock()
+    analyzer.client.messages.with_raw_response.create.side_effect = RuntimeError("overloaded")
+
+    with pytest.raises(Exception, match="overloaded"):
+        analyzer.analyze_with_context("Describe {repo_structure}", "src/")
+
+    assert limited.backend._levels[OUTPUT_TOKENS][0] == pytest.approx(600_000 * Config.CLAUDE_RATE_LIMIT_HEADROOM,
+                                                                     abs=1)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the single-pass dependency manifest scanner in read_dependencies_activity.
+"""
+
+import os
+import sys
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from activities.investigate_activities import read_dependencies_activity, _match_dependency_file
+
+
+def _write(root: Path, rel_path: str, content: str):
+    file_path = root / rel_path
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_text(content)
+
+
+def test_match_dependency_file_handles_globs_and_excludes():
+    assert _match_dependency_file("Api.csproj") == [("CSharp", "production")]
+    assert _match_dependency_file("requirements-dev.txt") == [("Python", "dev")]
+    assert _match_dependency_file("package.json") == [("JavaScript", "production")]
+    assert _match_dependency_file("package-lock.json") == []
+    assert _match_dependency_file("README.md") == []
+
+
+@pytest.mark.asyncio
+async def test_single_walk_prunes_skip_dirs(tmp_path):
+    _write(tmp_path, "package.json", json.dumps({"dependencies": {"react": "^18"}}))
+    _write(tmp_path, "node_modules/react/package.json", json.dumps({"dependencies": {"loose-envify": "^1"}}))
+    _write(tmp_path, ".git/hooks/requirements.txt", "should-not-be-read\n")
+    _write(tmp_path, "services/api/Api.csproj", "<Project />\n")
+    _write(tmp_path, "services/api/requirements.txt", "flask\n")
+    _write(tmp_path, "services/api/requirements-dev.txt", "pytest\n")
+
+    # The scanner must not fall back to one recursive glob per pattern
+    with patch.object(Path, "rglob", side_effect=AssertionError("rglob should not be used")):
+        result = await read_dependencies_activity(str(tmp_path))
+
+    assert result["status"] == "success"
+    deps = result["raw_dependencies"]
+    assert [d["full_path"] for d in deps["JavaScript"]["production_dependencies"]] == ["/package.json"]
+    assert [d["full_path"] for d in deps["Python"]["production_dependencies"]] == ["/services/api/requirements.txt"]
+    assert [d["full_path"] for d in deps["Python"]["developer_only_dependencies"]] == ["/services/api/requirements-dev.txt"]
+    assert [d["full_path"] for d in deps["CSharp"]["production_dependencies"]] == ["/services/api/Api.csproj"]
+    assert "should-not-be-read" not in result["formatted_content"]
+    assert set(result["timings"]) == {"scan_seconds", "read_seconds", "parse_seconds", "format_seconds"}
+
+
+@pytest.mark.asyncio
+async def test_checkout_scan_order_does_not_depend_on_the_filesystem(tmp_path):
+    _write(tmp_path, "b/requirements.txt", "flask\n")
+    _write(tmp_path, "a/requirements.txt", "django\n")
+    _write(tmp_path, "a-b/requirements.txt", "celery\n")
+    _write(tmp_path, "requirements.txt", "requests\n")
+    real_walk = os.walk
+
+    def reversed_walk(top):
+        # A filesystem that lists directory entries in reverse order
+        for root, dirs, files in real_walk(top):
+            dirs.reverse()
+            files.reverse()
+            yield root, dirs, files
+
+    first = await read_dependencies_activity(str(tmp_path))
+    with patch("activities.investigate_activities.os.walk", reversed_walk):
+        second = await read_dependencies_activity(str(tmp_path))
+
+    assert first["formatted_content"] == second["formatted_content"]
+    paths = [d["full_path"] for d in first["raw_dependencies"]["Python"]["production_dependencies"]]
+    assert paths == ["/a-b/requirements.txt", "/a/requirements.txt", "/b/requirements.txt", "/requirements.txt"]
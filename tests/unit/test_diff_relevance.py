@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Unit tests for diff-aware re-investigation: path relevance rules, the changed
+path listing, reuse of the last investigated commit's results and update mode.
+"""
+
+import json
+import logging
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from investigator.core.claude_analyzer import ClaudeAnalyzer
+from investigator.core.config import Config
+from investigator.core.diff_relevance import path_matches, steps_affected_by_diff, summarize_diff
+from investigator.core.git_manager import GitRepositoryManager
+from models import ClaudeConfigOverrides, PromptContextDict, RunAnalysisStepInput
+
+
+BASE_PROMPTS = Path(__file__).parent.parent.parent / "prompts" / "base_prompts.json"
+
+
+@pytest.fixture
+def base_config():
+    with open(BASE_PROMPTS) as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("path, pattern, expected", [
+    ("Dockerfile", "Dockerfile*", True),
+    ("services/api/Dockerfile.prod", "Dockerfile*", True),
+    (".github/workflows/ci.yml", ".github/**", True),
+    ("db/migrations/0001_init.py", "**/migrations/**", True),
+    ("migrations/0001_init.py", "**/migrations/**", True),
+    ("src/app.py", "**/migrations/**", False),
+    ("src/app.py", "*.md", False),
+    ("docs/guide/setup.md", "*.md", True),
+])
+def test_path_patterns(path, pattern, expected):
+    assert path_matches(path, pattern) is expected
+
+
+def test_docs_and_tests_only_affect_no_step(base_config):
+    changed = ["README.md", "docs/architecture.rst", "tests/unit/test_app.py", "src/app.test.ts"]
+
+    assert steps_affected_by_diff(base_config["processing_order"], changed, base_config["diff_ignore_paths"]) == set()
+
+
+def test_steps_with_path_rules_only_run_when_their_paths_change(base_config):
+    order = base_config["processing_order"]
+    ignore = base_config["diff_ignore_paths"]
+    unscoped = {step["name"] for step in order if not step.get("paths")}
+
+    code_change = steps_affected_by_diff(order, ["src/app.py"], ignore)
+    assert code_change == unscoped
+    assert "DBs" not in code_change and "deployment" not in code_change
+
+    assert "DBs" in steps_affected_by_diff(order, ["app/db/migrations/0002.sql"], ignore)
+    assert "deployment" in steps_affected_by_diff(order, [".github/workflows/deploy.yml"], ignore)
+
+
+def _git(repo, *args):
+    return subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True, text=True).stdout.strip()
+
+
+@pytest.fixture
+def two_commit_repo(tmp_path):
+    """A repository with a code change, a rename and a docs change; yields (path, base commit)."""
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "-q")
+    _git(repo, "config", "user.email", "dev@example.com")
+    _git(repo, "config", "user.name", "Dev")
+    (repo / "app.py").write_text("print('v1')\n")
+    (repo / "old_name.py").write_text("x = 1\n")
+    (repo / "README.md").write_text("# App\n")
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-qm", "first")
+    base = _git(repo, "rev-parse", "HEAD")
+
+    (repo / "app.py").write_text("print('v2')\n")
+    (repo / "README.md").write_text("# App\n\nNow with docs.\n")
+    _git(repo, "mv", "old_name.py", "new_name.py")
+    _git(repo, "commit", "-qam", "second")
+    return repo, base
+
+
+def test_changed_paths_between_commits(two_commit_repo):
+    repo, base = two_commit_repo
+
+    changed = GitRepositoryManager(logging.getLogger(__name__)).get_changed_paths(str(repo), base)
+
+    assert sorted(changed) == ["README.md", "app.py", "new_name.py", "old_name.py"]
+
+
+def test_diff_summary_lists_files_and_truncates_hunks():
+    patch = "\n".join([
+        "diff --git a/db/schema.sql b/db/schema.sql",
+        "index 111..222 100644",
+        "--- a/db/schema.sql",
+        "+++ b/db/schema.sql",
+        "@@ -1,2 +1,2 @@",
+        "--- old comment",
+        "+-- new comment",
+        " CREATE TABLE users (id INT);",
+        "diff --git a/src/big.py b/src/big.py",
+        "--- a/src/big.py",
+        "+++ b/src/big.py",
+        "@@ -0,0 +1,50 @@",
+        *[f"+line {i}" for i in range(50)],
+        "diff --git a/docs/guide.md b/docs/guide.md",
+        "@@ -1 +1 @@",
+        "-old docs",
+        "+new docs",
+    ])
+
+    summary = summarize_diff(patch, ignore_patterns=["*.md"], max_file_lines=10)
+
+    assert summary.startswith("Changed files (2):\n- db/schema.sql (+1 -1)\n- src/big.py (+50 -0)")
+    assert "--- old comment" in summary  # a removed line, not a file header
+    assert "+line 8" in summary and "+line 9" not in summary
+    assert "... (41 more diff lines)" in summary
+    assert "docs" not in summary
+
+
+def test_update_request_sends_previous_section_and_diff_instead_of_structure():
+    analyzer = ClaudeAnalyzer("test-key", logging.getLogger(__name__))
+
+    params = analyzer.build_update_params(
+        "version=2\nDescribe {repo_structure} and {repo_deps}\n{previous_context}",
+        "## Databases\nUses MySQL.", "Changed files (1):\n- db/schema.sql (+1 -1)",
+        previous_context="overview text",
+    )
+
+    prompt = params["messages"][0]["content"]
+    assert "version=2" not in prompt and "{repo_structure}" not in prompt and "{repo_deps}" not in prompt
+    assert ClaudeAnalyzer.UPDATE_STRUCTURE_REFERENCE in prompt
+    assert "<previous_section>\n## Databases\nUses MySQL.\n</previous_section>" in prompt
+    assert "- db/schema.sql (+1 -1)" in prompt
+    assert "overview text" in prompt
+
+
+@pytest.fixture
+def file_storage(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROMPT_CONTEXT_STORAGE", "file")
+    monkeypatch.setenv("PROMPT_CONTEXT_STORAGE_DIR", str(tmp_path / "storage"))
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    prompts = tmp_path / "prompts"
+    prompts.mkdir()
+    (prompts / "db.md").write_text("version=1\nDescribe the databases in {repo_structure}")
+    return str(prompts)
+
+
+def _step(prompts_dir, commit, reuse_commit=None, upstream_hashes=None):
+    return RunAnalysisStepInput(
+        context_dict=PromptContextDict(repo_name="repo", step_name="DBs"),
+        prompts_dir=prompts_dir,
+        prompt_file="db.md",
+        repo_structure=f"structure at {commit}",
+        config_overrides=ClaudeConfigOverrides(),
+        latest_commit=commit,
+        reuse_commit=reuse_commit,
+        upstream_hashes=upstream_hashes or {},
+    )
+
+
+@pytest.mark.asyncio
+async def test_unaffected_step_reuses_last_commit_result(file_storage):
+    from activities.investigate_activities import run_analysis_step_activity
+
+    old_commit, new_commit = "a" * 40, "c" * 40
+    with patch("investigator.core.claude_analyzer.ClaudeAnalyzer.analyze_with_context", return_value="postgres"):
+        await run_analysis_step_activity(_step(file_storage, old_commit))
+
+    with patch("investigator.core.claude_analyzer.ClaudeAnalyzer.analyze_with_context") as analyze:
+        result = await run_analysis_step_activity(_step(file_storage, new_commit, reuse_commit=old_commit))
+
+    analyze.assert_not_called()
+    assert result.cached is True
+    assert result.cache_reason == f"No relevant changes since {old_commit[:8]}"
+    assert result.context.result_reference_key == f"repo_DBs_{new_commit}_v1"
+
+
+@pytest.mark.asyncio
+async def test_reuse_is_refused_when_upstream_results_changed(file_storage):
+    from activities.investigate_activities import run_analysis_step_activity
+
+    old_commit, new_commit = "a" * 40, "c" * 40
+    with patch("investigator.core.claude_analyzer.ClaudeAnalyzer.analyze_with_context", return_value="postgres"):
+        await run_analysis_step_activity(_step(file_storage, old_commit, upstream_hashes={"hl_overview": "h1"}))
+
+    with patch("investigator.core.claude_analyzer.ClaudeAnalyzer.analyze_with_context", return_value="mysql") as analyze:
+        result = await run_analysis_step_activity(
+            _step(file_storage, new_commit, reuse_commit=old_commit, upstream_hashes={"hl_overview": "h2"}))
+
+    analyze.assert_called_once()
+    assert result.cached is False
+
+
+@pytest.mark.asyncio
+async def test_affected_step_updates_previous_section_from_the_diff(file_storage):
+    from activities.investigate_activities import run_analysis_step_activity, _save_shared_input
+
+    old_commit, new_commit = "a" * 40, "c" * 40
+    with patch("investigator.core.claude_analyzer.ClaudeAnalyzer.analyze_with_context", return_value="uses MySQL"):
+        await run_analysis_step_activity(_step(file_storage, old_commit))
+    diff_ref = _save_shared_input("repo", "Changed files (1):\n- db/schema.sql (+1 -1)")
+
+    step = _step(file_storage, new_commit)
+    step.update_from_commit = old_commit
+    step.diff_ref = diff_ref
+    with patch("investigator.core.claude_analyzer.ClaudeAnalyzer.analyze_with_context") as analyze, \
+         patch("investigator.core.claude_analyzer.ClaudeAnalyzer.update_section",
+               return_value="uses PostgreSQL") as update:
+        result = await run_analysis_step_activity(step)
+
+    analyze.assert_not_called()
+    prompt_template, previous_section, diff_summary = update.call_args.args[:3]
+    assert prompt_template.startswith("version=1")
+    assert previous_section == "uses MySQL"
+    assert diff_summary.endswith("db/schema.sql (+1 -1)")
+    assert result.cached is False
+    assert result.context.result_reference_key == f"repo_DBs_{new_commit}_v1"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_diff_tokens, stored", [(10_000, True), (5, False)])
+async def test_diff_summary_is_stored_only_within_the_token_budget(file_storage, two_commit_repo, monkeypatch,
+                                                                   base_config, max_diff_tokens, stored):
+    from activities.investigate_activities import get_diff_affected_steps_activity, _load_shared_input
+
+    monkeypatch.setattr(Config, "UPDATE_MODE_ENABLED", True)
+    monkeypatch.setattr(Config, "UPDATE_MODE_MAX_DIFF_TOKENS", max_diff_tokens)
+    repo, base = two_commit_repo
+
+    result = await get_diff_affected_steps_activity(
+        str(repo), base, base_config["processing_order"], base_config["diff_ignore_paths"], "repo"
+    )
+
+    assert result["status"] == "success"
+    assert result["changed_paths"] == 4 and result["relevant_paths"] == 3
+    assert "hl_overview" in result["affected_steps"] and "DBs" not in result["affected_steps"]
+    if stored:
+        summary = _load_shared_input("repo", result["diff_ref"])
+        assert "+print('v2')" in summary and "README" not in summary
+    else:
+        assert result["diff_ref"] is None
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the BatchGetItem read path of DynamoDBClient, against moto.
+"""
+
+import os
+import secrets
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+moto = pytest.importorskip("moto")
+
+TABLE = "test-repo-swarm-results"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+
+    with moto.mock_aws():
+        import boto3
+        from utils.dynamodb_client import DynamoDBClient
+
+        boto3.resource("dynamodb", region_name="us-east-1").create_table(
+            TableName=TABLE,
+            KeySchema=[
+                {"AttributeName": "repository_name", "KeyType": "HASH"},
+                {"AttributeName": "analysis_timestamp", "KeyType": "RANGE"},
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "repository_name", "AttributeType": "S"},
+                {"AttributeName": "analysis_timestamp", "AttributeType": "N"},
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        yield DynamoDBClient(table_name=TABLE)
+
+
+def test_results_are_read_in_one_batch(client):
+    for i in range(5):
+        client.save_analysis_result(f"key{i}", f"result {i}")
+    client.save_analysis_result("big", "x" * 400_000)
+
+    with patch.object(client, "get_analysis_result", wraps=client.get_analysis_result) as per_key:
+        results = client.get_analysis_results(["key0", "key1", "key2", "key3", "key4", "big", "missing"])
+
+    assert results["key3"] == "result 3"
+    assert results["big"] == "x" * 400_000
+    assert results["missing"] is None
+    # Only the missing key falls back to a Query
+    assert [call.args[0] for call in per_key.call_args_list] == ["missing"]
+
+
+def test_legacy_results_fall_back_to_query(client):
+    client.table.put_item(Item={
+        "repository_name": "_result_old",
+        "analysis_timestamp": 1700000000,
+        "result_content": "legacy result",
+        "ttl_timestamp": 0,
+    })
+
+    assert client.get_analysis_results(["old"]) == {"old": "legacy result"}
+
+
+def test_unprocessed_keys_are_retried(client):
+    client.save_analysis_result("a", "result a")
+    client.save_analysis_result("b", "result b")
+
+    low_level = client.dynamodb.meta.client
+    real_batch_get = low_level.batch_get_item
+    calls = []
+
+    def flaky_batch_get(RequestItems):
+        calls.append(RequestItems)
+        if len(calls) == 1:
+            # Pretend DynamoDB only got to the first key
+            keys = RequestItems[TABLE]["Keys"]
+            response = real_batch_get(RequestItems={TABLE: {**RequestItems[TABLE], "Keys": keys[:1]}})
+            response["UnprocessedKeys"] = {TABLE: {"Keys": keys[1:]}}
+            return response
+        return real_batch_get(RequestItems=RequestItems)
+
+    with patch.object(low_level, "batch_get_item", side_effect=flaky_batch_get), \
+         patch("time.sleep"):
+        results = client.get_analysis_results(["a", "b"])
+
+    assert results == {"a": "result a", "b": "result b"}
+    assert len(calls) == 2
+    assert len(calls[1][TABLE]["Keys"]) == 1
+
+
+def test_unprocessed_keys_give_up_after_max_attempts(client):
+    low_level = client.dynamodb.meta.client
+    keys = [client._item_key("_result_a")]
+
+    def always_unprocessed(RequestItems):
+        return {"Responses": {TABLE: []}, "UnprocessedKeys": RequestItems}
+
+    with patch.object(low_level, "batch_get_item", side_effect=always_unprocessed), \
+         patch("time.sleep"), pytest.raises(Exception, match="unprocessed"):
+        client.batch_get_items(keys, max_attempts=3)
+
+
+def test_chunked_data_is_reassembled(client):
+    # Random data does not compress, so this is split into several chunks
+    structure = secrets.token_hex(600_000)
+    client.save_temporary_analysis_data("chunky", "prompt", structure, context="ctx")
+    client.save_analysis_result("done", "finished")
+
+    data = client.get_multiple_analysis_data(["chunky", "done", "nothing"])
+
+    assert data["chunky"]["type"] == "analysis_data"
+    assert data["chunky"]["data"]["repo_structure"] == structure
+    assert data["chunky"]["data"]["context"] == "ctx"
+    assert data["done"] == {"type": "result", "content": "finished"}
+    assert "nothing" not in data
+
+
+def test_new_write_wins_over_a_legacy_timestamp_item(client):
+    client.table.put_item(Item={
+        "repository_name": "_result_k",
+        "analysis_timestamp": 1700000000,
+        "result_content": "OLD",
+        "ttl_timestamp": 0,
+    })
+
+    client.save_analysis_result("k", "NEW")
+
+    assert client.get_analysis_result("k") == "NEW"
+    assert client.get_analysis_results(["k"]) == {"k": "NEW"}
+
+
+def test_temporary_data_delete_removes_new_and_legacy_items(client):
+    client.table.put_item(Item={
+        "repository_name": "_temp_t",
+        "analysis_timestamp": 1700000000,
+        "prompt_content": "old prompt",
+        "ttl_timestamp": 0,
+    })
+    client.save_temporary_analysis_data("t", "new prompt", "src/")
+
+    assert client.get_temporary_analysis_data("t")["prompt_content"] == "new prompt"
+    assert client.delete_temporary_analysis_data("t") is True
+    assert client.get_temporary_analysis_data("t") is None
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the persistent bare-mirror clone cache in GitRepositoryManager.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import subprocess
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from investigator.core.config import Config
+from investigator.core.git_manager import GitRepositoryManager
+
+
+def _git(path, *args):
+    return subprocess.run(
+        ["git", "-C", str(path), "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+def _commit(path, filename, content):
+    (path / filename).write_text(content)
+    _git(path, "add", filename)
+    _git(path, "commit", "-q", "-m", f"add {filename}")
+    return _git(path, "rev-parse", "HEAD")
+
+
+def _make_origin(tmp_path):
+    origin = tmp_path / "origin"
+    subprocess.run(["git", "init", "-q", "-b", "main", str(origin)], check=True)
+    _commit(origin, "README.md", "hello\n")
+    return origin
+
+
+def test_first_checkout_creates_mirror_and_later_runs_fetch(tmp_path):
+    origin = _make_origin(tmp_path)
+    mirror_root = tmp_path / "mirrors"
+    manager = GitRepositoryManager(logging.getLogger(__name__))
+
+    first = manager.clone_from_mirror(str(origin), str(tmp_path / "run1"), str(mirror_root))
+    mirrors = list(mirror_root.glob("origin_*.git"))
+    assert len(mirrors) == 1
+    assert (Path(first) / "README.md").exists()
+
+    new_commit = _commit(origin, "app.py", "print('hi')\n")
+    second = manager.clone_from_mirror(str(origin), str(tmp_path / "run2"), str(mirror_root))
+
+    assert list(mirror_root.glob("origin_*.git")) == mirrors
+    assert _git(second, "rev-parse", "HEAD") == new_commit
+    assert _git(second, "rev-parse", "--abbrev-ref", "HEAD") == "main"
+    assert _git(second, "remote", "get-url", "origin") == str(origin)
+    # The working copy borrows objects from the mirror instead of copying them
+    assert (Path(second) / ".git" / "objects" / "info" / "alternates").exists()
+
+
+def test_concurrent_checkouts_share_one_mirror(tmp_path):
+    origin = _make_origin(tmp_path)
+    mirror_root = tmp_path / "mirrors"
+    manager = GitRepositoryManager(logging.getLogger(__name__))
+    errors = []
+
+    def checkout(i):
+        try:
+            manager.clone_from_mirror(str(origin), str(tmp_path / f"run{i}"), str(mirror_root))
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=checkout, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(list(mirror_root.glob("origin_*.git"))) == 1
+    for i in range(4):
+        assert (tmp_path / f"run{i}" / "README.md").exists()
+
+
+def test_mirror_fetches_only_branches_and_tags(tmp_path):
+    origin = _make_origin(tmp_path)
+    head = _git(origin, "rev-parse", "HEAD")
+    _git(origin, "tag", "v1")
+    # Pull request refs as GitHub advertises them
+    _git(origin, "update-ref", "refs/pull/1/head", head)
+    mirror_root = tmp_path / "mirrors"
+    manager = GitRepositoryManager(logging.getLogger(__name__))
+
+    manager.clone_from_mirror(str(origin), str(tmp_path / "run1"), str(mirror_root))
+
+    mirror = next(mirror_root.glob("origin_*.git"))
+    refs = _git(mirror, "for-each-ref", "--format=%(refname)").splitlines()
+    assert sorted(refs) == ["refs/heads/main", "refs/tags/v1"]
+    assert _git(mirror, "symbolic-ref", "HEAD") == "refs/heads/main"
+
+
+def test_mirror_is_garbage_collected_once_per_interval(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "GIT_MIRROR_GC_HOURS", 24)
+    origin = _make_origin(tmp_path)
+    mirror_root = tmp_path / "mirrors"
+    manager = GitRepositoryManager(logging.getLogger(__name__))
+    gcs = []
+    run_git = manager._run_git_command
+
+    def fake_run_git(cmd, **kw):
+        if "gc" not in cmd:
+            return run_git(cmd, **kw)
+        # The gc runs without the mirror lock, so checkouts never wait for it
+        with manager._mirror_lock(cmd[2], blocking=False) as locked:
+            gcs.append(locked)
+
+    monkeypatch.setattr(manager, "_run_git_command", fake_run_git)
+
+    manager.clone_from_mirror(str(origin), str(tmp_path / "run1"), str(mirror_root))
+    manager.clone_from_mirror(str(origin), str(tmp_path / "run2"), str(mirror_root))
+    assert gcs == []
+
+    stamp = f"{next(mirror_root.glob('origin_*.git'))}.gc"
+    day_ago = time.time() - 25 * 3600
+    os.utime(stamp, (day_ago, day_ago))
+    for run in ("run3", "run4"):
+        manager.clone_from_mirror(str(origin), str(tmp_path / run), str(mirror_root))
+        for thread in threading.enumerate():
+            if thread.name.startswith("git-gc-"):
+                thread.join()
+
+    assert gcs == [True]
+    assert os.path.getmtime(stamp) > day_ago
+
+
+def test_least_recently_used_idle_mirrors_are_removed_above_the_cap(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "GIT_MIRROR_MAX_GB", 1e-9)
+    monkeypatch.setattr(Config, "GIT_MIRROR_MIN_IDLE_HOURS", 6)
+    mirror_root = tmp_path / "mirrors"
+    manager = GitRepositoryManager(logging.getLogger(__name__))
+    repos = {}
+    for name in ("old", "recent", "current"):
+        origin = tmp_path / name
+        subprocess.run(["git", "init", "-q", "-b", "main", str(origin)], check=True)
+        _commit(origin, "README.md", f"{name}\n")
+        repos[name] = origin
+
+    manager.clone_from_mirror(str(repos["old"]), str(tmp_path / "run-old"), str(mirror_root))
+    old_mirror = next(mirror_root.glob("old_*.git"))
+    week_ago = time.time() - 7 * 24 * 3600
+    os.utime(f"{old_mirror}.lock", (week_ago, week_ago))
+    manager.clone_from_mirror(str(repos["recent"]), str(tmp_path / "run-recent"), str(mirror_root))
+    manager.clone_from_mirror(str(repos["current"]), str(tmp_path / "run-current"), str(mirror_root))
+
+    # Only the idle mirror goes; one used within the idle limit may back a running investigation
+    assert not old_mirror.exists()
+    assert list(mirror_root.glob("recent_*.git")) and list(mirror_root.glob("current_*.git"))
+
+
+def test_long_clones_heartbeat_while_git_runs():
+    from activities.investigate_activities import _heartbeat_while
+
+    async def slow_clone():
+        await asyncio.sleep(0.05)
+        return "/tmp/repo"
+
+    with patch("activities.investigate_activities.activity.in_activity", return_value=True), \
+         patch("activities.investigate_activities.activity.heartbeat") as heartbeat:
+        assert asyncio.run(_heartbeat_while(slow_clone(), "git:mirror", interval_seconds=0.01)) == "/tmp/repo"
+
+    assert heartbeat.call_count >= 2
+    heartbeat.assert_called_with("git:mirror")
+
+
+def test_cancel_event_kills_the_running_git_command():
+    manager = GitRepositoryManager(logging.getLogger(__name__))
+    cancel_event = threading.Event()
+    threading.Timer(0.2, cancel_event.set).start()
+
+    started = time.monotonic()
+    try:
+        manager._run_git_command(["sleep", "30"], cancel_event=cancel_event)
+    except Exception as e:
+        assert "cancelled" in str(e)
+    else:  # pragma: no cover - reported below
+        raise AssertionError("command was not cancelled")
+
+    assert time.monotonic() - started < 5
+
+
+def test_cancelled_heartbeat_wait_sets_the_cancel_event():
+    from activities.investigate_activities import _heartbeat_while
+
+    cancel_event = threading.Event()
+
+    async def run():
+        task = asyncio.ensure_future(
+            _heartbeat_while(asyncio.sleep(30), "git:mirror", interval_seconds=0.01, cancel_event=cancel_event)
+        )
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(run())
+
+    assert cancel_event.is_set()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Unit tests for tree-only structure and dependency extraction from git objects.
+"""
+
+import sys
+import logging
+import subprocess
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from investigator.core.git_tree_reader import GitTreeReader
+from investigator.core.repository_analyzer import RepositoryAnalyzer
+from investigator.core.config import Config
+
+logger = logging.getLogger(__name__)
+
+FILES = {
+    "README.md": "# demo\n",
+    "package.json": '{"dependencies": {"react": "^18.0.0"}, "devDependencies": {"jest": "^29.0.0"}}',
+    "requirements-dev.txt": "pytest\n",
+    "node_modules/left-pad/package.json": '{"dependencies": {"nope": "1.0.0"}}',
+    "src/app.py": "print('hi')\n",
+    "src/pkg/module.py": "x = 1\n",
+    "src/pkg/deep/inner.py": "y = 2\n",
+    "src/pkg/deep/deeper/leaf.py": "z = 3\n",
+    "src/pkg/deep/deeper/Service.csproj": "<Project />\n",
+}
+
+
+def _git(path, *args):
+    return subprocess.run(
+        ["git", "-C", str(path), "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        capture_output=True, text=True, check=True
+    ).stdout
+
+
+@pytest.fixture
+def origin(tmp_path):
+    repo = tmp_path / "demo"
+    subprocess.run(["git", "init", "-q", "-b", "main", str(repo)], check=True)
+    for rel_path, content in FILES.items():
+        file_path = repo / rel_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(content)
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", "init")
+    _git(repo, "config", "uploadpack.allowFilter", "true")
+    return repo
+
+
+def test_list_files_and_read_blobs(origin):
+    reader = GitTreeReader(logger)
+    files = reader.list_files(str(origin))
+
+    assert set(files) == set(FILES)
+    blobs = reader.read_blobs(str(origin), [files["src/app.py"], files["README.md"], "0" * 40])
+    assert blobs[files["src/app.py"]] == b"print('hi')\n"
+    assert blobs[files["README.md"]] == b"# demo\n"
+    assert "0" * 40 not in blobs
+
+
+def test_structure_from_git_matches_checkout(origin):
+    analyzer = RepositoryAnalyzer(logger)
+    assert analyzer.get_structure_from_git(str(origin)) == analyzer.get_structure(str(origin))
+
+
+def test_structure_from_git_on_partial_clone_without_checkout(origin, tmp_path):
+    clone = tmp_path / "clone" / "demo"
+    subprocess.run(
+        ["git", "clone", "-q", "--filter=blob:none", "--no-checkout", f"file://{origin}", str(clone)],
+        check=True
+    )
+    assert not (clone / "README.md").exists()
+
+    analyzer = RepositoryAnalyzer(logger)
+    assert analyzer.get_structure_from_git(str(clone)) == analyzer.get_structure(str(origin))
+
+
+@pytest.mark.asyncio
+async def test_read_dependencies_in_tree_only_mode(origin, tmp_path):
+    from activities.investigate_activities import read_dependencies_activity
+
+    clone = tmp_path / "clone" / "demo"
+    subprocess.run(
+        ["git", "clone", "-q", "--filter=blob:none", "--no-checkout", f"file://{origin}", str(clone)],
+        check=True
+    )
+
+    with patch.object(Config, "GIT_TREE_ONLY", True):
+        result = await read_dependencies_activity(str(clone))
+
+    assert result["status"] == "success"
+    deps = result["raw_dependencies"]
+    assert set(deps) == {"JavaScript", "Python", "CSharp"}
+    js_paths = [d["full_path"] for d in deps["JavaScript"]["production_dependencies"]]
+    assert js_paths == ["/package.json"]
+    assert deps["JavaScript"]["developer_only_dependencies"][0]["full_path"] == "/package.json (dev)"
+    assert deps["Python"]["developer_only_dependencies"][0]["content"] == "pytest\n"
+    assert deps["CSharp"]["production_dependencies"][0]["full_path"] == "/src/pkg/deep/deeper/Service.csproj"
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the sliding-window child scheduler in InvestigateReposWorkflow.
+The Temporal workflow APIs are patched with plain asyncio equivalents so the
+scheduling behavior can be tested without a Temporal server.
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from activities.worker_session import stage_window_size
+from workflows.investigate_repos_workflow import InvestigateReposWorkflow
+from models import ConfigOverrides, InvestigateSingleRepoResult
+from workflow_config import WorkflowConfig
+
+
+def _repos_config(count):
+    repositories = {"_comment": "not a repository"}
+    for i in range(count):
+        repositories[f"repo-{i}"] = {"url": f"https://github.com/org/repo-{i}", "type": "generic"}
+    return {"repositories": repositories}
+
+
+async def _run_with_children(child_fn, repo_count, chunk_size, stage_window=None):
+    """Run _run_investigation with patched workflow APIs and a fake child workflow.
+
+    stage_window is what the workers' stage pools size the window to without a chunk_size.
+    """
+    async def fake_execute_activity(activity, *args, **kwargs):
+        if activity.__name__ == "update_repos_list":
+            return {"status": "success", "message": "ok"}
+        if activity.__name__ == "get_stage_window_activity":
+            return stage_window
+        return _repos_config(repo_count)
+
+    async def fake_execute_child_workflow(run_fn, args, **kwargs):
+        return await child_fn(args[0])
+
+    async def fake_sleep(_duration):
+        await asyncio.sleep(0)
+
+    async def fake_wait(fs, *, timeout=None, return_when=asyncio.ALL_COMPLETED):
+        return await asyncio.wait(fs, timeout=timeout, return_when=return_when)
+
+    target = "workflows.investigate_repos_workflow.workflow"
+    with patch(f"{target}.execute_activity", fake_execute_activity), \
+         patch(f"{target}.execute_child_workflow", fake_execute_child_workflow), \
+         patch(f"{target}.sleep", fake_sleep), \
+         patch(f"{target}.wait", fake_wait):
+        return await InvestigateReposWorkflow()._run_investigation(
+            force=False, config_overrides=ConfigOverrides(chunk_size=chunk_size, adaptive_concurrency=False)
+        )
+
+
+def _result(request, status):
+    return InvestigateSingleRepoResult(
+        status=status,
+        repo_name=request.repo_name,
+        repo_url=request.repo_url,
+        repo_type=request.repo_type,
+        latest_commit="abc123",
+        branch_name="main",
+        message="boom" if status == "failed" else "done",
+    )
+
+
+def test_window_refills_as_soon_as_a_child_finishes():
+    """A slow child must not stop the other slots from picking up new repos."""
+    in_flight = 0
+    max_in_flight = 0
+    started = []
+    slow_release = asyncio.Event()
+
+    async def child(request):
+        nonlocal in_flight, max_in_flight
+        started.append(request.repo_name)
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        try:
+            if request.repo_name == "repo-0":
+                # The slow repo only finishes once every other repo has started
+                await slow_release.wait()
+            else:
+                await asyncio.sleep(0)
+                if len(started) == 6:
+                    slow_release.set()
+            return _result(request, "success")
+        finally:
+            in_flight -= 1
+
+    result = asyncio.run(_run_with_children(child, repo_count=6, chunk_size=2))
+
+    assert started == [f"repo-{i}" for i in range(6)]
+    assert max_in_flight == 2
+    assert result.total_repos == 6
+    assert result.successful == 6
+
+
+def test_counters_and_order_are_preserved():
+    """Counters match the chunked scheduler and results keep repos.json order."""
+    statuses = {"repo-0": "success", "repo-1": "skipped", "repo-2": "failed", "repo-3": "success"}
+
+    async def child(request):
+        # Later repos finish first to exercise out-of-order completion
+        await asyncio.sleep(0.001 * (4 - int(request.repo_name.split("-")[1])))
+        if request.repo_name == "repo-4":
+            raise RuntimeError("child crashed")
+        return _result(request, statuses[request.repo_name])
+
+    result = asyncio.run(_run_with_children(child, repo_count=5, chunk_size=3))
+
+    assert [r.repo_name for r in result.investigated_repos] == [f"repo-{i}" for i in range(5)]
+    assert result.total_repos == 5
+    assert result.successful == 2
+    assert result.skipped == 1
+    assert result.failed == 2
+    crashed = result.investigated_repos[4]
+    assert crashed.status == "failed"
+    assert "child crashed" in crashed.reason
+
+
+def _counting_child():
+    """Child that yields long enough for the window to fill; records the most children in flight."""
+    trace = {"in_flight": 0, "max": 0}
+
+    async def child(request):
+        trace["in_flight"] += 1
+        trace["max"] = max(trace["max"], trace["in_flight"])
+        for _ in range(50):
+            await asyncio.sleep(0)
+        trace["in_flight"] -= 1
+        return _result(request, "success")
+
+    return child, trace
+
+
+def test_default_window_comes_from_the_stage_pools():
+    child, trace = _counting_child()
+
+    result = asyncio.run(_run_with_children(child, repo_count=20, chunk_size=None, stage_window=10))
+
+    assert result.successful == 20
+    assert trace["max"] == 10
+
+
+def test_chunk_size_overrides_the_stage_pool_window():
+    child, trace = _counting_child()
+
+    asyncio.run(_run_with_children(child, repo_count=20, chunk_size=3, stage_window=10))
+
+    assert trace["max"] == 3
+
+
+def test_stage_window_covers_the_llm_and_clone_slots():
+    # One repository per LLM slot plus the clones overlapping their analysis
+    assert stage_window_size(True, llm_slots=8, clone_slots=2) == 10
+    assert stage_window_size(True, llm_slots=64, clone_slots=4) == 20
+    assert stage_window_size(False, llm_slots=8, clone_slots=2) == WorkflowConfig.WORKFLOW_CHUNK_SIZE
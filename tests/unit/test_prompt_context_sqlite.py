@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SQLite prompt context backend.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from utils import prompt_context_sqlite
+from utils.prompt_context import (
+    create_prompt_context,
+    create_prompt_context_from_dict,
+    create_prompt_context_manager,
+    get_storage_backend,
+)
+from utils.prompt_context_sqlite import SQLitePromptContext, SQLitePromptContextManager, SQLiteStore
+
+
+@pytest.fixture
+def sqlite_storage(tmp_path, monkeypatch):
+    db_path = tmp_path / "context.sqlite3"
+    monkeypatch.setenv("PROMPT_CONTEXT_STORAGE", "sqlite")
+    monkeypatch.setenv("PROMPT_CONTEXT_SQLITE_PATH", str(db_path))
+    yield db_path
+    prompt_context_sqlite._stores.clear()
+
+
+def test_backend_is_selected_by_environment(sqlite_storage):
+    assert get_storage_backend() == "sqlite"
+    assert isinstance(create_prompt_context("repo", "overview"), SQLitePromptContext)
+    assert isinstance(create_prompt_context_manager("repo"), SQLitePromptContextManager)
+
+    store = prompt_context_sqlite.get_sqlite_store()
+    assert store.db_path == sqlite_storage
+    journal_mode = store._connection().execute("PRAGMA journal_mode").fetchone()[0]
+    assert journal_mode == "wal"
+
+
+def test_prompt_data_context_and_results_round_trip(sqlite_storage):
+    manager = create_prompt_context_manager("repo")
+    manager.save_analysis_result("repo_overview_key", "overview result", step_name="overview")
+    manager.register_result("overview", "repo_overview_key")
+
+    context = manager.create_context_for_step("deps", context_config=[{"type": "step", "val": "overview"}])
+    structure_ref = manager.save_shared_input("src/\n  app.py")
+    context.repo_structure_ref = structure_ref
+    context.save_prompt_data("Describe the deps", None)
+
+    # A context rebuilt from its dict (as in another activity) sees the same data
+    restored = create_prompt_context_from_dict(context.to_dict())
+    data = restored.get_prompt_and_context()
+
+    assert data["prompt_content"] == "Describe the deps"
+    assert data["repo_structure"] == "src/\n  app.py"
+    assert data["context"] == "## overview\n\noverview result"
+    assert manager.retrieve_all_results() == {"overview": "overview result"}
+
+
+def test_expired_items_are_not_returned_and_get_purged(sqlite_storage):
+    manager = create_prompt_context_manager("repo")
+    manager.save_analysis_result("short", "gone soon", ttl_minutes=1)
+    manager.save_analysis_result("long", "still here", ttl_minutes=60)
+
+    with patch("utils.prompt_context_sqlite.time.time", return_value=time.time() + 120):
+        assert manager.get_analysis_result("short") is None
+        assert manager.get_analysis_results(["short", "long"]) == {"short": None, "long": "still here"}
+        assert manager._store.purge_expired() == 1
+
+    assert manager.get_analysis_result("short") is None
+
+
+def test_latest_investigation_is_the_newest_row(sqlite_storage):
+    manager = create_prompt_context_manager("repo")
+    now = time.time()
+    with patch("utils.prompt_context_sqlite.time.time", return_value=now - 100):
+        manager.save_investigation_metadata("repo", "https://example.com/repo", "a" * 40, "main")
+    with patch("utils.prompt_context_sqlite.time.time", return_value=now - 50):
+        manager.save_investigation_metadata(
+            "repo", "https://example.com/repo", "b" * 40, "main",
+            analysis_data={"prompt_metadata": {"overview": "2"}},
+        )
+
+    latest = manager.get_latest_investigation("repo")
+    assert latest["latest_commit"] == "b" * 40
+    assert latest["prompt_metadata"] == {"overview": "2"}
+    assert manager.get_latest_investigation("other") is None
+
+
+def test_cleanup_all_removes_only_this_repository(sqlite_storage):
+    repo = create_prompt_context_manager("repo")
+    other = create_prompt_context_manager("other")
+    repo.save_analysis_result("repo_key", "mine")
+    other.save_analysis_result("other_key", "theirs")
+
+    repo.cleanup_all()
+
+    assert repo.get_analysis_result("repo_key") is None
+    assert other.get_analysis_result("other_key") == "theirs"
+
+
+def test_batched_reads_span_several_queries(sqlite_storage, monkeypatch):
+    monkeypatch.setattr(prompt_context_sqlite, "MAX_KEYS_PER_QUERY", 3)
+    manager = create_prompt_context_manager("repo")
+    keys = [f"key{i}" for i in range(10)]
+    for key in keys:
+        manager.save_analysis_result(key, f"result {key}")
+
+    results = manager.get_analysis_results(keys + ["missing"])
+
+    assert results == {**{key: f"result {key}" for key in keys}, "missing": None}
+
+
+def test_concurrent_writers_from_threads(tmp_path):
+    store = SQLiteStore(tmp_path / "threads.sqlite3")
+
+    def write(worker):
+        for i in range(50):
+            store.put("result", f"w{worker}_{i}", "repo", f"value {worker} {i}", ttl_minutes=60)
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(store.get_many("result", [f"w{n}_{i}" for n in range(4) for i in range(50)])) == 200
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the pre-clone remote HEAD check (git ls-remote).
+"""
+
+import sys
+import logging
+import subprocess
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from investigator.core.git_manager import GitRepositoryManager
+from models import CacheCheckInput
+from models.investigation import InvestigationDecision
+
+
+def _make_repo(path: Path, branch: str = "trunk") -> str:
+    """Create a local git repository with a single commit and return its SHA."""
+    subprocess.run(["git", "init", "-q", "-b", branch, str(path)], check=True)
+    (path / "README.md").write_text("hello\n")
+    git = ["git", "-C", str(path), "-c", "user.name=test", "-c", "user.email=test@example.com"]
+    subprocess.run(git + ["add", "README.md"], check=True)
+    subprocess.run(git + ["commit", "-q", "-m", "init"], check=True)
+    return subprocess.run(
+        ["git", "-C", str(path), "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+def test_get_remote_head_resolves_commit_and_default_branch(tmp_path):
+    commit_sha = _make_repo(tmp_path / "origin")
+
+    manager = GitRepositoryManager(logging.getLogger(__name__))
+    remote_head = manager.get_remote_head(str(tmp_path / "origin"))
+
+    assert remote_head == {"commit_sha": commit_sha, "branch_name": "trunk"}
+
+
+def test_get_remote_head_raises_for_missing_remote(tmp_path):
+    manager = GitRepositoryManager(logging.getLogger(__name__))
+    with pytest.raises(Exception, match="git ls-remote failed"):
+        manager.get_remote_head(str(tmp_path / "does-not-exist"))
+
+
+def test_cache_check_input_requires_clone_or_remote_state():
+    with pytest.raises(ValueError):
+        CacheCheckInput(repo_name="repo", repo_url="https://github.com/org/repo")
+
+    remote_input = CacheCheckInput(
+        repo_name="repo",
+        repo_url="https://github.com/org/repo",
+        remote_commit="a" * 40,
+        remote_branch="main",
+    )
+    assert remote_input.repo_path is None
+
+
+@pytest.mark.asyncio
+async def test_cache_check_uses_remote_state_without_clone():
+    from activities.investigation_cache_activities import check_if_repo_needs_investigation
+
+    captured = {}
+
+    def fake_check(repo_name, current_state, prompt_versions):
+        captured["state"] = current_state
+        return InvestigationDecision(
+            needs_investigation=False,
+            reason="No changes since last investigation",
+            latest_commit=current_state.commit_sha,
+            branch_name=current_state.branch_name,
+        )
+
+    cache = Mock()
+    cache.check_needs_investigation.side_effect = fake_check
+
+    with patch("activities.investigation_cache_activities.InvestigationCache", return_value=cache), \
+         patch("utils.dynamodb_client.get_dynamodb_client", return_value=Mock()), \
+         patch("activities.investigation_cache_activities._get_latest_commit") as local_commit:
+        result = await check_if_repo_needs_investigation(CacheCheckInput(
+            repo_name="repo",
+            repo_url="https://github.com/org/repo",
+            prompt_versions={"hl_overview": "1"},
+            remote_commit="b" * 40,
+            remote_branch="main",
+        ))
+
+    local_commit.assert_not_called()
+    assert captured["state"].commit_sha == "b" * 40
+    assert captured["state"].has_uncommitted_changes is False
+    assert result.needs_investigation is False
+    assert result.latest_commit == "b" * 40
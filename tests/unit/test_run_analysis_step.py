@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the fused run_analysis_step_activity and the worker-local prompt registry.
+"""
+
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from investigator.core.prompt_registry import PromptRegistry
+from models import ClaudeConfigOverrides, PromptContextDict, RunAnalysisStepInput
+
+
+COMMIT = "b" * 40
+
+
+@pytest.fixture
+def prompts_dir(tmp_path):
+    prompts = tmp_path / "prompts" / "backend"
+    prompts.mkdir(parents=True)
+    (prompts / "overview.md").write_text("version=3\nDescribe {repo_structure}")
+    (prompts / "deps.md").write_text("version=2\nList the dependencies:\n{repo_deps}\n{previous_context}")
+    (tmp_path / "prompts" / "shared.md").write_text("version=1\nShared prompt")
+    return str(prompts)
+
+
+@pytest.fixture
+def file_storage(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROMPT_CONTEXT_STORAGE", "file")
+    monkeypatch.setenv("PROMPT_CONTEXT_STORAGE_DIR", str(tmp_path / "storage"))
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    return tmp_path / "storage"
+
+
+def test_registry_reads_each_prompt_once(prompts_dir):
+    registry = PromptRegistry()
+
+    with patch("builtins.open", wraps=open) as opened:
+        first = registry.get(prompts_dir, "overview.md")
+        second = registry.get(prompts_dir, "overview.md")
+
+    assert first == second == ("version=3\nDescribe {repo_structure}", "3")
+    assert opened.call_count == 1
+    assert registry.get(prompts_dir, "../shared.md") == ("version=1\nShared prompt", "1")
+    assert len(registry) == 2
+
+
+def test_registry_reloads_changed_and_forgets_missing_prompts(prompts_dir):
+    registry = PromptRegistry()
+    path = os.path.join(prompts_dir, "overview.md")
+    registry.get(prompts_dir, "overview.md")
+
+    with open(path, "w") as f:
+        f.write("version=4\nNew text")
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+    assert registry.get(prompts_dir, "overview.md") == ("version=4\nNew text", "4")
+
+    os.remove(path)
+    assert registry.get(prompts_dir, "overview.md") is None
+    assert registry.get(prompts_dir, "missing.md") is None
+    assert len(registry) == 0
+
+
+def test_registry_evicts_least_recently_used(prompts_dir):
+    registry = PromptRegistry(max_entries=1)
+
+    registry.get(prompts_dir, "overview.md")
+    registry.get(prompts_dir, "deps.md")
+
+    assert len(registry) == 1
+
+
+def _step_input(prompts_dir, step_name, prompt_file, context_keys=None, deps=None,
+                upstream_hashes=None, force_section=None):
+    return RunAnalysisStepInput(
+        context_dict=PromptContextDict(
+            repo_name="repo",
+            step_name=step_name,
+            context_reference_keys=context_keys or [],
+        ),
+        prompts_dir=prompts_dir,
+        prompt_file=prompt_file,
+        repo_structure="src/\n  app.py",
+        deps_formatted_content=deps,
+        config_overrides=ClaudeConfigOverrides(force_section=force_section),
+        latest_commit=COMMIT,
+        upstream_hashes=upstream_hashes or {},
+    )
+
+
+@pytest.mark.asyncio
+async def test_step_runs_claude_and_feeds_results_to_later_steps(prompts_dir, file_storage):
+    from activities.investigate_activities import run_analysis_step_activity
+
+    calls = []
+
+    def fake_analyze(self, prompt_template, repo_structure, previous_context=None, config_overrides=None):
+        calls.append((prompt_template, repo_structure, previous_context))
+        self.last_usage = {"input_tokens": 10, "output_tokens": 5}
+        return f"analysis {len(calls)}"
+
+    with patch("investigator.core.claude_analyzer.ClaudeAnalyzer.analyze_with_context", fake_analyze):
+        overview = await run_analysis_step_activity(_step_input(prompts_dir, "overview", "overview.md"))
+        deps = await run_analysis_step_activity(_step_input(
+            prompts_dir, "deps", "deps.md",
+            context_keys=[overview.context.result_reference_key],
+            deps="requests==2.0",
+        ))
+
+    assert overview.cached is False
+    assert overview.context.result_reference_key == f"repo_overview_{COMMIT}_v3"
+    assert overview.context.prompt_version == "3"
+    assert overview.context.data_reference_key is None
+    assert overview.usage == {"input_tokens": 10, "output_tokens": 5}
+
+    assert deps.context.result_reference_key == f"repo_deps_{COMMIT}_v2"
+    prompt, repo_structure, previous_context = calls[1]
+    assert "requests==2.0" in prompt
+    assert repo_structure == "src/\n  app.py"
+    assert "analysis 1" in previous_context
+
+    # Only the two results (with their input-fingerprint copies and lineage) were written - no per-step prompt data
+    stored = sorted(p.name for p in (file_storage / "repo").iterdir())
+    assert [name for name in stored if "_fp_" not in name and "_lineage" not in name] == [
+        f"_result_repo_deps_{COMMIT}_v2.json",
+        f"_result_repo_overview_{COMMIT}_v3.json",
+    ]
+    assert len([name for name in stored if "_fp_" in name]) == 2
+
+
+@pytest.mark.asyncio
+async def test_cached_step_skips_claude(prompts_dir, file_storage):
+    from activities.investigate_activities import run_analysis_step_activity
+
+    with patch("investigator.core.claude_analyzer.ClaudeAnalyzer.analyze_with_context", return_value="first"):
+        await run_analysis_step_activity(_step_input(prompts_dir, "overview", "overview.md"))
+
+    with patch("investigator.core.claude_analyzer.ClaudeAnalyzer.analyze_with_context") as analyze:
+        result = await run_analysis_step_activity(_step_input(prompts_dir, "overview", "overview.md"))
+
+    analyze.assert_not_called()
+    assert result.cached is True
+    assert result.result_length == len("first")
+
+
+@pytest.mark.asyncio
+async def test_new_commit_with_unchanged_inputs_reuses_result(prompts_dir, file_storage):
+    from activities.investigate_activities import run_analysis_step_activity
+
+    with patch("investigator.core.claude_analyzer.ClaudeAnalyzer.analyze_with_context", return_value="first"):
+        await run_analysis_step_activity(_step_input(prompts_dir, "overview", "overview.md"))
+
+    new_commit = "d" * 40
+    with patch("investigator.core.claude_analyzer.ClaudeAnalyzer.analyze_with_context") as analyze:
+        step = _step_input(prompts_dir, "overview", "overview.md")
+        step.latest_commit = new_commit
+        result = await run_analysis_step_activity(step)
+
+    analyze.assert_not_called()
+    assert result.cached is True
+    assert result.cache_reason.startswith("Inputs unchanged")
+    # Stored under the new commit's key, so reruns at this commit hit the commit cache
+    assert result.context.result_reference_key == f"repo_overview_{new_commit}_v3"
+    assert (file_storage / "repo" / f"_result_repo_overview_{new_commit}_v3.json").exists()
+
+
+@pytest.mark.asyncio
+async def test_changed_inputs_miss_the_fingerprint_cache(prompts_dir, file_storage):
+    from activities.investigate_activities import run_analysis_step_activity
+
+    with patch("investigator.core.claude_analyzer.ClaudeAnalyzer.analyze_with_context", return_value="first"):
+        await run_analysis_step_activity(_step_input(prompts_dir, "overview", "overview.md"))
+
+    with patch("investigator.core.claude_analyzer.ClaudeAnalyzer.analyze_with_context", return_value="second") as analyze:
+        step = _step_input(prompts_dir, "overview", "overview.md")
+        step.latest_commit = "d" * 40
+        step.repo_structure = "src/\n  app.py\n  new_module.py"
+        result = await run_analysis_step_activity(step)
+
+    analyze.assert_called_once()
+    assert result.cached is False
+
+
+@pytest.mark.asyncio
+async def test_forced_step_reruns_only_its_dependents(prompts_dir, file_storage):
+    from activities.investigate_activities import run_analysis_step_activity
+
+    (Path(prompts_dir) / "security.md").write_text("version=1\nCheck security")
+    with patch("investigator.core.claude_analyzer.ClaudeAnalyzer.analyze_with_context",
+               side_effect=["overview 1", "deps 1", "security 1"]):
+        overview = await run_analysis_step_activity(_step_input(prompts_dir, "overview", "overview.md"))
+        deps_step = _step_input(prompts_dir, "deps", "deps.md",
+                                context_keys=[overview.context.result_reference_key],
+                                upstream_hashes={"overview": overview.result_hash})
+        await run_analysis_step_activity(deps_step)
+        await run_analysis_step_activity(_step_input(prompts_dir, "security", "security.md"))
+
+    with patch("investigator.core.claude_analyzer.ClaudeAnalyzer.analyze_with_context",
+               side_effect=["overview 2", "deps 2"]) as analyze:
+        forced = await run_analysis_step_activity(
+            _step_input(prompts_dir, "overview", "overview.md", force_section="overview"))
+        deps_step.upstream_hashes = {"overview": forced.result_hash}
+        deps = await run_analysis_step_activity(deps_step)
+        security = await run_analysis_step_activity(_step_input(prompts_dir, "security", "security.md"))
+
+    assert analyze.call_count == 2
+    assert forced.cached is False and forced.result_hash != overview.result_hash
+    assert deps.cached is False
+    assert security.cached is True
+
+    # The re-run dependent is cached again against the new upstream result
+    with patch("investigator.core.claude_analyzer.ClaudeAnalyzer.analyze_with_context") as analyze:
+        again = await run_analysis_step_activity(deps_step)
+    analyze.assert_not_called()
+    assert again.cached is True
+    assert again.result_hash == deps.result_hash
+
+
+@pytest.mark.asyncio
+async def test_result_cached_without_lineage_is_accepted(prompts_dir, file_storage):
+    from activities.investigate_activities import run_analysis_step_activity
+
+    with patch("investigator.core.claude_analyzer.ClaudeAnalyzer.analyze_with_context", return_value="old"):
+        await run_analysis_step_activity(_step_input(prompts_dir, "deps", "deps.md"))
+    lineage_file = file_storage / "repo" / f"_result_repo_deps_{COMMIT}_v2_lineage.json"
+    lineage_file.unlink()
+
+    with patch("investigator.core.claude_analyzer.ClaudeAnalyzer.analyze_with_context") as analyze:
+        result = await run_analysis_step_activity(
+            _step_input(prompts_dir, "deps", "deps.md", upstream_hashes={"overview": "abc"}))
+
+    analyze.assert_not_called()
+    assert result.cached is True
+    # The current upstream results are recorded for later checks
+    assert lineage_file.exists()
+
+
+def test_fingerprint_covers_every_input():
+    from activities.investigation_cache import InvestigationCache
+
+    base = dict(prompt_content="Describe", repo_structure="src/", previous_context="ctx",
+                prompt_version="1", model_settings={"model": "m", "max_tokens": 10})
+    fingerprint = InvestigationCache.compute_input_fingerprint(**base)
+
+    assert InvestigationCache.compute_input_fingerprint(**base) == fingerprint
+    for field, value in [("prompt_content", "Describe!"), ("repo_structure", "lib/"),
+                         ("previous_context", None), ("prompt_version", "2"),
+                         ("model_settings", {"model": "m", "max_tokens": 20})]:
+        assert InvestigationCache.compute_input_fingerprint(**{**base, field: value}) != fingerprint
+    # Moving text between inputs changes the fingerprint too
+    assert InvestigationCache.compute_input_fingerprint(
+        **{**base, "prompt_content": "Describesrc/", "repo_structure": ""}) != fingerprint
+
+
+@pytest.mark.asyncio
+async def test_missing_prompt_raises_file_not_found(prompts_dir, file_storage):
+    from activities.investigate_activities import run_analysis_step_activity
+
+    with pytest.raises(FileNotFoundError):
+        await run_analysis_step_activity(_step_input(prompts_dir, "nope", "nope.md"))
+
+
+@pytest.mark.asyncio
+async def test_cache_check_activity_runs_the_step_cache_checks(prompts_dir, file_storage):
+    from activities.investigate_activities import check_analysis_step_cache_activity, run_analysis_step_activity
+
+    claude = "investigator.core.claude_analyzer.ClaudeAnalyzer.analyze_with_context"
+    with patch(claude, side_effect=AssertionError("Claude called by the cache check")):
+        miss = await check_analysis_step_cache_activity(_step_input(prompts_dir, "overview", "overview.md"))
+
+    assert miss.cached_output is None
+    assert miss.input_fingerprint
+
+    with patch(claude, return_value="first"):
+        await run_analysis_step_activity(_step_input(prompts_dir, "overview", "overview.md"))
+
+    step = _step_input(prompts_dir, "overview", "overview.md")
+    step.latest_commit = "d" * 40
+    with patch(claude, side_effect=AssertionError("Claude called by the cache check")):
+        hit = await check_analysis_step_cache_activity(step)
+
+    assert hit.cached_output.cached is True
+    assert hit.cached_output.cache_reason.startswith("Inputs unchanged")
+    assert hit.cached_output.context.result_reference_key == f"repo_overview_{'d' * 40}_v3"
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Unit tests for storing the repository structure and dependencies once per run
+and passing them to the analysis steps by content-addressed reference.
+"""
+
+import json
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from models import ClaudeConfigOverrides, PromptContextDict, RunAnalysisStepInput
+
+
+COMMIT = "c" * 40
+STRUCTURE = "src/\n  app.py\n" * 1000
+
+
+@pytest.fixture
+def file_storage(tmp_path, monkeypatch):
+    from activities import investigate_activities
+
+    monkeypatch.setenv("PROMPT_CONTEXT_STORAGE", "file")
+    monkeypatch.setenv("PROMPT_CONTEXT_STORAGE_DIR", str(tmp_path / "storage"))
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    investigate_activities._shared_input_writes.clear()
+    investigate_activities._load_shared_input.cache_clear()
+    return tmp_path / "storage" / "repo"
+
+
+@pytest.fixture
+def prompts_dir(tmp_path):
+    prompts = tmp_path / "prompts"
+    prompts.mkdir()
+    for name in ("one", "two", "three"):
+        (prompts / f"{name}.md").write_text(f"version=1\nStep {name}: {{repo_deps}}")
+    return str(prompts)
+
+
+def test_shared_input_keys_are_content_addressed(file_storage):
+    from utils.prompt_context import create_prompt_context_manager
+
+    manager = create_prompt_context_manager("repo")
+    first = manager.save_shared_input(STRUCTURE)
+    second = manager.save_shared_input(STRUCTURE)
+    other = manager.save_shared_input(STRUCTURE + "more")
+
+    assert first == second != other
+    assert first.startswith("repo_shared_")
+    assert manager.get_shared_input(first) == STRUCTURE
+    assert manager.get_shared_input("repo_shared_missing") is None
+
+
+@pytest.mark.asyncio
+async def test_steps_read_structure_written_once(file_storage, prompts_dir):
+    from activities import investigate_activities
+    from utils.prompt_context_file import FileBasedPromptContextManager
+
+    seen = []
+
+    def fake_analyze(self, prompt_template, repo_structure, previous_context=None, config_overrides=None):
+        seen.append((prompt_template, repo_structure))
+        return "result"
+
+    with patch.object(FileBasedPromptContextManager, "save_shared_input",
+                      autospec=True, side_effect=FileBasedPromptContextManager.save_shared_input) as save, \
+         patch("investigator.core.claude_analyzer.ClaudeAnalyzer.analyze_with_context", fake_analyze):
+        shared = await investigate_activities.store_shared_inputs_activity("repo", STRUCTURE, "flask==3.0")
+        # A second run with unchanged inputs reuses the same keys without rewriting
+        again = await investigate_activities.store_shared_inputs_activity("repo", STRUCTURE, "flask==3.0")
+
+        for name in ("one", "two", "three"):
+            await investigate_activities.run_analysis_step_activity(RunAnalysisStepInput(
+                context_dict=PromptContextDict(repo_name="repo", step_name=name),
+                prompts_dir=prompts_dir,
+                prompt_file=f"{name}.md",
+                repo_structure_ref=shared.repo_structure_ref,
+                deps_ref=shared.deps_ref,
+                config_overrides=ClaudeConfigOverrides(),
+                latest_commit=COMMIT,
+            ))
+
+    assert again == shared
+    assert save.call_count == 2  # structure and deps, once each
+    assert [structure for _, structure in seen] == [STRUCTURE] * 3
+    assert all("flask==3.0" in prompt for prompt, _ in seen)
+
+    shared_files = [p.name for p in file_storage.iterdir() if p.name.startswith("_shared_")]
+    assert len(shared_files) == 2
+
+
+@pytest.mark.asyncio
+async def test_saved_prompt_data_points_at_shared_structure(file_storage):
+    from activities import investigate_activities
+    from utils.prompt_context import create_prompt_context_from_dict
+
+    shared = await investigate_activities.store_shared_inputs_activity("repo", STRUCTURE, None)
+
+    saved = await investigate_activities.save_prompt_context_activity(
+        {"repo_name": "repo", "step_name": "one", "prompt_version": "1", "context_reference_keys": []},
+        "version=1\nDescribe the repo",
+        None,
+        None,
+        shared.repo_structure_ref,
+        None,
+    )
+
+    context_dict = saved["context"]
+    assert context_dict["repo_structure_ref"] == shared.repo_structure_ref
+
+    data_file = file_storage / f"{context_dict['data_reference_key']}.json"
+    assert json.loads(data_file.read_text())["repo_structure"] == ""
+
+    data = create_prompt_context_from_dict(context_dict).get_prompt_and_context()
+    assert data["repo_structure"] == STRUCTURE
+    assert data["prompt_content"] == "version=1\nDescribe the repo"
+
+
+def test_step_input_needs_structure_by_value_or_reference():
+    with pytest.raises(ValueError):
+        RunAnalysisStepInput(
+            context_dict=PromptContextDict(repo_name="repo", step_name="one"),
+            prompts_dir="prompts",
+            prompt_file="one.md",
+        )
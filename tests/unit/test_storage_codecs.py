@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the DynamoDB storage codecs: Binary zstd items, gzip fallback
+and decoding of items written before codecs were recorded.
+"""
+
+import base64
+import gzip
+import json
+import secrets
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+moto = pytest.importorskip("moto")
+
+from utils import storage_codecs
+
+TABLE = "test-repo-swarm-results"
+# Compressible, like a real repo structure: repeated paths with varying names
+STRUCTURE = "\n".join(f"packages/pkg{i % 300}/src/module_{i}.py" for i in range(40_000))
+
+
+@pytest.fixture(autouse=True)
+def fresh_codecs(monkeypatch):
+    monkeypatch.delenv("DYNAMODB_STORAGE_CODEC", raising=False)
+    monkeypatch.delenv("DYNAMODB_ZSTD_DICT", raising=False)
+    storage_codecs.reset_codecs()
+    yield
+    storage_codecs.reset_codecs()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+
+    with moto.mock_aws():
+        import boto3
+        from utils.dynamodb_client import DynamoDBClient
+
+        boto3.resource("dynamodb", region_name="us-east-1").create_table(
+            TableName=TABLE,
+            KeySchema=[
+                {"AttributeName": "repository_name", "KeyType": "HASH"},
+                {"AttributeName": "analysis_timestamp", "KeyType": "RANGE"},
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "repository_name", "AttributeType": "S"},
+                {"AttributeName": "analysis_timestamp", "AttributeType": "N"},
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        yield DynamoDBClient(table_name=TABLE)
+
+
+def _raw_item(client, name):
+    return client.table.get_item(Key={"repository_name": name, "analysis_timestamp": 0})["Item"]
+
+
+@pytest.mark.skipif(not storage_codecs.ZSTD_AVAILABLE, reason="zstandard not installed")
+def test_large_results_are_stored_as_zstd_binary(client):
+    client.save_analysis_result("big", STRUCTURE)
+
+    item = _raw_item(client, "_result_big")
+    assert item["codec"] == "zstd"
+    assert isinstance(item["compressed_result"].value, bytes)
+    assert client.get_analysis_result("big") == STRUCTURE
+
+
+@pytest.mark.parametrize("codec", ["gzip", "zstd"])
+def test_temporary_data_round_trips(client, monkeypatch, codec):
+    if codec == "zstd" and not storage_codecs.ZSTD_AVAILABLE:
+        pytest.skip("zstandard not installed")
+    monkeypatch.setenv("DYNAMODB_STORAGE_CODEC", codec)
+
+    client.save_temporary_analysis_data("temp", "prompt", STRUCTURE, context="ctx")
+
+    assert _raw_item(client, "_temp_temp")["codec"] == codec
+    data = client.get_temporary_analysis_data("temp")
+    assert data["repo_structure"] == STRUCTURE
+    assert data["context"] == "ctx"
+
+
+def test_chunks_are_binary_and_reassemble(client, monkeypatch):
+    monkeypatch.setenv("DYNAMODB_STORAGE_CODEC", "gzip")
+    structure = secrets.token_hex(600_000)
+
+    result = client.save_temporary_analysis_data("chunky", "prompt", structure)
+
+    assert result["is_chunked"] is True
+    chunk = _raw_item(client, "_temp_chunky_chunk_0")
+    assert isinstance(chunk["chunk_data"].value, bytes)
+    assert client.get_temporary_analysis_data("chunky")["repo_structure"] == structure
+
+
+@pytest.mark.skipif(not storage_codecs.ZSTD_AVAILABLE, reason="zstandard not installed")
+def test_binary_zstd_avoids_chunking_that_gzip_base64_needed(client):
+    # The repeated half is beyond gzip's 32KB window but within zstd's
+    structure = secrets.token_hex(250_000) * 2
+    legacy_size = len(base64.b64encode(gzip.compress(json.dumps(
+        {"prompt_content": "prompt", "repo_structure": structure}).encode())))
+    assert legacy_size > 380 * 1024
+
+    result = client.save_temporary_analysis_data("medium", "prompt", structure)
+
+    assert "is_chunked" not in result
+    assert client.get_temporary_analysis_data("medium")["repo_structure"] == structure
+
+
+def test_legacy_gzip_base64_items_still_decode(client):
+    client.table.put_item(Item={
+        "repository_name": "_result_old",
+        "analysis_timestamp": 0,
+        "compressed_result": base64.b64encode(gzip.compress(b"old result")).decode(),
+        "is_compressed": True,
+        "ttl_timestamp": 0,
+    })
+    payload = {"prompt_content": "p", "repo_structure": "old structure"}
+    client.table.put_item(Item={
+        "repository_name": "_temp_old",
+        "analysis_timestamp": 0,
+        "compressed_data": base64.b64encode(gzip.compress(json.dumps(payload).encode())).decode(),
+        "is_compressed": True,
+        "ttl_timestamp": 0,
+    })
+
+    assert client.get_analysis_result("old") == "old result"
+    assert client.get_analysis_results(["old"]) == {"old": "old result"}
+    assert client.get_temporary_analysis_data("old")["repo_structure"] == "old structure"
+
+
+@pytest.mark.skipif(not storage_codecs.ZSTD_AVAILABLE, reason="zstandard not installed")
+def test_dictionary_id_is_recorded_and_required(client, monkeypatch, tmp_path):
+    import zstandard
+
+    samples = [f"# Architecture of service {i}\n\n## Overview\nService {i} handles requests.\n".encode() * 20
+               for i in range(200)]
+    dict_path = tmp_path / "arch.zdict"
+    dict_path.write_bytes(zstandard.train_dictionary(4096, samples).as_bytes())
+    monkeypatch.setenv("DYNAMODB_ZSTD_DICT", str(dict_path))
+
+    client.save_analysis_result("dict", STRUCTURE)
+    assert _raw_item(client, "_result_dict")["codec_dict_id"] > 0
+    assert client.get_analysis_result("dict") == STRUCTURE
+
+    monkeypatch.delenv("DYNAMODB_ZSTD_DICT")
+    storage_codecs.reset_codecs()
+    with pytest.raises(ValueError, match="dictionary"):
+        storage_codecs.decode_item_payload(_raw_item(client, "_result_dict"), b"")
+
+
+def test_unknown_codec_is_rejected():
+    with pytest.raises(ValueError, match="Unknown storage codec"):
+        storage_codecs.get_codec("brotli")
+
+
+def test_codec_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        storage_codecs.StorageCodec()
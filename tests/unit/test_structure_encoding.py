@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the compact repository structure encoding and the token budget.
+"""
+
+import sys
+import logging
+import subprocess
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from investigator.core.repository_analyzer import RepositoryAnalyzer
+from investigator.core.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "demo"
+    files = [
+        "README.md",
+        "src/main/java/com/acme/App.java",
+        "src/main/java/com/acme/Util.java",
+        "node_modules/left-pad/index.js",
+        "a/b/c/d/e/deep.txt",
+        *[f"handlers/handler_{i:02d}.py" for i in range(25)],
+        "handlers/schema.json",
+        "handlers/Makefile",
+    ]
+    for rel_path in files:
+        file_path = repo / rel_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text("x\n")
+    return repo
+
+
+def test_compact_drops_icons_and_collapses_single_child_dirs(repo):
+    structure = RepositoryAnalyzer(logger).get_structure(str(repo), max_depth=6, structure_format="compact")
+
+    assert structure.startswith("Repository: demo\n================\n\n")
+    assert Config.DIR_ICON not in structure and Config.FILE_ICON not in structure
+    assert "node_modules" not in structure
+    assert "src/main/java/com/acme/\n  App.java\n  Util.java" in structure
+    assert "README.md" in structure.splitlines()
+
+
+def test_compact_groups_files_of_large_directories(repo):
+    lines = RepositoryAnalyzer(logger).get_structure(str(repo), structure_format="compact").splitlines()
+
+    start = lines.index("handlers/")
+    assert lines[start + 1:start + 4] == [
+        "  *.py x25 (e.g. handler_00.py, handler_01.py, handler_02.py)",
+        "  Makefile",
+        "  schema.json",
+    ]
+
+
+def test_compact_keeps_the_depth_limit(repo):
+    structure = RepositoryAnalyzer(logger).get_structure(str(repo), max_depth=2, structure_format="compact")
+
+    # Depth counts real directories: a/b is at the limit, so c is not expanded
+    assert "a/b/\n  c/ [NESTED]" in structure
+    assert "src/main/\n  java/ [NESTED]" in structure
+    assert "deep.txt" not in structure
+
+
+def test_compact_is_shorter_than_tree(repo):
+    analyzer = RepositoryAnalyzer(logger)
+
+    tree = analyzer.get_structure(str(repo), structure_format="tree")
+    compact = analyzer.get_structure(str(repo), structure_format="compact")
+
+    assert len(compact) < len(tree) / 2
+
+
+def test_compact_from_git_objects_matches_checkout(repo):
+    def git(*args):
+        subprocess.run(["git", "-C", str(repo), "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+                       check=True, capture_output=True)
+
+    git("init", "-q", "-b", "main")
+    git("add", "-A")
+    git("commit", "-q", "-m", "init")
+    analyzer = RepositoryAnalyzer(logger)
+
+    assert analyzer.get_structure_from_git(str(repo), structure_format="compact") == \
+        analyzer.get_structure(str(repo), structure_format="compact")
+
+
+def test_unknown_format_is_rejected(repo):
+    with pytest.raises(ValueError, match="Unknown repository structure format"):
+        RepositoryAnalyzer(logger).get_structure(str(repo), structure_format="yaml")
+
+
+@pytest.fixture
+def monorepo(tmp_path):
+    repo = tmp_path / "mono"
+    files = [
+        *[f"services/api/src/handlers/h{i}.py" for i in range(30)],
+        *[f"docs/guides/page{i}.md" for i in range(30)],
+        *[f"third_party/lib{i}/mod.c" for i in range(30)],
+        "a/b/c/d/e/f/deep.py",
+        "README.md",
+    ]
+    for rel_path in files:
+        file_path = repo / rel_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text("x\n")
+    return repo
+
+
+@pytest.mark.parametrize("structure_format", ["tree", "compact"])
+@pytest.mark.parametrize("token_budget", [150, 300, 800])
+def test_budgeted_structure_fits_the_budget(monorepo, structure_format, token_budget):
+    structure = RepositoryAnalyzer(logger).get_structure(
+        str(monorepo), structure_format=structure_format, token_budget=token_budget
+    )
+
+    assert RepositoryAnalyzer.estimate_tokens(structure) <= token_budget
+    assert "README.md" in structure
+
+
+def test_large_budget_sees_deeper_than_the_fixed_depth(monorepo):
+    analyzer = RepositoryAnalyzer(logger)
+
+    assert "deep.py" not in analyzer.get_structure(str(monorepo), structure_format="compact")
+    structure = analyzer.get_structure(str(monorepo), structure_format="compact", token_budget=100_000)
+    assert "a/b/c/d/e/f/\n  deep.py" in structure
+    assert "*.py x30 (e.g. h0.py, h1.py, h10.py)" in structure
+
+
+def test_vendored_trees_are_only_counted(monorepo):
+    structure = RepositoryAnalyzer(logger).get_structure(str(monorepo), structure_format="tree",
+                                                         token_budget=100_000)
+
+    assert f"  {Config.DIR_ICON} third_party/ [30 files]" in structure.splitlines()
+    assert "lib0" not in structure
+
+
+def test_tight_budget_expands_source_before_docs(monorepo):
+    structure = RepositoryAnalyzer(logger).get_structure(str(monorepo), structure_format="tree", token_budget=500)
+
+    assert "h0.py" in structure
+    assert "page0.md" not in structure
+    assert f"    {Config.DIR_ICON} guides/ [30 files]" in structure.splitlines()
+
+
+@pytest.mark.asyncio
+async def test_structure_activity_reports_budget_and_size(monorepo, monkeypatch):
+    from activities.investigate_activities import analyze_repository_structure_activity
+
+    monkeypatch.setattr(Config, "GIT_TREE_ONLY", False)
+    monkeypatch.setattr(Config, "STRUCTURE_TOKEN_BUDGET", 300)
+
+    result = await analyze_repository_structure_activity(str(monorepo))
+
+    assert result["structure_token_budget"] == 300
+    assert result["structure_tokens"] == RepositoryAnalyzer.estimate_tokens(result["repo_structure"]) <= 300
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Unit tests for routing clone-bound activities to the worker holding the clone
+and for the stage pool task queues.
+The Temporal workflow APIs are patched with plain asyncio equivalents.
+"""
+
+import sys
+import time
+import asyncio
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from temporalio.exceptions import ActivityError, TimeoutError as TemporalTimeoutError, TimeoutType
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from activities.worker_session import (
+    check_worker_queue_polled_activity,
+    configure_worker_task_queues,
+    get_worker_task_queues_activity,
+    unique_worker_task_queue
+)
+from models import WorkerTaskQueues
+from workflows.investigate_single_repo_workflow import InvestigateSingleRepoWorkflow
+
+
+def _schedule_to_start_timeout():
+    error = ActivityError(
+        "activity timed out", scheduled_event_id=1, started_event_id=0, identity="",
+        activity_type="analyze_repository_structure_activity", activity_id="1", retry_state=None,
+    )
+    error.__cause__ = TemporalTimeoutError("timed out", type=TimeoutType.SCHEDULE_TO_START, last_heartbeat_details=[])
+    return error
+
+
+async def _run(worker_queues, lost_queues=(), busy_queues=()):
+    """Clone and read the structure with fake activities; returns the calls as (activity, task_queue, args).
+
+    Activities on lost_queues always time out waiting to start and the queue has
+    no poller; the first structure activity on busy_queues times out once while
+    the queue is still polled.
+    """
+    calls = []
+    queues = iter(worker_queues)
+    timed_out = set()
+
+    async def fake_execute_activity(activity, args, **kwargs):
+        name = activity.__name__
+        task_queue = kwargs.get("task_queue")
+        calls.append((name, task_queue, list(args)))
+        if name == "check_worker_queue_polled_activity":
+            return args[0] not in lost_queues
+        if task_queue in lost_queues:
+            raise _schedule_to_start_timeout()
+        if task_queue in busy_queues and name == "analyze_repository_structure_activity" and task_queue not in timed_out:
+            timed_out.add(task_queue)
+            raise _schedule_to_start_timeout()
+        if name == "get_worker_task_queues_activity":
+            queue = next(queues)
+            return queue if isinstance(queue, WorkerTaskQueues) else WorkerTaskQueues(worker=queue)
+        if name == "clone_repository_activity":
+            return {"repo_path": f"/tmp/{task_queue}/repo", "temp_dir": f"/tmp/{task_queue}"}
+        if name == "analyze_repository_structure_activity":
+            return {"status": "success", "repo_structure": f"structure of {args[0]}"}
+        raise AssertionError(f"Unexpected activity {name}")
+
+    wf = InvestigateSingleRepoWorkflow()
+    wf._repo_name = "repo"
+    wf._repo_url = "https://github.com/org/repo"
+
+    target = "workflows.investigate_single_repo_workflow.workflow"
+    with patch(f"{target}.execute_activity", fake_execute_activity), \
+         patch(f"{target}.now", lambda: datetime(2025, 1, 1)):
+        await wf._clone_repository(wf._repo_url, wf._repo_name)
+        structure = await wf._analyze_repository_structure()
+    return calls, structure
+
+
+def test_clone_activities_run_on_the_cloning_worker():
+    calls, structure = asyncio.run(_run(["queue-a"]))
+
+    assert calls == [
+        ("get_worker_task_queues_activity", None, []),
+        ("clone_repository_activity", "queue-a", ["https://github.com/org/repo", "repo"]),
+        ("analyze_repository_structure_activity", "queue-a", ["/tmp/queue-a/repo"]),
+    ]
+    assert structure["repo_structure"] == "structure of /tmp/queue-a/repo"
+
+
+def test_without_a_worker_queue_everything_stays_on_the_shared_queue():
+    calls, _ = asyncio.run(_run([None]))
+
+    assert [task_queue for _, task_queue, _ in calls] == [None, None, None]
+
+
+def test_lost_worker_triggers_a_reclone_on_another_worker():
+    calls, structure = asyncio.run(_run(["queue-a", "queue-b"], lost_queues={"queue-a"}))
+
+    # The clone on queue-a is fine, the worker disappears before the structure activity starts
+    calls_after_clone = [(name, task_queue) for name, task_queue, _ in calls]
+    assert calls_after_clone[:2] == [("get_worker_task_queues_activity", None), ("clone_repository_activity", "queue-a")]
+    assert ("check_worker_queue_polled_activity", None) in calls_after_clone
+    assert calls_after_clone[-3:] == [
+        ("get_worker_task_queues_activity", None),
+        ("clone_repository_activity", "queue-b"),
+        ("analyze_repository_structure_activity", "queue-b"),
+    ]
+    assert structure["repo_structure"] == "structure of /tmp/queue-b/repo"
+
+
+def test_busy_worker_gets_the_activity_again_instead_of_a_reclone():
+    calls, structure = asyncio.run(_run(["queue-a"], busy_queues={"queue-a"}))
+
+    assert [(name, task_queue) for name, task_queue, _ in calls] == [
+        ("get_worker_task_queues_activity", None),
+        ("clone_repository_activity", "queue-a"),
+        ("analyze_repository_structure_activity", "queue-a"),
+        ("check_worker_queue_polled_activity", None),
+        ("analyze_repository_structure_activity", "queue-a"),
+    ]
+    assert structure["repo_structure"] == "structure of /tmp/queue-a/repo"
+
+
+def test_other_activity_failures_are_not_retried_elsewhere():
+    async def run():
+        wf = InvestigateSingleRepoWorkflow()
+        wf._repo_name = "repo"
+        wf._task_queues = WorkerTaskQueues(worker="queue-a")
+
+        async def failing(activity, args, **kwargs):
+            raise ActivityError("boom", scheduled_event_id=1, started_event_id=2, identity="", activity_type="x",
+                                activity_id="1", retry_state=None)
+
+        with patch("workflows.investigate_single_repo_workflow.workflow.execute_activity", failing), \
+             patch.object(wf, "_clone_repository") as reclone:
+            with pytest.raises(ActivityError):
+                await wf._execute_on_clone(get_worker_task_queues_activity, lambda clone: [])
+            reclone.assert_not_called()
+
+    asyncio.run(run())
+
+
+def test_clone_stage_has_its_own_pool_on_the_cloning_worker():
+    queues = WorkerTaskQueues(worker="queue-a", clone="queue-a-clone", llm="shared-llm", hub="shared-hub")
+
+    calls, _ = asyncio.run(_run([queues]))
+
+    assert [(name, task_queue) for name, task_queue, _ in calls] == [
+        ("get_worker_task_queues_activity", None),
+        ("clone_repository_activity", "queue-a-clone"),
+        ("analyze_repository_structure_activity", "queue-a"),
+    ]
+
+
+@pytest.mark.parametrize("sticky, stage_pools, expected", [
+    (False, False, {}),
+    (True, False, {"worker": "{unique}"}),
+    (True, True, {"worker": "{unique}", "clone": "{unique}-clone", "llm": "tq-llm", "hub": "tq-hub"}),
+    # Stage pools put the clone on a worker-specific queue even without WORKER_STICKY_QUEUE
+    (False, True, {"worker": "{unique}", "clone": "{unique}-clone", "llm": "tq-llm", "hub": "tq-hub"}),
+])
+def test_configured_stage_queues(sticky, stage_pools, expected):
+    with patch("activities.worker_session.unique_worker_task_queue", lambda task_queue: f"{task_queue}-host-1"):
+        queues = configure_worker_task_queues("tq", sticky, stage_pools)
+    configure_worker_task_queues("tq", False, False)
+
+    assert queues.model_dump(exclude_none=True) == {
+        stage: queue.format(unique="tq-host-1") for stage, queue in expected.items()
+    }
+
+
+@pytest.mark.asyncio
+async def test_worker_task_queues_activity_returns_the_configured_queues():
+    queue = unique_worker_task_queue("investigate-task-queue")
+    assert queue.startswith("investigate-task-queue-")
+    assert queue != unique_worker_task_queue("investigate-task-queue")
+
+    queues = configure_worker_task_queues("investigate-task-queue", True, True)
+    try:
+        with patch("activities.worker_session.activity.logger"):
+            assert await get_worker_task_queues_activity() == queues
+    finally:
+        configure_worker_task_queues("investigate-task-queue", False, False)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("seconds_ago, polled", [(5, True), (600, False), (None, False)])
+async def test_queue_check_looks_for_a_recent_poller(seconds_ago, polled):
+    from google.protobuf.timestamp_pb2 import Timestamp
+
+    pollers = []
+    if seconds_ago is not None:
+        last_access_time = Timestamp()
+        last_access_time.FromSeconds(int(time.time()) - seconds_ago)
+        pollers.append(SimpleNamespace(last_access_time=last_access_time))
+    client = SimpleNamespace(namespace="default", workflow_service=SimpleNamespace(
+        describe_task_queue=AsyncMock(return_value=SimpleNamespace(pollers=pollers))
+    ))
+
+    with patch("activities.worker_session.activity.client", lambda: client), \
+         patch("activities.worker_session.activity.logger"):
+        assert await check_worker_queue_polled_activity("queue-a") is polled
+
+    request = client.workflow_service.describe_task_queue.call_args.args[0]
+    assert request.task_queue.name == "queue-a"